@@ -65,6 +65,23 @@ def create_app():
     
     return app
 
+
+_console = None
+
+
+def _console_stream():
+    """UTF-8 обертка над sys.stdout.buffer, общая для всех приложений процесса.
+
+    Повторный create_app (тесты, рабочие процессы очереди заданий) не должен
+    создавать новую обертку: удаленная старая закрыла бы sys.stdout.buffer.
+    """
+    global _console
+    if _console is None or _console.buffer is not sys.stdout.buffer:
+        import io
+        _console = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', line_buffering=True)
+    return _console
+
+
 def setup_logging(app):
     """Настройка логирования приложения"""
     log_dir = os.path.join(app.root_path, 'logs')
@@ -86,10 +103,7 @@ def setup_logging(app):
     file_handler.setLevel(logging.INFO)
     
     # Настройка логирования в консоль с UTF-8
-    import io
-    console_handler = logging.StreamHandler(
-        io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', line_buffering=True)
-    )
+    console_handler = logging.StreamHandler(_console_stream())
     console_handler.setFormatter(formatter)
     console_handler.setLevel(logging.INFO)
     
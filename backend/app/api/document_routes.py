@@ -1,21 +1,28 @@
-from flask import Blueprint, request, jsonify, send_file, redirect, current_app
+from flask import Blueprint, Response, request, jsonify, send_file, redirect, current_app, stream_with_context
 import os
-import tempfile
+import json
 import traceback
 from werkzeug.utils import secure_filename
 import shutil
 import sys
 import uuid
 import datetime
-import hashlib
+import time
 import re
 import random
 import urllib.request
 from lxml import etree
 
 from app.services.document_processor import DocumentProcessor
-from app.services.norm_control_checker import NormControlChecker
-from app.services.document_corrector import DocumentCorrector
+from app.services.norm_control_checker import parse_rule_ids
+from app.services.document_corrector import DocumentCorrector, get_correction_formatting_mode
+from app.services.document_pipeline import DocumentPipeline
+from app.services.change_set import ChangeSet
+from app.services.result_cache import get_document_cache, make_cache_key
+from app.services.job_queue import QueueFullError, get_job_queue, JOB_DONE, JOB_FAILED
+from app.services.job_worker import report_progress
+from app.services.batch_processor import BatchError, get_batch_config, open_batch, run_batch, stream_zip
+from app.services.lazy_document_data import LazyDocumentData
 from app.services.ai_config import get_ai_status, save_api_key, clear_api_key
 from app.services.ai_client import is_configured as ai_is_configured, suggest_for_check_results, complete_prompt
 
@@ -25,8 +32,29 @@ ALLOWED_EXTENSIONS = {'docx'}
 # Директория для хранения постоянных корректированных файлов
 CORRECTIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'corrections')
 
-# Создаем директорию, если она не существует
+# Директория для загруженных документов (исходники для последующего /correct)
+UPLOADS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'uploads')
+
+# Директория для наборов изменений пробного исправления (dry_run)
+CHANGESETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'changesets')
+
+# Директория для сводок пакетной обработки (/batch)
+BATCHES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'batches')
+
+# Создаем директории, если они не существуют
 os.makedirs(CORRECTIONS_DIR, exist_ok=True)
+os.makedirs(UPLOADS_DIR, exist_ok=True)
+os.makedirs(CHANGESETS_DIR, exist_ok=True)
+os.makedirs(BATCHES_DIR, exist_ok=True)
+
+# Интервал комментариев keep-alive в потоке событий задания (секунды)
+JOB_EVENTS_KEEPALIVE = 15
+
+# Срок хранения загруженных оригиналов в UPLOADS_DIR по умолчанию (часы) и
+# как часто проверять устаревшие файлы (секунды)
+DEFAULT_UPLOAD_TTL_HOURS = 24
+UPLOADS_PURGE_INTERVAL = 600
+_uploads_purged_at = 0.0
 
 def allowed_file(filename):
     return '.' in filename and \
@@ -194,6 +222,171 @@ def ai_complete():
         current_app.logger.error(f"Ошибка AI complete: {type(e).__name__}: {str(e)}")
         return jsonify({'error': 'Не удалось выполнить запрос к ИИ'}), 500
 
+def _build_ai_suggestions(check_results, corrected_check_results, filename, corrected_filename):
+    """Формирует подсказки ИИ для исходной и исправленной версий.
+
+    Возвращает кортеж (ai_suggestions, ai_error).
+    """
+    ai_suggestions = {}
+    ai_error = None
+    try:
+        ai_suggestions['before'] = suggest_for_check_results(check_results, filename)
+    except Exception as ai_exc:
+        current_app.logger.warning(f"AI suggest (до исправления) не удалось: {type(ai_exc).__name__}: {str(ai_exc)}")
+        ai_error = 'Не удалось получить рекомендации ИИ для исходной версии'
+    if corrected_check_results:
+        try:
+            ai_suggestions['after'] = suggest_for_check_results(corrected_check_results, corrected_filename or filename)
+        except Exception as ai_exc:
+            current_app.logger.warning(f"AI suggest (после исправления) не удалось: {type(ai_exc).__name__}: {str(ai_exc)}")
+            ai_error = ai_error or 'Не удалось получить рекомендации ИИ для исправленной версии'
+    return ai_suggestions, ai_error
+
+
+def _corrected_filename_base(filename):
+    """Возвращает безопасное имя и отметку времени для исправленного файла."""
+    base_name, _ = os.path.splitext(filename)
+    safe_base = secure_filename(base_name) or "document"
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return safe_base, timestamp
+
+
+def _persist_upload(content, filename):
+    """Сохраняет загруженный документ в UPLOADS_DIR и возвращает путь к нему.
+
+    Оригинал нужен только для последующего /correct, поэтому хранится не дольше
+    UPLOAD_TTL_HOURS: устаревшие файлы удаляются при сохранении новых.
+    """
+    _purge_expired_uploads()
+    file_path = os.path.join(UPLOADS_DIR, f"{uuid.uuid4().hex}_{filename}")
+    with open(file_path, 'wb') as f:
+        f.write(content)
+    return file_path
+
+
+def _upload_ttl_hours():
+    """Срок хранения загруженных оригиналов из UPLOAD_TTL_HOURS (часы, по умолчанию 24)."""
+    value = os.environ.get('UPLOAD_TTL_HOURS', str(DEFAULT_UPLOAD_TTL_HOURS)).strip()
+    try:
+        hours = float(value)
+        if hours <= 0:
+            raise ValueError(value)
+    except ValueError:
+        print(f"Некорректное значение UPLOAD_TTL_HOURS={value}, используется {DEFAULT_UPLOAD_TTL_HOURS}")
+        hours = DEFAULT_UPLOAD_TTL_HOURS
+    return hours
+
+
+def _purge_expired_uploads(force=False):
+    """Удаляет из UPLOADS_DIR оригиналы старше UPLOAD_TTL_HOURS (не чаще UPLOADS_PURGE_INTERVAL).
+
+    Возвращает число удаленных файлов.
+    """
+    global _uploads_purged_at
+    now = time.time()
+    if not force and now - _uploads_purged_at < UPLOADS_PURGE_INTERVAL:
+        return 0
+    _uploads_purged_at = now
+    cutoff = now - _upload_ttl_hours() * 3600
+    removed = 0
+    for name in os.listdir(UPLOADS_DIR):
+        path = os.path.join(UPLOADS_DIR, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError as e:
+            print(f"Не удалось удалить устаревший файл {path}: {str(e)}")
+    return removed
+
+
+def _correction_filename(original_filename):
+    """Имя файла исправленного документа в CORRECTIONS_DIR."""
+    correction_date = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    if original_filename:
+        original_name, ext = os.path.splitext(original_filename)
+        safe_original_name = secure_filename(original_name)
+        return f"{safe_original_name}_corrected_{correction_date}.docx"
+    return f"corrected_doc_{correction_date}.docx"
+
+
+def _change_set_path(change_set_id):
+    """Путь к набору изменений; None для недопустимого идентификатора."""
+    if not re.fullmatch(r'[0-9a-f]{32}', str(change_set_id or '')):
+        return None
+    return os.path.join(CHANGESETS_DIR, f"{change_set_id}.json")
+
+
+def _slowest_rules(check_results):
+    """Самые медленные проверки из check_results (пустой список, если замеров нет)."""
+    return ((check_results or {}).get('timing') or {}).get('slowest', [])
+
+
+def _log_slowest_rules(check_results):
+    """Пишет в лог самые медленные проверки документа."""
+    timing = (check_results or {}).get('timing')
+    if not timing:
+        return
+    slowest = ', '.join(
+        f"{entry['checker']} (нормы {', '.join(str(rule_id) for rule_id in entry['rule_ids'])}): {entry['duration_ms']:.1f} мс"
+        for entry in timing.get('slowest', [])
+    )
+    current_app.logger.info(
+        f"Проверка заняла {timing['total_ms']:.1f} мс (режим {timing['mode']}, потоков {timing['workers']}); "
+        f"самые медленные: {slowest or 'нет данных'}"
+    )
+
+
+def _upload_response_from_cache(cache, cache_key, cached, filename, file_path, rule_ids, with_ai=True):
+    """Строит ответ /upload (тело, статус) из записи кеша.
+
+    Исправленный документ копируется из кеша в CORRECTIONS_DIR под новым именем.
+    Возвращает None, если запись неполная и документ нужно обработать заново.
+    """
+    correction_success = cached.get('correction_success', False)
+    corrected_filename = None
+    if correction_success:
+        safe_base, timestamp = _corrected_filename_base(filename)
+        corrected_filename = f"{safe_base}_corrected_{timestamp}.docx"
+        if not cache.restore_artifact(cache_key, os.path.join(CORRECTIONS_DIR, corrected_filename)):
+            return None
+
+    ai_enabled = with_ai and ai_is_configured()
+    ai_suggestions = cached.get('ai_suggestions') or {}
+    ai_error = None
+    if ai_enabled and not ai_suggestions:
+        ai_suggestions, ai_error = _build_ai_suggestions(
+            cached['check_results'], cached.get('corrected_check_results'), filename, corrected_filename
+        )
+
+    current_app.logger.info(f"Результат взят из кеша: {cache_key[:12]}")
+    # Поток событий задания получает те же этапы, что и при полной обработке
+    report_progress('checked', cached['check_results'])
+    if correction_success:
+        report_progress('corrected', {
+            'corrected_filename': corrected_filename,
+            'corrected_file_path': os.path.join(CORRECTIONS_DIR, corrected_filename),
+            'correction_passes': None
+        })
+    if cached.get('corrected_check_results') is not None:
+        report_progress('rechecked', cached['corrected_check_results'])
+    return {
+        'success': True,
+        'filename': filename,
+        'temp_path': file_path,
+        'check_results': cached['check_results'],
+        'slowest_rules': _slowest_rules(cached['check_results']),
+        'rules': rule_ids,
+        'correction_success': correction_success,
+        'corrected_file_path': corrected_filename,
+        'corrected_check_results': cached.get('corrected_check_results'),
+        'ai_enabled': ai_enabled,
+        'ai_suggestions': ai_suggestions if ai_suggestions else None,
+        'ai_error': ai_error,
+        'cache_hit': True
+    }, 200
+
+
 @bp.route('/upload', methods=['POST'])
 def upload_document():
     """
@@ -213,50 +406,107 @@ def upload_document():
     if not allowed_file(file.filename):
         return jsonify({'error': 'Недопустимый формат файла. Разрешены только файлы DOCX.'}), 400
     
+    # Необязательный набор норм для проверки (например, rules=2,3,6 — только шрифт и поля)
+    try:
+        rule_ids = parse_rule_ids(request.form.get('rules') or request.args.get('rules'))
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    
     try:
-        # Создаём временную директорию и сохраняем файл с корректным именем
-        temp_dir = tempfile.mkdtemp()
         filename = secure_filename(file.filename)
         
         # Убедимся, что имя файла имеет расширение .docx
         if not filename.lower().endswith('.docx'):
             filename = os.path.splitext(filename)[0] + '.docx'
-            
-        file_path = os.path.join(temp_dir, filename)
-        
-        # Сохраняем с явным закрытием файла
-        with open(file_path, 'wb') as f:
-            shutil.copyfileobj(file.stream, f)
         
-        # Проверяем, что файл успешно сохранен
-        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+        # Документ обрабатывается в памяти; на диск он записывается один раз, в конце
+        content = file.stream.read()
+        if not content:
             return jsonify({'error': 'Ошибка при сохранении файла'}), 500
         
-        current_app.logger.info(f"Файл сохранен по пути {file_path}, размер: {os.path.getsize(file_path)} байт")
+        current_app.logger.info(f"Получен файл {filename}, размер: {len(content)} байт")
+        
+        # Асинхронный режим: документ обрабатывается в пуле рабочих процессов,
+        # ответ сразу содержит идентификатор задания для /jobs/<id>
+        if _async_upload_requested():
+            try:
+                job_id = get_job_queue().submit(_run_upload_job, content, filename, rule_ids, filename=filename)
+            except QueueFullError as qe:
+                current_app.logger.warning(str(qe))
+                response = jsonify({'error': 'Очередь обработки заполнена, повторите попытку позже'})
+                response.headers['Retry-After'] = '30'
+                return response, 503
+            current_app.logger.info(f"Документ {filename} поставлен в очередь, задание {job_id}")
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': f"{bp.url_prefix}/jobs/{job_id}",
+                'events_url': f"{bp.url_prefix}/jobs/{job_id}/events"
+            }), 202
+        
+        body, status = _process_upload(content, filename, rule_ids)
+        return jsonify(body), status
+        
+    except Exception as e:
+        current_app.logger.error(f"Ошибка при обработке файла: {type(e).__name__}: {str(e)}")
+        current_app.logger.error("Трассировка:")
+        traceback.print_exc(file=sys.stdout)
+        return jsonify({
+            'error': f'Ошибка при обработке файла: {str(e)}',
+            'error_type': str(type(e).__name__)        }), 500
+
+
+def _async_upload_requested():
+    """Запрошен ли асинхронный режим /upload (параметр async; по умолчанию UPLOAD_ASYNC)."""
+    value = request.form.get('async') or request.args.get('async') or os.environ.get('UPLOAD_ASYNC', '0')
+    return value.strip().lower() in ('1', 'true', 'yes')
+
+
+def _process_upload(content, filename, rule_ids, with_ai=True, persist=True):
+    """Проверяет загруженный документ, исправляет его и проверяет повторно.
+
+    Возвращает кортеж (тело ответа, HTTP-статус). Используется синхронным
+    /upload и заданиями очереди обработки. with_ai=False отключает подсказки ИИ,
+    persist=False — сохранение оригинала для /correct (пакетная обработка;
+    temp_path в ответе тогда None).
+    """
+    try:
+        # Повторная загрузка того же файла отдается из кеша
+        cache = get_document_cache()
+        # Исправленный документ зависит от способа исправления шрифта (CORRECTION_FORMATTING)
+        cache_key = (make_cache_key(content, rule_ids, variant=get_correction_formatting_mode())
+                     if cache is not None else None)
+        if cache_key:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                file_path = _persist_upload(content, filename) if persist else None
+                cached_response = _upload_response_from_cache(cache, cache_key, cached, filename, file_path, rule_ids,
+                                                              with_ai=with_ai)
+                if cached_response is not None:
+                    return cached_response
         
         try:
-            # Обрабатываем документ
-            current_app.logger.info("Шаг 1: Создание DocumentProcessor")
-            doc_processor = DocumentProcessor(file_path)
+            # Документ разбирается один раз: извлечение, проверка, исправление копии
+            # и повторная проверка работают с объектами в памяти
+            current_app.logger.info("Шаг 1: Разбор документа")
+            # В задании очереди этапы передаются в поток событий /jobs/<id>/events
+            pipeline = DocumentPipeline(content, rule_ids, progress=report_progress)
             
-            current_app.logger.info("Шаг 2: Извлечение данных")
-            document_data = doc_processor.extract_data()
+            current_app.logger.info("Шаг 2-4: Извлечение данных и проверка")
+            check_results = pipeline.check()
+            document_data = pipeline.document_data
             
             # Проверяем результат извлечения данных
             current_app.logger.info(f"Результат извлечения данных: {type(document_data)}")
             if not document_data:
-                return jsonify({'error': 'Не удалось извлечь данные из документа'}), 500
+                return {'error': 'Не удалось извлечь данные из документа'}, 500
                 
             # Выводим ключи для отладки
             current_app.logger.info(f"Ключи документа: {document_data.keys()}")
             
-            current_app.logger.info("Шаг 3: Создание NormControlChecker")
-            checker = NormControlChecker()
-            
-            current_app.logger.info("Шаг 4: Выполнение проверки")
-            check_results = checker.check_document(document_data)
-            
             current_app.logger.info("Шаг 5: Проверка завершена успешно")
+            _log_slowest_rules(check_results)
 
             # Дополнительно: Автоисправление для достижения безупречного результата
             correction_success = False
@@ -265,110 +515,371 @@ def upload_document():
             corrected_check_results = None
             ai_suggestions = {}
             ai_error = None
-            ai_enabled = ai_is_configured()
+            ai_enabled = with_ai and ai_is_configured()
             try:
                 current_app.logger.info("Шаг 6: Автоисправление документа для соответствия нормам")
-                corrector = DocumentCorrector()
-
+                
+                # Небольшой итеративный цикл автоисправлений в памяти: повторяем до стабилизации
+                # (макс. 3 прохода). Исправления идемпотентны, поэтому обычно второй проход
+                # ничего не меняет; это проверяется по каноническому отпечатку XML-частей.
+                # При выборочной проверке (rules) исправляются только замечания выбранных норм
+                corrected_content = pipeline.correct(max_passes=3)
+                current_app.logger.info(f"Автоисправление завершено, проходов: {pipeline.correction_passes}")
+                
                 # Генерируем безопасное имя исправленного файла на основе оригинала и времени
-                base_name, _ = os.path.splitext(filename)
-                safe_base = secure_filename(base_name) or "document"
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+                safe_base, timestamp = _corrected_filename_base(filename)
                 corrected_filename = f"{safe_base}_corrected_{timestamp}.docx"
-                permanent_path = os.path.join(CORRECTIONS_DIR, corrected_filename)
-
-                # Применяем все доступные исправления и сохраняем в постоянную директорию
-                # None => применить все доступные исправления
-                corrected_file_path = corrector.correct_document(file_path, None, out_path=permanent_path)
-                correction_success = os.path.exists(corrected_file_path)
-                current_app.logger.info(f"Автоисправление завершено: {correction_success}, путь: {corrected_file_path}")
-
-                # Небольшой итеративный цикл автоисправлений: повторяем до стабилизации (макс. 3 прохода)
-                def _file_hash(path: str) -> str:
-                    try:
-                        with open(path, 'rb') as fh:
-                            return hashlib.sha256(fh.read()).hexdigest()
-                    except Exception:
-                        return ''
-
-                if correction_success:
-                    prev_hash = _file_hash(corrected_file_path)
-                    max_iter = 2  # дополнительно до 2 повторных проходов (итого до 3 применений)
-                    for i in range(max_iter):
-                        iter_filename = f"{safe_base}_corrected_{timestamp}_v{i+2}.docx"
-                        iter_path = os.path.join(CORRECTIONS_DIR, iter_filename)
-                        current_app.logger.info(f"Итерация доп. автоисправления #{i+2}: {iter_path}")
-                        iter_out = corrector.correct_document(corrected_file_path, None, out_path=iter_path)
-                        new_hash = _file_hash(iter_out)
-                        if not new_hash or new_hash == prev_hash:
-                            # Изменений нет — удалим лишний файл, если он появился
-                            try:
-                                if os.path.exists(iter_out) and iter_out != corrected_file_path:
-                                    os.remove(iter_out)
-                            except Exception:
-                                pass
-                            current_app.logger.info("Доп. автоисправления: изменений не обнаружено, завершаем итерации")
-                            break
-                        # Приняли улучшенную версию
-                        corrected_file_path = iter_out
-                        corrected_filename = os.path.basename(iter_out)
-                        prev_hash = new_hash
+                corrected_file_path = os.path.join(CORRECTIONS_DIR, corrected_filename)
+                with open(corrected_file_path, 'wb') as f:
+                    f.write(corrected_content)
+                correction_success = True
+                current_app.logger.info(f"Исправленный документ сохранен: {corrected_file_path}")
+                report_progress('corrected', {
+                    'corrected_filename': corrected_filename,
+                    'corrected_file_path': corrected_file_path,
+                    'correction_passes': pipeline.correction_passes
+                })
 
                 # Повторная проверка уже финального исправленного документа
-                if correction_success and corrected_file_path and os.path.exists(corrected_file_path):
-                    current_app.logger.info("Шаг 7: Повторная проверка финального исправленного документа")
-                    corrected_processor = DocumentProcessor(corrected_file_path)
-                    corrected_data = corrected_processor.extract_data()
-                    corrected_check_results = checker.check_document(corrected_data)
+                current_app.logger.info("Шаг 7: Повторная проверка финального исправленного документа")
+                journal = pipeline.journal
+                if journal is not None:
+                    # Проверяются только затронутые исправлением нормы и параграфы
+                    current_app.logger.info(f"Журнал исправлений: {journal.summary()}")
+                corrected_check_results = pipeline.recheck()
+                recheck = corrected_check_results.get('recheck')
+                if recheck:
+                    current_app.logger.info(
+                        f"Повторная проверка: заново {len(recheck['full_checks'])} проверок, "
+                        f"по параграфам {len(recheck['paragraph_checks'])} "
+                        f"({recheck['rechecked_paragraphs']} из {recheck['paragraph_count']}), "
+                        f"без изменений {len(recheck['reused_checks'])}"
+                    )
 
                 # Формируем подсказки ИИ при наличии ключа
                 if ai_enabled:
-                    try:
-                        ai_suggestions['before'] = suggest_for_check_results(check_results, filename)
-                    except Exception as ai_exc:
-                        current_app.logger.warning(f"AI suggest (до исправления) не удалось: {type(ai_exc).__name__}: {str(ai_exc)}")
-                        ai_error = 'Не удалось получить рекомендации ИИ для исходной версии'
-                    if corrected_check_results:
-                        try:
-                            ai_suggestions['after'] = suggest_for_check_results(corrected_check_results, corrected_filename or filename)
-                        except Exception as ai_exc:
-                            current_app.logger.warning(f"AI suggest (после исправления) не удалось: {type(ai_exc).__name__}: {str(ai_exc)}")
-                            ai_error = ai_error or 'Не удалось получить рекомендации ИИ для исправленной версии'
+                    ai_suggestions, ai_error = _build_ai_suggestions(
+                        check_results, corrected_check_results, filename, corrected_filename
+                    )
             except Exception as auto_fix_err:
                 current_app.logger.warning(f"Автоисправление не выполнено: {type(auto_fix_err).__name__}: {str(auto_fix_err)}")
+                correction_success = False
                 corrected_filename = None
                 corrected_file_path = None
                 corrected_check_results = None
 
+            # Сохраняем результат в кеш для повторных загрузок того же файла
+            if cache_key:
+                if isinstance(document_data, LazyDocumentData):
+                    cached_data = {key: document_data[key] for key in document_data.loaded_sections()}
+                else:
+                    cached_data = document_data
+                cache.put(cache_key, {
+                    'document_data': cached_data,
+                    'check_results': check_results,
+                    'correction_success': correction_success,
+                    'corrected_check_results': corrected_check_results,
+                    'ai_suggestions': ai_suggestions if ai_suggestions and not ai_error else None,
+                }, artifact_path=corrected_file_path if correction_success else None)
+            
+            # Исходный документ сохраняется для последующего исправления через /correct
+            file_path = _persist_upload(content, filename) if persist else None
+            
             # Возвращаем результаты проверки (+ сведения об автоисправлении, если успешно)
-            return jsonify({
+            return {
                 'success': True,
                 'filename': filename,
                 'temp_path': file_path,
                 'check_results': check_results,
+                'slowest_rules': _slowest_rules(check_results),
+                'rules': rule_ids,
                 'correction_success': correction_success,
                 'corrected_file_path': corrected_filename if correction_success else None,
                 'corrected_check_results': corrected_check_results,
                 'ai_enabled': ai_enabled,
                 'ai_suggestions': ai_suggestions if ai_suggestions else None,
-                'ai_error': ai_error
-            }), 200
+                'ai_error': ai_error,
+                'cache_hit': False
+            }, 200
             
         except Exception as inner_e:
             current_app.logger.error(f"Внутренняя ошибка: {type(inner_e).__name__}: {str(inner_e)}")
             traceback.print_exc(file=sys.stdout)
-            return jsonify({
+            return {
                 'error': f'Внутренняя ошибка при обработке: {str(inner_e)}',
                 'error_type': str(type(inner_e).__name__)
-            }), 500
+            }, 500
         
     except Exception as e:
         current_app.logger.error(f"Ошибка при обработке файла: {type(e).__name__}: {str(e)}")
         current_app.logger.error("Трассировка:")
         traceback.print_exc(file=sys.stdout)
-        return jsonify({
+        return {
             'error': f'Ошибка при обработке файла: {str(e)}',
-            'error_type': str(type(e).__name__)        }), 500
+            'error_type': str(type(e).__name__)
+        }, 500
+
+
+_job_app = None
+
+
+def _run_upload_job(content, filename, rule_ids, with_ai=True, persist=True):
+    """Задание очереди: обработка загрузки в рабочем процессе.
+
+    Приложение Flask создается один раз на процесс — для current_app и логов.
+    Возвращает кортеж (тело ответа, HTTP-статус), как _process_upload.
+    """
+    global _job_app
+    if _job_app is None:
+        from app import create_app
+        _job_app = create_app()
+    with _job_app.app_context():
+        return _process_upload(content, filename, rule_ids, with_ai=with_ai, persist=persist)
+
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """
+    Состояние задания асинхронной обработки и, после завершения, результат /upload
+    """
+    if not re.fullmatch(r'[0-9a-f]{32}', job_id):
+        return jsonify({'error': 'Недопустимый идентификатор задания'}), 400
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Задание не найдено'}), 404
+    return jsonify(_job_status_response(job_id, job)), 200
+
+
+def _job_status_response(job_id, job):
+    """Ответ о состоянии задания (для /jobs/<id> и завершающего события потока)."""
+    response = {
+        'success': True,
+        'job_id': job_id,
+        'status': job['status'],
+        'attempts': job['attempts'],
+        'filename': job.get('filename'),
+        'created_at': job['created_at'],
+        'finished_at': job['finished_at'],
+        'result': None,
+        'error': job['error']
+    }
+    if job['status'] == JOB_DONE:
+        body, status = job['result']
+        if status == 200:
+            response['result'] = body
+        else:
+            # Обработка завершилась ошибкой, которую синхронный /upload вернул бы с этим статусом
+            response['status'] = JOB_FAILED
+            response['error'] = body.get('error')
+            response['error_type'] = body.get('error_type')
+    return response
+
+
+@bp.route('/jobs/<job_id>/events', methods=['GET'])
+def get_job_events(job_id):
+    """
+    Поток событий задания (Server-Sent Events): этапы обработки и промежуточные
+    результаты по мере готовности — extracted, rule (замечания каждой нормы),
+    checked (результаты проверки исходного документа), correction_pass,
+    corrected, rechecked — и завершающее done или failed с ответом /jobs/<id>.
+    Переподключение продолжает поток после Last-Event-ID.
+    """
+    if not re.fullmatch(r'[0-9a-f]{32}', job_id):
+        return jsonify({'error': 'Недопустимый идентификатор задания'}), 400
+    queue = get_job_queue()
+    if queue.get(job_id) is None:
+        return jsonify({'error': 'Задание не найдено'}), 404
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        start = int(last_event_id) + 1 if last_event_id is not None else 0
+    except ValueError:
+        start = 0
+    
+    def generate():
+        position = max(start, 0)
+        while True:
+            polled = queue.events(job_id, position, timeout=JOB_EVENTS_KEEPALIVE)
+            if polled is None:
+                # Задание удалено по истечении JOB_RESULT_TTL
+                return
+            events, closed = polled
+            if not events and not closed:
+                yield ': keep-alive\n\n'
+                continue
+            for event in events:
+                name, data = event['event'], event['data']
+                if name in (JOB_DONE, JOB_FAILED):
+                    job = queue.get(job_id)
+                    if job is not None:
+                        data = _job_status_response(job_id, job)
+                        name = data['status']
+                yield _sse_message(event['id'], name, data)
+                position = event['id'] + 1
+            if closed:
+                return
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Отключает буферизацию ответа в nginx
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _sse_message(event_id, event, data):
+    """Сообщение Server-Sent Events с данными в JSON."""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n"
+
+
+@bp.route('/batch', methods=['POST'])
+def batch_upload():
+    """
+    Пакетная проверка и автоисправление: архив ZIP с документами DOCX или
+    несколько файлов DOCX (поле files). Документы обрабатываются в пуле рабочих
+    процессов; ответ — NDJSON: строка на каждый файл по мере готовности и
+    последняя строка со сводкой и ссылкой на ZIP исправленных документов
+    """
+    uploads = [f for f in request.files.getlist('files') + request.files.getlist('file') if f.filename]
+    if not uploads:
+        return jsonify({'error': 'Файлы не найдены в запросе'}), 400
+    try:
+        rule_ids = parse_rule_ids(request.form.get('rules') or request.args.get('rules'))
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    try:
+        source = open_batch([(f.filename, f.stream) for f in uploads], **get_batch_config())
+    except BatchError as be:
+        return jsonify({'error': str(be)}), 400
+    
+    batch_id = uuid.uuid4().hex
+    queue = get_job_queue()
+    current_app.logger.info(f"Пакет {batch_id}: документов {len(source.entries)}, пропущено {len(source.skipped)}")
+    
+    def generate():
+        started = time.perf_counter()
+        summary = {
+            'type': 'summary',
+            'batch_id': batch_id,
+            'total': len(source.entries) + len(source.skipped),
+            'succeeded': 0,
+            'failed': 0,
+            'skipped': len(source.skipped),
+            'total_issues': 0,
+            'corrected_total_issues': 0,
+            'issues_by_rule': {}
+        }
+        archive_files = []
+        try:
+            for skipped in source.skipped:
+                yield _ndjson_line({'type': 'file', 'index': None, 'filename': skipped['filename'],
+                                    'status': 'skipped', 'error': skipped['error']})
+            for entry, job in run_batch(queue, source.entries, _run_upload_job, (rule_ids, False, False),
+                                        filename_fn=lambda entry: _batch_storage_name(batch_id, entry),
+                                        batch_id=batch_id):
+                line = _batch_file_line(entry, job)
+                if line['status'] == JOB_DONE:
+                    summary['succeeded'] += 1
+                    summary['total_issues'] += line['total_issues']
+                    summary['corrected_total_issues'] += line['corrected_total_issues'] or 0
+                    for rule_result in job['result'][0]['check_results'].get('rules_results', []):
+                        if rule_result['issues_count']:
+                            rule_id = str(rule_result['rule_id'])
+                            summary['issues_by_rule'][rule_id] = (
+                                summary['issues_by_rule'].get(rule_id, 0) + rule_result['issues_count'])
+                    if line['corrected_file_path']:
+                        archive_files.append({'name': entry.name, 'corrected_file_path': line['corrected_file_path']})
+                else:
+                    summary['failed'] += 1
+                yield _ndjson_line(line)
+        finally:
+            source.close()
+        
+        summary['duration_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        summary['archive_url'] = f"{bp.url_prefix}/batch/{batch_id}/archive" if archive_files else None
+        with open(os.path.join(BATCHES_DIR, f"{batch_id}.json"), 'w', encoding='utf-8') as f:
+            json.dump({'batch_id': batch_id, 'files': archive_files, 'summary': summary}, f, ensure_ascii=False)
+        current_app.logger.info(
+            f"Пакет {batch_id} обработан: успешно {summary['succeeded']}, с ошибкой {summary['failed']}, "
+            f"пропущено {summary['skipped']}"
+        )
+        yield _ndjson_line(summary)
+    
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@bp.route('/batch/<batch_id>/archive', methods=['GET'])
+def download_batch_archive(batch_id):
+    """
+    ZIP исправленных документов пакета и сводки (summary.json); архив формируется
+    по частям во время передачи
+    """
+    if not re.fullmatch(r'[0-9a-f]{32}', batch_id):
+        return jsonify({'error': 'Недопустимый идентификатор пакета'}), 400
+    manifest_path = os.path.join(BATCHES_DIR, f"{batch_id}.json")
+    if not os.path.exists(manifest_path):
+        return jsonify({'error': 'Пакет не найден'}), 404
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    
+    members = []
+    for item in manifest['files']:
+        path = os.path.join(CORRECTIONS_DIR, os.path.basename(item['corrected_file_path']))
+        if os.path.exists(path):
+            members.append((item['name'], path))
+        else:
+            current_app.logger.warning(f"Исправленный документ пакета не найден: {path}")
+    members.append(('summary.json', json.dumps(manifest['summary'], ensure_ascii=False, indent=2).encode('utf-8')))
+    
+    response = Response(stream_zip(members), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename=batch_{batch_id}.zip'
+    return response
+
+
+def _batch_storage_name(batch_id, entry):
+    """Имя файла документа пакета на диске: уникальное и безопасное."""
+    base = secure_filename(os.path.splitext(entry.name)[0]) or 'document'
+    return f"{batch_id[:8]}_{entry.index + 1}_{base}.docx"
+
+
+def _batch_file_line(entry, job):
+    """Строка NDJSON с итогом обработки одного документа пакета."""
+    line = {
+        'type': 'file',
+        'index': entry.index,
+        'filename': entry.name,
+        'job_id': job['id'],
+        'status': job['status'],
+        'duration_ms': (round((job['finished_at'] - job['created_at']) * 1000, 3)
+                        if job['finished_at'] and job['created_at'] else None),
+        'error': job['error']
+    }
+    if job['status'] != JOB_DONE:
+        return line
+    body, status = job['result']
+    if status != 200:
+        line['status'] = JOB_FAILED
+        line['error'] = body.get('error')
+        return line
+    check_results = body['check_results']
+    corrected_check_results = body.get('corrected_check_results')
+    line.update({
+        'total_issues': check_results.get('total_issues_count', 0),
+        'severity': check_results.get('statistics', {}).get('severity'),
+        'correction_success': body['correction_success'],
+        'corrected_file_path': body['corrected_file_path'],
+        'corrected_total_issues': (corrected_check_results.get('total_issues_count')
+                                   if corrected_check_results else None),
+        'cache_hit': body.get('cache_hit', False)
+    })
+    return line
+
+
+def _ndjson_line(data):
+    """Строка NDJSON."""
+    return json.dumps(data, ensure_ascii=False, default=str) + '\n'
 
 @bp.route('/analyze', methods=['POST'])
 def analyze_document():
@@ -435,25 +946,11 @@ def correct_document():
         
         # Создаем уникальный ID для файла и постоянную директорию для него
         correction_id = str(uuid.uuid4())
-        correction_date = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Исправляем ошибки
         corrector = DocumentCorrector()
         current_app.logger.info("Исправление ошибок...")
         
-        # Используем дату и оригинальное имя для создания нового имени файла
-        if original_filename:
-            original_name, ext = os.path.splitext(original_filename)
-            safe_original_name = secure_filename(original_name)
-            permanent_filename = f"{safe_original_name}_corrected_{correction_date}.docx"
-        else:
-            permanent_filename = f"corrected_doc_{correction_date}.docx"
-        
-        # Создаем постоянный путь для исправленного файла
-        permanent_path = os.path.join(CORRECTIONS_DIR, permanent_filename)
-        current_app.logger.info(f"Путь для сохранения: {permanent_path}")
-        
-        # Применяем исправления и сохраняем в постоянную директорию
         # Поддерживаем оба ключа: 'errors' (новый) и 'errors_to_fix' (старый тестовый)
         errors_list = data.get('errors')
         if errors_list is None:
@@ -462,6 +959,31 @@ def correct_document():
         # Если список пустой или отсутствует — применяем все исправления
         apply_errors = errors_list if errors_list else None
 
+        if data.get('dry_run'):
+            # Пробный запуск: только набор изменений, без сохранения DOCX;
+            # выбранные изменения применяются позже через /apply-changes
+            change_set = corrector.correct_document(file_path, apply_errors, dry_run=True)
+            change_set_id = uuid.uuid4().hex
+            change_set.save(_change_set_path(change_set_id), file_path=file_path,
+                            original_filename=original_filename)
+            current_app.logger.info(f"Рассчитан набор изменений {change_set_id}: {change_set.summary()}")
+            return jsonify({
+                'success': True,
+                'dry_run': True,
+                'change_set_id': change_set_id,
+                'changes': change_set.to_list(),
+                'summary': change_set.summary(),
+                'original_filename': original_filename
+            }), 200
+
+        # Используем дату и оригинальное имя для создания нового имени файла
+        permanent_filename = _correction_filename(original_filename)
+        
+        # Создаем постоянный путь для исправленного файла
+        permanent_path = os.path.join(CORRECTIONS_DIR, permanent_filename)
+        current_app.logger.info(f"Путь для сохранения: {permanent_path}")
+        
+        # Применяем исправления и сохраняем в постоянную директорию
         corrected_file_path = corrector.correct_document(file_path, apply_errors, out_path=permanent_path)
         
         current_app.logger.info(f"Документ успешно исправлен, новый путь: {corrected_file_path}")
@@ -491,6 +1013,51 @@ def correct_document():
         traceback.print_exc(file=sys.stdout)
         return jsonify({'error': f'Ошибка при исправлении документа: {str(e)}'}), 500
 
+@bp.route('/apply-changes', methods=['POST'])
+def apply_changes():
+    """
+    Применение выбранных изменений из набора, рассчитанного при исправлении с dry_run
+    """
+    data = request.json or {}
+    change_set_path = _change_set_path(data.get('change_set_id'))
+    if change_set_path is None:
+        return jsonify({'error': 'Неверный идентификатор набора изменений'}), 400
+    if not os.path.exists(change_set_path):
+        return jsonify({'error': 'Набор изменений не найден'}), 404
+    
+    try:
+        change_set, meta = ChangeSet.load(change_set_path)
+        file_path = meta.get('file_path')
+        if not file_path or not os.path.exists(file_path):
+            return jsonify({'error': 'Исходный файл не найден'}), 404
+        original_filename = meta.get('original_filename', '')
+        
+        # None — применить все изменения набора
+        change_ids = data.get('change_ids')
+        applied = change_set.select(change_ids)
+        
+        permanent_filename = _correction_filename(original_filename)
+        permanent_path = os.path.join(CORRECTIONS_DIR, permanent_filename)
+        DocumentCorrector().apply_changes(file_path, change_set, change_ids, out_path=permanent_path)
+        current_app.logger.info(f"Применено изменений: {len(applied)} из {len(change_set)}, файл: {permanent_path}")
+        
+        return jsonify({
+            'success': True,
+            'corrected_file_path': permanent_filename,
+            'corrected_path': permanent_filename,
+            'filename': permanent_filename,
+            'original_filename': original_filename,
+            'applied_changes': [change['id'] for change in applied]
+        }), 200
+        
+    except ValueError as e:
+        current_app.logger.error(f"Ошибка применения набора изменений: {str(e)}")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Ошибка при применении изменений: {type(e).__name__}: {str(e)}")
+        traceback.print_exc(file=sys.stdout)
+        return jsonify({'error': f'Ошибка при применении изменений: {str(e)}'}), 500
+
 @bp.route('/download', methods=['GET'])
 def download_file():
     """
@@ -790,11 +1357,13 @@ def cleanup_old_files():
         kept_count = 0
         deleted_files = []
         
-        # Проверяем каждый файл в директории
-        if os.path.exists(CORRECTIONS_DIR):
-            for filename in os.listdir(CORRECTIONS_DIR):
-                if filename.endswith('.docx'):
-                    file_path = os.path.join(CORRECTIONS_DIR, filename)
+        # Проверяем каждый файл в директориях исправленных и загруженных документов, наборов изменений и пакетов
+        for directory in (CORRECTIONS_DIR, UPLOADS_DIR, CHANGESETS_DIR, BATCHES_DIR):
+            if not os.path.exists(directory):
+                continue
+            for filename in os.listdir(directory):
+                if filename.endswith(('.docx', '.json')):
+                    file_path = os.path.join(directory, filename)
                     file_mtime = datetime.datetime.fromtimestamp(os.path.getmtime(file_path))
                     
                     # Если файл старше указанного периода, удаляем его
@@ -0,0 +1,385 @@
+"""
+Пакетная проверка и исправление директорий с документами DOCX без сервера Flask.
+
+    python -m app.cli check <директория> [-o results.jsonl] [--format jsonl|csv]
+    python -m app.cli correct <директория> [--corrected-dir <директория>] [-o results.csv --format csv]
+
+Документы обрабатываются DocumentPipeline (DocumentProcessor → NormControlChecker →
+DocumentCorrector) в пуле рабочих процессов. Рабочий процесс сам читает файл,
+поэтому основной процесс не хранит содержимое документов, а в пуле одновременно
+не больше удвоенного числа процессов документов. На каждый документ в файл
+результатов записывается строка JSON или CSV: число замечаний, исправленный файл
+и время этапов обработки.
+
+С --resume документы, SHA-256 которых уже записан в файл результатов как успешно
+обработанный тем же режимом и с тем же набором норм, пропускаются: прерванный
+прогон архива продолжается с того места, где остановился.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from app.services.document_pipeline import DocumentPipeline
+from app.services.job_queue import DEFAULT_MAX_TASKS_PER_WORKER, default_start_method
+from app.services.norm_control_checker import parse_rule_ids
+
+MODES = ('check', 'correct')
+FORMATS = ('jsonl', 'csv')
+STATUS_OK = 'ok'
+STATUS_FAILED = 'failed'
+
+# Модули, импортируемые сервером forkserver до создания рабочих процессов
+PRELOAD_MODULES = ('app.services.document_pipeline',)
+
+CSV_FIELDS = (
+    'path', 'sha256', 'mode', 'rules', 'status', 'total_issues',
+    'severity_high', 'severity_medium', 'severity_low',
+    'corrected_path', 'corrected_total_issues', 'correction_passes',
+    'total_ms', 'check_ms', 'correct_ms', 'recheck_ms', 'error',
+)
+
+
+def find_documents(directory):
+    """
+    Пути ко всем документам DOCX директории и ее поддиректорий (без временных файлов Word)
+    """
+    documents = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(files):
+            if name.lower().endswith('.docx') and not name.startswith(('.', '~$')):
+                documents.append(os.path.join(root, name))
+    return documents
+
+
+def file_digest(path):
+    """
+    SHA-256 содержимого файла
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def rules_key(rules):
+    """
+    Набор норм в виде строки "2,3,6" ("" — все нормы) для сравнения записей
+    """
+    if not rules:
+        return ''
+    if isinstance(rules, str):
+        return ','.join(part.strip() for part in rules.split(',') if part.strip())
+    return ','.join(str(rule_id) for rule_id in rules)
+
+
+def new_record(relative_path, digest, mode, rule_ids):
+    """
+    Запись результата обработки документа (до обработки)
+    """
+    return {
+        'path': relative_path,
+        'sha256': digest,
+        'mode': mode,
+        'rules': rule_ids,
+        'status': STATUS_FAILED,
+        'total_issues': None,
+        'severity': None,
+        'issues_by_rule': None,
+        'corrected_path': None,
+        'corrected_total_issues': None,
+        'correction_passes': None,
+        'timing': {},
+        'error': None,
+    }
+
+
+def init_worker():
+    """
+    Инициализация рабочего процесса: план проверок и шаблон титульного листа
+    готовятся один раз на процесс. Диагностические сообщения сервисов (print)
+    выводятся в stderr, чтобы не смешиваться с результатами в стандартном выводе.
+    """
+    sys.stdout = sys.stderr
+
+    from app.services.document_corrector import get_title_page_template
+    from app.services.norm_control_checker import get_rule_plan
+
+    get_rule_plan()
+    get_title_page_template()
+
+
+def process_file(path, relative_path, digest, mode, rule_ids, corrected_dir):
+    """
+    Проверяет (и в режиме correct исправляет и проверяет повторно) один документ.
+    Выполняется в рабочем процессе; возвращает запись результата.
+    """
+    record = new_record(relative_path, digest, mode, rule_ids)
+    timing = record['timing']
+    started = time.perf_counter()
+    try:
+        with open(path, 'rb') as f:
+            content = f.read()
+        pipeline = DocumentPipeline(content, rule_ids)
+
+        stage = time.perf_counter()
+        check_results = pipeline.check()
+        timing['check_ms'] = _elapsed_ms(stage)
+        record['total_issues'] = check_results.get('total_issues_count', 0)
+        record['severity'] = check_results.get('statistics', {}).get('severity')
+        record['issues_by_rule'] = {
+            str(result['rule_id']): result['issues_count']
+            for result in check_results.get('rules_results', []) if result['issues_count']
+        }
+
+        if mode == 'correct':
+            stage = time.perf_counter()
+            corrected_content = pipeline.correct()
+            corrected_path = os.path.join(corrected_dir, relative_path)
+            os.makedirs(os.path.dirname(corrected_path), exist_ok=True)
+            with open(corrected_path, 'wb') as f:
+                f.write(corrected_content)
+            timing['correct_ms'] = _elapsed_ms(stage)
+            record['corrected_path'] = corrected_path
+            record['correction_passes'] = pipeline.correction_passes
+
+            stage = time.perf_counter()
+            corrected_check_results = pipeline.recheck()
+            timing['recheck_ms'] = _elapsed_ms(stage)
+            record['corrected_total_issues'] = corrected_check_results.get('total_issues_count', 0)
+        record['status'] = STATUS_OK
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {str(e)}"
+    timing['total_ms'] = _elapsed_ms(started)
+    return record
+
+
+def _elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+class ResultWriter:
+    """
+    Запись результатов в JSON Lines или CSV (по строке на документ, сразу на диск)
+    """
+
+    def __init__(self, path, fmt, append=False):
+        """
+        path: файл результатов (None — стандартный вывод)
+        fmt: jsonl или csv
+        append: дописывать в существующий файл (для --resume)
+        """
+        self.fmt = fmt
+        if path is None:
+            self._file, self._owned = sys.stdout, False
+            write_header = True
+        else:
+            write_header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+            self._file = open(path, 'a' if append else 'w', encoding='utf-8', newline='')
+            self._owned = True
+        self._csv = None
+        if fmt == 'csv':
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            if write_header:
+                self._csv.writeheader()
+
+    def write(self, record):
+        if self._csv is not None:
+            self._csv.writerow(self._csv_row(record))
+        else:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+
+    @staticmethod
+    def _csv_row(record):
+        severity = record.get('severity') or {}
+        timing = record.get('timing') or {}
+        row = {field: record.get(field) for field in CSV_FIELDS if field in record}
+        row.update({
+            'rules': rules_key(record.get('rules')),
+            'severity_high': severity.get('high'),
+            'severity_medium': severity.get('medium'),
+            'severity_low': severity.get('low'),
+            'total_ms': timing.get('total_ms'),
+            'check_ms': timing.get('check_ms'),
+            'correct_ms': timing.get('correct_ms'),
+            'recheck_ms': timing.get('recheck_ms'),
+        })
+        return {field: ('' if row.get(field) is None else row[field]) for field in CSV_FIELDS}
+
+
+def load_processed(path, fmt):
+    """
+    Успешно обработанные документы из файла результатов: множество (sha256, режим, нормы)
+    """
+    processed = set()
+    if path is None or not os.path.exists(path):
+        return processed
+    with open(path, encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            records = csv.DictReader(f)
+        else:
+            records = []
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Строка, оборванная при прерывании прогона
+                    continue
+        for record in records:
+            if record.get('status') == STATUS_OK and record.get('sha256'):
+                processed.add((record['sha256'], record.get('mode'), rules_key(record.get('rules'))))
+    return processed
+
+
+def _create_pool(workers, max_tasks_per_worker):
+    """
+    Пул рабочих процессов (forkserver с предзагрузкой сервисов, где он доступен)
+    """
+    start_method = default_start_method()
+    context = multiprocessing.get_context(start_method)
+    if start_method == 'forkserver':
+        context.set_forkserver_preload(list(PRELOAD_MODULES))
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker,
+                               max_tasks_per_child=max_tasks_per_worker)
+
+
+def run(args):
+    """
+    Обрабатывает документы директории; возвращает код завершения (1, если были ошибки)
+    """
+    directory = os.path.abspath(args.directory)
+    rule_ids = parse_rule_ids(args.rules)
+    corrected_dir = os.path.abspath(args.corrected_dir or directory.rstrip(os.sep) + '_corrected')
+    documents = find_documents(directory)
+    processed = load_processed(args.output, args.format) if args.resume else set()
+    key_suffix = (args.mode, rules_key(rule_ids))
+
+    print(f"Документов: {len(documents)}, ранее обработано: {len(processed)}, "
+          f"рабочих процессов: {args.workers}", file=sys.stderr)
+    writer = ResultWriter(args.output, args.format, append=args.resume)
+    stats = {STATUS_OK: 0, STATUS_FAILED: 0, 'skipped': 0}
+    started = time.perf_counter()
+    pending = iter(documents)
+    in_flight = {}
+    pool = None
+    try:
+        while True:
+            while len(in_flight) < args.workers * 2:
+                path = next(pending, None)
+                if path is None:
+                    break
+                relative_path = os.path.relpath(path, directory)
+                try:
+                    digest = file_digest(path)
+                except OSError as e:
+                    record = new_record(relative_path, None, args.mode, rule_ids)
+                    record['error'] = f"{type(e).__name__}: {str(e)}"
+                    _report(writer, stats, record, len(documents))
+                    continue
+                if (digest, *key_suffix) in processed:
+                    stats['skipped'] += 1
+                    continue
+                if pool is None:
+                    pool = _create_pool(args.workers, args.max_tasks_per_worker)
+                future = pool.submit(process_file, path, relative_path, digest, args.mode, rule_ids, corrected_dir)
+                in_flight[future] = (relative_path, digest, pool)
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                relative_path, digest, future_pool = in_flight.pop(future)
+                try:
+                    record = future.result()
+                except BrokenProcessPool:
+                    record = new_record(relative_path, digest, args.mode, rule_ids)
+                    record['error'] = 'Рабочий процесс аварийно завершился'
+                    if future_pool is pool:
+                        # Остальные задания сломанного пула завершатся с той же ошибкой,
+                        # новые документы идут в новый пул
+                        pool.shutdown(wait=False)
+                        pool = None
+                if record['status'] == STATUS_OK:
+                    processed.add((digest, *key_suffix))
+                _report(writer, stats, record, len(documents))
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+        writer.close()
+
+    print(f"Обработано: {stats[STATUS_OK]}, с ошибкой: {stats[STATUS_FAILED]}, пропущено: {stats['skipped']}, "
+          f"время: {time.perf_counter() - started:.1f} с", file=sys.stderr)
+    return 1 if stats[STATUS_FAILED] else 0
+
+
+def _report(writer, stats, record, total):
+    """
+    Записывает результат документа и выводит ход обработки
+    """
+    writer.write(record)
+    stats[record['status']] += 1
+    done = stats[STATUS_OK] + stats[STATUS_FAILED] + stats['skipped']
+    if record['status'] == STATUS_OK:
+        details = f"замечаний {record['total_issues']}"
+        if record['corrected_total_issues'] is not None:
+            details += f" → {record['corrected_total_issues']}"
+    else:
+        details = f"ошибка: {record['error']}"
+    print(f"[{done}/{total}] {record['path']}: {details}, {record['timing'].get('total_ms', 0):.0f} мс",
+          file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m app.cli',
+        description='Пакетная проверка и исправление документов DOCX по нормам оформления'
+    )
+    parser.add_argument('mode', choices=MODES,
+                        help='check — только проверка; correct — проверка, исправление и повторная проверка')
+    parser.add_argument('directory', help='директория с документами (обходится рекурсивно)')
+    parser.add_argument('-o', '--output', help='файл результатов (по умолчанию стандартный вывод)')
+    parser.add_argument('--format', choices=FORMATS, default='jsonl', help='формат результатов (jsonl или csv)')
+    parser.add_argument('--rules', help='номера норм для выборочной проверки, например 2,3,6')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='число рабочих процессов (по умолчанию число ядер)')
+    parser.add_argument('--max-tasks-per-worker', type=int, default=DEFAULT_MAX_TASKS_PER_WORKER,
+                        help='документов до замены рабочего процесса')
+    parser.add_argument('--corrected-dir',
+                        help='директория исправленных документов (по умолчанию <директория>_corrected)')
+    parser.add_argument('--resume', action='store_true',
+                        help='пропустить документы, уже успешно обработанные по файлу результатов')
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.directory):
+        parser.error(f"директория не найдена: {args.directory}")
+    if args.resume and not args.output:
+        parser.error('для --resume нужен файл результатов (--output)')
+    if args.workers < 1 or args.max_tasks_per_worker < 1:
+        parser.error('--workers и --max-tasks-per-worker должны быть положительными')
+    try:
+        parse_rule_ids(args.rules)
+    except ValueError as e:
+        parser.error(str(e))
+    return run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
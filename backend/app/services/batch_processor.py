@@ -0,0 +1,266 @@
+"""
+Пакетная обработка документов: архив ZIP или несколько DOCX в одном запросе.
+
+open_batch() составляет список документов пакета, не читая их содержимое:
+записи ZIP остаются в архиве до постановки в очередь, а записи сверх
+ограничения размера не распаковываются вовсе. run_batch() передает документы
+в очередь заданий (JobQueue) окном ограниченного размера и выдает результаты
+по мере завершения заданий, поэтому в памяти сервера одновременно находится
+не больше window документов независимо от размера пакета.
+
+stream_zip() формирует ZIP по частям: архив исправленных документов
+отдается клиенту, не собираясь целиком ни в памяти, ни на диске.
+"""
+
+import os
+import posixpath
+import time
+import zipfile
+
+from .job_queue import JOB_FAILED, QueueFullError
+
+DEFAULT_BATCH_MAX_FILES = 500
+DEFAULT_BATCH_MAX_FILE_MB = 50
+# Пауза перед повторной постановкой, если очередь заполнена другими запросами (секунды)
+QUEUE_FULL_RETRY = 1
+_ZIP_CHUNK_SIZE = 1024 * 1024
+
+
+class BatchError(ValueError):
+    """
+    Пакет не может быть обработан (нет документов, поврежденный архив, слишком много файлов)
+    """
+
+
+def get_batch_config():
+    """
+    Ограничения пакета из переменных окружения:
+    BATCH_MAX_FILES (документов в пакете, по умолчанию 500),
+    BATCH_MAX_FILE_MB (размер одного документа в МБ, по умолчанию 50)
+    """
+    config = {}
+    for key, name, default in (('max_files', 'BATCH_MAX_FILES', DEFAULT_BATCH_MAX_FILES),
+                               ('max_file_mb', 'BATCH_MAX_FILE_MB', DEFAULT_BATCH_MAX_FILE_MB)):
+        value = os.environ.get(name, str(default)).strip()
+        try:
+            number = int(value)
+            if number < 1:
+                raise ValueError(value)
+        except ValueError:
+            print(f"Некорректное значение {name}={value}, используется {default}")
+            number = default
+        config[key] = number
+    return {'max_files': config['max_files'], 'max_file_size': config['max_file_mb'] * 1024 * 1024}
+
+
+class BatchEntry:
+    """
+    Документ пакета: имя (уникальное в пакете) и чтение содержимого по требованию
+    """
+
+    def __init__(self, index, name, size, reader):
+        self.index = index
+        self.name = name
+        self.size = size
+        self._reader = reader
+
+    def read(self):
+        return self._reader()
+
+
+class BatchSource:
+    """
+    Документы пакета (entries) и файлы, пропущенные при разборе (skipped:
+    список {'filename', 'error'}); close() закрывает открытые архивы
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.skipped = []
+        self._archives = []
+        self._names = set()
+
+    def close(self):
+        for archive in self._archives:
+            archive.close()
+        self._archives = []
+
+    def _add(self, filename, size, reader, max_file_size):
+        if size is not None and size > max_file_size:
+            self.skipped.append({
+                'filename': filename,
+                'error': f'Файл больше {max_file_size // (1024 * 1024)} МБ'
+            })
+            return
+        self.entries.append(BatchEntry(len(self.entries), self._unique_name(filename), size, reader))
+
+    def _unique_name(self, filename):
+        """
+        Имя документа без каталогов архива; повторяющиеся имена получают суффикс _2, _3...
+        """
+        name = posixpath.basename(filename.replace('\\', '/'))
+        base, ext = os.path.splitext(name)
+        number = 1
+        while name.lower() in self._names:
+            number += 1
+            name = f"{base}_{number}{ext}"
+        self._names.add(name.lower())
+        return name
+
+
+def open_batch(uploads, max_files=DEFAULT_BATCH_MAX_FILES,
+               max_file_size=DEFAULT_BATCH_MAX_FILE_MB * 1024 * 1024):
+    """
+    Составляет пакет из загруженных файлов: uploads — список (имя файла, поток).
+    Архивы .zip разворачиваются в содержащиеся в них документы DOCX.
+    Бросает BatchError, если документов нет, их больше max_files или архив поврежден.
+    """
+    source = BatchSource()
+    try:
+        for filename, stream in uploads:
+            extension = os.path.splitext(filename)[1].lower()
+            if extension == '.zip':
+                _add_archive(source, filename, stream, max_file_size)
+            elif extension == '.docx':
+                source._add(filename, _stream_size(stream), stream.read, max_file_size)
+            else:
+                source.skipped.append({'filename': filename, 'error': 'Недопустимый формат файла'})
+        if not source.entries:
+            raise BatchError('В пакете нет документов DOCX')
+        if len(source.entries) > max_files:
+            raise BatchError(f'В пакете {len(source.entries)} документов, допускается не больше {max_files}')
+    except BaseException:
+        source.close()
+        raise
+    return source
+
+
+def _add_archive(source, filename, stream, max_file_size):
+    """
+    Добавляет в пакет документы DOCX из архива ZIP
+    """
+    try:
+        archive = zipfile.ZipFile(stream)
+    except (zipfile.BadZipFile, OSError) as e:
+        raise BatchError(f'Поврежденный архив {filename}: {str(e)}') from e
+    source._archives.append(archive)
+    for info in archive.infolist():
+        name = posixpath.basename(info.filename.replace('\\', '/'))
+        # Каталоги, служебные файлы macOS и временные файлы Word
+        if info.is_dir() or info.filename.startswith('__MACOSX/') or name.startswith(('.', '~$')):
+            continue
+        if not name.lower().endswith('.docx'):
+            source.skipped.append({'filename': info.filename, 'error': 'Недопустимый формат файла'})
+            continue
+        if info.flag_bits & 0x1:
+            source.skipped.append({'filename': info.filename, 'error': 'Файл в архиве зашифрован'})
+            continue
+        source._add(name, info.file_size, lambda info=info: archive.read(info), max_file_size)
+
+
+def _stream_size(stream):
+    """
+    Размер содержимого потока (None, если поток не поддерживает seek)
+    """
+    try:
+        position = stream.tell()
+        size = stream.seek(0, os.SEEK_END) - position
+        stream.seek(position)
+        return size
+    except (AttributeError, OSError):
+        return None
+
+
+def run_batch(queue, entries, job_fn, job_args=(), window=None, filename_fn=None, **meta):
+    """
+    Выполняет job_fn(содержимое, имя файла, *job_args) для каждого документа пакета
+    в очереди queue. В очереди одновременно не больше window документов
+    (по умолчанию вдвое больше числа рабочих процессов). Имя файла для задания —
+    filename_fn(entry) (по умолчанию entry.name). Выдает пары
+    (BatchEntry, состояние задания как в JobQueue.get) по мере завершения.
+    """
+    window = window or queue.workers * 2
+    pending = iter(entries)
+    in_flight = {}
+    entry, content = next(pending, None), None
+    while entry is not None or in_flight:
+        while entry is not None and len(in_flight) < window:
+            if content is None:
+                try:
+                    content = entry.read()
+                except Exception as e:
+                    yield entry, _failed_job(f"Не удалось прочитать файл: {type(e).__name__}: {str(e)}")
+                    entry = next(pending, None)
+                    continue
+            try:
+                filename = filename_fn(entry) if filename_fn is not None else entry.name
+                job_id = queue.submit(job_fn, content, filename, *job_args, filename=entry.name, **meta)
+            except QueueFullError:
+                # Очередь занята другими запросами: ждем завершения своих заданий
+                break
+            in_flight[job_id] = entry
+            entry, content = next(pending, None), None
+        if not in_flight:
+            time.sleep(QUEUE_FULL_RETRY)
+            continue
+        for job_id in queue.wait(list(in_flight)):
+            job = queue.get(job_id) or _failed_job('Задание не найдено')
+            yield in_flight.pop(job_id), job
+
+
+def _failed_job(error):
+    """
+    Состояние задания для документа, который не удалось поставить в очередь
+    """
+    return {'id': None, 'status': JOB_FAILED, 'attempts': 0, 'created_at': None,
+            'finished_at': None, 'result': None, 'error': error}
+
+
+class _ChunkWriter:
+    """
+    Поток записи для zipfile без seek/tell: накапливает записанные байты до выдачи
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(members):
+    """
+    Формирует ZIP по частям. members — пары (имя в архиве, путь к файлу или bytes).
+    Возвращает генератор байтовых фрагментов архива.
+    """
+    writer = _ChunkWriter()
+    # Документы DOCX уже сжаты: быстрый уровень сжатия почти не увеличивает архив
+    with zipfile.ZipFile(writer, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for name, member in members:
+            if isinstance(member, (bytes, bytearray)):
+                archive.writestr(name, member)
+            else:
+                with open(member, 'rb') as src, archive.open(name, 'w') as dst:
+                    while True:
+                        chunk = src.read(_ZIP_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+                        data = writer.pop()
+                        if data:
+                            yield data
+            data = writer.pop()
+            if data:
+                yield data
+    data = writer.pop()
+    if data:
+        yield data
@@ -0,0 +1,677 @@
+"""
+Набор изменений исправления документа (пробный запуск, dry run).
+
+DocumentCorrector исправляет документ на месте, а перед этим снимается копия
+пакета (ChangeBaseline). Сравнение исправленного документа с копией дает
+структурированный список изменений: свойства параграфов, runs и разделов
+(старое и новое значение), замены текста runs, добавленные и удаленные
+параграфы, изменения стилей и прочих частей пакета. DOCX при этом не
+сериализуется. Набор сохраняется в JSON, а выбранные изменения затем
+применяются к исходному документу без повторного исправления.
+"""
+
+import copy
+import json
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.opc.part import PartFactory, XmlPart
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from docx.text.run import Run
+from lxml import etree
+
+CHANGE_SET_VERSION = 1
+
+R_NAMESPACE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+# Понятные имена свойств w:pPr, w:rPr и w:sectPr
+PROPERTY_NAMES = {
+    'pStyle': 'style',
+    'jc': 'alignment',
+    'spacing': 'spacing',
+    'ind': 'indent',
+    'keepNext': 'keep_with_next',
+    'pageBreakBefore': 'page_break_before',
+    'suppressAutoHyphens': 'suppress_auto_hyphens',
+    'numPr': 'numbering',
+    'rStyle': 'character_style',
+    'rFonts': 'font_name',
+    'sz': 'font_size',
+    'szCs': 'font_size_cs',
+    'b': 'bold',
+    'i': 'italic',
+    'u': 'underline',
+    'caps': 'all_caps',
+    'color': 'color',
+    'pgSz': 'page_size',
+    'pgMar': 'margins',
+    'pgNumType': 'page_numbering',
+    'titlePg': 'title_page',
+    'headerReference': 'header',
+    'footerReference': 'footer',
+}
+
+# Элементы-контейнеры свойств и способ их создания у владельца
+_PROPERTY_PARENTS = {
+    'w:pPr': 'get_or_add_pPr',
+    'w:rPr': 'get_or_add_rPr',
+    'w:sectPr': 'get_or_add_sectPr',
+}
+
+# Порядок применения: сначала части пакета и стили, затем содержимое тела;
+# вставки выполняются до замен и удалений, пока опорные элементы на месте
+_APPLY_ORDER = ('part', 'style', 'section', 'inserted', 'paragraph', 'run', 'block', 'removed')
+
+# Ссылки на стили и нумерацию, определения которых может изменить исправление
+_STYLE_REFERENCES = {qn('w:pStyle'), qn('w:rStyle'), qn('w:tblStyle'), qn('w:basedOn')}
+_REFERENCE_MARKERS = ('Style', 'basedOn', 'numId')
+
+# Поля изменения, возвращаемые клиенту
+PUBLIC_FIELDS = ('id', 'kind', 'paragraph_index', 'run_index', 'block_index', 'property', 'old', 'new', 'requires')
+
+
+def copy_document(document):
+    """
+    Возвращает независимую копию документа.
+    Копируется пакет целиком: lxml не учитывает memo при deepcopy, поэтому
+    копия самого объекта Document ссылалась бы на другой XML, чем его часть,
+    и сохранялся бы неизмененный документ.
+    """
+    package = copy.deepcopy(document.part.package)
+    return package.main_document_part.document
+
+
+def _local(tag):
+    return etree.QName(tag).localname
+
+
+def _xml(element):
+    return etree.tostring(element, encoding='unicode')
+
+
+def _same(a, b):
+    # Обычная сериализация быстрее; каноническая нужна, только если отличается порядок атрибутов
+    if etree.tostring(a) == etree.tostring(b):
+        return True
+    return etree.tostring(a, method='c14n') == etree.tostring(b, method='c14n')
+
+
+def _value(element):
+    """
+    Значение свойства для просмотра: None — не задано, True — флаг без атрибутов,
+    строка — значение w:val, иначе словарь атрибутов
+    """
+    if element is None:
+        return None
+    attributes = {_local(name): value for name, value in element.attrib.items()}
+    if not attributes and len(element) == 0:
+        return True
+    if list(attributes) == ['val'] and len(element) == 0:
+        return attributes['val']
+    if len(element):
+        attributes['children'] = [_local(child.tag) for child in element]
+    return attributes
+
+
+def _text(element):
+    """
+    Текст параграфа или run для просмотра изменений
+    """
+    return ''.join(node.text or '' for node in element.iter(qn('w:t')))
+
+
+def _children_by_tag(parent):
+    """
+    {тег: элемент} свойств или None, если какой-то тег повторяется
+    """
+    children = {}
+    if parent is None:
+        return children
+    for child in parent:
+        if child.tag in children:
+            return None
+        children[child.tag] = child
+    return children
+
+
+class ChangeBaseline:
+    """
+    Копия документа до исправления и соответствие элементов тела исправляемого
+    документа их позициям в копии
+    """
+
+    def __init__(self, document):
+        self.original = copy_document(document)
+        self.elements = {'paragraph': [], 'block': []}
+        self.positions = {}
+        for live, original in zip(document.element.body, self.original.element.body):
+            kind = self._kind(live)
+            if kind is None:
+                continue
+            self.positions[live] = (kind, len(self.elements[kind]))
+            self.elements[kind].append(original)
+
+    @staticmethod
+    def _kind(element):
+        """
+        'paragraph' для параграфов тела, 'block' для таблиц и прочих элементов, None для w:sectPr
+        """
+        if element.tag == qn('w:p'):
+            return 'paragraph'
+        if element.tag == qn('w:sectPr'):
+            return None
+        return 'block'
+
+
+class ChangeSet:
+    """
+    Список изменений исправления документа
+    """
+
+    def __init__(self, changes=None, source_digest=None):
+        self.changes = changes or []
+        self.source_digest = source_digest
+
+    def __len__(self):
+        return len(self.changes)
+
+    # === Построение ===
+
+    @classmethod
+    def build(cls, baseline, corrected, source_digest=None):
+        """
+        Сравнивает исправленный документ с копией, снятой до исправления
+        baseline: ChangeBaseline исправленного документа
+        corrected: объект docx.Document после исправления
+        """
+        change_set = cls(source_digest=source_digest)
+        change_set._main_partname = None
+        change_set._numbering_partname = next((
+            str(rel.target_part.partname) for rel in corrected.part.rels.values()
+            if rel.reltype == RT.NUMBERING and not rel.is_external
+        ), None)
+        change_set._diff_body(baseline, corrected.element.body)
+        change_set._diff_section(baseline.original.element.body.sectPr, corrected.element.body.sectPr)
+        change_set._diff_parts(baseline.original.part.package, corrected.part.package)
+        change_set._link_requirements()
+        return change_set
+
+    def _add(self, kind, prop, **fields):
+        change = {
+            'id': len(self.changes),
+            'kind': kind,
+            'paragraph_index': None,
+            'run_index': None,
+            'block_index': None,
+            'property': prop,
+            'old': None,
+            'new': None,
+            'requires': [],
+        }
+        change.update(fields)
+        self.changes.append(change)
+        return change
+
+    def _diff_body(self, baseline, body):
+        """
+        Изменения параграфов и блоков тела документа
+        """
+        seen = set()
+        anchor = None
+        for element in body:
+            kind = ChangeBaseline._kind(element)
+            if kind is None:
+                continue
+            match = baseline.positions.get(element)
+            if match is None:
+                self._add('inserted', kind, anchor=anchor, new=_text(element), xml=_xml(element))
+                continue
+            seen.add(match)
+            anchor = list(match)
+            original = baseline.elements[match[0]][match[1]]
+            if _same(original, element):
+                continue
+            if kind == 'paragraph':
+                self._diff_paragraph(match[1], original, element)
+            else:
+                self._add('block', _local(element.tag), block_index=match[1], xml=_xml(element))
+
+        for kind, elements in baseline.elements.items():
+            for index, original in enumerate(elements):
+                if (kind, index) not in seen:
+                    position = {'paragraph_index': index} if kind == 'paragraph' else {'block_index': index}
+                    self._add('removed', kind, old=_text(original), target=[kind, index], **position)
+
+    def _diff_paragraph(self, position, old, new):
+        """
+        Изменения свойств и текста одного параграфа; если состав runs изменился,
+        параграф заменяется целиком
+        """
+        old_content = [child for child in old if child.tag != qn('w:pPr')]
+        new_content = [child for child in new if child.tag != qn('w:pPr')]
+        comparable = (
+            dict(old.attrib) == dict(new.attrib)
+            and len(old_content) == len(new_content)
+            and all(a.tag == b.tag and (a.tag == qn('w:r') or _same(a, b))
+                    for a, b in zip(old_content, new_content))
+        )
+        if comparable:
+            changes_before = len(self.changes)
+            comparable = self._diff_properties(
+                'paragraph', old.pPr, new.pPr, 'w:pPr', paragraph_index=position)
+            run_index = 0
+            for old_child, new_child in zip(old_content, new_content):
+                if not comparable:
+                    break
+                if old_child.tag != qn('w:r'):
+                    continue
+                comparable = self._diff_run(position, run_index, old_child, new_child)
+                run_index += 1
+            if not comparable:
+                del self.changes[changes_before:]
+        if not comparable:
+            self._add('paragraph', 'content', paragraph_index=position,
+                      old=_text(old), new=_text(new), xml=_xml(new))
+
+    def _diff_run(self, position, run_index, old, new):
+        """
+        Изменения свойств и текста run; False, если их нельзя выразить по отдельности
+        """
+        if dict(old.attrib) != dict(new.attrib):
+            return False
+        if not self._diff_properties('run', old.rPr, new.rPr, 'w:rPr',
+                                     paragraph_index=position, run_index=run_index):
+            return False
+        old_content = [child for child in old if child.tag != qn('w:rPr')]
+        new_content = [child for child in new if child.tag != qn('w:rPr')]
+        if len(old_content) != len(new_content) or not all(_same(a, b) for a, b in zip(old_content, new_content)):
+            self._add('run', 'text', paragraph_index=position, run_index=run_index,
+                      old=Run(old, None).text, new=Run(new, None).text,
+                      xml=[_xml(child) for child in new_content])
+        return True
+
+    def _diff_properties(self, kind, old_parent, new_parent, parent_tag, **location):
+        """
+        Изменения отдельных свойств контейнера (w:pPr, w:rPr, w:sectPr);
+        False, если свойства повторяются или изменены атрибуты самого контейнера
+        """
+        old_children = _children_by_tag(old_parent)
+        new_children = _children_by_tag(new_parent)
+        if old_children is None or new_children is None:
+            return False
+        old_attrib = dict(old_parent.attrib) if old_parent is not None else {}
+        new_attrib = dict(new_parent.attrib) if new_parent is not None else {}
+        if old_attrib != new_attrib:
+            return False
+
+        new_order = list(new_children)
+        tags = new_order + [tag for tag in old_children if tag not in new_children]
+        for tag in tags:
+            old_child = old_children.get(tag)
+            new_child = new_children.get(tag)
+            if old_child is not None and new_child is not None and _same(old_child, new_child):
+                continue
+            preceding = new_order[:new_order.index(tag)] if tag in new_children else []
+            self._add(
+                kind, PROPERTY_NAMES.get(_local(tag), _local(tag)),
+                old=_value(old_child), new=_value(new_child),
+                xml=_xml(new_child) if new_child is not None else None,
+                parent=parent_tag, tag=tag, after=list(reversed(preceding)),
+                parent_absent=new_parent is None, **location
+            )
+        return True
+
+    def _diff_section(self, old, new):
+        """
+        Изменения свойств последнего раздела документа (w:sectPr тела)
+        """
+        if old is None and new is None:
+            return
+        if old is not None and new is not None and _same(old, new):
+            return
+        changes_before = len(self.changes)
+        if not self._diff_properties('section', old, new, 'w:sectPr'):
+            del self.changes[changes_before:]
+            self._add('section', 'sectPr', xml=_xml(new) if new is not None else None, replace=True)
+
+    def _diff_parts(self, old_package, new_package):
+        """
+        Изменения стилей (по стилям) и остальных частей пакета (целиком)
+        """
+        old_parts = {str(part.partname): part for part in old_package.iter_parts()}
+        main_partname = self._main_partname = str(new_package.main_document_part.partname)
+        for part in new_package.iter_parts():
+            partname = str(part.partname)
+            if partname == main_partname:
+                continue
+            old_part = old_parts.get(partname)
+            if old_part is None:
+                self._add_new_part(new_package, part)
+                continue
+            if isinstance(part, XmlPart) and isinstance(old_part, XmlPart):
+                if _same(old_part.element, part.element):
+                    continue
+                if partname == '/word/styles.xml' and self._diff_styles(old_part.element, part.element):
+                    continue
+                self._add('part', partname, xml=_xml(part.element))
+            elif old_part.blob != part.blob:
+                # Двоичные части (рисунки) исправление не изменяет; набор изменений их не переносит
+                print(f"Изменение двоичной части {partname} не включено в набор изменений")
+
+    def _add_new_part(self, package, part):
+        """
+        Добавленная часть пакета (например, колонтитул с номерами страниц) вместе со связью
+        """
+        for source in package.iter_parts():
+            for rel in source.rels.values():
+                if not rel.is_external and rel.target_part is part:
+                    self._add(
+                        'part', str(part.partname), new=True,
+                        xml=_xml(part.element) if isinstance(part, XmlPart) else None,
+                        content_type=part.content_type, reltype=rel.reltype, rId=rel.rId,
+                        source=str(source.partname)
+                    )
+                    return
+        print(f"Не найдена связь для новой части {part.partname}")
+
+    def _diff_styles(self, old_styles, new_styles):
+        """
+        Изменения отдельных стилей и docDefaults; False, если стили нельзя сопоставить
+        """
+        old_items = self._style_items(old_styles)
+        new_items = self._style_items(new_styles)
+        if old_items is None or new_items is None or set(old_items) - set(new_items):
+            return False
+        for key, element in new_items.items():
+            old_element = old_items.get(key)
+            if old_element is not None and _same(old_element, element):
+                continue
+            self._add('style', key, old=self._style_name(old_element), new=self._style_name(element),
+                      xml=_xml(element), tag=element.tag)
+        return True
+
+    @staticmethod
+    def _style_name(element):
+        """
+        Имя стиля для просмотра изменений (None для docDefaults и отсутствующего стиля)
+        """
+        name = element.find(qn('w:name')) if element is not None else None
+        return name.get(qn('w:val')) if name is not None else None
+
+    @staticmethod
+    def _style_items(styles):
+        """
+        {идентификатор стиля или имя элемента: элемент} или None при повторах
+        """
+        items = {}
+        for child in styles:
+            key = child.get(qn('w:styleId')) if child.tag == qn('w:style') else _local(child.tag)
+            if key in items:
+                return None
+            items[key] = child
+        return items
+
+    def _link_requirements(self):
+        """
+        Связи между изменениями: изменение требует тех, без которых его результат
+        ссылался бы на отсутствующее или старое определение, —
+        добавленной части, на которую ссылается r:id тела документа;
+        изменений стилей, на которые ссылаются w:pStyle, w:rStyle, w:tblStyle и w:basedOn;
+        изменения части нумерации, на которую ссылается w:numId
+        """
+        added = {}
+        styles = {}
+        whole_styles = numbering = None
+        for change in self.changes:
+            if change['kind'] == 'style' and change['tag'] == qn('w:style'):
+                styles[change['property']] = change['id']
+            elif change['kind'] != 'part':
+                continue
+            elif change['property'] == '/word/styles.xml':
+                whole_styles = change['id']
+            elif change['property'] == self._numbering_partname or change.get('reltype') == RT.NUMBERING:
+                numbering = change['id']
+            elif change.get('rId') and change['source'] == self._main_partname:
+                added[change['rId']] = change['id']
+        if not (added or styles or whole_styles is not None or numbering is not None):
+            return
+
+        for change in self.changes:
+            xml = change.get('xml')
+            if not xml:
+                continue
+            # r:id частей и стилей относятся к их собственным связям, а не к связям тела
+            body_ids = added if change['kind'] not in ('part', 'style') else {}
+            for fragment in (xml if isinstance(xml, list) else [xml]):
+                if not any(marker in fragment for marker in _REFERENCE_MARKERS) \
+                        and not any(f'"{rId}"' in fragment for rId in body_ids):
+                    continue
+                for node in etree.fromstring(fragment).iter():
+                    required = None
+                    if node.tag in _STYLE_REFERENCES:
+                        required = styles.get(node.get(qn('w:val')), whole_styles)
+                    elif node.tag == qn('w:numId'):
+                        required = numbering
+                    elif body_ids:
+                        for name, value in node.attrib.items():
+                            if etree.QName(name).namespace == R_NAMESPACE and value in body_ids:
+                                self._require(change, body_ids[value])
+                    self._require(change, required)
+
+    @staticmethod
+    def _require(change, required):
+        if required is not None and required != change['id'] and required not in change['requires']:
+            change['requires'].append(required)
+
+    # === Представление и хранение ===
+
+    def summary(self):
+        """
+        Количество изменений по видам
+        """
+        counts = {}
+        for change in self.changes:
+            counts[change['kind']] = counts.get(change['kind'], 0) + 1
+        return {'total': len(self.changes), 'by_kind': counts}
+
+    def to_list(self):
+        """
+        Изменения без служебных данных (XML) для ответа API
+        """
+        return [{field: change.get(field) for field in PUBLIC_FIELDS} for change in self.changes]
+
+    def save(self, path, **meta):
+        """
+        Сохраняет набор изменений в JSON (meta — дополнительные сведения, например путь к исходнику)
+        """
+        data = {'version': CHANGE_SET_VERSION, 'source_digest': self.source_digest, 'changes': self.changes}
+        data.update(meta)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Загружает набор изменений; возвращает (ChangeSet, сведения meta)
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != CHANGE_SET_VERSION:
+            raise ValueError(f"Неподдерживаемая версия набора изменений: {data.get('version')}")
+        change_set = cls(data.pop('changes'), data.pop('source_digest'))
+        data.pop('version')
+        return change_set, data
+
+    # === Применение ===
+
+    def select(self, ids=None):
+        """
+        Выбранные изменения вместе с изменениями, которые им требуются
+        """
+        if ids is None:
+            return list(self.changes)
+        by_id = {change['id']: change for change in self.changes}
+        selected = set()
+        pending = [int(change_id) for change_id in ids]
+        while pending:
+            change_id = pending.pop()
+            if change_id in selected:
+                continue
+            if change_id not in by_id:
+                raise ValueError(f"Неизвестное изменение: {change_id}")
+            selected.add(change_id)
+            pending.extend(by_id[change_id]['requires'])
+        return [change for change in self.changes if change['id'] in selected]
+
+    def apply(self, document, ids=None):
+        """
+        Применяет изменения (все или ids) к исходному документу, из которого получен набор.
+        Возвращает идентификаторы примененных изменений
+        """
+        changes = self.select(ids)
+        body = document.element.body
+        elements = {'paragraph': [], 'block': []}
+        for element in body:
+            kind = ChangeBaseline._kind(element)
+            if kind is not None:
+                elements[kind].append(element)
+
+        inserted_after = {}
+        for change in sorted(changes, key=lambda change: (_APPLY_ORDER.index(change['kind']), change['id'])):
+            kind = change['kind']
+            if kind == 'part':
+                self._apply_part(document, change)
+            elif kind == 'style':
+                self._apply_style(document, change)
+            elif kind == 'section':
+                self._apply_section(body, change)
+            elif kind == 'inserted':
+                self._apply_insert(body, elements, inserted_after, change)
+            elif kind == 'removed':
+                element = elements[change['target'][0]][change['target'][1]]
+                if element.getparent() is not None:
+                    element.getparent().remove(element)
+            elif kind == 'block':
+                self._replace(elements['block'], change['block_index'], change['xml'])
+            elif change['property'] == 'content':
+                self._replace(elements['paragraph'], change['paragraph_index'], change['xml'])
+            else:
+                p = elements['paragraph'][change['paragraph_index']]
+                if kind == 'paragraph':
+                    self._apply_property(p, change)
+                elif change['property'] == 'text':
+                    self._apply_run_text(p.r_lst[change['run_index']], change)
+                else:
+                    self._apply_property(p.r_lst[change['run_index']], change)
+        return [change['id'] for change in changes]
+
+    @staticmethod
+    def _replace(elements, index, xml):
+        old = elements[index]
+        new = parse_xml(xml)
+        old.getparent().replace(old, new)
+        elements[index] = new
+
+    @staticmethod
+    def _apply_insert(body, elements, inserted_after, change):
+        """
+        Вставляет новый элемент тела после опорного (или в начало тела), сохраняя порядок вставок
+        """
+        anchor = tuple(change['anchor']) if change['anchor'] else None
+        new = parse_xml(change['xml'])
+        previous = inserted_after.get(anchor)
+        if previous is None and anchor is not None:
+            previous = elements[anchor[0]][anchor[1]]
+        if previous is None:
+            body.insert(0, new)
+        else:
+            previous.addnext(new)
+        inserted_after[anchor] = new
+
+    @staticmethod
+    def _apply_property(owner, change):
+        """
+        Устанавливает, заменяет или удаляет одно свойство в w:pPr, w:rPr или w:sectPr
+        """
+        parent_tag = qn(change['parent'])
+        tag = change['tag']
+        parent = owner.find(parent_tag)
+        if change['xml'] is None:
+            if parent is None:
+                return
+            existing = parent.find(tag)
+            if existing is not None:
+                parent.remove(existing)
+            if change['parent_absent'] and len(parent) == 0 and not parent.attrib:
+                owner.remove(parent)
+            return
+
+        if parent is None:
+            parent = getattr(owner, _PROPERTY_PARENTS[change['parent']])()
+        new = parse_xml(change['xml'])
+        existing = parent.find(tag)
+        if existing is not None:
+            parent.replace(existing, new)
+            return
+        for preceding_tag in change['after']:
+            preceding = parent.find(preceding_tag)
+            if preceding is not None:
+                preceding.addnext(new)
+                return
+        parent.insert(0, new)
+
+    @staticmethod
+    def _apply_run_text(r, change):
+        """
+        Заменяет содержимое run (текст, табуляции, разрывы), сохраняя w:rPr
+        """
+        for child in list(r):
+            if child.tag != qn('w:rPr'):
+                r.remove(child)
+        for fragment in change['xml']:
+            r.append(parse_xml(fragment))
+
+    def _apply_section(self, body, change):
+        if change.get('replace'):
+            old = body.sectPr
+            if old is not None:
+                body.remove(old)
+            if change['xml'] is not None:
+                body.append(parse_xml(change['xml']))
+            return
+        self._apply_property(body, change)
+
+    @staticmethod
+    def _apply_style(document, change):
+        """
+        Заменяет или добавляет стиль (или docDefaults) в styles.xml
+        """
+        styles = document.styles.element
+        new = parse_xml(change['xml'])
+        if change['tag'] == qn('w:style'):
+            existing = styles.get_by_id(change['property'])
+        else:
+            existing = styles.find(change['tag'])
+        if existing is not None:
+            styles.replace(existing, new)
+        else:
+            styles.append(new)
+
+    @staticmethod
+    def _apply_part(document, change):
+        """
+        Заменяет содержимое части пакета или добавляет новую часть со связью
+        """
+        package = document.part.package
+        parts = {str(part.partname): part for part in package.iter_parts()}
+        part = parts.get(change['property'])
+        if not change.get('new'):
+            if isinstance(part, XmlPart):
+                part._element = parse_xml(change['xml'])
+            return
+        if part is not None:
+            return
+        blob = change['xml'].encode('utf-8')
+        part = PartFactory(PackURI(change['property']), change['content_type'], change['reltype'], blob, package)
+        parts[change['source']].rels.add_relationship(change['reltype'], part, change['rId'])
@@ -0,0 +1,168 @@
+"""
+Компактное представление параграфов document_data.
+
+Каждый параграф хранится в записи со __slots__ вместо словаря, а одинаковые
+вложенные словари (font, paragraph_format, list_info) интернируются в общей
+таблице и разделяются между параграфами. Записи ведут себя как словари только
+для чтения, поэтому методы NormControlChecker._check_* работают с ними без изменений.
+
+DocumentProcessor.extract_data(compact=True) создает записи сразу при однопроходном
+чтении параграфов; DocumentPipeline включает этот режим переменной окружения
+COMPACT_PARAGRAPHS (см. get_compact_paragraphs_config).
+"""
+
+import os
+import sys
+from collections.abc import Mapping
+
+# Поля параграфа, которые формирует DocumentProcessor._extract_paragraphs
+PARAGRAPH_FIELDS = (
+    'index', 'text', 'style', 'alignment', 'font', 'line_spacing',
+    'paragraph_format', 'is_heading', 'list_info'
+)
+
+# Вложенные словари, одинаковые значения которых хранятся один раз
+INTERNED_FIELDS = ('font', 'paragraph_format', 'list_info')
+
+_FIELD_SET = frozenset(PARAGRAPH_FIELDS)
+
+
+def get_compact_paragraphs_config():
+    """
+    Хранить ли параграфы в компактных записях: переменная окружения
+    COMPACT_PARAGRAPHS (1 | true | yes | on; по умолчанию выключено)
+    """
+    value = os.environ.get('COMPACT_PARAGRAPHS', '').strip().lower()
+    if value in ('', '0', 'false', 'no', 'off'):
+        return False
+    if value in ('1', 'true', 'yes', 'on'):
+        return True
+    print(f"Некорректное значение COMPACT_PARAGRAPHS={value}, компактные записи не используются")
+    return False
+
+
+def _freeze(value):
+    """
+    Превращает словарь (в том числе вложенный) в хешируемый ключ
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
+class InternTable:
+    """
+    Таблица интернирования: одинаковые по содержимому словари заменяются одним объектом
+    """
+
+    def __init__(self):
+        self._items = {}
+
+    def __len__(self):
+        return len(self._items)
+
+    def intern(self, value):
+        """
+        Возвращает общий объект для словаря с таким же содержимым
+        """
+        if not isinstance(value, dict):
+            return value
+        try:
+            key = _freeze(value)
+            existing = self._items.get(key)
+        except TypeError:
+            # Нехешируемые значения не интернируем
+            return value
+        if existing is None:
+            self._items[key] = value
+            return value
+        return existing
+
+
+class ParagraphRecord(Mapping):
+    """
+    Запись параграфа со __slots__, совместимая со словарем только для чтения
+    """
+
+    __slots__ = PARAGRAPH_FIELDS
+
+    def __init__(self, data, intern_table=None):
+        for field in PARAGRAPH_FIELDS:
+            value = data.get(field)
+            if intern_table is not None and field in INTERNED_FIELDS:
+                value = intern_table.intern(value)
+            elif field == 'style' and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, field, value)
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        return default
+
+    def __contains__(self, key):
+        return key in _FIELD_SET
+
+    def __iter__(self):
+        return iter(PARAGRAPH_FIELDS)
+
+    def __len__(self):
+        return len(PARAGRAPH_FIELDS)
+
+    def __repr__(self):
+        return f"ParagraphRecord(index={self.index!r}, style={self.style!r}, text={self.text[:30]!r})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in PARAGRAPH_FIELDS)
+
+    def __setstate__(self, state):
+        for field, value in zip(PARAGRAPH_FIELDS, state):
+            setattr(self, field, value)
+
+    def to_dict(self):
+        """
+        Возвращает обычный словарь (например, для JSON-сериализации)
+        """
+        return {field: getattr(self, field) for field in PARAGRAPH_FIELDS}
+
+
+class CompactParagraphList(list):
+    """
+    Список записей ParagraphRecord с общей таблицей интернирования
+    и доступом к отдельным столбцам
+    """
+
+    def __init__(self, paragraphs=(), intern_table=None):
+        self.intern_table = intern_table if intern_table is not None else InternTable()
+        super().__init__(
+            para if isinstance(para, ParagraphRecord) else ParagraphRecord(para, self.intern_table)
+            for para in paragraphs
+        )
+
+    def column(self, field):
+        """
+        Возвращает значения одного поля по всем параграфам
+        """
+        if field not in _FIELD_SET:
+            raise KeyError(field)
+        return [getattr(para, field) for para in self]
+
+    def to_dicts(self):
+        """
+        Возвращает список обычных словарей
+        """
+        return [para.to_dict() for para in self]
+
+
+def compact_paragraphs(paragraphs):
+    """
+    Преобразует список параграфов-словарей в компактное представление
+    """
+    if isinstance(paragraphs, CompactParagraphList):
+        return paragraphs
+    return CompactParagraphList(paragraphs)
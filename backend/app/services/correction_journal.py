@@ -0,0 +1,221 @@
+"""
+Журнал изменений, внесенных при исправлении документа.
+
+Перед исправлением снимаются отпечатки параграфов тела документа и частей
+пакета (стили, тема, нумерация, разделы, колонтитулы, таблицы, свойства),
+после исправления — еще раз. Сравнение показывает, какие параграфы и части
+были затронуты, а неизмененные параграфы сопоставляются со своими исходными
+позициями. По журналу DocumentProcessor повторно использует уже извлеченные
+данные параграфов при повторной проверке исправленного документа.
+
+Изменение стилей или темы не делает устаревшими данные всех параграфов:
+для каждого параграфа до и после исправления запоминается то, что он
+наследует от стилей (FormattingResolver.paragraph_inherited_formatting),
+и заново разбираются только параграфы, у которых это изменилось.
+"""
+
+import difflib
+import hashlib
+import zipfile
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+from lxml import etree
+
+from .formatting_resolver import FormattingResolver
+
+# Части, от которых зависит действующее форматирование каждого параграфа
+FORMATTING_PARTS = ('styles', 'theme')
+
+# Части пакета, на которые ссылается основной документ
+_RELATED_PARTS = {
+    RT.STYLES: 'styles',
+    RT.THEME: 'theme',
+    RT.NUMBERING: 'numbering',
+    RT.SETTINGS: 'settings',
+    RT.HEADER: 'headers_footers',
+    RT.FOOTER: 'headers_footers',
+    RT.FOOTNOTES: 'footnotes',
+}
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _canonical(element):
+    # Каноническая сериализация не зависит от порядка атрибутов
+    return etree.tostring(element, method='c14n')
+
+
+def _element_digest(element):
+    return _digest(_canonical(element))
+
+
+def snapshot_document(document):
+    """
+    Отпечатки документа: (список отпечатков параграфов тела, {часть: отпечаток})
+    """
+    paragraphs = [_element_digest(para._p) for para in document.paragraphs]
+
+    hashers = {}
+    for rel_id, rel in sorted(document.part.rels.items()):
+        name = _RELATED_PARTS.get(rel.reltype)
+        if name is None or rel.is_external:
+            continue
+        hasher = hashers.setdefault(name, hashlib.blake2b(digest_size=16))
+        hasher.update(rel_id.encode())
+        part = rel.target_part
+        element = getattr(part, 'element', None)
+        hasher.update(_canonical(element) if element is not None else part.blob)
+    parts = {name: hasher.digest() for name, hasher in hashers.items()}
+
+    body = document.element.body
+    parts['sections'] = _digest(b''.join(_canonical(section._sectPr) for section in document.sections))
+    parts['tables'] = _digest(b''.join(_canonical(table) for table in body.iterchildren(qn('w:tbl'))))
+    parts['core_properties'] = _element_digest(document.core_properties._element)
+    return paragraphs, parts
+
+
+def formatting_snapshot(document):
+    """
+    Унаследованное от стилей и темы форматирование каждого параграфа тела документа
+    """
+    resolver = FormattingResolver(document)
+    return [resolver.paragraph_inherited_formatting(para._p) for para in document.paragraphs]
+
+
+def package_digest(path):
+    """
+    Канонический отпечаток пакета DOCX (путь или файловый объект; hex): XML-части в канонической форме (C14N),
+    остальные части — как есть, в порядке имен. В отличие от SHA-256 файла не зависит
+    от времени записи частей в ZIP, сжатия и порядка атрибутов, поэтому повторное
+    исправление, не изменившее документ, дает тот же отпечаток.
+    """
+    digest = hashlib.sha256()
+    with zipfile.ZipFile(path) as archive:
+        for name in sorted(archive.namelist()):
+            data = archive.read(name)
+            if name.endswith(('.xml', '.rels')):
+                try:
+                    data = _canonical(etree.fromstring(data))
+                except etree.XMLSyntaxError:
+                    pass
+            digest.update(name.encode('utf-8'))
+            digest.update(len(data).to_bytes(8, 'big'))
+            digest.update(data)
+    return digest.hexdigest()
+
+
+class CorrectionJournal:
+    """
+    Затронутые исправлением параграфы и части документа.
+
+    paragraph_map: {позиция параграфа в исправленном документе: позиция в исходном}
+                   для параграфов, оставшихся без изменений
+    touched_paragraphs: позиции измененных и добавленных параграфов исправленного документа
+    removed_paragraphs: позиции удаленных параграфов исходного документа
+    touched_parts: имена измененных частей ('styles', 'sections', 'tables', ...)
+    restyled_paragraphs: позиции неизмененных параграфов исправленного документа,
+                         действующее форматирование которых изменилось вместе со стилями
+    """
+
+    def __init__(self, document=None):
+        self.paragraph_map = {}
+        self.touched_paragraphs = set()
+        self.removed_paragraphs = set()
+        self.touched_parts = set()
+        self.restyled_paragraphs = set()
+        self.paragraph_count = 0
+        self._before = None
+        if document is not None:
+            self._before = snapshot_document(document) + (formatting_snapshot(document),)
+
+    def finish(self, document):
+        """
+        Сравнивает документ после исправления с отпечатками, снятыми в конструкторе
+        """
+        before_paragraphs, before_parts, before_formatting = self._before
+        after_paragraphs, after_parts = snapshot_document(document)
+        self._before = None
+
+        self.paragraph_count = len(after_paragraphs)
+        self.touched_parts = {
+            name for name in set(before_parts) | set(after_parts)
+            if before_parts.get(name) != after_parts.get(name)
+        }
+
+        self.paragraph_map = {}
+        matcher = difflib.SequenceMatcher(None, before_paragraphs, after_paragraphs, autojunk=False)
+        for old_start, new_start, size in matcher.get_matching_blocks():
+            for offset in range(size):
+                self.paragraph_map[new_start + offset] = old_start + offset
+        self.touched_paragraphs = set(range(self.paragraph_count)) - set(self.paragraph_map)
+        self.removed_paragraphs = set(range(len(before_paragraphs))) - set(self.paragraph_map.values())
+
+        self.restyled_paragraphs = set()
+        if self.formatting_touched:
+            after_formatting = formatting_snapshot(document)
+            self.restyled_paragraphs = {
+                new_position for new_position, old_position in self.paragraph_map.items()
+                if before_formatting[old_position] != after_formatting[new_position]
+            }
+        return self
+
+    def combine(self, later):
+        """
+        Журнал последовательных исправлений: сначала self, затем later
+        """
+        combined = CorrectionJournal()
+        combined.paragraph_count = later.paragraph_count
+        combined.touched_parts = self.touched_parts | later.touched_parts
+        for new_position, middle_position in later.paragraph_map.items():
+            if middle_position in self.paragraph_map:
+                combined.paragraph_map[new_position] = self.paragraph_map[middle_position]
+        combined.touched_paragraphs = set(range(later.paragraph_count)) - set(combined.paragraph_map)
+        combined.restyled_paragraphs = {
+            new_position for new_position, middle_position in later.paragraph_map.items()
+            if new_position in combined.paragraph_map
+            and (new_position in later.restyled_paragraphs or middle_position in self.restyled_paragraphs)
+        }
+        original_count = len(self.paragraph_map) + len(self.removed_paragraphs)
+        combined.removed_paragraphs = set(range(original_count)) - set(combined.paragraph_map.values())
+        return combined
+
+    @property
+    def formatting_touched(self):
+        """
+        Изменены ли части, влияющие на форматирование всех параграфов (стили, тема)
+        """
+        return any(name in self.touched_parts for name in FORMATTING_PARTS)
+
+    def reusable_paragraphs(self):
+        """
+        Параграфы, данные которых можно взять из исходного документа:
+        {позиция в исправленном документе: позиция в исходном}
+        """
+        return {
+            new_position: old_position for new_position, old_position in self.paragraph_map.items()
+            if new_position not in self.restyled_paragraphs
+        }
+
+    def changed_share(self):
+        """
+        Доля параграфов исправленного документа, данные которых нельзя взять из исходного
+        """
+        if not self.paragraph_count:
+            return 0.0
+        return 1 - len(self.reusable_paragraphs()) / self.paragraph_count
+
+    def summary(self):
+        """
+        Краткое описание журнала для логов и ответа API
+        """
+        return {
+            'paragraph_count': self.paragraph_count,
+            'touched_paragraphs': len(self.touched_paragraphs),
+            'removed_paragraphs': len(self.removed_paragraphs),
+            'restyled_paragraphs': len(self.restyled_paragraphs),
+            'touched_parts': sorted(self.touched_parts),
+            'formatting_touched': self.formatting_touched
+        }
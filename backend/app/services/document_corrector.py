@@ -2,18 +2,92 @@ import os
 import re
 import datetime
 import tempfile
+import threading
 from docx import Document
 from docx.shared import Pt, Cm, RGBColor
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT, WD_LINE_SPACING
 from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.enum.section import WD_SECTION
+from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml import OxmlElement, parse_xml
 from docx.oxml.ns import qn
+from docx.text.font import Font
 from docx.text.paragraph import Paragraph
 import shutil
 from docxtpl import DocxTemplate
 from docxcompose.composer import Composer
 
+from .change_set import ChangeBaseline, ChangeSet, copy_document
+from .correction_journal import CorrectionJournal, package_digest
+from .document_index import DocumentIndex
+from .formatting_engine import FormattingEngine
+from .formatting_resolver import FormattingResolver
+from .package_writer import save_document
+from . import regex_patterns as rx
+
+# Правила однопроходного форматирования (FormattingEngine) в порядке применения к параграфу
+BASE_FORMATTING_RULES = ('font', 'line_spacing')
+LIST_FORMATTING_RULES = ('list_items', 'letter_lists', 'multilevel_lists')
+HYPHENATION_RULES = ('hyphenation_settings', 'incorrect_hyphenation', 'hanging_prepositions')
+FINAL_FORMATTING_RULES = HYPHENATION_RULES + ('first_line_indent', 'paragraph_alignment')
+# Допустимое расхождение отступа с требуемым (см): значения хранятся в twips с округлением
+INDENT_TOLERANCE_CM = 0.01
+# Режим 'styles': завершающее удаление прямого форматирования runs, совпадающего со стилем
+STYLE_FORMATTING_RULES = ('redundant_formatting',)
+
+# Элементы w:pPr, удаляемые в режиме 'styles' при совпадении со стилем:
+# тег -> (свойства FormattingResolver, известные атрибуты элемента)
+REDUNDANT_PARAGRAPH_PROPERTIES = (
+    ('w:jc', ('alignment',), ('w:val',)),
+    ('w:spacing', ('space_before', 'space_after', 'line_spacing', 'line_spacing_rule'),
+     ('w:before', 'w:after', 'w:line', 'w:lineRule')),
+    ('w:ind', ('first_line_indent', 'left_indent', 'right_indent'),
+     ('w:firstLine', 'w:hanging', 'w:left', 'w:start', 'w:right', 'w:end')),
+)
+
+# Способ исправления шрифта runs:
+# 'direct' — шрифт и размер записываются в каждый run (прямое форматирование);
+# 'styles' — шрифт и размер задаются стилями параграфов, а прямое форматирование,
+# совпадающее со стилем, удаляется (меньше document.xml, быстрее сохранение и разбор)
+CORRECTION_FORMATTING_MODES = ('direct', 'styles')
+
+
+def get_correction_formatting_mode():
+    """
+    Способ исправления шрифта из переменной окружения
+    CORRECTION_FORMATTING (direct | styles, по умолчанию direct)
+    """
+    mode = os.environ.get('CORRECTION_FORMATTING', 'direct').strip().lower()
+    if mode not in CORRECTION_FORMATTING_MODES:
+        print(f"Неизвестный режим CORRECTION_FORMATTING={mode}, используется direct")
+        mode = 'direct'
+    return mode
+
+
+TITLE_PAGE_TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates', 'Титульный лист.docx')
+
+_title_page_templates = {}
+_title_page_templates_lock = threading.Lock()
+
+
+def get_title_page_template(path=TITLE_PAGE_TEMPLATE_PATH):
+    """
+    Шаблон титульного листа, разобранный один раз на процесс (повторно
+    разбирается, только если файл шаблона изменился). Возвращает None, если
+    шаблона нет. Общий объект не изменяется: для вставки берется копия его пакета.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _title_page_templates_lock:
+        cached = _title_page_templates.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, Document(path))
+            _title_page_templates[path] = cached
+    return cached[1]
+
+
 class DocumentCorrector:
     """
     Класс для исправления ошибок в документе
@@ -49,6 +123,73 @@ class DocumentCorrector:
         }
         self.errors = []
         self.temp_files = []
+        self._formatting_resolver = None
+        self._document_index = None
+        self._formatting_engine = None
+        # Правила форматирования одной группы применяются за один обход параграфов;
+        # False — отдельный обход на каждое правило (для сравнения и отладки)
+        self.fuse_formatting = True
+        # Способ исправления шрифта runs: 'direct' или 'styles' (CORRECTION_FORMATTING)
+        self.formatting_mode = get_correction_formatting_mode()
+        # Журнал изменений последнего вызова correct_document
+        self.journal = None
+        # Набор изменений последнего пробного запуска (dry_run)
+        self.change_set = None
+    
+    def _get_formatting_resolver(self, document):
+        """
+        Возвращает резолвер действующего форматирования для документа (кешируется)
+        """
+        if self._formatting_resolver is None or self._formatting_resolver.document is not document:
+            self._formatting_resolver = FormattingResolver(document)
+        return self._formatting_resolver
+    
+    def _get_document_index(self, document):
+        """
+        Возвращает общий индекс параграфов документа для проходов корректора (кешируется)
+        """
+        if self._document_index is None or self._document_index.document is not document:
+            self._document_index = DocumentIndex(document)
+        return self._document_index
+    
+    def _get_formatting_engine(self):
+        """
+        Возвращает движок однопроходного форматирования с зарегистрированными правилами
+        """
+        if self._formatting_engine is None:
+            engine = FormattingEngine()
+            engine.register('font', self._font_paragraph, run=self._font_run, prepare=self._prepare_font)
+            engine.register('line_spacing', self._line_spacing_paragraph, prepare=self._prepare_line_spacing)
+            engine.register('list_items', self._list_items_paragraph, run=self._list_run_font)
+            engine.register('letter_lists', self._letter_lists_paragraph, run=self._list_run_font, changes_text=True)
+            engine.register('multilevel_lists', self._multilevel_lists_paragraph, prepare=self._prepare_multilevel_lists)
+            engine.register('hyphenation_settings', self._hyphenation_settings_paragraph,
+                            prepare=self._prepare_paragraph_layout)
+            engine.register('incorrect_hyphenation', self._incorrect_hyphenation_paragraph,
+                            run=self._incorrect_hyphenation_run, changes_text=True)
+            engine.register('hanging_prepositions', self._hanging_prepositions_paragraph,
+                            run=self._hanging_prepositions_run, changes_text=True)
+            engine.register('first_line_indent', self._first_line_indent_paragraph,
+                            prepare=self._prepare_paragraph_layout, finish=self._first_line_indent_tables)
+            engine.register('paragraph_alignment', self._paragraph_alignment_paragraph,
+                            prepare=self._prepare_paragraph_layout, finish=self._paragraph_alignment_tables)
+            engine.register('redundant_formatting', self._redundant_formatting_paragraph,
+                            prepare=self._prepare_redundant_formatting, finish=self._redundant_formatting_tables)
+            self._formatting_engine = engine
+        return self._formatting_engine
+    
+    def _apply_formatting(self, document, names, timings=None, targets=None):
+        """
+        Применяет правила форматирования names к параграфам документа
+        targets: {позиция параграфа: индексы runs или None} — только к этим параграфам
+        """
+        index = self._get_document_index(document)
+        engine = self._get_formatting_engine()
+        if self.fuse_formatting:
+            engine.run(document, index, names, timings=timings, targets=targets)
+        else:
+            for name in names:
+                engine.run(document, index, (name,), timings=timings, targets=targets)
     
     def __del__(self):
         """
@@ -68,7 +209,7 @@ class DocumentCorrector:
             except Exception as e:
                 print(f"Ошибка при удалении временного файла {temp_file}: {str(e)}")
     
-    def correct_document(self, file_path, errors=None, out_path=None):
+    def correct_document(self, file_path, errors=None, out_path=None, dry_run=False):
         """
         Исправляет ошибки в документе
         
@@ -76,9 +217,11 @@ class DocumentCorrector:
             file_path: Путь к файлу для исправления
             errors: Список ошибок для исправления (если None, исправляем все возможные)
             out_path: Путь для сохранения исправленного файла (если None, генерируется автоматически)
+            dry_run: только рассчитать изменения, не сохраняя исправленный документ
             
         Returns:
             str: Путь к исправленному файлу
+            (ChangeSet с запланированными изменениями при dry_run=True)
         """
         self.errors = errors
         
@@ -95,9 +238,15 @@ class DocumentCorrector:
                 raise FileNotFoundError(f"Файл не найден: {file_path}")
         
         try:
-            # Загружаем документ
             document = Document(file_path)
             
+            if dry_run:
+                # Копия до исправления нужна, чтобы сравнить с ней исправленный документ
+                baseline = ChangeBaseline(document)
+                self.correct(document, errors)
+                self.change_set = ChangeSet.build(baseline, document, source_digest=package_digest(file_path))
+                return self.change_set
+            
             # Если указан путь для сохранения
             if out_path:
                 # Проверяем, что путь имеет правильное расширение
@@ -120,23 +269,81 @@ class DocumentCorrector:
                 out_path = os.path.join(temp_dir, f"corrected_{file_name}")
                 self.temp_files.append(out_path)
             
-            # Если список ошибок не предоставлен, исправляем все, что можем
-            if errors is None:
-                # Применяем базовые стили перед точечными корректировками, чтобы документ выглядел системно
-                self._apply_core_styles(document)
-                self._correct_all(document)
-            else:
-                # Исправляем только указанные ошибки
-                self._correct_specific_errors(document, errors)
+            self.correct(document, errors)
             
-            # Сохраняем исправленный документ
-            document.save(out_path)
+            # Сохраняем исправленный документ; неизмененные части (изображения и т.п.)
+            # копируются из исходного файла без пересжатия
+            save_document(document, out_path, source=file_path)
             return out_path
             
         except Exception as e:
             print(f"Ошибка при исправлении документа: {str(e)}")
             raise
     
+    def apply_changes(self, file_path, change_set, ids=None, out_path=None):
+        """
+        Применяет к документу выбранные изменения из набора, рассчитанного при dry_run
+        
+        Args:
+            file_path: Путь к исходному файлу, для которого рассчитан набор
+            change_set: ChangeSet
+            ids: идентификаторы применяемых изменений (None — все)
+            out_path: Путь для сохранения исправленного файла
+            
+        Returns:
+            str: Путь к исправленному файлу
+        """
+        if change_set.source_digest and package_digest(file_path) != change_set.source_digest:
+            raise ValueError("Документ изменился после расчета набора изменений")
+        
+        document = Document(file_path)
+        applied = change_set.apply(document, ids)
+        print(f"Применено изменений: {len(applied)} из {len(change_set)}")
+        
+        out_dir = os.path.dirname(out_path)
+        if out_dir and not os.path.exists(out_dir):
+            os.makedirs(out_dir, exist_ok=True)
+        save_document(document, out_path, source=file_path)
+        return out_path
+    
+    def correct(self, document, errors=None):
+        """
+        Исправляет ошибки в уже открытом документе (объект изменяется на месте)
+        
+        Args:
+            document: объект docx.Document
+            errors: Список ошибок для исправления (если None, исправляем все возможные)
+            
+        Returns:
+            docx.Document: исправленный документ (тот же объект)
+        """
+        self.errors = errors
+        
+        # Кеш действующего форматирования мог остаться от предыдущего прохода по этому же объекту
+        self._formatting_resolver = None
+        # Снимаем отпечатки для журнала изменений
+        journal = CorrectionJournal(document)
+        # Индекс параграфов строится один раз и обновляется проходами исправления
+        self._document_index = DocumentIndex(document)
+        
+        targets = None
+        # Если список ошибок не предоставлен, исправляем все, что можем
+        if errors is None:
+            # Применяем базовые стили перед точечными корректировками, чтобы документ выглядел системно
+            self._apply_core_styles(document)
+            self._correct_all(document)
+        else:
+            # Исправляем только указанные ошибки
+            targets = self._correct_specific_errors(document, errors)
+        
+        if self.formatting_mode == 'styles':
+            # Шрифт задан стилями — убираем дублирующее его прямое форматирование runs
+            # (после точечных исправлений — только в исправленных параграфах)
+            self._apply_formatting(document, STYLE_FORMATTING_RULES, targets=targets)
+        
+        self.journal = journal.finish(document)
+        return document
+    
     def _correct_all(self, document):
         """
         Исправляет все типичные ошибки в документе
@@ -144,11 +351,8 @@ class DocumentCorrector:
         # Сначала исправляем поля страницы и базовые настройки документа
         self._correct_margins(document)
         
-        # Исправляем шрифт для всего документа
-        self._correct_font(document)
-        
-        # Исправляем межстрочный интервал
-        self._correct_line_spacing(document)
+        # Исправляем шрифт и межстрочный интервал за один обход параграфов
+        self._apply_formatting(document, BASE_FORMATTING_RULES)
 
         # Продвигаем псевдозаголовки (обычный текст, похожий на заголовок) в корректные стили Heading
         self._promote_pseudo_headings_to_styles(document)
@@ -198,13 +402,10 @@ class DocumentCorrector:
         # ОТКЛЮЧЕНО: Исправление титульного листа (удаляло весь контент)
         # self._correct_title_page(document)
         
-        # Исправляем переносы в тексте
-        self._correct_hyphenation(document)
-        
-        # В конце применяем форматирование абзацев и выравнивание
-        # для гарантии правильного форматирования всего текста
-        self._correct_first_line_indent(document)
-        self._correct_paragraph_alignment(document)
+        # Исправляем переносы в тексте, а в конце применяем форматирование абзацев
+        # и выравнивание для гарантии правильного форматирования всего текста
+        # (один обход параграфов для всех правил группы)
+        self._apply_formatting(document, FINAL_FORMATTING_RULES)
         self._clean_extra_blank_lines(document)
     
     def _apply_core_styles(self, document):
@@ -257,6 +458,9 @@ class DocumentCorrector:
             heading_style.paragraph_format.line_spacing = self.standard_rules['line_spacing']
             heading_style.paragraph_format.line_spacing_rule = WD_LINE_SPACING.MULTIPLE
 
+        # Стили изменились — кеш действующего форматирования устарел
+        self._formatting_resolver = None
+
     def _set_style_font_defaults(self, style, font_size, *, bold=False, all_caps=False):
         """Применяет единый шрифт Times New Roman к стилю."""
         font_name = self.standard_rules['font']['name']
@@ -270,11 +474,15 @@ class DocumentCorrector:
         rPr.rFonts_hAnsi = font_name
         rPr.rFonts_eastAsia = font_name
         rPr.rFonts_cs = font_name
+        # Шрифт темы имеет приоритет над явно указанным шрифтом стиля
+        self._clear_theme_fonts(rPr.rFonts)
 
     def _clean_extra_blank_lines(self, document):
         """Удаляет лишние подряд идущие пустые абзацы, сохраняя визуальную чистоту.
         ВАЖНО: НЕ трогает таблицы - они требуют особой осторожности!
         """
+        index = self._get_document_index(document)
+
         def trim_paragraph_list(paragraphs, in_table=False):
             consecutive_blank = 0
             for paragraph in list(paragraphs):
@@ -291,16 +499,13 @@ class DocumentCorrector:
                 # Удаляем только если больше 2 подряд пустых параграфов
                 if consecutive_blank > 2:
                     try:
-                        element = paragraph._element
-                        parent = element.getparent()
-                        if parent is not None:
-                            parent.remove(element)
+                        index.remove_paragraph(paragraph)
                     except Exception as e:
                         print(f"Предупреждение: не удалось удалить пустой параграф: {str(e)}")
                         continue
 
         # Обрабатываем только основные параграфы документа
-        trim_paragraph_list(document.paragraphs, in_table=False)
+        trim_paragraph_list(index.paragraphs, in_table=False)
 
         # Таблицы НЕ трогаем - они хрупкие!
         # Комментируем опасный код:
@@ -339,38 +544,32 @@ class DocumentCorrector:
                 'ВВЕДЕНИЕ', 'ЗАКЛЮЧЕНИЕ', 'СПИСОК ЛИТЕРАТУРЫ', 'ПРИЛОЖЕНИЯ', 'ПРИЛОЖЕНИЕ'
             }
 
-            # Получаем список всех параграфов внутри таблиц для исключения
-            table_paragraphs = set()
-            for table in document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            table_paragraphs.add(id(para))
+            index = self._get_document_index(document)
 
-            for paragraph in document.paragraphs:
+            for paragraph in index.paragraphs:
                 # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
-                if id(paragraph) in table_paragraphs:
+                if index.is_table_paragraph(paragraph):
                     continue
                 
                 text = paragraph.text.strip()
                 if not text:
                     continue
                 # Уже нормальный заголовок — пропускаем
-                if paragraph.style and paragraph.style.name.startswith('Heading'):
+                if index.is_heading(paragraph):
                     continue
 
                 try:
                     lower = text.lower()
 
                     # ГЛАВА N / РАЗДЕЛ N (только верхний уровень)
-                    if re.match(r'^(глава|раздел)\s+\d+\.?\s*', lower):
+                    if rx.CHAPTER_OR_SECTION_HEADING.match(lower):
                         if h1_style:
-                            paragraph.style = h1_style
+                            index.set_style(paragraph, h1_style)
                         continue
 
                     # Многоуровневая нумерация: 1., 1.1, 1.1.1 и т.д.
                     # Определяем уровень по количеству чисел в начале
-                    m = re.match(r'^(\d+(?:\.\d+)*)(?:[\s\.:\-]+)(.*)', text)
+                    m = rx.MULTILEVEL_NUMBERING.match(text)
                     if m:
                         numbering = m.group(1)
                         rest = m.group(2).strip()
@@ -379,13 +578,13 @@ class DocumentCorrector:
                         # Выбираем стиль по уровню (1->Heading 1, 2->Heading 2, >=3->Heading 3)
                         try:
                             if level == 1 and h1_style:
-                                paragraph.style = h1_style
+                                index.set_style(paragraph, h1_style)
                             elif level == 2 and h2_style:
-                                paragraph.style = h2_style
+                                index.set_style(paragraph, h2_style)
                             else:
                                 # Для третьего и более уровней используем Heading 3, если он есть
                                 if 'Heading 3' in document.styles:
-                                    paragraph.style = document.styles['Heading 3']
+                                    index.set_style(paragraph, document.styles['Heading 3'])
                         except Exception as e:
                             print(f"ОШИБКА при установке стиля заголовка: {str(e)}")
 
@@ -410,16 +609,16 @@ class DocumentCorrector:
                         continue
 
                     # Нумерация "1. ..." без вложений -> Heading 1
-                    if re.match(r'^\d+\.(\s+|$)', text):
+                    if rx.TOP_LEVEL_NUMBERING.match(text):
                         if h1_style:
-                            paragraph.style = h1_style
+                            index.set_style(paragraph, h1_style)
                         continue
 
                     # ALL-CAPS короткие заголовки (часто структурные части)
                     if text == text.upper() and 2 <= len(text) <= 80 and not text.endswith('.'):
                         # Неформатированные ключевые слова — точно H1
                         if text in h1_keywords and h1_style:
-                            paragraph.style = h1_style
+                            index.set_style(paragraph, h1_style)
                         continue
                 
                 except Exception as e:
@@ -433,12 +632,19 @@ class DocumentCorrector:
 
     def _correct_specific_errors(self, document, errors):
         """
-        Исправляет только указанные ошибки
+        Исправляет только указанные ошибки.
+        Замечания о параграфах (шрифт, интервал, отступ, выравнивание, заголовки)
+        исправляются точечно — только в указанных параграфах и runs; группа, в которой
+        у замечания нет места, исправляется во всем документе.
+        
+        Returns:
+            dict | None: исправленные параграфы {позиция: индексы runs или None}
+            или None, если параграфы исправлялись во всем документе
         """
         error_types = set(error.get('type') for error in errors if 'type' in error)
         
         # Группируем ошибки по типу
-        font_errors = any(et.startswith('font_') for et in error_types)
+        font_errors = any(self._is_font_error(et) for et in error_types)
         margin_errors = any(et.endswith('_margin') for et in error_types)
         spacing_errors = 'line_spacing' in error_types
         indent_errors = 'first_line_indent' in error_types
@@ -450,21 +656,28 @@ class DocumentCorrector:
         list_errors = any(et.startswith('list_') for et in error_types)
         title_page_errors = any(et.startswith('title_page_') for et in error_types)
         
+        # Места замечаний: {позиция параграфа: индексы runs или None}, None — весь документ
+        font_targets = self._error_targets(errors, self._is_font_error)
+        spacing_targets = self._error_targets(errors, lambda et: et == 'line_spacing')
+        indent_targets = self._error_targets(errors, lambda et: et == 'first_line_indent')
+        heading_targets = self._error_targets(errors, lambda et: et.startswith('heading_'))
+        alignment_targets = self._error_targets(errors, lambda et: et == 'paragraph_alignment')
+        
         # Исправляем соответствующие группы ошибок
         if font_errors:
-            self._correct_font(document)
+            self._correct_font(document, font_targets)
         if margin_errors:
             self._correct_margins(document)
         if spacing_errors:
-            self._correct_line_spacing(document)
+            self._correct_line_spacing(document, spacing_targets)
         if indent_errors:
-            self._correct_first_line_indent(document)
+            self._correct_first_line_indent(document, indent_targets)
         if heading_errors:
-            self._correct_section_headings(document)
+            self._correct_section_headings(document, None if heading_targets is None else set(heading_targets))
         if image_errors:
             self._correct_images(document)
         if paragraph_alignment_errors:
-            self._correct_paragraph_alignment(document)
+            self._correct_paragraph_alignment(document, alignment_targets)
         if table_errors:
             self._correct_tables(document)
         if page_numbers_errors:
@@ -474,73 +687,297 @@ class DocumentCorrector:
         # ОТКЛЮЧЕНО: Исправление титульного листа удаляет весь контент
         # if title_page_errors:
         #     self._correct_title_page(document)
+        
+        # Исправленные параграфы, если ни одна группа не обрабатывала параграфы всего документа
+        located = [
+            targets for flag, targets in (
+                (font_errors, font_targets), (spacing_errors, spacing_targets),
+                (indent_errors, indent_targets), (heading_errors, heading_targets),
+                (paragraph_alignment_errors, alignment_targets),
+            ) if flag
+        ]
+        if image_errors or table_errors or page_numbers_errors or list_errors \
+                or any(targets is None for targets in located):
+            return None
+        touched = {}
+        for targets in located:
+            for position, run_indexes in targets.items():
+                self._merge_target(touched, position, run_indexes)
+        return touched
     
-    def _correct_font(self, document):
+    def _error_targets(self, errors, matches):
         """
-        Исправляет шрифт для всего документа
-        Добавлена защита и обработка ошибок
+        Места замечаний, тип которых удовлетворяет matches:
+        {позиция параграфа: индексы runs или None (все runs)}.
+        Возвращает None, если хотя бы у одного такого замечания места нет
         """
-        try:
-            # Получаем список всех параграфов внутри таблиц для особой обработки
-            table_paragraphs = set()
-            for table in document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            table_paragraphs.add(id(para))
-            
-            for paragraph in document.paragraphs:
-                # Пропускаем пустые параграфы
-                if not paragraph.text.strip():
-                    continue
-                
+        targets = {}
+        for error in errors:
+            if not matches(error.get('type') or ''):
+                continue
+            position = self._error_position(error)
+            if position is None:
+                return None
+            self._merge_target(targets, position, self._error_runs(error))
+        return targets
+    
+    @staticmethod
+    def _is_font_error(error_type):
+        """
+        Замечание о шрифте: параграфа ('font_*') или отдельного фрагмента ('accent_font*')
+        """
+        return error_type.startswith(('font_', 'accent_font'))
+    
+    @staticmethod
+    def _merge_target(targets, position, run_indexes):
+        """
+        Добавляет место исправления; None (все runs) поглощает отдельные индексы
+        """
+        if run_indexes is None:
+            targets[position] = None
+        elif position not in targets:
+            targets[position] = set(run_indexes)
+        elif targets[position] is not None:
+            targets[position].update(run_indexes)
+    
+    @staticmethod
+    def _error_position(error):
+        """
+        Позиция параграфа замечания в теле документа (как в document.paragraphs) или None.
+        Берется из 'paragraph_index' (замечания обработчиков параграфов) или из места
+        вида "Параграф N" / "Заголовок N"; 'heading_index' — номер среди непустых
+        параграфов, а не позиция, поэтому не используется
+        """
+        position = error.get('paragraph_index')
+        if position is None:
+            match = rx.ISSUE_PARAGRAPH_LOCATION.match(str(error.get('location') or '').strip())
+            if match:
+                position = int(match.group(1)) - 1
+        if isinstance(position, int) and not isinstance(position, bool) and position >= 0:
+            return position
+        return None
+    
+    @staticmethod
+    def _error_runs(error):
+        """
+        Индексы runs замечания или None (весь параграф).
+        Берутся из 'run_indexes' / 'run_index' или из места вида "Параграф N, фрагмент M"
+        """
+        run_indexes = error.get('run_indexes')
+        if run_indexes is None and error.get('run_index') is not None:
+            run_indexes = (error['run_index'],)
+        if run_indexes is None:
+            match = rx.ISSUE_PARAGRAPH_LOCATION.match(str(error.get('location') or '').strip())
+            if match and match.group(2) and int(match.group(2)) > 0:
+                run_indexes = (int(match.group(2)) - 1,)
+        return run_indexes
+    
+    def _correct_font(self, document, targets=None):
+        """
+        Исправляет шрифт для всего документа или только в targets
+        """
+        self._apply_formatting(document, ('font',), targets=targets)
+    
+    def _prepare_font(self, document):
+        if self.formatting_mode == 'styles':
+            self._normalize_paragraph_styles(document)
+        return {
+            'resolver': self._get_formatting_resolver(document),
+            'font_name': self.standard_rules['font']['name'],
+        }
+    
+    def _run_font_targets(self, heading_level):
+        """
+        Размер и насыщенность шрифта runs параграфа по уровню заголовка
+        (насыщенность None — не исправляется)
+        """
+        if heading_level == 1:
+            return self.standard_rules['headings']['h1']['font_size'], self.standard_rules['headings']['h1']['bold']
+        if heading_level == 2:
+            return self.standard_rules['headings']['h2']['font_size'], self.standard_rules['headings']['h2']['bold']
+        return self.standard_rules['font']['size'], None
+    
+    def _normalize_paragraph_styles(self, document):
+        """
+        Режим 'styles': задает шрифт и размер в стилях непустых параграфов тела
+        документа, чтобы runs получали их от стиля, а не из прямого форматирования
+        """
+        index = self._get_document_index(document)
+        resolver = self._get_formatting_resolver(document)
+        font_name = self.standard_rules['font']['name']
+        
+        targets = {}
+        for paragraph in index.paragraphs:
+            style_id = resolver.paragraph_style_id(paragraph._p)
+            if style_id is None or style_id in targets or not paragraph.text.strip():
+                continue
+            heading_level = None
+            if index.is_heading(paragraph):
                 try:
-                    # Определяем, является ли параграф заголовком
-                    is_heading = paragraph.style.name.startswith('Heading')
+                    heading_level = int(index.style_name(paragraph).replace('Heading ', ''))
+                except ValueError:
                     heading_level = None
-                    
-                    if is_heading:
-                        try:
-                            heading_level = int(paragraph.style.name.replace('Heading ', ''))
-                        except ValueError:
-                            heading_level = None
-                    
-                    # Применяем соответствующий стиль шрифта
-                    for run in paragraph.runs:
-                        try:
-                            # Устанавливаем базовый шрифт для всех элементов
-                            if run.font.name != self.standard_rules['font']['name']:
-                                run.font.name = self.standard_rules['font']['name']
-                            
-                            if is_heading and heading_level == 1:
-                                # Для заголовков 1 уровня
-                                if run.font.size != Pt(self.standard_rules['headings']['h1']['font_size']):
-                                    run.font.size = Pt(self.standard_rules['headings']['h1']['font_size'])
-                                if run.font.bold != self.standard_rules['headings']['h1']['bold']:
-                                    run.font.bold = self.standard_rules['headings']['h1']['bold']
-                            elif is_heading and heading_level == 2:
-                                # Для заголовков 2 уровня
-                                if run.font.size != Pt(self.standard_rules['headings']['h2']['font_size']):
-                                    run.font.size = Pt(self.standard_rules['headings']['h2']['font_size'])
-                                if run.font.bold != self.standard_rules['headings']['h2']['bold']:
-                                    run.font.bold = self.standard_rules['headings']['h2']['bold']
-                            else:
-                                # Для обычного текста
-                                if run.font.size != Pt(self.standard_rules['font']['size']):
-                                    run.font.size = Pt(self.standard_rules['font']['size'])
-                        
-                        except Exception as e:
-                            print(f"ОШИБКА при установке шрифта для run: {str(e)}")
-                            continue
-                
-                except Exception as e:
-                    print(f"ОШИБКА при обработке параграфа '{paragraph.text[:50]}...': {str(e)}")
-                    continue
+            targets[style_id] = self._run_font_targets(heading_level)
         
-        except Exception as e:
-            print(f"КРИТИЧЕСКАЯ ОШИБКА в _correct_font: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        changed = False
+        for style_id, (size, bold) in targets.items():
+            inherited = resolver.resolve_style_run(style_id)
+            if (inherited.get('name') == font_name and inherited.get('size') == size
+                    and (bold is None or inherited.get('bold') == bold)):
+                continue
+            style = document.styles.element.get_by_id(style_id)
+            if style is None or style.type != WD_STYLE_TYPE.PARAGRAPH:
+                continue
+            font = Font(style)
+            font.name = font_name
+            self._clear_theme_fonts(style.rPr.rFonts)
+            font.size = Pt(size)
+            if bold is not None:
+                font.bold = bold
+            changed = True
+        
+        if changed:
+            # Стили изменились — кеш действующего форматирования устарел
+            resolver.invalidate()
+    
+    def _font_paragraph(self, facts, context):
+        """
+        Правило 'font': стиль и уровень заголовка параграфа для обработки его runs
+        """
+        # Пропускаем пустые параграфы
+        if not facts.stripped:
+            return None
+        
+        style_id = context['resolver'].paragraph_style_id(facts.paragraph._p)
+        
+        # Определяем, является ли параграф заголовком
+        heading_level = None
+        if facts.is_heading:
+            try:
+                heading_level = int(facts.style_name.replace('Heading ', ''))
+            except ValueError:
+                heading_level = None
+        return style_id, heading_level
+    
+    def _font_run(self, run, facts, value, context):
+        """
+        Правило 'font': шрифт и размер run
+        """
+        style_id, heading_level = value
+        font_name = context['font_name']
+        
+        if self.formatting_mode == 'styles':
+            size, bold = self._run_font_targets(heading_level)
+            self._apply_style_run_font(run, context['resolver'], style_id, size, bold)
+            return
+        
+        # Сравниваем с действующим форматированием (с учетом стилей),
+        # чтобы не дублировать в run то, что уже задано стилем
+        effective = context['resolver'].resolve_run(run._r, style_id)
+        
+        # Устанавливаем базовый шрифт для всех элементов
+        if effective.get('name') != font_name:
+            self._set_run_font_name(run, font_name)
+        
+        if heading_level == 1:
+            # Для заголовков 1 уровня
+            if effective.get('size') != self.standard_rules['headings']['h1']['font_size']:
+                run.font.size = Pt(self.standard_rules['headings']['h1']['font_size'])
+            if effective.get('bold') != self.standard_rules['headings']['h1']['bold']:
+                run.font.bold = self.standard_rules['headings']['h1']['bold']
+        elif heading_level == 2:
+            # Для заголовков 2 уровня
+            if effective.get('size') != self.standard_rules['headings']['h2']['font_size']:
+                run.font.size = Pt(self.standard_rules['headings']['h2']['font_size'])
+            if effective.get('bold') != self.standard_rules['headings']['h2']['bold']:
+                run.font.bold = self.standard_rules['headings']['h2']['bold']
+        else:
+            # Для обычного текста
+            if effective.get('size') != self.standard_rules['font']['size']:
+                run.font.size = Pt(self.standard_rules['font']['size'])
+    
+    def _set_run_font_name(self, run, font_name):
+        """
+        Устанавливает шрифт run и убирает ссылки на шрифты темы, которые имеют приоритет над ним
+        """
+        run.font.name = font_name
+        self._clear_theme_fonts(run._r.rPr.rFonts if run._r.rPr is not None else None)
+    
+    @staticmethod
+    def _clear_theme_fonts(rFonts):
+        """
+        Убирает из w:rFonts ссылки на шрифты темы, которые имеют приоритет над явным шрифтом
+        """
+        if rFonts is not None:
+            for attr in ('w:asciiTheme', 'w:hAnsiTheme'):
+                if rFonts.get(qn(attr)) is not None:
+                    del rFonts.attrib[qn(attr)]
+    
+    def _apply_style_run_font(self, run, resolver, style_id, size, bold=None):
+        """
+        Режим 'styles': шрифт, размер и насыщенность run берутся из стиля.
+        Если стиль задает нужное значение, прямое форматирование этого свойства
+        удаляется; иначе (например, символьный стиль с другим шрифтом) оно
+        устанавливается, как в режиме 'direct'
+        """
+        r = run._r
+        rpr = r.rPr
+        run_style_id = rpr.rStyle.val if rpr is not None and rpr.rStyle is not None else None
+        inherited = resolver.resolve_style_run(style_id, run_style_id)
+        effective = resolver.resolve_run(r, style_id)
+        font_name = self.standard_rules['font']['name']
+        
+        if inherited.get('name') == font_name:
+            self._remove_direct_font_name(rpr)
+        elif effective.get('name') != font_name:
+            self._set_run_font_name(run, font_name)
+        
+        if inherited.get('size') == size:
+            self._remove_rpr_child(rpr, 'w:sz')
+        elif effective.get('size') != size:
+            run.font.size = Pt(size)
+        
+        if bold is not None:
+            if inherited.get('bold') == bold:
+                self._remove_rpr_child(rpr, 'w:b')
+            elif effective.get('bold') != bold:
+                run.font.bold = bold
+        
+        self._remove_empty_rpr(r)
+    
+    @staticmethod
+    def _remove_direct_font_name(rpr):
+        """
+        Удаляет прямо заданный шрифт run (w:ascii/w:hAnsi и шрифты темы для них)
+        """
+        rFonts = rpr.rFonts if rpr is not None else None
+        if rFonts is None:
+            return
+        for attr in ('w:ascii', 'w:hAnsi', 'w:asciiTheme', 'w:hAnsiTheme'):
+            if rFonts.get(qn(attr)) is not None:
+                del rFonts.attrib[qn(attr)]
+        if not rFonts.attrib:
+            rpr.remove(rFonts)
+    
+    @staticmethod
+    def _remove_rpr_child(rpr, tag):
+        """
+        Удаляет свойство из w:rPr run
+        """
+        if rpr is None:
+            return
+        child = rpr.find(qn(tag))
+        if child is not None:
+            rpr.remove(child)
+    
+    @staticmethod
+    def _remove_empty_rpr(r):
+        """
+        Удаляет пустой w:rPr run
+        """
+        rpr = r.rPr
+        if rpr is not None and len(rpr) == 0 and not rpr.attrib:
+            r.remove(rpr)
     
     def _correct_margins(self, document):
         """
@@ -561,90 +998,90 @@ class DocumentCorrector:
             section.page_width = Cm(21.0)
             section.page_height = Cm(29.7)
     
-    def _correct_line_spacing(self, document):
+    def _correct_line_spacing(self, document, targets=None):
         """
-        Исправляет межстрочный интервал
-        Добавлена защита от таблиц и обработка ошибок
+        Исправляет межстрочный интервал (во всем документе или только в targets)
         """
-        try:
-            # Получаем список всех параграфов внутри таблиц
-            table_paragraphs = set()
-            for table in document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            table_paragraphs.add(id(para))
-            
-            for paragraph in document.paragraphs:
-                # Пропускаем параграфы внутри таблиц - у них свои правила
-                if id(paragraph) in table_paragraphs:
-                    continue
-                
-                # Пропускаем пустые параграфы
-                if not paragraph.text.strip():
-                    continue
-
-                try:
-                    pf = paragraph.paragraph_format
-                    
-                    # Устанавливаем полуторный интервал (1.5) для всех абзацев, включая заголовки
-                    if pf.line_spacing != self.standard_rules['line_spacing']:
-                        pf.line_spacing = self.standard_rules['line_spacing']
-                        pf.line_spacing_rule = WD_LINE_SPACING.MULTIPLE
-
-                    # Для обычного текста сбрасываем интервалы до/после; для заголовков их задают стили
-                    if not paragraph.style.name.startswith('Heading'):
-                        if pf.space_before != Pt(0):
-                            pf.space_before = Pt(0)
-                        if pf.space_after != Pt(0):
-                            pf.space_after = Pt(0)
-                
-                except Exception as e:
-                    print(f"ОШИБКА при установке интервала для параграфа '{paragraph.text[:50]}...': {str(e)}")
-                    continue
+        self._apply_formatting(document, ('line_spacing',), targets=targets)
+    
+    def _prepare_line_spacing(self, document):
+        return {'resolver': self._get_formatting_resolver(document)}
+    
+    def _line_spacing_paragraph(self, facts, context):
+        """
+        Правило 'line_spacing': полуторный интервал и интервалы до/после параграфа
+        """
+        # Пропускаем параграфы внутри таблиц - у них свои правила
+        if facts.in_table:
+            return
         
-        except Exception as e:
-            print(f"КРИТИЧЕСКАЯ ОШИБКА в _correct_line_spacing: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        # Пропускаем пустые параграфы
+        if not facts.stripped:
+            return
+        
+        paragraph = facts.paragraph
+        pf = paragraph.paragraph_format
+        # Действующие значения с учетом стиля и docDefaults
+        effective = context['resolver'].resolve_paragraph(paragraph._p)
+        
+        # Устанавливаем полуторный интервал (1.5) для всех абзацев, включая заголовки
+        if effective.get('line_spacing') != self.standard_rules['line_spacing'] or \
+           effective.get('line_spacing_rule') not in (None, 'auto'):
+            pf.line_spacing = self.standard_rules['line_spacing']
+            pf.line_spacing_rule = WD_LINE_SPACING.MULTIPLE
+
+        # Для обычного текста сбрасываем интервалы до/после; для заголовков их задают стили
+        if not facts.is_heading:
+            if effective.get('space_before'):
+                pf.space_before = Pt(0)
+            if effective.get('space_after'):
+                pf.space_after = Pt(0)
     
-    def _correct_first_line_indent(self, document):
+    def _correct_first_line_indent(self, document, targets=None):
         """
-        Исправляет отступы первой строки (абзацный отступ)
+        Исправляет отступы первой строки (абзацный отступ) во всем документе или только в targets
         ВАЖНО: осторожно с таблицами!
         """
-        # Обрабатываем основные параграфы документа
-        for paragraph in document.paragraphs:
-            # Пропускаем пустые параграфы и заголовки
-            if not paragraph.text.strip() or paragraph.style.name.startswith('Heading'):
-                continue
-                
-            # Пропускаем подписи к рисункам (которые должны быть без отступа)
-            if paragraph.text.strip().lower().startswith(('рисунок', 'рис.')):
-                # Явно устанавливаем нулевой отступ для подписей к рисункам
-                paragraph.paragraph_format.first_line_indent = Cm(0)
-                continue
-                
-            # Пропускаем заголовки таблиц (которые должны быть без отступа)
-            if paragraph.text.strip().lower().startswith('таблица'):
-                # Явно устанавливаем нулевой отступ для заголовков таблиц
-                paragraph.paragraph_format.first_line_indent = Cm(0)
-                continue
-                
-            # Особая обработка для элементов списков
-            if re.match(r'^[•\-–—]\s', paragraph.text) or re.match(r'^\d+[.)]\s', paragraph.text):
-                # Для элементов списка устанавливаем отрицательный отступ первой строки
-                paragraph.paragraph_format.first_line_indent = Cm(-0.5)
-                paragraph.paragraph_format.left_indent = Cm(1.0)
-                continue
-                
-            # Принудительно устанавливаем отступ первой строки 1.25 см для остальных параграфов
-            paragraph.paragraph_format.first_line_indent = Cm(1.25)
-            
-            # Сбрасываем другие отступы, которые могут мешать
-            paragraph.paragraph_format.left_indent = Cm(0)
-            paragraph.paragraph_format.right_indent = Cm(0)
+        self._apply_formatting(document, ('first_line_indent',), targets=targets)
+    
+    def _first_line_indent_paragraph(self, facts, context):
+        """
+        Правило 'first_line_indent': абзацный отступ параграфа тела документа
+        """
+        # Пропускаем пустые параграфы и заголовки
+        if not facts.stripped or facts.is_heading:
+            return
+        
+        paragraph = facts.paragraph
+        resolver = context['resolver']
+        lower = facts.stripped.lower()
         
+        # Пропускаем подписи к рисункам (которые должны быть без отступа)
+        if lower.startswith(('рисунок', 'рис.')):
+            # Явно устанавливаем нулевой отступ для подписей к рисункам
+            self._set_paragraph_indents(paragraph, resolver, first_line_indent=0)
+            return
+        
+        # Пропускаем заголовки таблиц (которые должны быть без отступа)
+        if lower.startswith('таблица'):
+            # Явно устанавливаем нулевой отступ для заголовков таблиц
+            self._set_paragraph_indents(paragraph, resolver, first_line_indent=0)
+            return
+        
+        # Особая обработка для элементов списков
+        if rx.BULLET_ITEM.match(facts.text) or rx.NUMBERED_ITEM.match(facts.text):
+            # Для элементов списка устанавливаем отрицательный отступ первой строки
+            self._set_paragraph_indents(paragraph, resolver, first_line_indent=-0.5, left_indent=1.0)
+            return
+        
+        # Отступ первой строки 1.25 см для остальных параграфов; другие отступы,
+        # которые могут мешать, сбрасываем
+        self._set_paragraph_indents(paragraph, resolver, first_line_indent=1.25, left_indent=0, right_indent=0)
+    
+    def _first_line_indent_tables(self, document, context):
+        """
+        Правило 'first_line_indent': отступы в ячейках таблиц (после обхода параграфов)
+        """
         # ОСТОРОЖНО с таблицами - минимальные изменения!
         try:
             for table in document.tables:
@@ -675,35 +1112,31 @@ class DocumentCorrector:
         except Exception as e:
             print(f"ОШИБКА при обработке отступов в таблицах: {str(e)}")
     
-    def _correct_section_headings(self, document):
+    def _correct_section_headings(self, document, positions=None):
         """
         Улучшенная функция для форматирования заголовков разделов
         ВАЖНО: НЕ использует paragraph.text = ... для сохранения форматирования
+        positions: позиции параграфов для точечного исправления (None — весь документ)
         """
         try:
-            # Получаем список всех параграфов внутри таблиц для исключения
-            table_paragraphs = set()
-            for table in document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            table_paragraphs.add(id(para))
+            index = self._get_document_index(document)
             
             # Паттерны для идентификации заголовков разделов
-            chapter_patterns = [
-                r'^глава\s+\d+\.?\s+',
-                r'^раздел\s+\d+\.?\s+',
-                r'^\d+\.\s+[А-Я]',
-                r'^\d+\.\d+\.\s+[А-Я]'
-            ]
+            chapter_patterns = rx.CHAPTER_PATTERNS
             
             # Словарь для хранения информации об уровнях заголовков
             heading_levels = {}
             
+            if positions is None:
+                candidates = range(len(index.paragraphs))
+            else:
+                candidates = sorted(i for i in positions if 0 <= i < len(index.paragraphs))
+            
             # Первый проход: определяем уровни заголовков по нумерации
-            for i, paragraph in enumerate(document.paragraphs):
+            for i in candidates:
+                paragraph = index.paragraphs[i]
                 # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
-                if id(paragraph) in table_paragraphs:
+                if index.is_table_paragraph(paragraph):
                     continue
                 
                 text = paragraph.text.strip()
@@ -719,19 +1152,19 @@ class DocumentCorrector:
                     
                     # Проверяем по регулярным выражениям
                     for pattern in chapter_patterns:
-                        if re.match(pattern, text, re.IGNORECASE):
+                        if pattern.match(text):
                             is_heading = True
                             
                             # Определяем уровень заголовка по количеству чисел в нумерации
-                            numbers = re.findall(r'\d+', text.split()[0])
+                            numbers = rx.DIGITS.findall(text.split()[0])
                             heading_level = len(numbers)
                             break
                     
                     # Также проверяем, является ли параграф уже заголовком по стилю
-                    if paragraph.style and paragraph.style.name.startswith('Heading'):
+                    if index.is_heading(paragraph):
                         is_heading = True
                         try:
-                            current_level = int(paragraph.style.name.replace('Heading ', ''))
+                            current_level = int(index.style_name(paragraph).replace('Heading ', ''))
                             heading_level = current_level if heading_level is None else heading_level
                         except (ValueError, AttributeError):
                             pass
@@ -745,104 +1178,99 @@ class DocumentCorrector:
                     continue
             
             # Второй проход: форматируем заголовки согласно их уровню
-            for i, paragraph in enumerate(document.paragraphs):
-                # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
-                if id(paragraph) in table_paragraphs:
+            # (параграфы таблиц отсеяны в первом проходе)
+            for i, level in heading_levels.items():
+                paragraph = index.paragraphs[i]
+                try:
+                    self._format_section_heading(document, index, paragraph, level)
+                except Exception as e:
+                    print(f"ОШИБКА при форматировании заголовка '{paragraph.text[:50]}...': {str(e)}")
                     continue
-                
-                if i in heading_levels:
-                    try:
-                        level = heading_levels[i]
-                        
-                        # Применяем соответствующий стиль заголовка
-                        if level == 1:
-                            paragraph.style = document.styles['Heading 1']
-                            # Дополнительное форматирование для Heading 1
-                            paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                            paragraph.paragraph_format.space_before = Pt(12)
-                            paragraph.paragraph_format.space_after = Pt(12)
-                            
-                            # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: делаем текст заглавными буквами через runs
-                            for run in paragraph.runs:
-                                run.text = run.text.upper()
-                        
-                        elif level == 2:
-                            paragraph.style = document.styles['Heading 2']
-                            # Дополнительное форматирование для Heading 2
-                            paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-                            paragraph.paragraph_format.space_before = Pt(12)
-                            paragraph.paragraph_format.space_after = Pt(6)
-                            
-                            # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: capitalize через runs
-                            # (сохраняем первое слово как есть, т.к. это может быть номер)
-                            if paragraph.runs:
-                                full_text = paragraph.text
-                                parts = full_text.split(' ', 1)
-                                if len(parts) > 1:
-                                    new_text = parts[0] + ' ' + parts[1].capitalize()
-                                    # Применяем к первому run
-                                    for run in paragraph.runs:
-                                        run.text = ''
-                                    if paragraph.runs:
-                                        paragraph.runs[0].text = new_text
-                        
-                        elif level == 3:
-                            paragraph.style = document.styles['Heading 3']
-                            # Дополнительное форматирование для Heading 3
-                            paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-                            paragraph.paragraph_format.space_before = Pt(6)
-                            paragraph.paragraph_format.space_after = Pt(3)
-                        
-                        # Общие правила для всех заголовков
-                        paragraph.paragraph_format.first_line_indent = Cm(0)
-                        paragraph.paragraph_format.left_indent = Cm(0)
-                        paragraph.paragraph_format.right_indent = Cm(0)
-                        
-                        # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: убираем точку через runs
-                        if paragraph.text.strip().endswith('.'):
-                            if paragraph.runs:
-                                last_run = paragraph.runs[-1]
-                                last_run.text = last_run.text.rstrip('.')
-                        
-                        # Форматирование шрифта заголовка
-                        for run in paragraph.runs:
-                            run.font.name = self.standard_rules['font']['name']
-                            if level == 1:
-                                run.font.size = Pt(16)
-                                run.font.bold = True
-                            elif level == 2:
-                                run.font.size = Pt(14)
-                                run.font.bold = True
-                            else:
-                                run.font.size = Pt(14)
-                                run.font.bold = True
-                    
-                    except Exception as e:
-                        print(f"ОШИБКА при форматировании заголовка '{paragraph.text[:50]}...': {str(e)}")
-                        continue
         
         except Exception as e:
             print(f"КРИТИЧЕСКАЯ ОШИБКА в _correct_section_headings: {str(e)}")
             import traceback
             traceback.print_exc() 
 
+    def _format_section_heading(self, document, index, paragraph, level):
+        """
+        Оформляет параграф как заголовок раздела уровня level: стиль, выравнивание,
+        интервалы, отступы, регистр текста и шрифт
+        """
+        # Применяем соответствующий стиль заголовка
+        if level == 1:
+            index.set_style(paragraph, document.styles['Heading 1'])
+            # Дополнительное форматирование для Heading 1
+            paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+            paragraph.paragraph_format.space_before = Pt(12)
+            paragraph.paragraph_format.space_after = Pt(12)
+
+            # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: делаем текст заглавными буквами через runs
+            for run in paragraph.runs:
+                run.text = run.text.upper()
+
+        elif level == 2:
+            index.set_style(paragraph, document.styles['Heading 2'])
+            # Дополнительное форматирование для Heading 2
+            paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
+            paragraph.paragraph_format.space_before = Pt(12)
+            paragraph.paragraph_format.space_after = Pt(6)
+
+            # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: capitalize через runs
+            # (сохраняем первое слово как есть, т.к. это может быть номер)
+            if paragraph.runs:
+                full_text = paragraph.text
+                parts = full_text.split(' ', 1)
+                if len(parts) > 1:
+                    new_text = parts[0] + ' ' + parts[1].capitalize()
+                    # Применяем к первому run
+                    for run in paragraph.runs:
+                        run.text = ''
+                    if paragraph.runs:
+                        paragraph.runs[0].text = new_text
+
+        elif level == 3:
+            index.set_style(paragraph, document.styles['Heading 3'])
+            # Дополнительное форматирование для Heading 3
+            paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
+            paragraph.paragraph_format.space_before = Pt(6)
+            paragraph.paragraph_format.space_after = Pt(3)
+
+        # Общие правила для всех заголовков
+        paragraph.paragraph_format.first_line_indent = Cm(0)
+        paragraph.paragraph_format.left_indent = Cm(0)
+        paragraph.paragraph_format.right_indent = Cm(0)
+
+        # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: убираем точку через runs
+        if paragraph.text.strip().endswith('.'):
+            if paragraph.runs:
+                last_run = paragraph.runs[-1]
+                last_run.text = last_run.text.rstrip('.')
+
+        # Форматирование шрифта заголовка
+        for run in paragraph.runs:
+            run.font.name = self.standard_rules['font']['name']
+            if level == 1:
+                run.font.size = Pt(16)
+                run.font.bold = True
+            elif level == 2:
+                run.font.size = Pt(14)
+                run.font.bold = True
+            else:
+                run.font.size = Pt(14)
+                run.font.bold = True
+
     def _correct_images(self, document):
         """
         Исправляет подписи к рисункам
         ВАЖНО: НЕ использует paragraph.text = ... для сохранения форматирования
         """
         try:
-            # Получаем список всех параграфов внутри таблиц для исключения
-            table_paragraphs = set()
-            for table in document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            table_paragraphs.add(id(para))
+            index = self._get_document_index(document)
             
-            for paragraph in document.paragraphs:
+            for paragraph in index.paragraphs:
                 # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
-                if id(paragraph) in table_paragraphs:
+                if index.is_table_paragraph(paragraph):
                     continue
                 
                 text = paragraph.text.strip()
@@ -912,48 +1340,89 @@ class DocumentCorrector:
             import traceback
             traceback.print_exc()
     
-    def _correct_paragraph_alignment(self, document):
+    def _correct_paragraph_alignment(self, document, targets=None):
         """
-        Исправляет выравнивание параграфов
+        Исправляет выравнивание параграфов (во всем документе или только в targets)
         ВАЖНО: НЕ трогаем параграфы в таблицах - они обрабатываются отдельно!
         """
-        # Сначала проходим по всем параграфам в основном документе
-        for paragraph in document.paragraphs:
-            # Пропускаем пустые параграфы
-            if not paragraph.text.strip():
-                continue
-                
-            # Обрабатываем заголовки
-            if paragraph.style.name.startswith('Heading'):
-                heading_level = int(paragraph.style.name.replace('Heading ', ''))
-                if heading_level == 1:
-                    paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                else:
-                    paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-                continue
-                
-            # Подписи к рисункам выравниваем по центру
-            if paragraph.text.strip().lower().startswith(('рисунок', 'рис.')):
-                paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                continue
-                
-            # Заголовки таблиц выравниваем по левому краю
-            if paragraph.text.strip().lower().startswith('таблица'):
-                paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-                continue
-                
-            # Элементы списков выравниваем по ширине, но с особым форматированием
-            if re.match(r'^[•\-–—]\s', paragraph.text) or re.match(r'^\d+[.)]\s', paragraph.text):
-                paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
-                continue
-                
-            # Все остальные параграфы (основной текст) выравниваем по ширине
-            paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
-            
-            # Включаем автоматические переносы для улучшения выравнивания по ширине
-            self._enable_hyphenation(paragraph)
+        self._apply_formatting(document, ('paragraph_alignment',), targets=targets)
+    
+    def _paragraph_alignment_paragraph(self, facts, context):
+        """
+        Правило 'paragraph_alignment': выравнивание параграфа тела документа
+        """
+        # Пропускаем пустые параграфы
+        if not facts.stripped:
+            return
+        
+        paragraph = facts.paragraph
+        resolver = context['resolver']
+        
+        # Обрабатываем заголовки
+        if facts.is_heading:
+            heading_level = int(facts.style_name.replace('Heading ', ''))
+            if heading_level == 1:
+                self._set_paragraph_alignment(paragraph, resolver, WD_PARAGRAPH_ALIGNMENT.CENTER)
+            else:
+                self._set_paragraph_alignment(paragraph, resolver, WD_PARAGRAPH_ALIGNMENT.LEFT)
+            return
+        
+        lower = facts.stripped.lower()
         
-        # Затем проходим по всем таблицам и выравниваем текст в ячейках
+        # Подписи к рисункам выравниваем по центру
+        if lower.startswith(('рисунок', 'рис.')):
+            self._set_paragraph_alignment(paragraph, resolver, WD_PARAGRAPH_ALIGNMENT.CENTER)
+            return
+        
+        # Заголовки таблиц выравниваем по левому краю
+        if lower.startswith('таблица'):
+            self._set_paragraph_alignment(paragraph, resolver, WD_PARAGRAPH_ALIGNMENT.LEFT)
+            return
+        
+        # Элементы списков выравниваем по ширине, но с особым форматированием
+        if rx.BULLET_ITEM.match(facts.text) or rx.NUMBERED_ITEM.match(facts.text):
+            self._set_paragraph_alignment(paragraph, resolver, WD_PARAGRAPH_ALIGNMENT.JUSTIFY)
+            return
+        
+        # Все остальные параграфы (основной текст) выравниваем по ширине
+        self._set_paragraph_alignment(paragraph, resolver, WD_PARAGRAPH_ALIGNMENT.JUSTIFY)
+        
+        # Включаем автоматические переносы для улучшения выравнивания по ширине
+        self._enable_hyphenation(paragraph, resolver)
+    
+    def _prepare_paragraph_layout(self, document):
+        # Проходы исправления могли изменить стили — действующее форматирование
+        # параграфов разрешаем заново
+        resolver = self._get_formatting_resolver(document)
+        resolver.invalidate()
+        return {'resolver': resolver}
+    
+    @staticmethod
+    def _set_paragraph_alignment(paragraph, resolver, alignment):
+        """
+        Задает выравнивание параграфа, если действующее (с учетом стиля) другое;
+        уже правильно выровненный параграф не изменяется
+        """
+        if resolver.resolve_paragraph(paragraph._p).get('alignment') != alignment:
+            paragraph.paragraph_format.alignment = alignment
+    
+    @staticmethod
+    def _set_paragraph_indents(paragraph, resolver, **indents):
+        """
+        Задает отступы параграфа в см (first_line_indent, left_indent, right_indent),
+        которые отличаются от действующих с учетом стиля; совпадающие не записываются,
+        чтобы XML уже правильно оформленного параграфа не менялся
+        """
+        effective = resolver.resolve_paragraph(paragraph._p)
+        paragraph_format = paragraph.paragraph_format
+        for name, value in indents.items():
+            if abs((effective.get(name) or 0) - value) > INDENT_TOLERANCE_CM:
+                setattr(paragraph_format, name, Cm(value))
+    
+    def _paragraph_alignment_tables(self, document, context):
+        """
+        Правило 'paragraph_alignment': выравнивание текста в ячейках таблиц (после обхода параграфов)
+        """
         for table in document.tables:
             for row in table.rows:
                 for cell in row.cells:
@@ -963,32 +1432,45 @@ class DocumentCorrector:
                             continue
                         
                         # Выравниваем текст в ячейках по ширине
-                        paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY                        # Включаем автоматические переносы для улучшения выравнивания
-                        self._enable_hyphenation(paragraph)
+                        paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
+                        # Включаем автоматические переносы для улучшения выравнивания
+                        self._enable_hyphenation(paragraph, context['resolver'])
 
-    def _enable_hyphenation(self, paragraph):
+    def _enable_hyphenation(self, paragraph, resolver):
         """
-        Включает автоматические переносы для параграфа
+        Включает автоматические переносы для параграфа. Значения, которые уже
+        действуют (с учетом стиля), не записываются — XML параграфа не меняется
         """
         try:
-            pPr = paragraph._element.get_or_add_pPr()
-            if pPr is not None:
-                # Добавляем свойство автоматического переноса слов
-                hyphenation_element = OxmlElement('w:autoSpaceDE')
-                hyphenation_element.set(qn('w:val'), '1')
-                pPr.append(hyphenation_element)
-                
-                # Добавляем свойство выравнивания последней строки
-                last_line_element = OxmlElement('w:contextualSpacing')
-                last_line_element.set(qn('w:val'), '1')
-                pPr.append(last_line_element)
+            effective = resolver.resolve_paragraph(paragraph._p)
+            # Свойство автоматического переноса слов (включено по умолчанию)
+            if not effective.get('auto_space_de', True):
+                self._set_ppr_value(paragraph._element.get_or_add_pPr(), 'w:autoSpaceDE', '1')
+            # Свойство выравнивания последней строки; без интервалов до и после
+            # параграфа оно ни на что не влияет
+            if effective.get('space_before') or effective.get('space_after'):
+                self._set_ppr_value(paragraph._element.get_or_add_pPr(), 'w:contextualSpacing', '1')
         except Exception as e:
             print(f"Предупреждение: Не удалось включить переносы слов: {str(e)}")
     
+    @staticmethod
+    def _set_ppr_value(pPr, tag, value):
+        """
+        Задает w:val свойства параграфа: изменяет существующий элемент или добавляет новый,
+        чтобы повторное исправление не дублировало свойства
+        """
+        element = pPr.find(qn(tag))
+        if element is None:
+            element = OxmlElement(tag)
+            pPr.append(element)
+        if element.get(qn('w:val')) != value:
+            element.set(qn('w:val'), value)
+    
     def _correct_tables(self, document):
         """
         Исправляет оформление таблиц с защитой структуры
         """
+        index = self._get_document_index(document)
         try:
             for table in document.tables:
                 # Сохраняем исходные свойства таблицы
@@ -1061,7 +1543,7 @@ class DocumentCorrector:
         
         # Исправляем заголовки таблиц (вне таблицы)
         try:
-            for paragraph in document.paragraphs:
+            for paragraph in index.paragraphs:
                 text_lower = paragraph.text.strip().lower()
                 if text_lower.startswith('таблица'):
                     # Форматирование заголовка таблицы
@@ -1181,243 +1663,190 @@ class DocumentCorrector:
     
     def _correct_lists(self, document):
         """
-        Исправляет оформление списков
+        Исправляет оформление списков: маркированные и нумерованные элементы,
+        буквенные перечисления и отступы многоуровневых перечислений
         ВАЖНО: обрабатывает только списки вне таблиц
         """
-        try:
-            # Получаем список всех параграфов внутри таблиц для исключения
-            table_paragraphs = set()
-            for table in document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            table_paragraphs.add(id(para))
-            
-            for paragraph in document.paragraphs:
-                # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
-                if id(paragraph) in table_paragraphs:
-                    continue
-                
-                # Пропускаем пустые параграфы и заголовки
-                if not paragraph.text.strip() or paragraph.style.name.startswith('Heading'):
-                    continue
-                
-                try:
-                    # Проверяем, является ли параграф элементом списка
-                    is_list_item = False
-                    list_type = None
-                    
-                    # Проверка на маркированный список
-                    if re.match(r'^[•\-–—]\s', paragraph.text):
-                        is_list_item = True
-                        list_type = 'bullet'
-                    
-                    # Проверка на нумерованный список
-                    elif re.match(r'^\d+[.)]\s', paragraph.text) or re.match(r'^[a-яa-z][.)]\s', paragraph.text, re.IGNORECASE):
-                        is_list_item = True
-                        list_type = 'numbered'
-                    
-                    # Применяем форматирование к элементам списка
-                    if is_list_item:
-                        pf = paragraph.paragraph_format
-                        
-                        # БЕЗОПАСНАЯ УСТАНОВКА: проверяем текущее значение перед изменением
-                        if pf.left_indent is None or pf.left_indent != Cm(1.0):
-                            pf.left_indent = Cm(1.0)
-                        
-                        if pf.first_line_indent is None or pf.first_line_indent != Cm(-0.5):
-                            pf.first_line_indent = Cm(-0.5)  # Обратный отступ для маркера
-                        
-                        # Устанавливаем межстрочный интервал
-                        if pf.line_spacing != self.standard_rules['line_spacing']:
-                            pf.line_spacing = self.standard_rules['line_spacing']
-                            pf.line_spacing_rule = WD_LINE_SPACING.MULTIPLE
-                        
-                        # Выравнивание по ширине только если не установлено
-                        if pf.alignment != WD_PARAGRAPH_ALIGNMENT.JUSTIFY:
-                            pf.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
-                        
-                        # Шрифт для элементов списка - БЕЗ УДАЛЕНИЯ RUNS
-                        for run in paragraph.runs:
-                            if run.font.name != self.standard_rules['font']['name']:
-                                run.font.name = self.standard_rules['font']['name']
-                            if run.font.size != Pt(self.standard_rules['font']['size']):
-                                run.font.size = Pt(self.standard_rules['font']['size'])
-                
-                except Exception as e:
-                    print(f"ОШИБКА при обработке элемента списка '{paragraph.text[:50]}...': {str(e)}")
-                    continue
-            
-            # Дополнительно обрабатываем буквенные перечисления
-            self._correct_letter_lists(document)
-            
-        except Exception as e:
-            print(f"КРИТИЧЕСКАЯ ОШИБКА в _correct_lists: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        self._apply_formatting(document, LIST_FORMATTING_RULES)
+    
+    def _list_items_paragraph(self, facts, context):
+        """
+        Правило 'list_items': оформление элементов маркированных и нумерованных списков
+        """
+        # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
+        if facts.in_table:
+            return False
+        
+        # Пропускаем пустые параграфы и заголовки
+        if not facts.stripped or facts.is_heading:
+            return False
+        
+        # Проверяем, является ли параграф элементом списка (маркированного или нумерованного)
+        text = facts.text
+        if not (rx.BULLET_ITEM.match(text) or rx.NUMBERED_ITEM.match(text) or rx.LETTER_ITEM_RANGE.match(text)):
+            return False
+        
+        pf = facts.paragraph.paragraph_format
+        
+        # БЕЗОПАСНАЯ УСТАНОВКА: проверяем текущее значение перед изменением
+        if pf.left_indent is None or pf.left_indent != Cm(1.0):
+            pf.left_indent = Cm(1.0)
+        
+        if pf.first_line_indent is None or pf.first_line_indent != Cm(-0.5):
+            pf.first_line_indent = Cm(-0.5)  # Обратный отступ для маркера
+        
+        # Устанавливаем межстрочный интервал
+        if pf.line_spacing != self.standard_rules['line_spacing']:
+            pf.line_spacing = self.standard_rules['line_spacing']
+            pf.line_spacing_rule = WD_LINE_SPACING.MULTIPLE
+        
+        # Выравнивание по ширине только если не установлено
+        if pf.alignment != WD_PARAGRAPH_ALIGNMENT.JUSTIFY:
+            pf.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
+        return True
+    
+    def _list_run_font(self, run, facts, value, context):
+        """
+        Шрифт run элемента списка - БЕЗ УДАЛЕНИЯ RUNS
+        """
+        if self.formatting_mode == 'styles':
+            self._apply_style_font_to_run(run, facts)
+            return
+        if run.font.name != self.standard_rules['font']['name']:
+            run.font.name = self.standard_rules['font']['name']
+        if run.font.size != Pt(self.standard_rules['font']['size']):
+            run.font.size = Pt(self.standard_rules['font']['size'])
+    
+    def _apply_style_font_to_run(self, run, facts):
+        """
+        Режим 'styles': основной шрифт и размер run параграфа facts через стиль
+        """
+        resolver = self._get_formatting_resolver(facts.index.document)
+        style_id = resolver.paragraph_style_id(facts.paragraph._p)
+        self._apply_style_run_font(run, resolver, style_id, self.standard_rules['font']['size'])
     
-    def _correct_letter_lists(self, document):
+    def _letter_lists_paragraph(self, facts, context):
         """
-        Исправляет оформление перечислений с буквенной нумерацией
+        Правило 'letter_lists': перечисления с буквенной нумерацией
         ВАЖНО: сохраняет форматирование текста, не перезаписывает paragraph.text
         """
-        try:
-            # Получаем список всех параграфов внутри таблиц для исключения
-            table_paragraphs = set()
-            for table in document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            table_paragraphs.add(id(para))
-            
-            # Регулярное выражение для поиска буквенных перечислений
-            letter_list_pattern = r'^([а-яa-z])[)\.]\s'
-            
-            for paragraph in document.paragraphs:
-                # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
-                if id(paragraph) in table_paragraphs:
-                    continue
-                
-                text = paragraph.text.strip()
-                
-                # Пропускаем пустые параграфы и заголовки
-                if not text or paragraph.style.name.startswith('Heading'):
-                    continue
-                
-                try:
-                    # Проверяем, является ли параграф элементом буквенного перечисления
-                    match = re.match(letter_list_pattern, text, re.IGNORECASE)
-                    if match:
-                        pf = paragraph.paragraph_format
-                        
-                        # Форматируем перечисление - БЕЗОПАСНО
-                        if pf.first_line_indent != Cm(-0.5):
-                            pf.first_line_indent = Cm(-0.5)  # Обратный отступ для буквы
-                        
-                        if pf.left_indent != Cm(1.0):
-                            pf.left_indent = Cm(1.0)  # Отступ слева для текста
-                        
-                        if pf.alignment != WD_PARAGRAPH_ALIGNMENT.JUSTIFY:
-                            pf.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
-                        
-                        # Проверяем формат буквы - должен быть с закрывающей скобкой: а)
-                        letter = match.group(1)
-                        
-                        # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: НЕ ИСПОЛЬЗУЕМ paragraph.text = ...
-                        # Вместо этого изменяем только первый run
-                        if text[1] == '.' and len(paragraph.runs) > 0:
-                            # Ищем точку в первом run и заменяем на скобку
-                            first_run = paragraph.runs[0]
-                            if '.' in first_run.text:
-                                first_run.text = first_run.text.replace(f"{letter}.", f"{letter})", 1)
-                        
-                        # Восстанавливаем форматирование шрифта БЕЗ УНИЧТОЖЕНИЯ runs
-                        for run in paragraph.runs:
-                            if run.font.name != self.standard_rules['font']['name']:
-                                run.font.name = self.standard_rules['font']['name']
-                            if run.font.size != Pt(self.standard_rules['font']['size']):
-                                run.font.size = Pt(self.standard_rules['font']['size'])
-                
-                except Exception as e:
-                    print(f"ОШИБКА при обработке буквенного перечисления '{text[:50]}...': {str(e)}")
-                    continue
-            
-            # УЛУЧШЕННАЯ ЛОГИКА многоуровневых перечислений
-            self._correct_multilevel_lists(document, table_paragraphs)
-            
-        except Exception as e:
-            print(f"КРИТИЧЕСКАЯ ОШИБКА в _correct_letter_lists: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
+        if facts.in_table:
+            return False
+        
+        text = facts.stripped
+        
+        # Пропускаем пустые параграфы и заголовки
+        if not text or facts.is_heading:
+            return False
+        
+        # Проверяем, является ли параграф элементом буквенного перечисления
+        match = rx.LETTER_ITEM.match(text)
+        if not match:
+            return False
+        
+        paragraph = facts.paragraph
+        pf = paragraph.paragraph_format
+        
+        # Форматируем перечисление - БЕЗОПАСНО
+        if pf.first_line_indent != Cm(-0.5):
+            pf.first_line_indent = Cm(-0.5)  # Обратный отступ для буквы
+        
+        if pf.left_indent != Cm(1.0):
+            pf.left_indent = Cm(1.0)  # Отступ слева для текста
+        
+        if pf.alignment != WD_PARAGRAPH_ALIGNMENT.JUSTIFY:
+            pf.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
+        
+        # Проверяем формат буквы - должен быть с закрывающей скобкой: а)
+        letter = match.group(1)
+        
+        # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: НЕ ИСПОЛЬЗУЕМ paragraph.text = ...
+        # Вместо этого изменяем только первый run
+        runs = facts.runs
+        if text[1] == '.' and len(runs) > 0:
+            # Ищем точку в первом run и заменяем на скобку
+            first_run = runs[0]
+            if '.' in first_run.text:
+                first_run.text = first_run.text.replace(f"{letter}.", f"{letter})", 1)
+        
+        # Шрифт восстанавливается в runs БЕЗ УНИЧТОЖЕНИЯ runs
+        return True
     
-    def _correct_multilevel_lists(self, document, table_paragraphs):
+    def _prepare_multilevel_lists(self, document):
+        # Уровни: 1) или 1. — NUMBERED_LEVEL1_ITEM, а) или а. — LETTER_ITEM, маркеры — BULLET_ITEM
+        return {'in_list': False}
+    
+    def _multilevel_lists_paragraph(self, facts, context):
         """
-        Форматирует многоуровневые перечисления с правильными отступами
+        Правило 'multilevel_lists': отступы уровней многоуровневых перечислений
         """
-        try:
-            # Регулярные выражения для разных уровней
-            level1_pattern = r'^(\d+)[)\.]\s'  # 1) или 1.
-            level2_pattern = r'^([а-яa-z])[)\.]\s'  # а) или а.
-            level3_pattern = r'^[•\-–—]\s'  # маркеры
-            
-            in_list = False
-            
-            for paragraph in document.paragraphs:
-                # Пропускаем параграфы внутри таблиц
-                if id(paragraph) in table_paragraphs:
-                    continue
-                
-                text = paragraph.text.strip()
-                
-                # Пропускаем пустые параграфы и заголовки
-                if not text or paragraph.style.name.startswith('Heading'):
-                    in_list = False
-                    continue
-                
-                try:
-                    pf = paragraph.paragraph_format
-                    
-                    # Проверяем уровень списка
-                    if re.match(level1_pattern, text):
-                        # Начало нумерованного списка (первый уровень)
-                        in_list = True
-                        
-                        # Форматируем первый уровень - БЕЗОПАСНО
-                        if pf.first_line_indent != Cm(-0.5):
-                            pf.first_line_indent = Cm(-0.5)
-                        if pf.left_indent != Cm(0.5):
-                            pf.left_indent = Cm(0.5)
-                        
-                    elif re.match(level2_pattern, text, re.IGNORECASE) and in_list:
-                        # Буквенное перечисление (второй уровень)
-                        
-                        # Форматируем второй уровень с дополнительным отступом - БЕЗОПАСНО
-                        if pf.first_line_indent != Cm(-0.5):
-                            pf.first_line_indent = Cm(-0.5)
-                        if pf.left_indent != Cm(1.5):
-                            pf.left_indent = Cm(1.5)  # Увеличенный отступ для вложенного списка
-                        
-                    elif re.match(level3_pattern, text) and in_list:
-                        # Маркированный список (третий уровень)
-                        
-                        # Форматируем третий уровень - БЕЗОПАСНО
-                        if pf.first_line_indent != Cm(-0.5):
-                            pf.first_line_indent = Cm(-0.5)
-                        if pf.left_indent != Cm(2.5):
-                            pf.left_indent = Cm(2.5)  # Еще больший отступ
-                        
-                    elif in_list and text:
-                        # Обычный параграф между элементами списка - НЕ СБРАСЫВАЕМ in_list
-                        # Проверяем, является ли это продолжением элемента списка
-                        if not (re.match(level1_pattern, text) or 
-                                re.match(level2_pattern, text, re.IGNORECASE) or 
-                                re.match(level3_pattern, text)):
-                            # Это обычный текст - конец списка только если нет отступа
-                            if pf.left_indent is None or pf.left_indent < Cm(0.5):
-                                in_list = False
-                
-                except Exception as e:
-                    print(f"ОШИБКА при форматировании многоуровневого списка '{text[:50]}...': {str(e)}")
-                    continue
+        level1_pattern = rx.NUMBERED_LEVEL1_ITEM
+        level2_pattern = rx.LETTER_ITEM
+        level3_pattern = rx.BULLET_ITEM
         
-        except Exception as e:
-            print(f"КРИТИЧЕСКАЯ ОШИБКА в _correct_multilevel_lists: {str(e)}")
-            import traceback
-            traceback.print_exc() 
+        # Пропускаем параграфы внутри таблиц
+        if facts.in_table:
+            return
+        
+        text = facts.stripped
+        
+        # Пропускаем пустые параграфы и заголовки
+        if not text or facts.is_heading:
+            context['in_list'] = False
+            return
+        
+        pf = facts.paragraph.paragraph_format
+        
+        # Проверяем уровень списка
+        if level1_pattern.match(text):
+            # Начало нумерованного списка (первый уровень)
+            context['in_list'] = True
+            
+            # Форматируем первый уровень - БЕЗОПАСНО
+            if pf.first_line_indent != Cm(-0.5):
+                pf.first_line_indent = Cm(-0.5)
+            if pf.left_indent != Cm(0.5):
+                pf.left_indent = Cm(0.5)
+            
+        elif level2_pattern.match(text) and context['in_list']:
+            # Буквенное перечисление (второй уровень)
+            
+            # Форматируем второй уровень с дополнительным отступом - БЕЗОПАСНО
+            if pf.first_line_indent != Cm(-0.5):
+                pf.first_line_indent = Cm(-0.5)
+            if pf.left_indent != Cm(1.5):
+                pf.left_indent = Cm(1.5)  # Увеличенный отступ для вложенного списка
+            
+        elif level3_pattern.match(text) and context['in_list']:
+            # Маркированный список (третий уровень)
+            
+            # Форматируем третий уровень - БЕЗОПАСНО
+            if pf.first_line_indent != Cm(-0.5):
+                pf.first_line_indent = Cm(-0.5)
+            if pf.left_indent != Cm(2.5):
+                pf.left_indent = Cm(2.5)  # Еще больший отступ
+            
+        elif context['in_list']:
+            # Обычный параграф между элементами списка: это обычный текст -
+            # конец списка только если нет отступа
+            if pf.left_indent is None or pf.left_indent < Cm(0.5):
+                context['in_list'] = False
 
     def _correct_title_page(self, document):
         """
         Исправляет титульный лист: заменяет неправильный титульный лист на шаблонный
         или вставляет шаблонный титульный лист, если он отсутствует
         """
+        index = self._get_document_index(document)
         # Проверяем наличие титульного листа
         title_page_exists = False
         title_page_paragraphs = []
         
         # Собираем все параграфы титульного листа (до первого Heading 1 или до "СОДЕРЖАНИЕ"/"ВВЕДЕНИЕ")
-        for i, para in enumerate(document.paragraphs):
+        for i, para in enumerate(index.paragraphs):
             text = para.text.strip().lower()
-            if para.style.name.startswith('Heading') and para.style.name == 'Heading 1':
+            if index.style_name(para) == 'Heading 1':
                 break
             if any(word in text for word in ['содержание', 'введение']):
                 break
@@ -1434,67 +1863,41 @@ class DocumentCorrector:
             if any(keyword in title_text for keyword in title_keywords):
                 title_page_exists = True
         
-        # Путь к шаблону титульного листа
-        template_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates', 'Титульный лист.docx')
-        
-        if not os.path.exists(template_path):
-            print(f"Предупреждение: Шаблон титульного листа не найден по пути {template_path}")
+        template = get_title_page_template()
+        if template is None:
+            print(f"Предупреждение: Шаблон титульного листа не найден по пути {TITLE_PAGE_TEMPLATE_PATH}")
             return
 
         if title_page_exists:
             # Если титульный лист существует, но неправильно оформлен - заменяем его
             # Удаляем старые параграфы титульного листа
             for i, para in reversed(title_page_paragraphs):
-                p = para._element
-                p.getparent().remove(p)
+                index.remove_paragraph(para)
                 
-            # Вставляем новый титульный лист из шаблона
-            self._insert_title_page_from_template(document, template_path)
-        else:
-            # Если титульного листа нет - просто вставляем шаблон
-            self._insert_title_page_from_template(document, template_path)
+        # Вставляем титульный лист из шаблона
+        self._insert_title_page_from_template(document, template)
 
-    def _insert_title_page_from_template(self, document, template_path):
+    def _insert_title_page_from_template(self, document, template=None):
         """
-        Вставляет титульный лист из шаблона в начало документа
+        Вставляет титульный лист из шаблона в начало документа.
+        Объединение выполняется в памяти: Composer вставляет копию разобранного
+        шаблона в сам документ вместе со стилями, нумерацией и связанными частями,
+        без сохранения и повторного разбора временных файлов.
         """
         try:
-            # Создаем временный файл для сохранения текущего документа
-            temp_doc_fd, temp_doc_path = tempfile.mkstemp(suffix='.docx')
-            os.close(temp_doc_fd)
-            document.save(temp_doc_path)
-            self.temp_files.append(temp_doc_path)
-            
-            # Создаем новый документ на основе шаблона титульного листа
-            title_doc = Document(template_path)
-            
-            # Сохраняем шаблон во временный файл
-            temp_title_fd, temp_title_path = tempfile.mkstemp(suffix='.docx')
-            os.close(temp_title_fd)
-            title_doc.save(temp_title_path)
-            self.temp_files.append(temp_title_path)
-            
-            # Используем Composer для объединения документов
-            composer = Composer(title_doc)
-            doc_to_merge = Document(temp_doc_path)
-            composer.append(doc_to_merge)
-            
-            # Сохраняем результат во временный файл
-            temp_result_fd, temp_result_path = tempfile.mkstemp(suffix='.docx')
-            os.close(temp_result_fd)
-            composer.save(temp_result_path)
-            self.temp_files.append(temp_result_path)
-            
-            # Загружаем результат обратно в исходный документ
-            result_doc = Document(temp_result_path)
-            
-            # Очищаем исходный документ
-            for element in list(document._element.body):
-                document._element.body.remove(element)
-            
-            # Копируем все элементы из результата в исходный документ
-            for element in list(result_doc._element.body):
-                document._element.body.append(element)
+            if template is None:
+                template = get_title_page_template()
+            if template is None:
+                print(f"Предупреждение: Шаблон титульного листа не найден по пути {TITLE_PAGE_TEMPLATE_PATH}")
+                return
+
+            # Composer изменяет вставляемый документ (поля свойств, стили), поэтому
+            # вставляется копия пакета шаблона, а не общий объект
+            composer = Composer(document)
+            composer.insert(0, copy_document(template))
+            
+            # В начало тела добавлены параграфы шаблона — индекс параграфов перестраивается
+            self._get_document_index(document).refresh()
                 
             print("Титульный лист успешно вставлен")
             
@@ -1509,17 +1912,11 @@ class DocumentCorrector:
         Теперь только форматирует существующие формулы
         """
         try:
-            # Получаем список всех параграфов внутри таблиц для исключения
-            table_paragraphs = set()
-            for table in document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            table_paragraphs.add(id(para))
+            index = self._get_document_index(document)
             
-            for paragraph in document.paragraphs:
+            for paragraph in index.paragraphs:
                 # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
-                if id(paragraph) in table_paragraphs:
+                if index.is_table_paragraph(paragraph):
                     continue
                 
                 text = paragraph.text.strip()
@@ -1564,13 +1961,7 @@ class DocumentCorrector:
         ВАЖНО: НЕ использует paragraph.text = ... для сохранения форматирования
         """
         try:
-            # Получаем список всех параграфов внутри таблиц для исключения
-            table_paragraphs = set()
-            for table in document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            table_paragraphs.add(id(para))
+            index = self._get_document_index(document)
             
             # Регулярные выражения для поиска и замены
             replacements = [
@@ -1583,9 +1974,9 @@ class DocumentCorrector:
             ]
             
             # Проходим по всем параграфам документа
-            for paragraph in document.paragraphs:
+            for paragraph in index.paragraphs:
                 # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
-                if id(paragraph) in table_paragraphs:
+                if index.is_table_paragraph(paragraph):
                     continue
                 
                 # Пропускаем пустые параграфы
@@ -1627,16 +2018,10 @@ class DocumentCorrector:
         ВАЖНО: НЕ использует paragraph.text = ... для сохранения форматирования
         """
         try:
-            # Получаем список всех параграфов внутри таблиц для исключения
-            table_paragraphs = set()
-            for table in document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            table_paragraphs.add(id(para))
+            index = self._get_document_index(document)
             
-            # Ищем раздел со списком литературы
-            bibliography_started = False
+            # Раздел со списком литературы находит индекс документа
+            span = index.section_span('bibliography')
             bibliography_paragraphs = []
             
             # Паттерны для идентификации различных типов источников
@@ -1649,48 +2034,31 @@ class DocumentCorrector:
                 'dissertation': r'(?i)(?:дис|автореф)\.(?:\s|\.)'
             }
             
-            for i, paragraph in enumerate(document.paragraphs):
-                # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
-                if id(paragraph) in table_paragraphs:
-                    continue
-                
-                text = paragraph.text.strip().lower()
-                
+            if span:
+                title_position, positions = span
+                paragraph = index.paragraphs[title_position]
+                bibliography_paragraphs = [(i, index.paragraphs[i]) for i in positions]
                 try:
-                    # Определяем начало списка литературы
-                    if not bibliography_started and re.search(r'список\s+(использованн(ой|ых)\s+)?литератур', text):
-                        bibliography_started = True
-                        # Форматируем заголовок списка литературы
-                        paragraph.style = document.styles['Heading 1']
-                        pf = paragraph.paragraph_format
-                        pf.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                        pf.first_line_indent = Cm(0)
-                        pf.space_after = Pt(12)
-                        pf.space_before = Pt(12)
-                        
-                        # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: убираем точку через runs
-                        if paragraph.text.strip().endswith('.'):
-                            if paragraph.runs:
-                                last_run = paragraph.runs[-1]
-                                last_run.text = last_run.text.rstrip('.')
-                        
-                        # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: upper через runs
-                        for run in paragraph.runs:
-                            run.text = run.text.upper()
-                        continue
+                    # Форматируем заголовок списка литературы
+                    index.set_style(paragraph, document.styles['Heading 1'])
+                    pf = paragraph.paragraph_format
+                    pf.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+                    pf.first_line_indent = Cm(0)
+                    pf.space_after = Pt(12)
+                    pf.space_before = Pt(12)
                     
-                    # Собираем параграфы списка литературы
-                    if bibliography_started:
-                        # Если встретили новый заголовок, значит список литературы закончился
-                        if paragraph.style.name.startswith('Heading'):
-                            break
-                        
-                        # Добавляем параграф в список для дальнейшей обработки
-                        bibliography_paragraphs.append((i, paragraph))
+                    # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: убираем точку через runs
+                    if paragraph.text.strip().endswith('.'):
+                        if paragraph.runs:
+                            last_run = paragraph.runs[-1]
+                            last_run.text = last_run.text.rstrip('.')
+                    
+                    # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: upper через runs
+                    for run in paragraph.runs:
+                        run.text = run.text.upper()
                 
                 except Exception as e:
-                    print(f"ОШИБКА при поиске списка литературы '{text[:50]}...': {str(e)}")
-                    continue
+                    print(f"ОШИБКА при оформлении заголовка списка литературы '{paragraph.text[:50]}...': {str(e)}")
             
             # Если нашли список литературы, форматируем его
             if bibliography_paragraphs:
@@ -1866,60 +2234,23 @@ class DocumentCorrector:
         ВАЖНО: НЕ использует paragraph.text = ... для сохранения форматирования
         """
         try:
-            # Получаем список всех параграфов внутри таблиц для исключения
-            table_paragraphs = set()
-            for table in document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            table_paragraphs.add(id(para))
+            index = self._get_document_index(document)
             
-            # Ищем раздел с оглавлением
-            toc_started = False
+            # Раздел с оглавлением находит индекс документа
+            span = index.section_span('toc')
             toc_paragraphs = []
             
-            for i, paragraph in enumerate(document.paragraphs):
-                # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
-                if id(paragraph) in table_paragraphs:
-                    continue
-                
-                text = paragraph.text.strip().lower()
-                
+            if span:
+                title_position, positions = span
+                paragraph = index.paragraphs[title_position]
+                toc_paragraphs = [(i, index.paragraphs[i]) for i in positions]
                 try:
-                    # Определяем начало оглавления
-                    if not toc_started and re.search(r'^(оглавление|содержание)$', text):
-                        toc_started = True
-                        # Форматируем заголовок оглавления
-                        paragraph.style = document.styles['Heading 1']
-                        pf = paragraph.paragraph_format
-                        pf.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                        pf.first_line_indent = Cm(0)
-                        pf.space_after = Pt(12)
-                        pf.space_before = Pt(12)
-                        
-                        # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: убираем точку через runs
-                        if paragraph.text.strip().endswith('.'):
-                            if paragraph.runs:
-                                last_run = paragraph.runs[-1]
-                                last_run.text = last_run.text.rstrip('.')
-                        
-                        # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: upper через runs
-                        for run in paragraph.runs:
-                            run.text = run.text.upper()
-                        continue
-                    
-                    # Собираем параграфы оглавления
-                    if toc_started:
-                        # Если встретили заголовок "ВВЕДЕНИЕ", значит оглавление закончилось
-                        if text == 'введение' or paragraph.style.name.startswith('Heading'):
-                            break
-                        
-                        # Добавляем параграф в список для дальнейшей обработки
-                        toc_paragraphs.append((i, paragraph))
+                    # Заголовок оглавления оформляется как заголовок раздела первого уровня,
+                    # чтобы повторное исправление (_correct_section_headings) его не меняло
+                    self._format_section_heading(document, index, paragraph, 1)
                 
                 except Exception as e:
-                    print(f"ОШИБКА при поиске оглавления '{text[:50]}...': {str(e)}")
-                    continue
+                    print(f"ОШИБКА при оформлении заголовка оглавления '{paragraph.text[:50]}...': {str(e)}")
             
             # Если нашли оглавление, форматируем его
             if toc_paragraphs:
@@ -1979,21 +2310,15 @@ class DocumentCorrector:
         ВАЖНО: НЕ использует paragraph.text = ... для сохранения форматирования
         """
         try:
-            # Получаем список всех параграфов внутри таблиц для исключения
-            table_paragraphs = set()
-            for table in document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            table_paragraphs.add(id(para))
+            index = self._get_document_index(document)
             
             # Ищем начало раздела приложений
             appendix_started = False
             current_appendix = None
             
-            for i, paragraph in enumerate(document.paragraphs):
+            for i, paragraph in enumerate(index.paragraphs):
                 # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
-                if id(paragraph) in table_paragraphs:
+                if index.is_table_paragraph(paragraph):
                     continue
                 
                 text = paragraph.text.strip()
@@ -2005,7 +2330,7 @@ class DocumentCorrector:
                         current_appendix = text
                         
                         # Форматируем заголовок приложения
-                        paragraph.style = document.styles['Heading 1']
+                        index.set_style(paragraph, document.styles['Heading 1'])
                         pf = paragraph.paragraph_format
                         pf.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
                         pf.first_line_indent = Cm(0)
@@ -2025,10 +2350,10 @@ class DocumentCorrector:
                         # Если после слова "ПРИЛОЖЕНИЕ" и буквы нет названия, ищем следующий параграф с названием
                         if len(paragraph.text.split()) < 3:
                             next_para_index = i + 1
-                            if next_para_index < len(document.paragraphs):
-                                next_para = document.paragraphs[next_para_index]
-                                if id(next_para) not in table_paragraphs:
-                                    if next_para.text.strip() and not next_para.style.name.startswith('Heading'):
+                            if next_para_index < len(index.paragraphs):
+                                next_para = index.paragraphs[next_para_index]
+                                if not index.is_table_paragraph(next_para):
+                                    if next_para.text.strip() and not index.is_heading(next_para):
                                         # Форматируем название приложения
                                         next_pf = next_para.paragraph_format
                                         next_pf.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
@@ -2041,7 +2366,7 @@ class DocumentCorrector:
                                             run.text = run.text.upper()
                     
                     # Форматируем содержимое приложения, если это не заголовок
-                    elif appendix_started and not paragraph.style.name.startswith('Heading') and text:
+                    elif appendix_started and not index.is_heading(paragraph) and text:
                         # Для текста внутри приложения применяем стандартное форматирование
                         if not re.match(r'^(рисунок|рис\.|таблица)', text.lower()):
                             pf = paragraph.paragraph_format
@@ -2078,14 +2403,15 @@ class DocumentCorrector:
         """
         Исправляет оформление акцентов в тексте (курсив, жирность)
         """
+        index = self._get_document_index(document)
         # Проходим по всем параграфам
-        for paragraph in document.paragraphs:
+        for paragraph in index.paragraphs:
             # Пропускаем пустые параграфы
             if not paragraph.text.strip():
                 continue
             
             # Пропускаем заголовки - у них свое форматирование
-            if paragraph.style.name.startswith('Heading'):
+            if index.is_heading(paragraph):
                 continue
             
             # Проверяем форматирование текста (акценты)
@@ -2228,154 +2554,195 @@ class DocumentCorrector:
 
     def _correct_hyphenation(self, document):
         """
-        Исправляет автоматические переносы в документе
+        Исправляет автоматические переносы в документе, неправильные переносы
+        в тексте и "висячие" предлоги и союзы
         """
-        for paragraph in document.paragraphs:
-            # Пропускаем пустые параграфы и заголовки
-            if not paragraph.text.strip() or paragraph.style.name.startswith('Heading'):
-                continue
-                
-            # Включаем автоматические переносы для параграфа
-            try:
-                if paragraph._element.get_or_add_pPr():
-                    # Создаем элемент для автоматической расстановки переносов
-                    hyphenation_element = OxmlElement('w:suppressAutoHyphens')
-                    hyphenation_element.set(qn('w:val'), '0')  # 0 = включено (не подавлять)
-                    paragraph._element.get_or_add_pPr().append(hyphenation_element)
-                    
-                    # Добавляем настройку автоматического разрыва слов для русского языка
-                    lang_element = OxmlElement('w:lang')
-                    lang_element.set(qn('w:val'), 'ru-RU')
-                    paragraph._element.get_or_add_pPr().append(lang_element)
-            except Exception as e:
-                print(f"Предупреждение: Не удалось настроить переносы: {str(e)}")
-        
-        # Исправляем неправильные переносы в тексте
-        self._fix_incorrect_hyphenation(document)
+        self._apply_formatting(document, HYPHENATION_RULES)
+    
+    def _hyphenation_settings_paragraph(self, facts, context):
+        """
+        Правило 'hyphenation_settings': включает автоматические переносы для параграфа
+        """
+        # Пропускаем пустые параграфы и заголовки
+        if not facts.stripped or facts.is_heading:
+            return
         
-        # Исправляем "висячие" предлоги и союзы
-        self._fix_hanging_prepositions(document)
+        paragraph = facts.paragraph
+        try:
+            effective = context['resolver'].resolve_paragraph(paragraph._p)
+            pPr = paragraph._element.get_or_add_pPr()
+            # Автоматическая расстановка переносов: 0 = включено (не подавлять);
+            # по умолчанию переносы не подавлены, поэтому записываем только при отключении
+            if effective.get('suppress_auto_hyphens'):
+                self._set_ppr_value(pPr, 'w:suppressAutoHyphens', '0')
+            # Настройка автоматического разрыва слов для русского языка
+            self._set_ppr_value(pPr, 'w:lang', 'ru-RU')
+        except Exception as e:
+            print(f"Предупреждение: Не удалось настроить переносы: {str(e)}")
 
     def _fix_incorrect_hyphenation(self, document):
         """
         Исправляет неправильные переносы в тексте
         ВАЖНО: НЕ использует paragraph.text = ... для сохранения форматирования
         """
-        try:
-            # Получаем список всех параграфов внутри таблиц для исключения
-            table_paragraphs = set()
-            for table in document.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        for para in cell.paragraphs:
-                            table_paragraphs.add(id(para))
-            
-            # Список запрещенных переносов (слова, которые не должны переноситься)
-            forbidden_hyphen_words = [
-                r'\bи\b', r'\bа\b', r'\bв\b', r'\bс\b', r'\bк\b', r'\bу\b', r'\bо\b',
-                r'\bна\b', r'\bот\b', r'\bдо\b', r'\bза\b', r'\bиз\b', r'\bпо\b',
-                r'\bт\.д\b', r'\bт\.п\b', r'\bт\.е\b',
-                r'\bг\.\b', r'\bгг\.\b', r'\bвв\.\b', r'\bстр\.\b'
-            ]
-            
-            # Список правил для проверки и исправления неправильных переносов
-            hyphen_rules = [
-                (r'(\w)-\s+(\w)', r'\1\2'),  # Убираем переносы внутри слов
-                (r'(\d+)\s*-\s*(\d+)', r'\1-\2'),  # Исправляем дефисы в числовых диапазонах
-                (r'(\w+)\s*-\s*(\w+)', r'\1-\2')  # Исправляем дефисы между словами
-            ]
-            
-            for paragraph in document.paragraphs:
-                # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
-                if id(paragraph) in table_paragraphs:
-                    continue
-                
-                # Пропускаем пустые параграфы
-                if not paragraph.text.strip():
-                    continue
-                
-                try:
-                    # Проверяем необходимость изменений
-                    needs_modification = False
-                    for pattern in forbidden_hyphen_words:
-                        if re.search(pattern, paragraph.text):
-                            needs_modification = True
-                            break
-                    
-                    if not needs_modification:
-                        for pattern, _ in hyphen_rules:
-                            if re.search(pattern, paragraph.text):
-                                needs_modification = True
-                                break
-                    
-                    if needs_modification and paragraph.runs:
-                        # КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: работаем через runs
-                        for run in paragraph.runs:
-                            if run.text:
-                                text = run.text
-                                
-                                # Применяем замены для запрещенных переносов
-                                for pattern in forbidden_hyphen_words:
-                                    for match in re.finditer(r'\s+(' + pattern[2:-2] + r')\b', text):
-                                        word = match.group(1)
-                                        text = text.replace(f" {word}", f"\u00A0{word}")
-                                
-                                # Применяем правила для исправления переносов
-                                for pattern, replacement in hyphen_rules:
-                                    text = re.sub(pattern, replacement, text)
-                                
-                                run.text = text
-                
-                except Exception as e:
-                    print(f"ОШИБКА при исправлении переносов '{paragraph.text[:50]}...': {str(e)}")
-                    continue
+        self._apply_formatting(document, ('incorrect_hyphenation',))
+    
+    def _incorrect_hyphenation_paragraph(self, facts, context):
+        """
+        Правило 'incorrect_hyphenation': нужно ли исправлять переносы в runs параграфа
+        """
+        # КРИТИЧЕСКАЯ ПРОВЕРКА: пропускаем параграфы внутри таблиц
+        if facts.in_table:
+            return False
         
-        except Exception as e:
-            print(f"КРИТИЧЕСКАЯ ОШИБКА в _fix_incorrect_hyphenation: {str(e)}")
-            import traceback
-            traceback.print_exc()
+        # Пропускаем пустые параграфы
+        if not facts.stripped:
+            return False
+        
+        # Запрещенные переносы и правила исправления — в regex_patterns
+        # (FORBIDDEN_HYPHEN_WORDS, HYPHEN_RULES)
+        paragraph_text = facts.text
+        if rx.FORBIDDEN_HYPHEN_ANY.search(paragraph_text):
+            return True
+        return any(pattern.search(paragraph_text) for pattern, _ in rx.HYPHEN_RULES)
+    
+    def _incorrect_hyphenation_run(self, run, facts, value, context):
+        """
+        Правило 'incorrect_hyphenation': исправление текста run
+        КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: работаем через runs
+        """
+        if not run.text:
+            return
+        text = run.text
+        
+        # Применяем замены для запрещенных переносов
+        for pattern in rx.FORBIDDEN_HYPHEN_SPACED:
+            for match in pattern.finditer(text):
+                word = match.group(1)
+                text = text.replace(f" {word}", f"\u00A0{word}")
+        
+        # Применяем правила для исправления переносов
+        for pattern, replacement in rx.HYPHEN_RULES:
+            text = pattern.sub(replacement, text)
+        
+        run.text = text
 
     def _fix_hanging_prepositions(self, document):
         """
         Исправляет "висячие" предлоги и союзы в конце строк, добавляя неразрывные пробелы
         """
-        # Список предлогов и союзов, которые не должны находиться в конце строки
-        hanging_words = [
-            'а', 'и', 'в', 'с', 'к', 'у', 'о', 'на', 'от', 'до', 'за', 'из', 'по', 'под', 'над',
-            'при', 'для', 'без', 'про', 'через', 'перед', 'после', 'кроме', 'вдоль', 'вместо',
-            'около', 'возле', 'между', 'сквозь', 'среди', 'из-за', 'из-под', 'но', 'да', 'или',
-            'либо', 'то', 'не', 'ни', 'бы', 'же', 'ведь', 'вот', 'что', 'как', 'так', 'уж'
-        ]
+        self._apply_formatting(document, ('hanging_prepositions',))
+    
+    def _hanging_prepositions_paragraph(self, facts, context):
+        """
+        Правило 'hanging_prepositions': заменяет пробел после предлога или союза на неразрывный
+        """
+        # Предлоги и союзы, которые не должны находиться в конце строки,
+        # и пробел после них (regex_patterns.HANGING_WORDS)
+        text = facts.text
         
-        # Регулярное выражение для поиска предлогов и союзов в тексте
-        # Ищем предлог/союз и пробел после него
-        pattern = r'\b(' + '|'.join(hanging_words) + r')\s+'
+        # Ищем все вхождения предлогов и союзов
+        for match in rx.HANGING_WORD.finditer(facts.text):
+            # Заменяем обычный пробел после предлога на неразрывный
+            text = text[:match.end()-1] + '\u00A0' + text[match.end():]
         
-        for paragraph in document.paragraphs:
-            text = paragraph.text
-            
-            # Ищем все вхождения предлогов и союзов
-            for match in re.finditer(pattern, text):
-                # Получаем найденное слово и его позицию
-                word = match.group(1)
-                pos = match.start()
-                
-                # Заменяем обычный пробел после предлога на неразрывный
-                text = text[:match.end()-1] + '\u00A0' + text[match.end():]
-                
-            # Если текст изменился, обновляем параграф
-            if text != paragraph.text:
-                paragraph.text = text
-                
-                # Восстанавливаем форматирование
-                for run in paragraph.runs:
-                    run.font.name = self.standard_rules['font']['name']
-                    run.font.size = Pt(self.standard_rules['font']['size'])
+        # Если текст изменился, обновляем параграф и восстанавливаем форматирование в runs
+        if text != facts.text:
+            facts.paragraph.text = text
+            return True
+        return False
+    
+    def _hanging_prepositions_run(self, run, facts, value, context):
+        """
+        Правило 'hanging_prepositions': восстанавливает шрифт run после замены текста
+        """
+        if self.formatting_mode == 'styles':
+            self._apply_style_font_to_run(run, facts)
+            return
+        run.font.name = self.standard_rules['font']['name']
+        run.font.size = Pt(self.standard_rules['font']['size'])
 
+    def _prepare_redundant_formatting(self, document):
+        # Проходы исправления могли изменить стили и назначить параграфам новые
+        # (например, стили заголовков) — приводим их шрифт к стандарту
+        # и разрешаем форматирование заново
+        resolver = self._get_formatting_resolver(document)
+        resolver.invalidate()
+        self._normalize_paragraph_styles(document)
+        return {'resolver': resolver}
+    
+    def _redundant_formatting_paragraph(self, facts, context):
+        """
+        Правило 'redundant_formatting': удаляет прямое форматирование параграфа
+        и его runs, совпадающее с унаследованным от стилей
+        """
+        self._strip_redundant_paragraph_formatting(facts.paragraph._p, context['resolver'])
+        self._strip_redundant_run_formatting(facts.paragraph._p, context['resolver'])
+    
+    def _redundant_formatting_tables(self, document, context):
+        """
+        Правило 'redundant_formatting' для параграфов таблиц
+        """
+        index = self._get_document_index(document)
+        for p in index.table_elements:
+            self._strip_redundant_paragraph_formatting(p, context['resolver'])
+            self._strip_redundant_run_formatting(p, context['resolver'])
+    
+    def _strip_redundant_paragraph_formatting(self, p, resolver):
+        """
+        Удаляет из w:pPr параграфа p выравнивание, интервалы и отступы,
+        если все заданные в элементе значения совпадают со значениями стиля
+        """
+        ppr = p.pPr
+        if ppr is None:
+            return
+        inherited = resolver.resolve_style_paragraph(resolver.paragraph_style_id(p))
+        direct = resolver.direct_paragraph_props(p)
+        for tag, keys, attributes in REDUNDANT_PARAGRAPH_PROPERTIES:
+            child = ppr.find(qn(tag))
+            if child is None or not child.attrib:
+                continue
+            # Атрибуты, которые резолвер не разбирает (например, w:beforeAutospacing), сохраняем
+            if any(name not in {qn(attribute) for attribute in attributes} for name in child.attrib):
+                continue
+            present = [key for key in keys if key in direct]
+            if present and all(direct[key] == inherited.get(key) for key in present):
+                ppr.remove(child)
+        if len(ppr) == 0 and not ppr.attrib:
+            p.remove(ppr)
+    
+    def _strip_redundant_run_formatting(self, p, resolver):
+        """
+        Удаляет из runs параграфа p шрифт, размер, насыщенность, курсив и прописные,
+        если они совпадают со значениями стиля, и ставшие пустыми w:rPr
+        """
+        style_id = resolver.paragraph_style_id(p)
+        for r in p.xpath('./w:r | ./w:hyperlink/w:r'):
+            rpr = r.rPr
+            if rpr is None:
+                continue
+            run_style_id = rpr.rStyle.val if rpr.rStyle is not None else None
+            inherited = resolver.resolve_style_run(style_id, run_style_id)
+            direct = resolver.direct_run_props(r)
+            
+            rFonts = rpr.rFonts
+            if (rFonts is not None and inherited.get('name') is not None
+                    and rFonts.get(qn('w:asciiTheme')) is None and rFonts.get(qn('w:hAnsiTheme')) is None
+                    and rFonts.get(qn('w:ascii')) == inherited['name']
+                    and rFonts.get(qn('w:hAnsi')) in (None, inherited['name'])):
+                self._remove_direct_font_name(rpr)
+            
+            for key, tag in (('size', 'w:sz'), ('bold', 'w:b'), ('italic', 'w:i'), ('all_caps', 'w:caps')):
+                if key in direct and direct[key] == inherited.get(key):
+                    self._remove_rpr_child(rpr, tag)
+            
+            self._remove_empty_rpr(r)
+    
     def _correct_cross_references(self, document):
         """
         Исправляет перекрестные ссылки в документе
         """
+        index = self._get_document_index(document)
         # Словарь для хранения номеров рисунков, таблиц и формул
         reference_dict = {
             'рисунок': {},  # номер: заголовок
@@ -2386,7 +2753,7 @@ class DocumentCorrector:
         }
         
         # Первый проход - собираем информацию о номерах элементов
-        for i, paragraph in enumerate(document.paragraphs):
+        for i, paragraph in enumerate(index.paragraphs):
             text = paragraph.text.strip()
             
             # Поиск рисунков
@@ -2417,7 +2784,7 @@ class DocumentCorrector:
                     reference_dict['формула'][formula_num] = text.replace(match.group(0), '').strip()
             
             # Поиск заголовков разделов
-            elif paragraph.style.name.startswith('Heading'):
+            elif index.is_heading(paragraph):
                 match = re.match(r'^(\d+(?:\.\d+)*)\s+(.+)', text)
                 if match:
                     section_num = match.group(1)
@@ -2433,12 +2800,12 @@ class DocumentCorrector:
                     reference_dict['приложение'][appendix_letter] = title
         
         # Второй проход - исправляем ссылки в тексте
-        for paragraph in document.paragraphs:
+        for paragraph in index.paragraphs:
             text = paragraph.text
             modified = False
             
             # Ищем ссылки на рисунки
-            for match in re.finditer(r'(?<!\w)(рис\.|рисунк[а-я]*)\s*\.?\s*(\d+)(?!\d)', text, re.IGNORECASE):
+            for match in rx.CROSS_REFERENCE_IMAGE.finditer(text):
                 prefix, num = match.groups()
                 if num in reference_dict['рисунок']:
                     correct_ref = f"рисунок {num}"
@@ -2448,7 +2815,7 @@ class DocumentCorrector:
                     modified = True
             
             # Ищем ссылки на таблицы
-            for match in re.finditer(r'(?<!\w)(табл\.|таблиц[а-я]*)\s*\.?\s*(\d+)(?!\d)', text, re.IGNORECASE):
+            for match in rx.CROSS_REFERENCE_TABLE.finditer(text):
                 prefix, num = match.groups()
                 if num in reference_dict['таблица']:
                     correct_ref = f"таблица {num}"
@@ -2458,7 +2825,7 @@ class DocumentCorrector:
                     modified = True
             
             # Ищем ссылки на формулы
-            for match in re.finditer(r'(?<!\w)(формул[а-я]*|выражени[а-я]*)\s*\.?\s*(\d+(?:\.\d+)?)(?!\d)', text, re.IGNORECASE):
+            for match in rx.CROSS_REFERENCE_FORMULA.finditer(text):
                 prefix, num = match.groups()
                 if num in reference_dict['формула']:
                     correct_ref = f"формула ({num})"
@@ -2468,7 +2835,7 @@ class DocumentCorrector:
                     modified = True
             
             # Ищем ссылки на разделы
-            for match in re.finditer(r'(?<!\w)(раздел[а-я]*|глав[а-я]*)\s*\.?\s*(\d+(?:\.\d+)?)(?!\d)', text, re.IGNORECASE):
+            for match in rx.CROSS_REFERENCE_SECTION.finditer(text):
                 prefix, num = match.groups()
                 if num in reference_dict['раздел']:
                     correct_ref = f"раздел {num}"
@@ -2478,7 +2845,7 @@ class DocumentCorrector:
                     modified = True
             
             # Ищем ссылки на приложения
-            for match in re.finditer(r'(?<!\w)(приложени[а-я]*)\s*\.?\s*([А-Я])(?![А-Я])', text, re.IGNORECASE):
+            for match in rx.CROSS_REFERENCE_APPENDIX.finditer(text):
                 prefix, letter = match.groups()
                 if letter in reference_dict['приложение']:
                     correct_ref = f"приложение {letter}"
@@ -2500,49 +2867,30 @@ class DocumentCorrector:
         """
         Исправляет список сокращений и условных обозначений
         """
-        # Ищем раздел со списком сокращений
-        abbreviations_started = False
-        abbreviations_paragraphs = []
+        index = self._get_document_index(document)
         
-        # Паттерны для идентификации раздела с сокращениями
-        abbr_title_patterns = [
-            r'список\s+сокращений',
-            r'перечень\s+сокращений',
-            r'список\s+условных\s+обозначений',
-            r'условные\s+обозначения',
-            r'принятые\s+сокращения'
-        ]
+        # Раздел со списком сокращений находит индекс документа
+        span = index.section_span('abbreviations')
+        abbreviations_paragraphs = []
         
-        for i, paragraph in enumerate(document.paragraphs):
-            text = paragraph.text.strip().lower()
+        if span:
+            title_position, positions = span
+            paragraph = index.paragraphs[title_position]
+            abbreviations_paragraphs = [(i, index.paragraphs[i]) for i in positions]
             
-            # Определяем начало списка сокращений
-            if not abbreviations_started:
-                if any(re.search(pattern, text) for pattern in abbr_title_patterns):
-                    abbreviations_started = True
-                    # Форматируем заголовок списка сокращений
-                    paragraph.style = document.styles['Heading 1']
-                    paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                    paragraph.paragraph_format.first_line_indent = Cm(0)
-                    paragraph.paragraph_format.space_after = Pt(12)
-                    paragraph.paragraph_format.space_before = Pt(12)
-                    
-                    # Убираем точку в конце заголовка, если она есть
-                    if paragraph.text.strip().endswith('.'):
-                        paragraph.text = paragraph.text.strip().rstrip('.')
-                    
-                    # Приводим к верхнему регистру
-                    paragraph.text = paragraph.text.upper()
-                    continue
+            # Форматируем заголовок списка сокращений
+            index.set_style(paragraph, document.styles['Heading 1'])
+            paragraph.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+            paragraph.paragraph_format.first_line_indent = Cm(0)
+            paragraph.paragraph_format.space_after = Pt(12)
+            paragraph.paragraph_format.space_before = Pt(12)
             
-            # Собираем параграфы списка сокращений
-            if abbreviations_started:
-                # Если встретили новый заголовок, значит список сокращений закончился
-                if paragraph.style.name.startswith('Heading'):
-                    break
-                
-                # Добавляем параграф в список для дальнейшей обработки
-                abbreviations_paragraphs.append((i, paragraph))
+            # Убираем точку в конце заголовка, если она есть
+            if paragraph.text.strip().endswith('.'):
+                paragraph.text = paragraph.text.strip().rstrip('.')
+            
+            # Приводим к верхнему регистру
+            paragraph.text = paragraph.text.upper()
         
         # Если нашли список сокращений, форматируем его
         if abbreviations_paragraphs:
@@ -2594,6 +2942,7 @@ class DocumentCorrector:
             document: Документ Word
             abbreviations_dict: Словарь сокращений (сокращение: расшифровка)
         """
+        index = self._get_document_index(document)
         if not abbreviations_dict:
             return
         
@@ -2601,7 +2950,7 @@ class DocumentCorrector:
         # было ли оно расшифровано при первом употреблении
         abbreviation_first_use = {}
         
-        for i, paragraph in enumerate(document.paragraphs):
+        for i, paragraph in enumerate(index.paragraphs):
             text = paragraph.text.strip()
             
             # Ищем сокращения в тексте
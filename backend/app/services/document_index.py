@@ -0,0 +1,185 @@
+"""
+Общий индекс документа для проходов DocumentCorrector.
+
+Строится один раз в начале исправления: параграфы тела документа (прокси
+python-docx создаются однократно), принадлежность параграфов таблицам по
+XML-элементу, имена стилей, позиции заголовков и границы структурных
+разделов (оглавление, список литературы, список сокращений). Проходы
+корректора изменяют стили и структуру через индекс, поэтому он остается
+согласованным с документом.
+"""
+
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import qn
+from docx.styles import BabelFish
+
+from . import regex_patterns as rx
+
+# Разделы документа: (шаблоны заголовка раздела, тексты параграфов, завершающих раздел).
+# Раздел также заканчивается на первом параграфе со стилем заголовка.
+SECTION_SPANS = {
+    'toc': ((rx.TOC_TITLE,), ('введение',)),
+    'bibliography': ((rx.BIBLIOGRAPHY_SECTION_TITLE,), ()),
+    'abbreviations': (rx.ABBREVIATIONS_TITLES, ()),
+}
+
+
+class DocumentIndex:
+    """
+    Индекс параграфов тела документа для корректора.
+    Позиции совпадают с индексами в document.paragraphs.
+    """
+
+    def __init__(self, document):
+        """
+        Инициализация индекса
+        document: объект docx.Document
+        """
+        self.document = document
+        self.refresh()
+
+    def refresh(self):
+        """
+        Перестраивает индекс после изменений структуры, выполненных в обход индекса
+        """
+        self.paragraphs = self.document.paragraphs
+        self.elements = [para._p for para in self.paragraphs]
+        self._positions = None
+
+        # Параграфы таблиц (включая вложенные) отмечаются по самому XML-элементу
+        body = self.document.element.body
+        self.table_elements = {
+            element
+            for table in body.iterchildren(qn('w:tbl'))
+            for element in table.iter(qn('w:p'))
+        }
+
+        self._style_names = {}
+        self._style_table = None
+        self._spans = {}
+
+    def __len__(self):
+        return len(self.elements)
+
+    def position_of(self, paragraph):
+        """
+        Возвращает позицию параграфа (или его XML-элемента) в теле документа или None
+        """
+        if self._positions is None:
+            self._positions = {element: i for i, element in enumerate(self.elements)}
+        return self._positions.get(getattr(paragraph, '_p', paragraph))
+
+    def is_table_paragraph(self, paragraph):
+        """
+        Проверяет, находится ли параграф внутри таблицы
+        """
+        return paragraph._p in self.table_elements
+
+    def style_name(self, paragraph):
+        """
+        Имя стиля параграфа (кешируется до изменения стиля через set_style)
+        """
+        element = paragraph._p
+        name = self._style_names.get(element)
+        if name is None:
+            names_by_id, default_name = self._paragraph_style_table()
+            style_id = element.style
+            name = names_by_id.get(style_id, default_name) if style_id else default_name
+            name = name or ''
+            self._style_names[element] = name
+        return name
+
+    def _paragraph_style_table(self):
+        """
+        Имена стилей параграфов по идентификатору и имя стиля по умолчанию.
+        Разрешение совпадает с paragraph.style python-docx (первый стиль с данным
+        идентификатором; стиль другого типа или отсутствующий — стиль по умолчанию),
+        но таблица строится один раз, а не поиском по всем стилям для каждого параграфа.
+        """
+        if self._style_table is None:
+            first_by_id = {}
+            default_name = None
+            for style in self.document.styles.element.iterchildren(qn('w:style')):
+                first_by_id.setdefault(style.styleId, style)
+                if style.type == WD_STYLE_TYPE.PARAGRAPH and style.default:
+                    default_name = self._ui_name(style)
+            names_by_id = {
+                style_id: self._ui_name(style) if style.type == WD_STYLE_TYPE.PARAGRAPH else default_name
+                for style_id, style in first_by_id.items()
+            }
+            self._style_table = (names_by_id, default_name)
+        return self._style_table
+
+    @staticmethod
+    def _ui_name(style):
+        name = style.name_val
+        return BabelFish.internal2ui(name) if name is not None else None
+
+    def is_heading(self, paragraph):
+        """
+        Проверяет, оформлен ли параграф стилем заголовка
+        """
+        return self.style_name(paragraph).startswith('Heading')
+
+    def heading_positions(self):
+        """
+        Позиции параграфов со стилем заголовка
+        """
+        return [i for i, paragraph in enumerate(self.paragraphs) if self.is_heading(paragraph)]
+
+    def set_style(self, paragraph, style):
+        """
+        Назначает параграфу стиль и обновляет имя стиля и границы разделов в индексе
+        """
+        paragraph.style = style
+        self._style_names[paragraph._p] = (style.name if style is not None else None) or ''
+        self._spans.clear()
+
+    def remove_paragraph(self, paragraph):
+        """
+        Удаляет параграф из документа и из индекса
+        """
+        element = paragraph._p
+        parent = element.getparent()
+        if parent is not None:
+            parent.remove(element)
+        position = self.position_of(element)
+        if position is not None:
+            del self.paragraphs[position]
+            del self.elements[position]
+            self._positions = None
+        self.table_elements.discard(element)
+        self._style_names.pop(element, None)
+        self._spans.clear()
+
+    def section_span(self, name):
+        """
+        Границы раздела 'toc', 'bibliography' или 'abbreviations':
+        (позиция заголовка раздела, [позиции параграфов раздела]) или None, если раздела нет
+        """
+        if name not in self._spans:
+            self._spans[name] = self._find_section_span(*SECTION_SPANS[name])
+        return self._spans[name]
+
+    def _find_section_span(self, title_patterns, stop_texts):
+        """
+        Ищет первый заголовок раздела вне таблиц и собирает параграфы до следующего заголовка
+        """
+        title_position = None
+        positions = []
+        for i, paragraph in enumerate(self.paragraphs):
+            if self.is_table_paragraph(paragraph):
+                continue
+            if title_position is None:
+                text = paragraph.text.strip().lower()
+                if any(pattern.search(text) for pattern in title_patterns):
+                    title_position = i
+                continue
+            if self.is_heading(paragraph):
+                break
+            if stop_texts and paragraph.text.strip().lower() in stop_texts:
+                break
+            positions.append(i)
+        if title_position is None:
+            return None
+        return title_position, positions
@@ -0,0 +1,172 @@
+"""
+Обработка загруженного документа в памяти: проверка, исправление, повторная проверка.
+
+Содержимое DOCX из запроса разбирается один раз. Извлечение данных и проверка
+работают с этим объектом документа, исправление — с копией его пакета
+(copy.deepcopy пакета дешевле повторного разбора ZIP), повторная проверка —
+с исправленным объектом. Исправленный документ сохраняется в BytesIO (части,
+которые исправление не изменило, переносятся из загруженного DOCX без
+пересжатия), а на диск записывается вызывающей стороной один раз, в конце.
+Временные файлы и директории не создаются.
+
+При выборочной проверке (rule_ids) исправление тоже выборочное: исправляются
+только замечания проверенных норм (DocumentCorrector.correct(document, errors)),
+а не все оформление документа, и повторно проверяются только эти нормы.
+
+Функция progress(событие, данные), если задана, получает этапы по мере их
+завершения: extracted, rule (результат каждой нормы исходного документа),
+checked, correction_pass (каждый сохраненный проход исправления), rechecked.
+"""
+
+import io
+
+from docx import Document
+
+from .change_set import copy_document
+from .compact_paragraphs import get_compact_paragraphs_config
+from .correction_journal import package_digest
+from .document_corrector import DocumentCorrector
+from .document_processor import DocumentProcessor
+from .norm_control_checker import RECHECK_MAX_CHANGED_SHARE, NormControlChecker
+from .package_writer import save_document
+
+
+class DocumentPipeline:
+    """
+    Конвейер проверки и исправления одного загруженного документа
+    """
+
+    def __init__(self, content, rule_ids=None, checker=None, progress=None, compact=None):
+        """
+        Инициализация конвейера
+        content: содержимое DOCX (bytes)
+        rule_ids: номера норм для выборочной проверки (None — все нормы)
+        checker: NormControlChecker (по умолчанию создается новый)
+        progress: функция progress(событие, данные) для хода обработки (None — не сообщать)
+        compact: хранить параграфы в компактных записях (None — по COMPACT_PARAGRAPHS)
+        """
+        if not content:
+            raise ValueError("Файл пуст")
+        try:
+            self.document = Document(io.BytesIO(content))
+        except Exception as e:
+            raise ValueError(f"Неверный формат файла или поврежденный DOCX: {str(e)}") from e
+
+        self.content = content
+        self.rule_ids = rule_ids
+        self.checker = checker or NormControlChecker()
+        self.progress = progress
+        self.compact = get_compact_paragraphs_config() if compact is None else compact
+
+        self.document_data = None
+        self.check_results = None
+        self.corrected_document = None
+        self.corrected_content = None
+        self.correction_passes = 0
+        self.journal = None
+        self.corrected_data = None
+        self.corrected_check_results = None
+
+    def check(self):
+        """
+        Извлекает данные документа и проверяет их; возвращает результаты проверки
+        """
+        processor = DocumentProcessor.from_document(self.document)
+        # Для выборочной проверки разделы документа извлекаются по требованию
+        self.document_data = processor.extract_data(compact=self.compact, lazy=self.rule_ids is not None)
+        self._report('extracted', {'sections': list(self.document_data.keys()),
+                                   'lazy': self.rule_ids is not None})
+        on_rule = (lambda result: self._report('rule', result)) if self.progress is not None else None
+        self.check_results = self.checker.check_document(self.document_data, rules=self.rule_ids, on_rule=on_rule)
+        self._report('checked', self.check_results)
+        return self.check_results
+
+    def correct(self, max_passes=3):
+        """
+        Исправляет копию документа, повторяя исправление до стабилизации
+        (не более max_passes проходов). Исправления идемпотентны, поэтому обычно
+        второй проход ничего не меняет — это проверяется по каноническому отпечатку
+        XML-частей сохраненного в памяти документа.
+        При выборочной проверке исправляются только найденные ею замечания.
+        Возвращает содержимое исправленного DOCX (bytes).
+        """
+        errors = self._errors_to_fix()
+        corrector = DocumentCorrector()
+        document = copy_document(self.document)
+        corrector.correct(document, errors)
+        journal = corrector.journal
+        content = self._save(document)
+        digest = package_digest(io.BytesIO(content))
+        passes = 1
+        self._report('correction_pass', {'pass': passes, 'changed': True})
+
+        while passes < max_passes:
+            corrector.correct(document, errors)
+            passes += 1
+            new_content = self._save(document)
+            new_digest = package_digest(io.BytesIO(new_content))
+            self._report('correction_pass', {'pass': passes, 'changed': new_digest != digest})
+            if new_digest == digest:
+                print(f"Повторное исправление не изменило документ, проходов: {passes}")
+                break
+            # Приняли улучшенную версию
+            if journal is not None and corrector.journal is not None:
+                journal = journal.combine(corrector.journal)
+            else:
+                journal = None
+            content, digest = new_content, new_digest
+
+        self.corrected_document = document
+        self.corrected_content = content
+        self.correction_passes = passes
+        self.journal = journal
+        return content
+
+    def recheck(self):
+        """
+        Проверяет исправленный документ; по журналу исправлений повторно
+        разбираются и проверяются только затронутые параграфы и нормы. Если
+        исправление затронуло почти все параграфы (больше RECHECK_MAX_CHANGED_SHARE),
+        документ проверяется полностью — так быстрее
+        """
+        processor = DocumentProcessor.from_document(self.corrected_document)
+        if self.journal is not None and self.journal.changed_share() <= RECHECK_MAX_CHANGED_SHARE:
+            self.corrected_data = processor.extract_data(
+                compact=self.compact, lazy=self.rule_ids is not None,
+                previous_data=self.document_data, journal=self.journal
+            )
+            self.corrected_check_results = self.checker.recheck_document(
+                self.corrected_data, self.document_data, self.check_results, rules=self.rule_ids
+            )
+        else:
+            self.corrected_data = processor.extract_data(compact=self.compact, lazy=self.rule_ids is not None)
+            self.corrected_check_results = self.checker.check_document(self.corrected_data, rules=self.rule_ids)
+        self._report('rechecked', self.corrected_check_results)
+        return self.corrected_check_results
+
+    def _errors_to_fix(self):
+        """
+        Замечания для исправления: при выборочной проверке — найденные ею
+        (check() вызывается при необходимости), иначе None — исправляется все
+        """
+        if self.rule_ids is None:
+            return None
+        if self.check_results is None:
+            self.check()
+        return list(self.check_results.get('issues', []))
+
+    def _report(self, event, data=None):
+        """
+        Сообщает о завершенном этапе функции progress (если она задана)
+        """
+        if self.progress is not None:
+            self.progress(event, data)
+
+    def _save(self, document):
+        """
+        Сохраняет документ в память и возвращает содержимое DOCX; части, не
+        измененные исправлением, копируются из загруженного DOCX без пересжатия
+        """
+        stream = io.BytesIO()
+        save_document(document, stream, source=self.content)
+        return stream.getvalue()
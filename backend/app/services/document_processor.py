@@ -4,22 +4,26 @@
 """
 
 import docx
-from docx.oxml.text.paragraph import CT_P
 from docx.oxml.table import CT_Tbl
-from docx.text.paragraph import Paragraph
 from docx.table import Table, _Row, _Cell
-import re
 from docx.shared import Length, Pt, Cm
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 import os
 import json
 import uuid
+import threading
+from collections.abc import Mapping
 from docx import Document
 from docx.shared import Pt, Cm
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from docx.oxml.ns import qn
 from .norm_control_checker import NormControlChecker
 from .document_corrector import DocumentCorrector
+from .paragraph_index import ParagraphIndex
+from .compact_paragraphs import CompactParagraphList, ParagraphRecord, compact_paragraphs
+from .formatting_resolver import FormattingResolver
+from .lazy_document_data import LazyDocumentData
+from . import regex_patterns as rx
 from datetime import datetime
 import shutil
 import tempfile
@@ -213,6 +217,8 @@ class DocumentProcessor:
         """
         self.file_path = file_path
         self.temp_file_path = None
+        self._paragraph_index = None
+        self._formatting_resolver = None
         
         # Если file_path не указан (None), просто инициализируем объект без документа
         if file_path is None:
@@ -261,6 +267,16 @@ class DocumentProcessor:
             print(f"Ошибка при открытии DOCX файла {file_path}: {str(e)}")
             raise ValueError(f"Неверный формат файла или поврежденный DOCX: {file_path}") from e
     
+    @classmethod
+    def from_document(cls, document):
+        """
+        Обработчик для уже открытого документа (без повторного чтения файла)
+        document: объект docx.Document
+        """
+        processor = cls(None)
+        processor.document = document
+        return processor
+    
     def __del__(self):
         """
         Деструктор для очистки временных файлов
@@ -280,83 +296,281 @@ class DocumentProcessor:
             except Exception as e:
                 print(f"Ошибка при удалении временного файла: {str(e)}")
     
-    def extract_data(self):
+    @property
+    def paragraph_index(self):
+        """
+        Позиционный индекс параграфов документа (строится один раз)
+        """
+        if self._paragraph_index is None:
+            self._paragraph_index = ParagraphIndex(self.document)
+        return self._paragraph_index
+    
+    @property
+    def formatting_resolver(self):
+        """
+        Резолвер действующего форматирования с учетом стилей и темы (строится один раз)
+        """
+        if self._formatting_resolver is None:
+            self._formatting_resolver = FormattingResolver(self.document)
+        return self._formatting_resolver
+    
+    def extract_data(self, compact=False, lazy=False, previous_data=None, journal=None):
         """
         Извлекает все необходимые данные из документа для анализа
+        
+        Args:
+            compact: если True, параграфы хранятся в компактных записях со __slots__
+                     с общими словарями форматирования (см. compact_paragraphs); записи
+                     создаются сразу при чтении параграфов, без промежуточных словарей
+            lazy: если True, возвращается LazyDocumentData — разделы извлекаются
+                  при первом обращении (например, из методов NormControlChecker)
+            previous_data: данные исходного документа, из которого этот получен исправлением
+            journal: CorrectionJournal исправления — неизмененные параграфы и стили
+                     берутся из previous_data без повторного разбора
         """
-        document_data = {}
+        body_cache = {}
+        body_lock = threading.Lock()
+        reuse = self._reusable_records(previous_data, journal)
         
-        # Извлекаем разные типы данных, защищая каждый вызов от ошибок
-        try:
-            document_data['paragraphs'] = self._extract_paragraphs()
-        except Exception as e:
-            print(f"Ошибка при извлечении параграфов: {str(e)}")
-            document_data['paragraphs'] = []
-            
-        try:
-            document_data['tables'] = self._extract_tables()
-        except Exception as e:
-            print(f"Ошибка при извлечении таблиц: {str(e)}")
-            document_data['tables'] = []
-            
-        try:
-            document_data['headings'] = self._extract_headings()
-        except Exception as e:
-            print(f"Ошибка при извлечении заголовков: {str(e)}")
-            document_data['headings'] = []
-            
-        try:
-            document_data['bibliography'] = self._extract_bibliography()
-        except Exception as e:
-            print(f"Ошибка при извлечении библиографии: {str(e)}")
-            document_data['bibliography'] = []
-            
-        try:
-            document_data['styles'] = self._extract_styles()
-        except Exception as e:
-            print(f"Ошибка при извлечении стилей: {str(e)}")
-            document_data['styles'] = {}
-            
-        try:
-            document_data['page_setup'] = self._extract_page_setup()
-        except Exception as e:
-            print(f"Ошибка при извлечении настроек страницы: {str(e)}")
-            document_data['page_setup'] = {}
-            
-        try:
-            document_data['images'] = self._extract_images()
-        except Exception as e:
-            print(f"Ошибка при извлечении изображений: {str(e)}")
-            document_data['images'] = []
-            
-        try:
-            document_data['page_numbers'] = self._extract_page_numbers()
-        except Exception as e:
-            print(f"Ошибка при извлечении нумерации страниц: {str(e)}")
-            document_data['page_numbers'] = {
+        def get_body_sections():
+            # Результат однопроходного извлечения вычисляется один раз (и при запросе
+            # разделов из нескольких потоков); None — если не удалось
+            with body_lock:
+                if 'sections' not in body_cache:
+                    try:
+                        body_cache['sections'] = self._extract_body_single_pass(reuse, compact=compact)
+                    except Exception as e:
+                        print(f"Ошибка при однопроходном извлечении данных, используем поэтапное: {str(e)}")
+                        body_cache['sections'] = None
+                return body_cache['sections']
+        
+        def section(name, extractor, default_factory):
+            # Защищаем извлечение каждого раздела от ошибок
+            def load():
+                try:
+                    return extractor()
+                except Exception as e:
+                    print(f"Ошибка при извлечении раздела {name}: {str(e)}")
+                    return default_factory()
+            return load
+        
+        def body_section(key, legacy_extractor):
+            # Параграфы, заголовки, библиография и изображения собираются за один проход
+            def extract():
+                body_sections = get_body_sections()
+                if body_sections is not None:
+                    return body_sections[key]
+                return legacy_extractor()
+            return extract
+        
+        def extract_paragraphs():
+            paragraphs = body_section('paragraphs', self._extract_paragraphs)()
+            return compact_paragraphs(paragraphs) if compact else paragraphs
+        
+        def extract_document_properties():
+            body_sections = get_body_sections()
+            statistics = body_sections['statistics'] if body_sections is not None else None
+            return self._extract_document_properties(statistics)
+        
+        def extract_styles():
+            if 'styles' in reuse:
+                return reuse['styles']
+            return self._extract_styles()
+        
+        document_data = LazyDocumentData([
+            ('paragraphs', section('paragraphs', extract_paragraphs, list)),
+            ('tables', section('tables', self._extract_tables, list)),
+            ('headings', section('headings', body_section('headings', self._extract_headings), list)),
+            ('bibliography', section('bibliography', body_section('bibliography', self._extract_bibliography), list)),
+            ('styles', section('styles', extract_styles, dict)),
+            ('page_setup', section('page_setup', self._extract_page_setup, dict)),
+            ('images', section('images', body_section('images', self._extract_images), list)),
+            ('page_numbers', section('page_numbers', self._extract_page_numbers, lambda: {
                 'has_page_numbers': False,
                 'position': None,
                 'first_numbered_page': None,
                 'alignment': None
+            })),
+            ('document_properties', section('document_properties', extract_document_properties, dict)),
+            # Выделяем титульный лист
+            ('title_page', lambda: self._extract_title_page(document_data.get('paragraphs', []))),
+        ])
+        
+        if lazy:
+            return document_data
+        return document_data.materialize()
+    
+    @staticmethod
+    def _reusable_records(previous_data, journal):
+        """
+        Данные исходного документа, которые не изменились при исправлении:
+        {'paragraphs': {позиция: запись параграфа}, 'styles': стили}
+        """
+        reuse = {'paragraphs': {}}
+        if previous_data is None or journal is None:
+            return reuse
+        
+        # Берем только уже извлеченные разделы: повторный разбор исходного документа не нужен
+        if isinstance(previous_data, LazyDocumentData):
+            loaded = set(previous_data.loaded_sections())
+        else:
+            loaded = set(previous_data)
+        
+        if 'paragraphs' in loaded:
+            previous_records = {
+                para['index']: para for para in previous_data['paragraphs'] if isinstance(para, Mapping)
             }
+            reuse['paragraphs'] = {
+                position: previous_records[previous_position]
+                for position, previous_position in journal.reusable_paragraphs().items()
+                if previous_position in previous_records
+            }
+        if 'styles' in loaded and 'styles' not in journal.touched_parts:
+            reuse['styles'] = previous_data['styles']
+        return reuse
+    
+    def _extract_body_single_pass(self, reuse=None, compact=False):
+        """
+        Извлекает параграфы, заголовки, библиографию, изображения и статистику
+        за один проход по параграфам тела документа.
+        
+        Результат совпадает с последовательным вызовом _extract_paragraphs,
+        _extract_headings, _extract_bibliography, _extract_images и статистикой
+        из _extract_document_properties, но список параграфов python-docx строится
+        один раз, а стиль, текст и форматирование каждого параграфа читаются однократно.
+        
+        reuse: результат _reusable_records — записи неизмененных параграфов
+               берутся из него вместо повторного чтения форматирования
+        compact: если True, параграфы сразу сохраняются в CompactParagraphList
+                 (вложенные словари интернируются по мере чтения)
+        """
+        reused_records = (reuse or {}).get('paragraphs') or {}
+        if compact:
+            paragraphs = CompactParagraphList()
+            make_record = lambda data: ParagraphRecord(data, paragraphs.intern_table)
+        else:
+            paragraphs = []
+            make_record = lambda data: data
+        headings = []
+        bibliography_items = []
+        images = []
+        heading_count = 0
+        
+        bibliography_started = False
+        bibliography_finished = False
+        
+        index = self.paragraph_index
+        
+        for i, para in enumerate(index.paragraphs):
+            record = reused_records.get(i)
+            if record is not None:
+                # Параграф не изменился при исправлении — форматирование уже известно
+                text = record['text']
+                stripped = text.strip()
+                style_name = record['style']
+                is_heading = record['is_heading']
+                if is_heading:
+                    heading_count += 1
+                font_info = record['font']
+                alignment = record['alignment']
+                para_format = record['paragraph_format']
+                paragraphs.append(make_record(dict(record, index=i)))
+            else:
+                text = para.text
+                stripped = text.strip()
+                style_name = para.style.name if para.style else None
+                is_heading = bool(style_name) and style_name.startswith('Heading')
+                
+                if is_heading:
+                    heading_count += 1
+                
+                # Форматирование нужно только непустым параграфам и заголовкам
+                font_info = None
+                alignment = None
+                para_format = None
+                if stripped or is_heading:
+                    font_info = self._get_paragraph_font(para)
+                    alignment = self._get_paragraph_alignment(para)
+                    para_format = self._get_paragraph_format(para)
             
-        try:
-            document_data['document_properties'] = self._extract_document_properties()
-        except Exception as e:
-            print(f"Ошибка при извлечении свойств документа: {str(e)}")
-            document_data['document_properties'] = {}
+            # Параграфы
+            if stripped and record is None:
+                paragraphs.append(make_record({
+                    'index': i,
+                    'text': text,
+                    'style': style_name or 'Normal',
+                    'alignment': alignment,
+                    'font': font_info,
+                    'line_spacing': self._get_paragraph_line_spacing(para),
+                    'paragraph_format': para_format,
+                    'is_heading': is_heading,
+                    'list_info': self._get_list_info(para)
+                }))
+            
+            # Заголовки
+            if is_heading:
+                try:
+                    level = int(style_name.replace('Heading ', ''))
+                except ValueError:
+                    level = 0
+                    
+                headings.append({
+                    'index': i,
+                    'text': text,
+                    'level': level,
+                    'style': style_name,
+                    'font': dict(font_info),
+                    'alignment': alignment,
+                    'has_number': bool(rx.HEADING_NUMBER.match(text)),
+                    'has_ending_dot': stripped.endswith('.'),
+                    'all_caps': all(c.isupper() for c in text if c.isalpha()),
+                    'para_format': dict(para_format)
+                })
             
-        # Выделяем титульный лист
-        document_data['title_page'] = self._extract_title_page(document_data.get('paragraphs', []))
+            # Библиография
+            if not bibliography_finished:
+                para_text = text.lower().strip()
+                if not bibliography_started:
+                    if self._is_bibliography_title(para_text):
+                        bibliography_started = True
+                elif is_heading or any(para_text.startswith(end) for end in self.BIBLIOGRAPHY_END_IDENTIFIERS):
+                    bibliography_finished = True
+                elif para_text:
+                    self._append_bibliography_item(bibliography_items, para, para_text, i, font_info, alignment, is_heading)
+            
+            # Изображения: подпись ищет рисунок в трех предыдущих параграфах
+            if stripped.lower().startswith(('рис.', 'рисунок')):
+                for j in index.images_for_caption(i):
+                    images.append({
+                        'caption': stripped,
+                        'caption_index': i,
+                        'image_para_index': j,
+                        'has_number': bool(rx.IMAGE_CAPTION_NUMBER.search(stripped.lower())),
+                        'ends_with_dot': stripped.endswith('.'),
+                        'alignment': alignment
+                    })
+        
+        statistics = {
+            'paragraph_count': len(index),
+            'table_count': len(self.document.tables),
+            'section_count': len(self.document.sections),
+            'heading_count': heading_count
+        }
         
-        return document_data
+        return {
+            'paragraphs': paragraphs,
+            'headings': headings,
+            'bibliography': bibliography_items,
+            'images': images,
+            'statistics': statistics
+        }
     
     def _extract_paragraphs(self):
         """
         Извлекает все параграфы документа с их стилями
         """
         paragraphs = []
-        for i, para in enumerate(self.document.paragraphs):
+        for i, para in enumerate(self.paragraph_index.paragraphs):
             if not para.text.strip():
                 continue  # Пропускаем пустые параграфы
                 
@@ -386,11 +600,9 @@ class DocumentProcessor:
                 
             # Пытаемся получить заголовок таблицы из предыдущего параграфа
             table_title = None
-            table_xml_element = table._element
-            prev_elem = table_xml_element.getprevious()
+            prev_para = self.paragraph_index.preceding_paragraph(table._element)
             
-            if prev_elem is not None and isinstance(prev_elem, CT_P):
-                prev_para = Paragraph(prev_elem, table._parent)
+            if prev_para is not None:
                 if prev_para.text.strip().lower().startswith('таблица'):
                     table_title = prev_para.text.strip()
             
@@ -427,7 +639,7 @@ class DocumentProcessor:
         Извлекает заголовки документа по уровням
         """
         headings = []
-        for i, para in enumerate(self.document.paragraphs):
+        for i, para in enumerate(self.paragraph_index.paragraphs):
             if para.style.name.startswith('Heading'):
                 try:
                     level = int(para.style.name.replace('Heading ', ''))
@@ -443,112 +655,114 @@ class DocumentProcessor:
                     'style': para.style.name,
                     'font': font_info,
                     'alignment': self._get_paragraph_alignment(para),
-                    'has_number': bool(re.match(r'^\d+(\.\d+)*\.?\s', para.text)),
+                    'has_number': bool(rx.HEADING_NUMBER.match(para.text)),
                     'has_ending_dot': para.text.strip().endswith('.'),
                     'all_caps': all(c.isupper() for c in para.text if c.isalpha()),
                     'para_format': self._get_paragraph_format(para)
                 })
         return headings
     
+    # Заголовки раздела списка литературы
+    BIBLIOGRAPHY_SECTION_TITLES = [
+        'список литературы', 'список используемых источников', 
+        'список использованных источников', 'список источников',
+        'библиографический список', 'библиография',
+        'список использованной литературы', 'литература',
+        'использованные источники', 'источники', 'использованная литература'
+    ]
+    
+    # Параграфы, которые могут означать окончание списка литературы
+    BIBLIOGRAPHY_END_IDENTIFIERS = [
+        'приложение', 'глоссарий', 'алфавитный указатель', 
+        'предметный указатель', 'указатель имен'
+    ]
+    
     def _extract_bibliography(self):
         """
         Пытается найти и извлечь список литературы
         """
         bibliography_items = []
         bibliography_started = False
-        bibliography_section_titles = [
-            'список литературы', 'список используемых источников', 
-            'список использованных источников', 'список источников',
-            'библиографический список', 'библиография',
-            'список использованной литературы', 'литература',
-            'использованные источники', 'источники', 'использованная литература'
-        ]
         
-        # Параграфы, которые могут означать окончание списка литературы
-        end_section_identifiers = [
-            'приложение', 'глоссарий', 'алфавитный указатель', 
-            'предметный указатель', 'указатель имен'
-        ]
-        
-        paragraphs = self.document.paragraphs
+        paragraphs = self.paragraph_index.paragraphs
         
         for i, para in enumerate(paragraphs):
             para_text = para.text.lower().strip()
             
             # Поиск начала списка литературы
             if not bibliography_started:
-                if any(para_text == title for title in bibliography_section_titles) or \
-                   any(para_text.startswith(title) for title in bibliography_section_titles):
+                if self._is_bibliography_title(para_text):
                     bibliography_started = True
-                    bibliography_heading_index = i
                     continue
             else:
+                is_heading = para.style.name.startswith('Heading')
                 # Проверка на окончание списка литературы
-                if para.style.name.startswith('Heading') or \
-                   any(para_text.startswith(end) for end in end_section_identifiers):
+                if is_heading or \
+                   any(para_text.startswith(end) for end in self.BIBLIOGRAPHY_END_IDENTIFIERS):
                     break
                 
                 # Пропускаем пустые параграфы
                 if not para_text:
                     continue
                 
-                # Проверка на наличие нумерации (например, "1. ", "1) ", "[1]", и т.д.)
-                is_numbered = bool(re.match(r'^\d+[\.\)\]]', para_text)) or \
-                              bool(re.match(r'^\[\d+\]', para_text))
-                
-                # Если параграф выглядит как библиографическая запись
-                if is_numbered or self._looks_like_bibliography_item(para_text):
-                    # Обрабатываем нумерацию, убирая её из текста
-                    clean_text = re.sub(r'^\d+[\.\)\]]?\s*', '', para_text)
-                    clean_text = re.sub(r'^\[\d+\]\s*', '', clean_text)
-                    
-                    # Добавляем в список, если это не просто номер
-                    if len(clean_text) > 3:  # проверка, что это не просто номер
-                        bibliography_items.append({
-                            'text': para.text,
-                            'index': i,
-                            'font': self._get_paragraph_font(para),
-                            'is_numbered': is_numbered,
-                            'alignment': self._get_paragraph_alignment(para)
-                        })
-                    
-                # Если параграф похож на продолжение предыдущей записи
-                elif bibliography_items and len(para_text) > 3 and not para.style.name.startswith('Heading'):
-                    # Проверяем, не начинается ли параграф с заглавной буквы 
-                    # (что может указывать на новую запись)
-                    if not (para_text[0].isupper() and bibliography_items[-1]['text'].endswith('.')):
-                        # Добавляем к предыдущей записи
-                        bibliography_items[-1]['text'] = f"{bibliography_items[-1]['text']} {para.text}"
-                    else:
-                        bibliography_items.append({
-                            'text': para.text,
-                            'index': i,
-                            'font': self._get_paragraph_font(para),
-                            'is_numbered': False,
-                            'alignment': self._get_paragraph_alignment(para)
-                        })
+                self._append_bibliography_item(bibliography_items, para, para_text, i, None, None, is_heading)
                 
         return bibliography_items
     
+    def _is_bibliography_title(self, para_text):
+        """
+        Проверяет, является ли текст (в нижнем регистре) заголовком списка литературы
+        """
+        return any(para_text.startswith(title) for title in self.BIBLIOGRAPHY_SECTION_TITLES)
+    
+    def _append_bibliography_item(self, bibliography_items, para, para_text, index, font_info, alignment, is_heading):
+        """
+        Добавляет параграф списка литературы как новую запись или продолжение предыдущей.
+        font_info и alignment можно передать заранее вычисленными, иначе они читаются из параграфа.
+        """
+        # Проверка на наличие нумерации (например, "1. ", "1) ", "[1]", и т.д.)
+        is_numbered = bool(rx.BIBLIOGRAPHY_NUMBERED.match(para_text)) or \
+                      bool(rx.BIBLIOGRAPHY_BRACKET_NUMBERED.match(para_text))
+        
+        # Если параграф выглядит как библиографическая запись
+        if is_numbered or self._looks_like_bibliography_item(para_text):
+            # Обрабатываем нумерацию, убирая её из текста
+            clean_text = rx.BIBLIOGRAPHY_NUMBER_PREFIX.sub('', para_text)
+            clean_text = rx.BIBLIOGRAPHY_BRACKET_PREFIX.sub('', clean_text)
+            
+            # Добавляем в список, если это не просто номер
+            if len(clean_text) > 3:  # проверка, что это не просто номер
+                bibliography_items.append({
+                    'text': para.text,
+                    'index': index,
+                    'font': dict(font_info) if font_info is not None else self._get_paragraph_font(para),
+                    'is_numbered': is_numbered,
+                    'alignment': alignment if font_info is not None else self._get_paragraph_alignment(para)
+                })
+            
+        # Если параграф похож на продолжение предыдущей записи
+        elif bibliography_items and len(para_text) > 3 and not is_heading:
+            # Проверяем, не начинается ли параграф с заглавной буквы 
+            # (что может указывать на новую запись)
+            if not (para_text[0].isupper() and bibliography_items[-1]['text'].endswith('.')):
+                # Добавляем к предыдущей записи
+                bibliography_items[-1]['text'] = f"{bibliography_items[-1]['text']} {para.text}"
+            else:
+                bibliography_items.append({
+                    'text': para.text,
+                    'index': index,
+                    'font': dict(font_info) if font_info is not None else self._get_paragraph_font(para),
+                    'is_numbered': False,
+                    'alignment': alignment if font_info is not None else self._get_paragraph_alignment(para)
+                })
+    
     def _looks_like_bibliography_item(self, text):
         """
         Проверяет, похож ли текст на библиографическую запись
         """
-        # Типичные признаки библиографической записи
-        patterns = [
-            r'^[А-Я][а-я]+,\s[А-Я]\.',  # Фамилия, И.О.
-            r'\d{4}\.',  # Год издания с точкой
-            r'[–—-]\s\d+\sс\.',  # Указание на количество страниц
-            r'\[Электронный\sресурс\]',  # Электронный ресурс
-            r'URL:',  # URL
-            r'дата\sобращения',  # Дата обращения
-            r'ГОСТ\s',  # ГОСТ
-            r'№\s?\d+',  # Номер (для законов и постановлений)
-            r'от\s\d{2}\.\d{2}\.\d{4}',  # Дата (для законов и постановлений)
-        ]
-        
+        # Типичные признаки библиографической записи (см. regex_patterns.BIBLIOGRAPHY_ITEM_HINTS)
         # Если текст соответствует хотя бы одному из паттернов
-        return any(bool(re.search(pattern, text, re.IGNORECASE)) for pattern in patterns)
+        return any(pattern.search(text) for pattern in rx.BIBLIOGRAPHY_ITEM_HINTS)
     
     def _extract_styles(self):
         """
@@ -617,32 +831,24 @@ class DocumentProcessor:
         """
         images = []
         
+        index = self.paragraph_index
+        
         # Проход по всем параграфам для поиска рисунков
-        for i, paragraph in enumerate(self.document.paragraphs):
+        for i, paragraph in enumerate(index.paragraphs):
             if paragraph.text.strip().lower().startswith(('рис.', 'рисунок')):
                 # Это похоже на подпись к рисунку
                 image_caption = paragraph.text.strip()
                 
-                # Ищем предыдущий параграф, который может содержать изображение
-                j = i - 1
-                while j >= 0:
-                    prev_para = self.document.paragraphs[j]
-                    if hasattr(prev_para, 'runs'):
-                        for run in prev_para.runs:
-                            if hasattr(run, '_element') and run._element.findall('.//pic:pic', {'pic': 'http://schemas.openxmlformats.org/drawingml/2006/picture'}):
-                                images.append({
-                                    'caption': image_caption,
-                                    'caption_index': i,
-                                    'image_para_index': j,
-                                    'has_number': bool(re.search(r'рис\w*\s+\d+', image_caption.lower())),
-                                    'ends_with_dot': image_caption.endswith('.'),
-                                    'alignment': self._get_paragraph_alignment(paragraph)
-                                })
-                                break
-                    j -= 1
-                    # Ограничиваем поиск до 3 параграфов назад
-                    if j < i - 3:
-                        break
+                # Рисунки в пределах трех предыдущих параграфов берем из индекса
+                for j in index.images_for_caption(i):
+                    images.append({
+                        'caption': image_caption,
+                        'caption_index': i,
+                        'image_para_index': j,
+                        'has_number': bool(rx.IMAGE_CAPTION_NUMBER.search(image_caption.lower())),
+                        'ends_with_dot': image_caption.endswith('.'),
+                        'alignment': self._get_paragraph_alignment(paragraph)
+                    })
         
         return images
 
@@ -751,9 +957,10 @@ class DocumentProcessor:
         
         return page_numbers
 
-    def _extract_document_properties(self):
+    def _extract_document_properties(self, statistics=None):
         """
-        Извлекает метаданные документа
+        Извлекает метаданные документа.
+        statistics - заранее посчитанная статистика (из однопроходного извлечения)
         """
         properties = {}
         
@@ -768,11 +975,15 @@ class DocumentProcessor:
             properties['revision'] = cp.revision
             
         # Статистика документа
+        if statistics is not None:
+            properties['statistics'] = statistics
+            return properties
+        
         statistics = {
-            'paragraph_count': len(self.document.paragraphs),
+            'paragraph_count': len(self.paragraph_index),
             'table_count': len(self.document.tables),
             'section_count': len(self.document.sections),
-            'heading_count': sum(1 for para in self.document.paragraphs if para.style and para.style.name.startswith('Heading'))
+            'heading_count': sum(1 for para in self.paragraph_index.paragraphs if para.style and para.style.name.startswith('Heading'))
         }
         properties['statistics'] = statistics
         
@@ -780,11 +991,11 @@ class DocumentProcessor:
     
     def _get_paragraph_alignment(self, paragraph):
         """
-        Определяет выравнивание параграфа
+        Определяет выравнивание параграфа (прямое или унаследованное от стиля)
         """
         if paragraph.paragraph_format and paragraph.paragraph_format.alignment:
             return paragraph.paragraph_format.alignment
-        return None
+        return self._effective_paragraph_format(paragraph).get('alignment')
     
     def _get_paragraph_font(self, paragraph):
         """
@@ -818,6 +1029,13 @@ class DocumentProcessor:
                         font_info['color'] = font.color.rgb if hasattr(font.color, 'rgb') else None
                     else:
                         font_info['color'] = None
+                    
+                    # Значения, не заданные напрямую, берем из стилей, docDefaults и темы
+                    if any(font_info.get(key) is None for key in ('name', 'size', 'bold', 'italic', 'underline')):
+                        effective = self._effective_run_font(paragraph, main_run)
+                        for key in ('name', 'size', 'bold', 'italic', 'underline'):
+                            if font_info.get(key) is None:
+                                font_info[key] = effective.get(key)
                 
                 # Проверяем, одинаково ли форматирование во всех runs
                 if len(runs) > 1:
@@ -855,7 +1073,7 @@ class DocumentProcessor:
             pf = paragraph.paragraph_format
             if pf.line_spacing:
                 return pf.line_spacing
-        return None
+        return self._effective_paragraph_format(paragraph).get('line_spacing')
 
     def _get_paragraph_format(self, paragraph):
         """
@@ -874,7 +1092,35 @@ class DocumentProcessor:
             para_format['left_indent'] = pf.left_indent.cm if pf.left_indent else None
             para_format['right_indent'] = pf.right_indent.cm if pf.right_indent else None
             
+            # Не заданные напрямую значения берем из стиля и docDefaults
+            if any(value is None for value in para_format.values()):
+                effective = self._effective_paragraph_format(paragraph)
+                for key, value in para_format.items():
+                    if value is None:
+                        para_format[key] = effective.get(key)
+            
         return para_format
+    
+    def _effective_paragraph_format(self, paragraph):
+        """
+        Действующее форматирование параграфа с учетом стилей (см. FormattingResolver)
+        """
+        try:
+            return self.formatting_resolver.resolve_paragraph(paragraph._p)
+        except Exception as e:
+            print(f"Ошибка при определении форматирования параграфа по стилю: {str(e)}")
+            return {}
+    
+    def _effective_run_font(self, paragraph, run):
+        """
+        Действующий шрифт run с учетом стилей, docDefaults и темы (см. FormattingResolver)
+        """
+        try:
+            resolver = self.formatting_resolver
+            return resolver.resolve_run(run._r, resolver.paragraph_style_id(paragraph._p))
+        except Exception as e:
+            print(f"Ошибка при определении шрифта по стилю: {str(e)}")
+            return {}
 
     def _get_list_info(self, paragraph):
         """
@@ -887,7 +1133,7 @@ class DocumentProcessor:
         }
         
         # Проверка на нумерованный список по тексту
-        if re.match(r'^\d+[.)]\s', paragraph.text) or re.match(r'^[a-z][.)]\s', paragraph.text):
+        if rx.NUMBERED_ITEM.match(paragraph.text) or rx.LATIN_LETTER_ITEM.match(paragraph.text):
             list_info['is_list_item'] = True
             list_info['list_type'] = 'numbered'
             
@@ -897,7 +1143,7 @@ class DocumentProcessor:
                 list_info['list_level'] = int(indent / 0.5) if indent > 0 else 0
         
         # Проверка на маркированный список по тексту
-        elif re.match(r'^[•\-–—]\s', paragraph.text):
+        elif rx.BULLET_ITEM.match(paragraph.text):
             list_info['is_list_item'] = True
             list_info['list_type'] = 'bullet'
             
@@ -0,0 +1,194 @@
+"""
+Однопроходное применение исправлений форматирования параграфов.
+
+Исправления DocumentCorrector регистрируют, что они делают с параграфом
+и с каждым его run, а движок за один обход параграфов тела документа
+применяет их в порядке, заданном при вызове. Для каждого параграфа правила
+выполняются в том же порядке, что и отдельные проходы, поэтому результат
+совпадает с последовательным выполнением. Общие признаки параграфа (текст,
+стиль, список runs) вычисляются один раз и сбрасываются только после
+правил, изменяющих текст.
+
+Для точечных исправлений движок обходит только заданные позиции параграфов
+(и, при необходимости, заданные runs), так что время зависит от числа
+исправляемых мест, а не от размера документа.
+"""
+
+import time
+
+
+class CorrectionFacts:
+    """
+    Признаки параграфа тела документа, общие для правил форматирования
+    """
+
+    __slots__ = ('paragraph', 'position', 'index', '_text', '_runs')
+
+    def __init__(self, paragraph, position, index):
+        self.paragraph = paragraph
+        self.position = position
+        self.index = index
+        self._text = None
+        self._runs = None
+
+    @property
+    def text(self):
+        """
+        Текст параграфа (кешируется до изменения текста правилом)
+        """
+        if self._text is None:
+            self._text = self.paragraph.text
+        return self._text
+
+    @property
+    def stripped(self):
+        return self.text.strip()
+
+    @property
+    def runs(self):
+        """
+        Список runs параграфа (кешируется до изменения текста правилом)
+        """
+        if self._runs is None:
+            self._runs = self.paragraph.runs
+        return self._runs
+
+    @property
+    def style_name(self):
+        return self.index.style_name(self.paragraph)
+
+    @property
+    def is_heading(self):
+        return self.index.is_heading(self.paragraph)
+
+    @property
+    def in_table(self):
+        return self.index.is_table_paragraph(self.paragraph)
+
+    def invalidate(self):
+        """
+        Сбрасывает текст и runs после правила, изменившего содержимое параграфа
+        """
+        self._text = None
+        self._runs = None
+
+
+class FormattingRule:
+    """
+    Исправление форматирования, применяемое движком к каждому параграфу.
+
+    paragraph(facts, context) -> значение для run-обработчика; если оно ложно,
+        runs параграфа этим правилом не обрабатываются
+    run(run, facts, value, context) — обработка одного run параграфа
+    prepare(document) -> context — вызывается один раз перед обходом
+    finish(document, context) — вызывается после обхода (например, для таблиц)
+    changes_text: правило изменяет текст или состав runs параграфа
+    """
+
+    __slots__ = ('name', 'paragraph', 'run', 'prepare', 'finish', 'changes_text')
+
+    def __init__(self, name, paragraph, run=None, prepare=None, finish=None, changes_text=False):
+        self.name = name
+        self.paragraph = paragraph
+        self.run = run
+        self.prepare = prepare
+        self.finish = finish
+        self.changes_text = changes_text
+
+
+class FormattingEngine:
+    """
+    Движок однопроходного применения правил форматирования
+    """
+
+    def __init__(self):
+        self._rules = {}
+
+    def register(self, name, paragraph, run=None, prepare=None, finish=None, changes_text=False):
+        """
+        Регистрирует правило форматирования под именем
+        """
+        self._rules[name] = FormattingRule(name, paragraph, run, prepare, finish, changes_text)
+
+    def __contains__(self, name):
+        return name in self._rules
+
+    def names(self):
+        """
+        Имена зарегистрированных правил в порядке регистрации
+        """
+        return list(self._rules)
+
+    def run(self, document, index, names, timings=None, targets=None):
+        """
+        Применяет правила names за один обход параграфов
+        document: объект docx.Document
+        index: DocumentIndex документа
+        names: имена правил в порядке применения к каждому параграфу
+        timings: словарь, в который записывается время каждого правила в секундах
+        targets: {позиция параграфа: индексы runs или None (все runs)} — обходятся
+            только эти параграфы, а завершающие обработчики (finish) для всего
+            документа не вызываются; None — все параграфы
+        """
+        clock = time.perf_counter
+        active = []
+        for name in names:
+            rule = self._rules[name]
+            started = clock()
+            context = rule.prepare(document) if rule.prepare else None
+            if timings is not None:
+                timings[name] = timings.get(name, 0.0) + clock() - started
+            active.append((rule, context))
+
+        paragraphs = list(index.paragraphs)
+        if targets is None:
+            selected = ((position, paragraph, None) for position, paragraph in enumerate(paragraphs))
+        else:
+            selected = (
+                (position, paragraphs[position], targets[position])
+                for position in sorted(targets) if 0 <= position < len(paragraphs)
+            )
+
+        for position, paragraph, run_indexes in selected:
+            facts = CorrectionFacts(paragraph, position, index)
+            for rule, context in active:
+                started = clock() if timings is not None else None
+                self._apply(rule, facts, context, run_indexes)
+                if timings is not None:
+                    timings[rule.name] += clock() - started
+
+        if targets is not None:
+            return
+        for rule, context in active:
+            if rule.finish:
+                started = clock()
+                rule.finish(document, context)
+                if timings is not None:
+                    timings[rule.name] += clock() - started
+
+    @staticmethod
+    def _apply(rule, facts, context, run_indexes=None):
+        """
+        Применяет одно правило к параграфу и его runs
+        run_indexes: индексы обрабатываемых runs (None — все runs параграфа)
+        """
+        try:
+            value = rule.paragraph(facts, context)
+        except Exception as e:
+            print(f"ОШИБКА в правиле {rule.name} для параграфа '{facts.paragraph.text[:50]}...': {str(e)}")
+            value = None
+        if rule.changes_text:
+            facts.invalidate()
+
+        if value and rule.run:
+            runs = facts.runs
+            if run_indexes is not None:
+                runs = [runs[i] for i in sorted(run_indexes) if 0 <= i < len(runs)]
+            for run in runs:
+                try:
+                    rule.run(run, facts, value, context)
+                except Exception as e:
+                    print(f"ОШИБКА в правиле {rule.name} для run: {str(e)}")
+                    continue
+            if rule.changes_text:
+                facts.invalidate()
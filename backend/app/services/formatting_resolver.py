@@ -0,0 +1,402 @@
+"""
+Вычисление действующего (эффективного) форматирования параграфов и runs.
+
+python-docx возвращает только прямое форматирование: run.font.name равен None,
+если шрифт задан стилем, значениями по умолчанию документа или темой.
+FormattingResolver проходит цепочку docDefaults -> стиль (basedOn) -> стиль
+параграфа -> стиль run -> прямое форматирование и разрешает шрифты темы.
+Результаты кешируются на уровне документа, поэтому одинаково оформленные
+параграфы и runs не разбираются повторно.
+"""
+
+from lxml import etree
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+
+# Значения w:jc -> выравнивание python-docx
+_JC_ALIGNMENT = {
+    'left': WD_PARAGRAPH_ALIGNMENT.LEFT,
+    'start': WD_PARAGRAPH_ALIGNMENT.LEFT,
+    'center': WD_PARAGRAPH_ALIGNMENT.CENTER,
+    'right': WD_PARAGRAPH_ALIGNMENT.RIGHT,
+    'end': WD_PARAGRAPH_ALIGNMENT.RIGHT,
+    'both': WD_PARAGRAPH_ALIGNMENT.JUSTIFY,
+    'distribute': WD_PARAGRAPH_ALIGNMENT.DISTRIBUTE,
+}
+
+_FALSE_VALUES = ('0', 'false', 'off', 'none')
+
+_A_NS = 'http://schemas.openxmlformats.org/drawingml/2006/main'
+
+TWIPS_PER_PT = 20
+TWIPS_PER_CM = 566.929
+
+
+def _on_off(element):
+    """
+    Значение переключателя (w:b, w:i и т.п.)
+    """
+    val = element.get(qn('w:val'))
+    return val is None or val.lower() not in _FALSE_VALUES
+
+
+def _twips(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class FormattingResolver:
+    """
+    Резолвер действующего форматирования с кешем на уровне документа
+    """
+
+    def __init__(self, document):
+        """
+        Инициализация резолвера
+        document: объект docx.Document
+        """
+        self.document = document
+        styles_element = document.styles.element
+
+        self._styles = {}
+        self._default_paragraph_style = None
+        self._default_character_style = None
+        for style in styles_element.findall(qn('w:style')):
+            style_id = style.get(qn('w:styleId'))
+            if style_id is None:
+                continue
+            self._styles[style_id] = style
+            if style.get(qn('w:default')) in ('1', 'true', 'on'):
+                style_type = style.get(qn('w:type'))
+                if style_type == 'paragraph':
+                    self._default_paragraph_style = style_id
+                elif style_type == 'character':
+                    self._default_character_style = style_id
+
+        self.theme_fonts = self._read_theme_fonts()
+
+        # Значения по умолчанию документа
+        self._default_run_props = {}
+        self._default_para_props = {}
+        doc_defaults = styles_element.find(qn('w:docDefaults'))
+        if doc_defaults is not None:
+            rpr = doc_defaults.find(qn('w:rPrDefault') + '/' + qn('w:rPr'))
+            if rpr is not None:
+                self._default_run_props = self._parse_rpr(rpr)
+            ppr = doc_defaults.find(qn('w:pPrDefault') + '/' + qn('w:pPr'))
+            if ppr is not None:
+                self._default_para_props = self._parse_ppr(ppr)
+
+        # Кеши
+        self._style_run_cache = {}
+        self._style_para_cache = {}
+        self._run_cache = {}
+        self._para_cache = {}
+        self._inherited_run_cache = {}
+        self._inherited_para_cache = {}
+
+    def _read_theme_fonts(self):
+        """
+        Читает шрифты темы (major/minor, latin)
+        """
+        fonts = {'major': None, 'minor': None}
+        try:
+            theme_part = self.document.part.part_related_by(RT.THEME)
+        except (KeyError, AttributeError):
+            return fonts
+        try:
+            root = etree.fromstring(theme_part.blob)
+        except Exception as e:
+            print(f"Ошибка при чтении темы документа: {str(e)}")
+            return fonts
+        for kind in ('major', 'minor'):
+            latin = root.find(f'.//{{{_A_NS}}}{kind}Font/{{{_A_NS}}}latin')
+            if latin is not None:
+                fonts[kind] = latin.get('typeface') or None
+        return fonts
+
+    def _parse_rpr(self, rpr):
+        """
+        Разбирает w:rPr в словарь заданных в нем свойств
+        """
+        props = {}
+        for child in rpr:
+            tag = child.tag
+            if tag == qn('w:rFonts'):
+                # Шрифт темы имеет приоритет над явно указанным w:ascii
+                name = None
+                theme = child.get(qn('w:asciiTheme'))
+                if theme:
+                    name = self.theme_fonts.get('major' if theme.startswith('major') else 'minor')
+                if name is None:
+                    name = child.get(qn('w:ascii'))
+                if name is not None:
+                    props['name'] = name
+            elif tag == qn('w:sz'):
+                half_points = _twips(child.get(qn('w:val')))
+                if half_points is not None:
+                    props['size'] = half_points / 2.0
+            elif tag == qn('w:b'):
+                props['bold'] = _on_off(child)
+            elif tag == qn('w:i'):
+                props['italic'] = _on_off(child)
+            elif tag == qn('w:u'):
+                props['underline'] = (child.get(qn('w:val')) or 'single') != 'none'
+            elif tag == qn('w:color'):
+                props['color'] = child.get(qn('w:val'))
+            elif tag == qn('w:caps'):
+                props['all_caps'] = _on_off(child)
+        return props
+
+    def _parse_ppr(self, ppr):
+        """
+        Разбирает w:pPr в словарь заданных в нем свойств
+        """
+        props = {}
+        jc = ppr.find(qn('w:jc'))
+        if jc is not None and jc.get(qn('w:val')) in _JC_ALIGNMENT:
+            props['alignment'] = _JC_ALIGNMENT[jc.get(qn('w:val'))]
+
+        spacing = ppr.find(qn('w:spacing'))
+        if spacing is not None:
+            before = _twips(spacing.get(qn('w:before')))
+            if before is not None:
+                props['space_before'] = before / TWIPS_PER_PT
+            after = _twips(spacing.get(qn('w:after')))
+            if after is not None:
+                props['space_after'] = after / TWIPS_PER_PT
+            line = _twips(spacing.get(qn('w:line')))
+            if line is not None:
+                rule = spacing.get(qn('w:lineRule')) or 'auto'
+                if rule == 'auto':
+                    props['line_spacing'] = line / 240.0
+                else:
+                    # Точный интервал или "не менее" — в пунктах
+                    props['line_spacing'] = line / TWIPS_PER_PT
+                props['line_spacing_rule'] = rule
+
+        ind = ppr.find(qn('w:ind'))
+        if ind is not None:
+            first_line = _twips(ind.get(qn('w:firstLine')))
+            hanging = _twips(ind.get(qn('w:hanging')))
+            if hanging is not None:
+                props['first_line_indent'] = -hanging / TWIPS_PER_CM
+            elif first_line is not None:
+                props['first_line_indent'] = first_line / TWIPS_PER_CM
+            left = _twips(ind.get(qn('w:left')) or ind.get(qn('w:start')))
+            if left is not None:
+                props['left_indent'] = left / TWIPS_PER_CM
+            right = _twips(ind.get(qn('w:right')) or ind.get(qn('w:end')))
+            if right is not None:
+                props['right_indent'] = right / TWIPS_PER_CM
+
+        # Переносы и автоматический интервал между русским и латинским текстом
+        for tag, key in (('w:suppressAutoHyphens', 'suppress_auto_hyphens'), ('w:autoSpaceDE', 'auto_space_de')):
+            element = ppr.find(qn(tag))
+            if element is not None:
+                props[key] = _on_off(element)
+        return props
+
+    def _style_chain(self, style_id):
+        """
+        Цепочка стилей от базового к указанному (по basedOn)
+        """
+        chain = []
+        seen = set()
+        while style_id and style_id not in seen and style_id in self._styles:
+            seen.add(style_id)
+            style = self._styles[style_id]
+            chain.append(style)
+            based_on = style.find(qn('w:basedOn'))
+            style_id = based_on.get(qn('w:val')) if based_on is not None else None
+        chain.reverse()
+        return chain
+
+    def style_run_props(self, style_id):
+        """
+        Свойства run, заданные цепочкой стиля (без значений по умолчанию документа)
+        """
+        cached = self._style_run_cache.get(style_id)
+        if cached is not None:
+            return cached
+        props = {}
+        for style in self._style_chain(style_id):
+            rpr = style.find(qn('w:rPr'))
+            if rpr is not None:
+                props.update(self._parse_rpr(rpr))
+        self._style_run_cache[style_id] = props
+        return props
+
+    def style_paragraph_props(self, style_id):
+        """
+        Свойства параграфа, заданные цепочкой стиля (без значений по умолчанию документа)
+        """
+        cached = self._style_para_cache.get(style_id)
+        if cached is not None:
+            return cached
+        props = {}
+        for style in self._style_chain(style_id):
+            ppr = style.find(qn('w:pPr'))
+            if ppr is not None:
+                props.update(self._parse_ppr(ppr))
+        self._style_para_cache[style_id] = props
+        return props
+
+    def paragraph_style_id(self, p_element):
+        """
+        Идентификатор стиля параграфа (или стиль по умолчанию)
+        """
+        ppr = p_element.pPr
+        if ppr is not None and ppr.pStyle is not None:
+            return ppr.pStyle.val
+        return self._default_paragraph_style
+
+    def resolve_run(self, r_element, paragraph_style_id=None):
+        """
+        Действующие свойства run: name, size, bold, italic, underline, color, all_caps
+        """
+        rpr = r_element.rPr
+        run_style_id = None
+        signature = b''
+        if rpr is not None:
+            if rpr.rStyle is not None:
+                run_style_id = rpr.rStyle.val
+            signature = etree.tostring(rpr)
+        key = (paragraph_style_id, run_style_id, signature)
+        cached = self._run_cache.get(key)
+        if cached is not None:
+            return cached
+
+        props = dict(self.resolve_style_run(paragraph_style_id, run_style_id))
+        if rpr is not None:
+            props.update(self._parse_rpr(rpr))
+
+        self._run_cache[key] = props
+        return props
+
+    def direct_run_props(self, r_element):
+        """
+        Свойства, заданные прямым форматированием run (только указанные в его w:rPr)
+        """
+        rpr = r_element.rPr
+        return self._parse_rpr(rpr) if rpr is not None else {}
+
+    def resolve_style_run(self, paragraph_style_id=None, run_style_id=None):
+        """
+        Свойства run, унаследованные от значений по умолчанию документа, стиля
+        параграфа и стиля run (без прямого форматирования run)
+        """
+        key = (paragraph_style_id, run_style_id)
+        cached = self._inherited_run_cache.get(key)
+        if cached is not None:
+            return cached
+
+        props = {
+            'name': None, 'size': None, 'bold': False, 'italic': False,
+            'underline': False, 'color': None, 'all_caps': False
+        }
+        props.update(self._default_run_props)
+        if paragraph_style_id:
+            props.update(self.style_run_props(paragraph_style_id))
+        props.update(self.style_run_props(run_style_id or self._default_character_style))
+
+        self._inherited_run_cache[key] = props
+        return props
+
+    def resolve_paragraph(self, p_element):
+        """
+        Действующие свойства параграфа: alignment, line_spacing, line_spacing_rule,
+        space_before/space_after (pt), first_line_indent/left_indent/right_indent (см),
+        suppress_auto_hyphens, auto_space_de
+        """
+        style_id = self.paragraph_style_id(p_element)
+        ppr = p_element.pPr
+        signature = etree.tostring(ppr) if ppr is not None else b''
+        key = (style_id, signature)
+        cached = self._para_cache.get(key)
+        if cached is not None:
+            return cached
+
+        props = dict(self.resolve_style_paragraph(style_id))
+        if ppr is not None:
+            props.update(self._parse_ppr(ppr))
+
+        self._para_cache[key] = props
+        return props
+
+    def direct_paragraph_props(self, p_element):
+        """
+        Свойства, заданные прямым форматированием параграфа (только указанные в его w:pPr)
+        """
+        ppr = p_element.pPr
+        return self._parse_ppr(ppr) if ppr is not None else {}
+
+    def resolve_style_paragraph(self, style_id):
+        """
+        Свойства параграфа, унаследованные от значений по умолчанию документа
+        и стиля (без прямого форматирования параграфа)
+        """
+        cached = self._inherited_para_cache.get(style_id)
+        if cached is not None:
+            return cached
+
+        props = {
+            'alignment': None, 'line_spacing': None, 'line_spacing_rule': None,
+            'space_before': None, 'space_after': None,
+            'first_line_indent': None, 'left_indent': None, 'right_indent': None,
+            'suppress_auto_hyphens': False, 'auto_space_de': True
+        }
+        props.update(self._default_para_props)
+        if style_id:
+            props.update(self.style_paragraph_props(style_id))
+
+        self._inherited_para_cache[style_id] = props
+        return props
+
+    def resolve_paragraph_font(self, paragraph):
+        """
+        Действующий шрифт первого run параграфа (или стиля, если runs нет)
+        """
+        p_element = paragraph._p
+        style_id = self.paragraph_style_id(p_element)
+        r_lst = p_element.r_lst
+        if r_lst:
+            return self.resolve_run(r_lst[0], style_id)
+        props = dict(self._default_run_props)
+        if style_id:
+            props.update(self.style_run_props(style_id))
+        return props
+
+    def inherited_formatting(self, paragraph_style_id, run_style_id=None):
+        """
+        Все, что параграф получает от стилей и темы: имя стиля параграфа,
+        унаследованные свойства run и параграфа, шрифты темы. Если после изменения
+        стилей результат для параграфа с неизмененной разметкой тот же, не изменилось
+        и его действующее форматирование
+        """
+        style = self._styles.get(paragraph_style_id)
+        name = style.find(qn('w:name')) if style is not None else None
+        return (
+            name.get(qn('w:val')) if name is not None else None,
+            self.resolve_style_run(paragraph_style_id, run_style_id),
+            self.resolve_style_paragraph(paragraph_style_id),
+            self.theme_fonts,
+        )
+
+    def paragraph_inherited_formatting(self, p_element):
+        """
+        inherited_formatting() для параграфа: по его стилю и стилю первого run
+        """
+        r_lst = p_element.r_lst
+        rpr = r_lst[0].rPr if r_lst else None
+        run_style_id = rpr.rStyle.val if rpr is not None and rpr.rStyle is not None else None
+        return self.inherited_formatting(self.paragraph_style_id(p_element), run_style_id)
+
+    def invalidate(self):
+        """
+        Сбрасывает кеши (после изменения стилей документа)
+        """
+        self.__init__(self.document)
@@ -0,0 +1,508 @@
+"""
+Очередь заданий обработки документов с пулом рабочих процессов.
+
+Задание (функция и аргументы) выполняется в ProcessPoolExecutor, а его
+состояние хранится в памяти процесса сервера и доступно по идентификатору.
+Число ожидающих заданий ограничено: при заполненной очереди submit()
+отклоняет новое задание (QueueFullError). Если рабочий процесс аварийно
+завершился (BrokenProcessPool), пул пересоздается, а прерванные задания
+ставятся в очередь повторно. Аварийное завершение ломает пул целиком, и
+ошибку получают все его задания, поэтому попытка засчитывается только
+заданию, которое точно выполнялось в завершившемся процессе: единственному
+начатому в пуле (рабочий процесс сообщает о начале задания событием started).
+Такое задание повторяется отдельно от остальных — в пуле изоляции из одного
+процесса, где задания выполняются по одному, — не более max_attempts попыток.
+Если начатых заданий было несколько (или о начале не сообщило ни одно),
+виновника не определить: начатые задания без учета попытки переходят в пул
+изоляции, где аварийное завершение однозначно указывает на документ, а не
+начатые просто ставятся в обычный пул повторно. Исключение, выброшенное самим
+заданием, повторной попытки не вызывает: результат обработки того же
+документа был бы тем же.
+
+Рабочие процессы по умолчанию создаются сервером forkserver, заранее
+загрузившим сервисы обработки (см. job_worker), и заменяются новыми после
+max_tasks_per_worker заданий. Если после задания резидентная память процесса
+превысила max_worker_rss, пул заменяется целиком: новые задания идут в новый
+пул, а процессы старого завершаются после уже переданных им заданий.
+
+Ход выполнения задания доступен как последовательность событий (events()):
+queued, события рабочего процесса (started и переданные через
+job_worker.report_progress), retry при повторе с учетом попытки, requeued
+при повторе без ее учета и завершающее done или failed.
+Рабочие процессы передают события через общую очередь multiprocessing,
+которую разбирает отдельный поток сервера; завершающее событие добавляется
+только после всех событий рабочего процесса.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+import uuid
+import weakref
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .job_worker import JOB_EVENTS_END, PRELOAD_MODULES, init_worker, run_job
+
+# Состояния задания
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RESULT_TTL = 3600
+DEFAULT_MAX_TASKS_PER_WORKER = 100
+DEFAULT_MAX_WORKER_RSS_MB = 1024
+# Сколько секунд после завершения задания ждать последних событий рабочего процесса
+EVENTS_GRACE = 5
+# Способы запуска рабочих процессов: fork не используется — сервер Flask многопоточный
+JOB_START_METHODS = ('forkserver', 'spawn')
+
+
+class QueueFullError(Exception):
+    """
+    Очередь заданий заполнена
+    """
+
+
+def _int_env(name, default, minimum):
+    """
+    Целое значение переменной окружения (не меньше minimum) или default
+    """
+    value = os.environ.get(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        number = int(value)
+        if number < minimum:
+            raise ValueError(value)
+    except ValueError:
+        print(f"Некорректное значение {name}={value}, используется {default}")
+        return default
+    return number
+
+
+def get_job_queue_config():
+    """
+    Настройки очереди заданий из переменных окружения:
+    JOB_WORKERS (число рабочих процессов, по умолчанию число ядер),
+    JOB_QUEUE_SIZE (сколько заданий может ждать свободного процесса, 32),
+    JOB_MAX_ATTEMPTS (попыток при аварийном завершении процесса, 3),
+    JOB_RESULT_TTL (сколько секунд хранятся завершенные задания, 3600),
+    JOB_WORKER_MAX_TASKS (заданий до замены рабочего процесса, 100; 0 — без замены),
+    JOB_WORKER_MAX_RSS_MB (порог резидентной памяти процесса, 1024; 0 — без порога),
+    JOB_START_METHOD (forkserver | spawn; по умолчанию forkserver, где он доступен)
+    """
+    start_method = os.environ.get('JOB_START_METHOD', '').strip().lower() or default_start_method()
+    if start_method not in JOB_START_METHODS or start_method not in multiprocessing.get_all_start_methods():
+        print(f"Недоступный способ запуска JOB_START_METHOD={start_method}, используется {default_start_method()}")
+        start_method = default_start_method()
+    max_rss_mb = _int_env('JOB_WORKER_MAX_RSS_MB', DEFAULT_MAX_WORKER_RSS_MB, 0)
+    return {
+        'workers': _int_env('JOB_WORKERS', os.cpu_count() or 1, 1),
+        'queue_size': _int_env('JOB_QUEUE_SIZE', DEFAULT_QUEUE_SIZE, 0),
+        'max_attempts': _int_env('JOB_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS, 1),
+        'result_ttl': _int_env('JOB_RESULT_TTL', DEFAULT_RESULT_TTL, 0),
+        'max_tasks_per_worker': _int_env('JOB_WORKER_MAX_TASKS', DEFAULT_MAX_TASKS_PER_WORKER, 0) or None,
+        'max_worker_rss': max_rss_mb * 1024 * 1024 or None,
+        'start_method': start_method,
+    }
+
+
+def default_start_method():
+    """
+    forkserver, если он доступен (Linux, macOS), иначе spawn (Windows)
+    """
+    return 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class JobQueue:
+    """
+    Ограниченная очередь заданий над пулом рабочих процессов
+    """
+
+    def __init__(self, workers=1, queue_size=DEFAULT_QUEUE_SIZE, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 result_ttl=DEFAULT_RESULT_TTL, max_tasks_per_worker=DEFAULT_MAX_TASKS_PER_WORKER,
+                 max_worker_rss=None, start_method=None):
+        """
+        Инициализация очереди
+        workers: число рабочих процессов
+        queue_size: сколько заданий может ожидать сверх выполняемых
+        max_attempts: число попыток выполнения при аварийном завершении процесса
+        result_ttl: время хранения завершенных заданий в секундах
+        max_tasks_per_worker: заданий до замены рабочего процесса (None — без замены)
+        max_worker_rss: порог резидентной памяти рабочего процесса в байтах (None — без порога)
+        start_method: forkserver или spawn (None — default_start_method())
+        """
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.result_ttl = result_ttl
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_worker_rss = max_worker_rss
+        self.start_method = start_method or default_start_method()
+        self.recycled_pools = 0
+        self._jobs = {}
+        # Обработчик завершения может вызваться сразу в add_done_callback под этой блокировкой
+        self._lock = threading.RLock()
+        self._state_changed = threading.Condition(self._lock)
+        self._events_queue = None
+        self._pool = None
+        # Пул изоляции: задания, подозреваемые в аварийном завершении процесса, по одному
+        self._isolation_pool = None
+        self._isolated = deque()
+        self._isolated_job = None
+        # Задания, начатые в сломанном пуле на момент первого сообщения об ошибке
+        self._crashes = weakref.WeakKeyDictionary()
+
+    def submit(self, fn, *args, **meta):
+        """
+        Ставит в очередь вызов fn(*args) и возвращает идентификатор задания.
+        fn должна быть функцией верхнего уровня модуля (передается в рабочий процесс).
+        meta — дополнительные сведения о задании, возвращаемые в get().
+        """
+        with self._lock:
+            self._prune()
+            pending = sum(1 for job in self._jobs.values() if job['status'] in (JOB_QUEUED, JOB_RUNNING))
+            if pending >= self.workers + self.queue_size:
+                raise QueueFullError(f"Очередь заполнена: {pending} заданий в обработке")
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'id': job_id,
+                'status': JOB_QUEUED,
+                'fn': fn,
+                'args': args,
+                'meta': meta,
+                'attempts': 0,
+                'created_at': time.time(),
+                'finished_at': None,
+                'result': None,
+                'error': None,
+                'future': None,
+                'pool': None,
+                'pid': None,
+                'events': [],
+                'events_closed': False,
+                'worker_events_done': False,
+            }
+            self._add_event(self._jobs[job_id], JOB_QUEUED)
+            self._start(self._jobs[job_id])
+        return job_id
+
+    def get(self, job_id):
+        """
+        Состояние задания (словарь без внутренних полей) или None, если задания нет
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            status = job['status']
+            if status == JOB_QUEUED and job['future'] is not None and job['future'].running():
+                status = JOB_RUNNING
+            return {
+                'id': job['id'],
+                'status': status,
+                'attempts': job['attempts'],
+                'created_at': job['created_at'],
+                'finished_at': job['finished_at'],
+                'result': job['result'],
+                'error': job['error'],
+                **job['meta'],
+            }
+
+    def events(self, job_id, start=0, timeout=None):
+        """
+        События задания начиная с номера start; если новых событий нет, ждет их
+        не дольше timeout секунд. Возвращает (список событий, завершен ли поток событий)
+        или None, если задания нет. Событие: {'id', 'event', 'data', 'time'}.
+        """
+        with self._state_changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            self._state_changed.wait_for(
+                lambda: len(job['events']) > start or self._events_complete(job), timeout)
+            return job['events'][start:], job['events_closed']
+
+    def wait(self, job_ids, timeout=None):
+        """
+        Ждет завершения хотя бы одного из заданий job_ids не дольше timeout секунд.
+        Возвращает список завершенных (или уже удаленных) заданий из job_ids.
+        """
+        with self._state_changed:
+            self._state_changed.wait_for(lambda: any(self._is_finished(job_id) for job_id in job_ids), timeout)
+            return [job_id for job_id in job_ids if self._is_finished(job_id)]
+
+    def stats(self):
+        """
+        Число заданий в каждом состоянии
+        """
+        with self._lock:
+            counts = {JOB_QUEUED: 0, JOB_RUNNING: 0, JOB_DONE: 0, JOB_FAILED: 0}
+            for job in self._jobs.values():
+                status = job['status']
+                if status == JOB_QUEUED and job['future'] is not None and job['future'].running():
+                    status = JOB_RUNNING
+                counts[status] += 1
+            return counts
+
+    def shutdown(self, wait=True):
+        """
+        Останавливает пул рабочих процессов
+        """
+        with self._lock:
+            pools = [pool for pool in (self._pool, self._isolation_pool) if pool is not None]
+            self._pool = self._isolation_pool = None
+            self._isolated.clear()
+            events_queue, self._events_queue = self._events_queue, None
+        for pool in pools:
+            pool.shutdown(wait=wait, cancel_futures=not wait)
+        if events_queue is not None:
+            events_queue.put(None)
+
+    def _create_pool(self, workers=None):
+        """
+        Новый пул рабочих процессов (workers — их число, по умолчанию self.workers);
+        при forkserver сервер один раз загружает PRELOAD_MODULES, и все рабочие
+        процессы получают их уже импортированными
+        """
+        context = multiprocessing.get_context(self.start_method)
+        if self.start_method == 'forkserver':
+            context.set_forkserver_preload(list(PRELOAD_MODULES))
+        if self._events_queue is None:
+            # Запись без фонового потока: событие started попадает к серверу,
+            # даже если процесс аварийно завершится сразу после него
+            self._events_queue = context.SimpleQueue()
+            threading.Thread(target=self._read_events, args=(self._events_queue,),
+                             name='job-events', daemon=True).start()
+        return ProcessPoolExecutor(
+            max_workers=workers or self.workers,
+            mp_context=context,
+            initializer=init_worker,
+            initargs=(self._events_queue,),
+            max_tasks_per_child=self.max_tasks_per_worker,
+        )
+
+    def _start(self, job, isolated=False):
+        """
+        Передает задание в пул (вызывается под self._lock);
+        isolated — в пул изоляции, после уже ожидающих его заданий
+        """
+        if isolated:
+            job['future'] = None
+            self._isolated.append(job['id'])
+            self._start_isolated()
+            return
+        if self._pool is None:
+            self._pool = self._create_pool()
+        job['attempts'] += 1
+        try:
+            self._submit(job, self._pool)
+        except BrokenProcessPool:
+            # Пул сломан другим заданием, но его обработчик еще не успел пересоздать пул
+            self._pool = self._create_pool()
+            self._submit(job, self._pool)
+
+    def _start_isolated(self):
+        """
+        Передает в пул изоляции следующее ожидающее задание, если в нем ничего
+        не выполняется (вызывается под self._lock)
+        """
+        while self._isolated_job is None and self._isolated:
+            job = self._jobs.get(self._isolated.popleft())
+            if job is None or job['status'] != JOB_QUEUED:
+                continue
+            if self._isolation_pool is None:
+                self._isolation_pool = self._create_pool(workers=1)
+            job['attempts'] += 1
+            try:
+                self._submit(job, self._isolation_pool)
+            except BrokenProcessPool:
+                self._isolation_pool = self._create_pool(workers=1)
+                self._submit(job, self._isolation_pool)
+            self._isolated_job = job['id']
+
+    def _submit(self, job, pool):
+        """
+        Передает задание в пул pool (вызывается под self._lock)
+        """
+        job['worker_events_done'] = False
+        job['pid'] = None
+        job['pool'] = pool
+        future = pool.submit(run_job, job['fn'], job['args'], job['id'])
+        job['future'] = future
+        future.add_done_callback(lambda done: self._finished(job['id'], pool, done))
+
+    def _finished(self, job_id, pool, future):
+        """
+        Обработчик завершения задания: сохраняет результат или повторяет задание
+        после аварийного завершения рабочего процесса; заменяет пул, если рабочий
+        процесс превысил порог памяти
+        """
+        retired_pools = []
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['future'] is not future:
+                return
+            isolated = pool is self._isolation_pool and self._isolated_job == job_id
+            if isolated:
+                self._isolated_job = None
+            try:
+                job['result'], rss = future.result()
+                job['status'] = JOB_DONE
+                if self.max_worker_rss and rss and rss > self.max_worker_rss and self._pool is pool:
+                    print(f"Рабочий процесс занимает {rss // (1024 * 1024)} МБ "
+                          f"(порог {self.max_worker_rss // (1024 * 1024)} МБ), пул заменяется")
+                    retired_pools.append(pool)
+                    self._pool = None
+                    self.recycled_pools += 1
+            except BrokenProcessPool:
+                if self._pool is pool:
+                    # Пул непригоден: новые и повторные задания пойдут в новый пул
+                    retired_pools.append(pool)
+                    self._pool = None
+                elif self._isolation_pool is pool:
+                    retired_pools.append(pool)
+                    self._isolation_pool = None
+                self._crashed(job, pool, isolated)
+            except Exception as e:
+                job['status'] = JOB_FAILED
+                job['error'] = f"{type(e).__name__}: {str(e)}"
+                traceback.print_exception(type(e), e, e.__traceback__)
+            if job['status'] in (JOB_DONE, JOB_FAILED):
+                job['finished_at'] = time.time()
+                job['args'] = None
+                job['pool'] = None
+                self._events_complete(job)
+                self._state_changed.notify_all()
+            self._start_isolated()
+            if self._isolation_pool is not None and self._isolated_job is None and not self._isolated:
+                # Подозреваемых заданий больше нет: процесс изоляции не нужен
+                retired_pools.append(self._isolation_pool)
+                self._isolation_pool = None
+        for retired_pool in retired_pools:
+            retired_pool.shutdown(wait=False)
+
+    def _crashed(self, job, pool, isolated):
+        """
+        Повторяет задание, прерванное аварийным завершением рабочего процесса
+        (вызывается под self._lock). Попытка засчитывается, только если задание
+        точно выполнялось в завершившемся процессе: единственное в пуле изоляции
+        или единственное начатое в обычном пуле
+        """
+        if pool not in self._crashes:
+            self._crashes[pool] = {
+                other['id'] for other in self._jobs.values()
+                if other['pool'] is pool and other['pid'] is not None and not self._succeeded(other['future'])
+            }
+        started = self._crashes[pool]
+        if not isolated and started != {job['id']}:
+            # Виновник не определен: начатые задания (или все, если о начале
+            # не сообщило ни одно) проверяются по одному, не начатые повторяются как есть
+            suspect = not started or job['id'] in started
+            job['attempts'] -= 1
+            job['status'] = JOB_QUEUED
+            self._add_event(job, 'requeued', {'attempt': job['attempts'] + 1, 'isolated': suspect})
+            self._start(job, isolated=suspect)
+            return
+        if job['attempts'] < self.max_attempts:
+            print(f"Рабочий процесс аварийно завершился, задание {job['id']} "
+                  f"повторяется отдельно (попытка {job['attempts'] + 1} из {self.max_attempts})")
+            job['status'] = JOB_QUEUED
+            self._add_event(job, 'retry', {'attempt': job['attempts'] + 1, 'isolated': True})
+            self._start(job, isolated=True)
+        else:
+            job['status'] = JOB_FAILED
+            job['error'] = 'Рабочий процесс аварийно завершился'
+            # Процесс завершился, не передав конец событий: ждать их нечего
+            job['worker_events_done'] = True
+
+    @staticmethod
+    def _succeeded(future):
+        return future.done() and not future.cancelled() and future.exception() is None
+
+    def _read_events(self, events_queue):
+        """
+        Поток сервера: переносит события рабочих процессов в их задания
+        """
+        while True:
+            try:
+                item = events_queue.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            job_id, event, data = item
+            with self._state_changed:
+                job = self._jobs.get(job_id)
+                if job is None or job['events_closed']:
+                    continue
+                if event == JOB_EVENTS_END:
+                    job['worker_events_done'] = True
+                    self._events_complete(job)
+                    continue
+                if event == 'started':
+                    # Процесс, в котором начата попытка (см. _crashed)
+                    job['pid'] = (data or {}).get('pid')
+                self._add_event(job, event, data)
+
+    def _is_finished(self, job_id):
+        """
+        Задание завершено или уже удалено (вызывается под self._lock)
+        """
+        job = self._jobs.get(job_id)
+        return job is None or job['finished_at'] is not None
+
+    def _add_event(self, job, event, data=None):
+        """
+        Добавляет событие задания и будит ожидающих events() (вызывается под self._lock)
+        """
+        job['events'].append({'id': len(job['events']), 'event': event, 'data': data, 'time': time.time()})
+        self._state_changed.notify_all()
+
+    def _events_complete(self, job):
+        """
+        Добавляет завершающее событие, если задание завершено и события рабочего
+        процесса получены (или их нет дольше EVENTS_GRACE). Вызывается под self._lock.
+        """
+        if job['events_closed']:
+            return True
+        if job['finished_at'] is None:
+            return False
+        if not job['worker_events_done'] and time.time() - job['finished_at'] < EVENTS_GRACE:
+            return False
+        job['events_closed'] = True
+        self._add_event(job, job['status'], {'attempts': job['attempts'], 'error': job['error']})
+        return True
+
+    def _prune(self):
+        """
+        Удаляет завершенные задания старше result_ttl (вызывается под self._lock)
+        """
+        expired = time.time() - self.result_ttl
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job['finished_at'] is not None and job['finished_at'] < expired]:
+            del self._jobs[job_id]
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """
+    Общая очередь заданий процесса (создается при первом обращении,
+    настраивается переменными окружения, см. get_job_queue_config)
+    """
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue(**get_job_queue_config())
+    return _job_queue
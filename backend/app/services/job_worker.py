@@ -0,0 +1,113 @@
+"""
+Рабочие процессы очереди заданий: предзагрузка и учет памяти.
+
+Рабочие процессы создаются сервером forkserver. Он один раз импортирует
+модули app.services и зависимости (python-docx, lxml, docxtpl, docxcompose,
+Flask, при включенном ИИ — google.generativeai) и прогревает общие объекты
+процесса: план выполнения проверок и разобранный шаблон титульного листа.
+Каждый рабочий процесс — fork уже прогретого сервера, поэтому первое задание
+не тратит время на импорт и подготовку.
+
+Задание выполняется через run_job(), который вместе с результатом возвращает
+размер резидентной памяти процесса: по нему JobQueue решает, пора ли заменить
+рабочие процессы (рост памяти lxml/python-docx от документа к документу).
+
+Во время задания report_progress() передает серверу события хода обработки
+(этапы и промежуточные результаты) через очередь, полученную при
+инициализации процесса. Вне рабочего процесса report_progress() ничего не делает.
+"""
+
+import os
+import sys
+
+# Модули, импортируемые сервером forkserver до создания рабочих процессов
+PRELOAD_MODULES = ('app.services.job_worker_preload',)
+
+# Служебное событие: рабочий процесс передал все события попытки задания
+JOB_EVENTS_END = '_end'
+
+_warmed_up = False
+_progress_queue = None
+_current_job = None
+
+
+def warm_up():
+    """
+    Импортирует сервисы обработки документов и прогревает общие объекты процесса
+    (повторный вызов ничего не делает)
+    """
+    global _warmed_up
+    if _warmed_up:
+        return
+    _warmed_up = True
+
+    import app.api.document_routes  # noqa: F401 — сервисы, Flask, python-docx, lxml
+    from app.services.ai_client import is_configured as ai_is_configured
+    from app.services.document_corrector import get_title_page_template
+    from app.services.norm_control_checker import get_rule_plan
+
+    get_rule_plan()
+    get_title_page_template()
+    if ai_is_configured():
+        try:
+            import google.generativeai  # noqa: F401
+        except ImportError:
+            pass
+
+
+def init_worker(progress_queue=None):
+    """
+    Инициализация рабочего процесса: при запуске без forkserver (spawn)
+    прогрев выполняется здесь, в самом процессе
+    progress_queue: очередь multiprocessing для событий хода обработки
+    """
+    global _progress_queue
+    _progress_queue = progress_queue
+    warm_up()
+
+
+def run_job(fn, args, job_id=None):
+    """
+    Выполняет задание в рабочем процессе.
+    Возвращает кортеж (результат fn(*args), резидентная память процесса в байтах или None)
+    """
+    global _current_job
+    _current_job = job_id
+    try:
+        report_progress('started', {'pid': os.getpid()})
+        result = fn(*args)
+    finally:
+        report_progress(JOB_EVENTS_END)
+        _current_job = None
+    return result, current_rss()
+
+
+def report_progress(event, data=None):
+    """
+    Передает событие хода обработки текущего задания (данные — JSON-совместимые);
+    вне задания рабочего процесса ничего не делает
+    """
+    if _progress_queue is None or _current_job is None:
+        return
+    try:
+        _progress_queue.put((_current_job, event, data))
+    except Exception as e:
+        print(f"Не удалось передать событие {event} задания {_current_job}: {str(e)}")
+
+
+def current_rss():
+    """
+    Текущая резидентная память процесса в байтах (None, если определить нельзя)
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Без /proc доступен только пиковый размер: в КБ в Linux, в байтах в macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
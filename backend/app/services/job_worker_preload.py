@@ -0,0 +1,11 @@
+"""
+Предзагрузка для сервера forkserver рабочих процессов очереди заданий.
+
+Импортируется только сервером forkserver (см. JobQueue и
+job_worker.PRELOAD_MODULES): прогревает процесс при импорте, чтобы рабочие
+процессы, создаваемые fork-ом сервера, получали его состояние готовым.
+"""
+
+from app.services.job_worker import warm_up
+
+warm_up()
@@ -0,0 +1,77 @@
+"""
+Ленивое представление document_data.
+
+Разделы документа (параграфы, таблицы, стили, колонтитулы и т.д.) извлекаются
+при первом обращении и кешируются. Проверки, которым нужна только часть данных,
+не платят за извлечение остальных разделов. Каждый раздел извлекается один
+раз, даже если его одновременно запрашивают несколько потоков (CHECK_EXECUTOR=thread).
+"""
+
+import threading
+from collections.abc import MutableMapping
+
+
+class LazyDocumentData(MutableMapping):
+    """
+    Словарь разделов document_data, вычисляемых по требованию.
+
+    loaders: упорядоченный словарь {ключ раздела: функция без аргументов}.
+    Порядок ключей совпадает с порядком loaders.
+    """
+
+    def __init__(self, loaders):
+        self._loaders = dict(loaders)
+        self._values = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def __getitem__(self, key):
+        if key in self._values:
+            return self._values[key]
+        if self._loaders.get(key) is None:
+            raise KeyError(key)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Остальные потоки ждут результата первого, а не извлекают раздел заново
+        with key_lock:
+            if key not in self._values:
+                self._values[key] = self._loaders[key]()
+            return self._values[key]
+
+    def __setitem__(self, key, value):
+        self._values[key] = value
+        if key not in self._loaders:
+            self._loaders[key] = None
+
+    def __delitem__(self, key):
+        if key not in self._loaders:
+            raise KeyError(key)
+        del self._loaders[key]
+        self._values.pop(key, None)
+
+    def __contains__(self, key):
+        return key in self._loaders
+
+    def __iter__(self):
+        return iter(self._loaders)
+
+    def __len__(self):
+        return len(self._loaders)
+
+    def __repr__(self):
+        return f"LazyDocumentData(loaded={self.loaded_sections()}, sections={list(self._loaders)})"
+
+    def loaded_sections(self):
+        """
+        Список уже извлеченных разделов
+        """
+        return [key for key in self._loaders if key in self._values]
+
+    def materialize(self, keys=None):
+        """
+        Извлекает разделы keys (по умолчанию все) и возвращает обычный словарь;
+        ключи, которых нет среди разделов, пропускаются
+        """
+        if keys is None:
+            keys = self._loaders
+        return {key: self[key] for key in keys if key in self._loaders}
@@ -1,10 +1,20 @@
 import os
-import re
 import json
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from docx.shared import Pt, Cm
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 from collections import defaultdict
 
+from .job_queue import default_start_method
+from .job_worker import PRELOAD_MODULES
+from .lazy_document_data import LazyDocumentData
+from .paragraph_index import index_paragraphs_by_position
+from .paragraph_visitor import ParagraphVisitorEngine
+from . import regex_patterns as rx
+
 # === NORM_RULES: 30 нормоконтрольных правил ===
 NORM_RULES = [
     {"id": 1, "name": "Наименование темы работы", "description": "Тема соответствует утвержденной приказом.", "checker": "_check_topic_title"},    {"id": 2, "name": "Размер шрифта", "description": "Размер основного шрифта — 14pt. Для листингов кода допустим 12pt.", "checker": "_check_font"},
@@ -38,6 +48,164 @@ NORM_RULES = [
     {"id": 30, "name": "Библиографические ссылки", "description": "[5], [1, с. 28] и т.д.", "checker": "_check_bibliography_references"},
 ]
 
+# Распределение замечаний общих проверок по нормам: несколько норм используют
+# одну функцию проверки, и ее замечания относятся к норме по типу замечания.
+# Замечания неуказанных типов относятся к первой норме группы.
+RULE_ISSUE_TYPES = {
+    2: ('font_size', 'font_consistency', 'font_missing_data'),
+    3: ('font_name',),
+    5: ('first_line_indent',),
+    9: ('paragraph_alignment',),
+    13: ('heading_alignment', 'heading_dot'),
+    15: ('heading_font_size', 'heading_bold'),
+    16: (),
+    24: ('table_title', 'table_title_format', 'data_missing'),
+    25: ('image_alignment', 'image_caption_dot', 'image_caption_format', 'image_number'),
+}
+
+
+class RulePlan:
+    """
+    Скомпилированный план выполнения норм: каждая функция проверки
+    вызывается один раз, а ее замечания распределяются по нормам по типу
+    """
+
+    def __init__(self, rules):
+        """
+        Инициализация плана
+        rules: список норм в формате NORM_RULES
+        """
+        self.rules = list(rules)
+        self.rules_by_id = {rule["id"]: rule for rule in self.rules}
+
+        groups = {}
+        for rule in self.rules:
+            groups.setdefault(rule["checker"], []).append(rule["id"])
+
+        # Шаги плана: (имя проверки, id норм группы, {тип замечания: id нормы})
+        self.steps = []
+        for checker, rule_ids in groups.items():
+            routes = {}
+            if len(rule_ids) > 1:
+                for rule_id in rule_ids:
+                    for issue_type in RULE_ISSUE_TYPES.get(rule_id, ()):
+                        routes[issue_type] = rule_id
+            self.steps.append((checker, tuple(rule_ids), routes))
+
+    def route(self, issues, rule_ids, routes):
+        """
+        Распределяет замечания одной проверки по выбранным нормам группы
+        issues: замечания, возвращенные проверкой
+        rule_ids: id выбранных норм группы (в порядке NORM_RULES)
+        routes: {тип замечания: id нормы}
+        Returns:
+            dict: {id нормы: список замечаний}
+        """
+        routed = {rule_id: [] for rule_id in rule_ids}
+        for issue in issues:
+            rule_id = routes.get(issue.get('type'))
+            if rule_id is None:
+                rule_id = rule_ids[0]
+            elif rule_id not in routed:
+                # Замечание относится к норме, которая не выбрана
+                continue
+            routed[rule_id].append(issue)
+        return routed
+
+
+_rule_plan = None
+
+
+def get_rule_plan():
+    """
+    Возвращает план выполнения NORM_RULES (строится один раз на процесс)
+    """
+    global _rule_plan
+    if _rule_plan is None:
+        _rule_plan = RulePlan(NORM_RULES)
+    return _rule_plan
+
+
+def parse_rule_ids(value):
+    """
+    Разбирает параметр rules ("2,3,6") в список идентификаторов норм.
+    Возвращает None, если параметр не задан. Бросает ValueError для неизвестных норм.
+    """
+    if value is None or not str(value).strip():
+        return None
+    known_ids = {rule['id'] for rule in NORM_RULES}
+    rule_ids = []
+    for part in str(value).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit() or int(part) not in known_ids:
+            raise ValueError(f"Неизвестная норма: {part}")
+        rule_ids.append(int(part))
+    return rule_ids or None
+
+
+# Режимы выполнения проверок: последовательно, пулом потоков или пулом процессов
+CHECK_EXECUTOR_MODES = ('serial', 'thread', 'process')
+
+# Сколько самых медленных проверок попадает в check_results['timing']['slowest']
+SLOWEST_RULES_LIMIT = 5
+
+# Доля измененных параграфов, выше которой повторная проверка выполняется полностью:
+# сопоставление с предыдущими данными тогда почти ничего не экономит
+RECHECK_MAX_CHANGED_SHARE = 0.8
+
+
+def get_check_executor_config():
+    """
+    Режим выполнения проверок из переменных окружения:
+    CHECK_EXECUTOR (serial | thread | process, по умолчанию serial)
+    и CHECK_WORKERS (размер пула, по умолчанию число ядер)
+    """
+    mode = os.environ.get('CHECK_EXECUTOR', 'serial').strip().lower()
+    if mode not in CHECK_EXECUTOR_MODES:
+        print(f"Неизвестный режим CHECK_EXECUTOR={mode}, используется serial")
+        mode = 'serial'
+    try:
+        workers = int(os.environ.get('CHECK_WORKERS') or 0)
+    except ValueError:
+        workers = 0
+    return mode, max(1, workers or os.cpu_count() or 1)
+
+
+_check_pools = {}
+_check_pools_lock = threading.Lock()
+
+
+def get_check_pool(mode, workers):
+    """
+    Общий для процесса пул выполнения проверок (создается при первом обращении)
+    """
+    key = (mode, workers)
+    with _check_pools_lock:
+        pool = _check_pools.get(key)
+        if pool is None:
+            if mode == 'process':
+                # fork из многопоточного сервера небезопасен: как и очередь заданий,
+                # используем forkserver (или spawn, где его нет)
+                start_method = default_start_method()
+                context = multiprocessing.get_context(start_method)
+                if start_method == 'forkserver':
+                    context.set_forkserver_preload(list(PRELOAD_MODULES))
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            else:
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='norm-check')
+            _check_pools[key] = pool
+        return pool
+
+
+def _run_check_batch(document_data, names):
+    """
+    Выполняет группу проверок в рабочем процессе
+    """
+    return NormControlChecker(executor='serial')._run_checks(document_data, names)
+
+
 class NormControlChecker:
     """
     Класс для проверки документа на соответствие требованиям нормоконтроля
@@ -52,7 +220,76 @@ class NormControlChecker:
         {'type': 'supervisor', 'keywords': ['руководитель'], 'case': 'title', 'min_lines_after': 4},
         {'type': 'city_year', 'keywords': ['город', 'благовещенск'], 'case': 'title', 'min_lines_after': 0},
     ]
-    def __init__(self):
+
+    # Однозначные числительные словами (для _check_numerals)
+    DIGIT_WORDS = {
+        '0': ['ноль', 'нулевой', 'нулевая', 'нулевое', 'нулевые'],
+        '1': ['один', 'одна', 'одно', 'первый', 'первая', 'первое', 'первые'],
+        '2': ['два', 'две', 'второй', 'вторая', 'второе', 'вторые'],
+        '3': ['три', 'третий', 'третья', 'третье', 'третьи'],
+        '4': ['четыре', 'четвертый', 'четвертая', 'четвертое', 'четвертые'],
+        '5': ['пять', 'пятый', 'пятая', 'пятое', 'пятые'],
+        '6': ['шесть', 'шестой', 'шестая', 'шестое', 'шестые'],
+        '7': ['семь', 'седьмой', 'седьмая', 'седьмое', 'седьмые'],
+        '8': ['восемь', 'восьмой', 'восьмая', 'восьмое', 'восьмые'],
+        '9': ['девять', 'девятый', 'девятая', 'девятое', 'девятые']
+    }
+    # Обратный словарь: слово -> цифра
+    WORD_TO_DIGIT = {word: digit for digit, words in DIGIT_WORDS.items() for word in words}
+
+    # Проверки, выполняемые за один проход по параграфам:
+    # {имя проверки: (обработчик параграфа, подготовка контекста или None)}
+    PARAGRAPH_VISITORS = {
+        '_check_font': ('_visit_font', None),
+        '_check_line_spacing': ('_visit_line_spacing', None),
+        '_check_paragraphs': ('_visit_paragraphs', None),
+        '_check_accents': ('_visit_accents', None),
+        '_check_heading_spacing': ('_visit_heading_spacing', None),
+        '_check_numerals': ('_visit_numerals', None),
+        '_check_ordinals': ('_visit_ordinals', None),
+        '_check_surnames': ('_visit_surnames', '_prepare_surnames'),
+    }
+    
+    # Разделы document_data, от которых зависит результат проверки. При повторной
+    # проверке исправленного документа проверка с неизменными разделами не выполняется
+    CHECK_DEPENDENCIES = {
+        '_check_font': ('paragraphs',),
+        '_check_margins': ('page_setup',),
+        '_check_line_spacing': ('paragraphs',),
+        '_check_paragraphs': ('paragraphs',),
+        '_check_headings': ('headings',),
+        '_check_bibliography': ('bibliography', 'paragraphs'),
+        '_check_images_and_tables': ('images', 'tables'),
+        '_check_page_numbers': ('page_numbers', 'page_setup', 'styles'),
+        '_check_lists': ('paragraphs',),
+        '_check_references': ('images', 'paragraphs', 'tables'),
+        '_check_document_structure': ('headings', 'paragraphs'),
+        '_check_title_page': ('page_numbers', 'paragraphs', 'title_page'),
+        '_check_topic_title': ('title_page',),
+        '_check_accents': ('paragraphs',),
+        '_check_page_count': ('appendices', 'appendices_start_page', 'page_count', 'title_page'),
+        '_check_heading_spacing': ('paragraphs',),
+        '_check_section_start': ('pages', 'paragraphs', 'paragraphs_pages'),
+        '_check_chapter_conclusion': ('paragraphs',),
+        '_check_appendices': ('appendices', 'appendices_start_index', 'appendices_start_page',
+                              'paragraphs', 'paragraphs_pages'),
+        '_check_numerals': ('paragraphs',),
+        '_check_ordinals': ('paragraphs',),
+        '_check_surnames': ('paragraphs', 'bibliography'),
+        '_check_toc': ('headings', 'toc'),
+        '_check_numbering': ('appendices', 'formulas', 'images', 'tables'),
+    }
+    
+    def __init__(self, executor=None, max_workers=None):
+        """
+        executor: режим выполнения проверок (serial, thread, process);
+                  None — из переменной окружения CHECK_EXECUTOR
+        max_workers: размер пула; None — из CHECK_WORKERS
+        """
+        config_mode, config_workers = get_check_executor_config()
+        self.executor = executor if executor in CHECK_EXECUTOR_MODES else config_mode
+        self.max_workers = max_workers or config_workers
+        
         # Стандартные правила для курсовых работ
         self.standard_rules = {
             'font': {
@@ -91,17 +328,6 @@ class NormControlChecker:
             ]
         }
         
-        # Улучшенные паттерны для проверки литературы
-        self.bibliography_patterns = {
-            'one_author': r'^[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\.\s.*\s[–—-]\s.*,\s\d{4}\.\s[–—-]\s\d+\sс\.?$',
-            '2_3_authors': r'^[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\.,\s[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\..*\s[–—-]\s.*,\s\d{4}\.\s[–—-]\s\d+\sс\.?$',
-            '4_authors': r'^[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\.,\s[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\.,\s[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\.,\s[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\..*$',
-            '5_plus_authors': r'^.*\[и\sдр\.\].*$',
-            'web_resource': r'^.*\s?\[Электронный\sресурс\]\s?.*URL:\s.+\s\(дата\sобращения:?\s\d{2}\.\d{2}\.\d{4}\)\.?$',
-            'law': r'^.*(закон|постановление|указ|кодекс).*от\s\d{2}\.\d{2}\.\d{4}.*№.*$',
-            'gost': r'^ГОСТ\s.*[–—-]\s\d{4}.*$'
-        }
-        
         # Типовые сообщения об ошибках
         self.bibliography_error_messages = {
             'one_author': "Неправильное оформление источника с одним автором. Должно быть: 'Фамилия, И.О. Название – Город, Год. – Количество страниц с.'",
@@ -113,34 +339,136 @@ class NormControlChecker:
             'gost': "Неправильное оформление ГОСТа. Должно быть: 'ГОСТ Номер–Год...'."
         }
     
-    def check_document(self, document_data):
+    def check_document(self, document_data, rules=None, on_rule=None):
         """
         Проверяет документ на соответствие требованиям нормоконтроля
         
         Args:
-            document_data: Структурированные данные документа
+            document_data: Структурированные данные документа (dict или LazyDocumentData —
+                           тогда извлекаются только разделы, нужные выбранным проверкам)
+            rules: Идентификаторы норм из NORM_RULES для проверки (None — все нормы)
+            on_rule: Функция, которой передается результат каждой нормы
+                     (rule_id, rule_name, issues, issues_count), как только его проверка завершена
             
         Returns:
             dict: Результаты проверки с выявленными несоответствиями
         """
-        results = []
-        for rule in NORM_RULES:
-            check_func = getattr(self, rule["checker"], None)
-            if check_func is not None:
-                result = check_func(document_data)
+        return self._check_rules(document_data, rules, on_rule=on_rule)
+    
+    def recheck_document(self, document_data, previous_data, previous_results, rules=None):
+        """
+        Повторно проверяет документ, полученный исправлением уже проверенного
+        
+        Проверки, разделы данных которых не изменились, не выполняются — их замечания
+        берутся из previous_results. Текстовые проверки пересчитываются только для
+        измененных параграфов и их соседей. Результат совпадает с check_document.
+        
+        Args:
+            document_data: Данные исправленного документа
+            previous_data: Данные исходного документа
+            previous_results: Результат check_document для исходного документа
+            rules: Идентификаторы норм для проверки (None — все нормы)
+            
+        Если изменено больше RECHECK_MAX_CHANGED_SHARE параграфов, выполняется обычная
+        проверка check_document (без ключа 'recheck').
+        
+        Returns:
+            dict: Результаты проверки; в ключе 'recheck' — какие проверки выполнены заново
+        """
+        if self._changed_share(document_data, previous_data) > RECHECK_MAX_CHANGED_SHARE:
+            return self.check_document(document_data, rules=rules)
+        return self._check_rules(document_data, rules, previous=(previous_data, previous_results))
+    
+    @staticmethod
+    def _changed_share(document_data, previous_data):
+        """
+        Доля измененных параграфов; 0, если параграфы исходного документа не извлекались
+        (выбранным нормам они не нужны)
+        """
+        if isinstance(previous_data, LazyDocumentData):
+            loaded = previous_data.loaded_sections()
+        else:
+            loaded = previous_data
+        if 'paragraphs' not in loaded or 'paragraphs' not in document_data:
+            return 0.0
+        paragraphs = document_data['paragraphs']
+        previous_paragraphs = previous_data['paragraphs']
+        if not paragraphs:
+            return 0.0
+        changed = NormControlChecker._changed_positions(paragraphs, previous_paragraphs)
+        return len(changed) / max(len(paragraphs), len(previous_paragraphs))
+    
+    @staticmethod
+    def _changed_positions(paragraphs, previous_paragraphs):
+        """
+        Позиции параграфов, отличающихся от предыдущих данных (включая добавленные и удаленные)
+        """
+        count = len(paragraphs)
+        previous_count = len(previous_paragraphs)
+        return [
+            position for position in range(max(count, previous_count))
+            if position >= count or position >= previous_count
+            or paragraphs[position] != previous_paragraphs[position]
+        ]
+    
+    def _check_rules(self, document_data, rules, previous=None, on_rule=None):
+        """
+        Выполняет проверки выбранных норм и собирает результат
+        previous: (данные, результаты) исходного документа для повторной проверки
+        on_rule: функция для результата каждой нормы по мере готовности проверок
+        """
+        plan = get_rule_plan()
+        rule_ids = None if rules is None else set(rules)
+        
+        steps = []
+        for checker, group_ids, routes in plan.steps:
+            active_ids = [rule_id for rule_id in group_ids if rule_ids is None or rule_id in rule_ids]
+            if active_ids:
+                steps.append((checker, active_ids, routes))
+        
+        started = time.perf_counter()
+        names = [checker for checker, _, _ in steps if getattr(self, checker, None) is not None]
+        on_outcome = self._rule_reporter(plan, steps, on_rule) if on_rule is not None else None
+        recheck = None
+        if previous is None:
+            outcomes = self._execute_checks(document_data, names, on_outcome=on_outcome)
+        else:
+            outcomes, recheck = self._recheck_outcomes(document_data, *previous, steps, names)
+        
+        issues_by_rule = {}
+        durations = {}
+        for checker, active_ids, routes in steps:
+            if checker in outcomes:
+                issues, duration = outcomes[checker]
+                issues_by_rule.update(plan.route(issues, active_ids, routes))
             else:
-                result = [{
-                    'type': 'not_implemented',
-                    'severity': 'info',
-                    'location': 'Документ',
-                    'description': f'Проверка для нормы "{rule["name"]}" ещё не реализована.',
-                    'auto_fixable': False
-                }]
+                duration = 0.0
+                for rule_id in active_ids:
+                    issues_by_rule[rule_id] = [{
+                        'type': 'not_implemented',
+                        'severity': 'info',
+                        'location': 'Документ',
+                        'description': f'Проверка для нормы "{plan.rules_by_id[rule_id]["name"]}" ещё не реализована.',
+                        'auto_fixable': False
+                    }]
+                    if on_rule is not None:
+                        on_rule(self._rule_progress(plan, rule_id, issues_by_rule[rule_id]))
+            for rule_id in active_ids:
+                durations[rule_id] = (checker, duration)
+        
+        results = []
+        for rule in plan.rules:
+            if rule["id"] not in issues_by_rule:
+                continue
+            checker, duration = durations[rule["id"]]
             results.append({
                 "rule_id": rule["id"],
                 "rule_name": rule["name"],
                 "description": rule["description"],
-                "issues": result
+                "issues": issues_by_rule[rule["id"]],
+                # Нормы с общей проверкой показывают время этой проверки
+                "duration_ms": round(duration * 1000, 3),
+                "issues_count": len(issues_by_rule[rule["id"]])
             })
         
         # Считаем общее количество проблем
@@ -157,9 +485,271 @@ class NormControlChecker:
         }
           # Подготовим статистику по категориям и серьезности проблем
         response['statistics'] = self._calculate_statistics(results)
+        response['timing'] = {
+            'mode': self.executor,
+            'workers': 1 if self.executor == 'serial' else self.max_workers,
+            'total_ms': round((time.perf_counter() - started) * 1000, 3),
+            'slowest': self._slowest_rules(results, durations)
+        }
+        if recheck is not None:
+            response['recheck'] = recheck
         
         return response
     
+    @staticmethod
+    def _rule_reporter(plan, steps, on_rule):
+        """
+        Обработчик готовых проверок {имя: (замечания, время)}: передает в on_rule
+        результат каждой нормы, к которой относится проверка
+        """
+        step_rules = {checker: (active_ids, routes) for checker, active_ids, routes in steps}
+        
+        def report(outcomes):
+            for checker, (issues, _) in outcomes.items():
+                active_ids, routes = step_rules[checker]
+                for rule_id, rule_issues in plan.route(issues, active_ids, routes).items():
+                    on_rule(NormControlChecker._rule_progress(plan, rule_id, rule_issues))
+        return report
+    
+    @staticmethod
+    def _rule_progress(plan, rule_id, issues):
+        """
+        Результат нормы для on_rule
+        """
+        return {
+            'rule_id': rule_id,
+            'rule_name': plan.rules_by_id[rule_id]['name'],
+            'issues': issues,
+            'issues_count': len(issues)
+        }
+    
+    def _recheck_outcomes(self, document_data, previous_data, previous_results, steps, names):
+        """
+        Выполняет только проверки, затронутые изменениями документа
+        
+        Returns:
+            tuple: ({имя проверки: (замечания, время в секундах)}, сводка повторной проверки)
+        """
+        previous_issues = {
+            result['rule_id']: result['issues'] for result in previous_results.get('rules_results', [])
+        }
+        unchanged = {}
+        
+        def section_unchanged(section):
+            if section not in unchanged:
+                unchanged[section] = document_data.get(section) == previous_data.get(section)
+            return unchanged[section]
+        
+        outcomes = {}
+        reused = []
+        pending = []
+        partial = {}
+        for checker, active_ids, _ in steps:
+            if checker not in names:
+                continue
+            dependencies = self.CHECK_DEPENDENCIES.get(checker)
+            if dependencies is None or any(rule_id not in previous_issues for rule_id in active_ids):
+                pending.append(checker)
+                continue
+            # Замечания группы норм в порядке норм; повторная маршрутизация восстановит их по нормам
+            issues = [issue for rule_id in active_ids for issue in previous_issues[rule_id]]
+            if all(section_unchanged(section) for section in dependencies):
+                outcomes[checker] = (issues, 0.0)
+                reused.append(checker)
+            elif (checker in self.PARAGRAPH_VISITORS
+                  and 'paragraphs' in document_data and 'paragraphs' in previous_data
+                  and all(section_unchanged(section) for section in dependencies if section != 'paragraphs')
+                  and all('paragraph_index' in issue for issue in issues)):
+                partial[checker] = issues
+            else:
+                pending.append(checker)
+        
+        outcomes.update(self._execute_checks(document_data, pending))
+        
+        rechecked_paragraphs = 0
+        if partial:
+            partial_outcomes, rechecked_paragraphs = self._recheck_paragraphs(document_data, previous_data, partial)
+            outcomes.update(partial_outcomes)
+        
+        recheck = {
+            'reused_checks': reused,
+            'paragraph_checks': list(partial),
+            'full_checks': pending,
+            'rechecked_paragraphs': rechecked_paragraphs,
+            'paragraph_count': len(document_data.get('paragraphs') or [])
+        }
+        return outcomes, recheck
+    
+    def _recheck_paragraphs(self, document_data, previous_data, partial):
+        """
+        Пересчитывает текстовые проверки для измененных параграфов и их соседей,
+        замечания остальных параграфов берет из предыдущей проверки
+        
+        Args:
+            partial: {имя проверки: замечания предыдущей проверки}
+            
+        Returns:
+            tuple: ({имя проверки: (замечания, время в секундах)}, число проверенных параграфов)
+        """
+        paragraphs = document_data['paragraphs']
+        count = len(paragraphs)
+        
+        # Обработчики видят соседние параграфы, поэтому проверяются и соседи измененных
+        changed = self._changed_positions(paragraphs, previous_data['paragraphs'])
+        positions = {
+            neighbor for position in changed for neighbor in (position - 1, position, position + 1)
+            if 0 <= neighbor < count
+        }
+        
+        timings = {}
+        fresh = self._run_paragraph_visitors(document_data, list(partial), timings=timings, positions=positions)
+        
+        outcomes = {}
+        for name, previous_issues in partial.items():
+            previous_by_index = {}
+            for issue in previous_issues:
+                previous_by_index.setdefault(issue['paragraph_index'], []).append(issue)
+            fresh_by_index = {}
+            for issue in fresh[name]:
+                fresh_by_index.setdefault(issue['paragraph_index'], []).append(issue)
+            
+            issues = []
+            for position, para in enumerate(paragraphs):
+                source = fresh_by_index if position in positions else previous_by_index
+                issues.extend(source.get(para.get('index'), ()))
+            outcomes[name] = (issues, timings.get(name, 0.0))
+        return outcomes, len(positions)
+    
+    def _execute_checks(self, document_data, names, on_outcome=None):
+        """
+        Выполняет проверки в выбранном режиме (последовательно или пулом)
+        on_outcome: функция, которой передаются результаты проверок по мере готовности
+        
+        Returns:
+            dict: {имя проверки: (список замечаний, время в секундах)}
+        """
+        if self.executor == 'serial' or self.max_workers <= 1 or len(names) <= 1:
+            return self._run_checks(document_data, names, on_outcome=on_outcome)
+        
+        # Текстовые проверки остаются одним общим проходом по параграфам
+        fused = self._fused_check_names(document_data, names)
+        tasks = ([fused] if fused else []) + [[name] for name in names if name not in fused]
+        
+        outcomes = {}
+        if self.executor == 'process':
+            # В процессы данные передаются сериализованными — по одной копии на пакет задач;
+            # из ленивых данных извлекаются только разделы, нужные выбранным проверкам
+            if hasattr(document_data, 'materialize'):
+                document_data = document_data.materialize(self._check_sections(names))
+            batches = [[] for _ in range(min(self.max_workers, len(tasks)))]
+            for i, task in enumerate(tasks):
+                batches[i % len(batches)].extend(task)
+            pool = get_check_pool('process', self.max_workers)
+            futures = [pool.submit(_run_check_batch, document_data, batch) for batch in batches]
+        else:
+            pool = get_check_pool('thread', self.max_workers)
+            futures = [pool.submit(self._run_checks, document_data, task) for task in tasks]
+        for future in as_completed(futures):
+            batch_outcomes = future.result()
+            outcomes.update(batch_outcomes)
+            if on_outcome is not None:
+                on_outcome(batch_outcomes)
+        return outcomes
+    
+    def _check_sections(self, names):
+        """
+        Разделы document_data, нужные проверкам names (None — все разделы,
+        если зависимости какой-то проверки неизвестны)
+        """
+        sections = set()
+        for name in names:
+            dependencies = self.CHECK_DEPENDENCIES.get(name)
+            if dependencies is None:
+                return None
+            sections.update(dependencies)
+        return sorted(sections)
+    
+    def _fused_check_names(self, document_data, names):
+        """
+        Проверки из names, которые выполняются общим проходом по параграфам
+        """
+        if not document_data or 'paragraphs' not in document_data:
+            return []
+        return [name for name in names if name in self.PARAGRAPH_VISITORS]
+    
+    def _run_checks(self, document_data, names, on_outcome=None):
+        """
+        Последовательно выполняет проверки и замеряет время каждой
+        on_outcome: функция, которой передаются результаты проверок по мере готовности
+        
+        Returns:
+            dict: {имя проверки: (список замечаний, время в секундах)}
+        """
+        outcomes = {}
+        fused = self._fused_check_names(document_data, names)
+        if fused:
+            timings = {}
+            fused_issues = self._run_paragraph_visitors(document_data, fused, timings=timings)
+            for name in fused:
+                outcomes[name] = (fused_issues[name], timings.get(name, 0.0))
+            if on_outcome is not None:
+                on_outcome({name: outcomes[name] for name in fused})
+        for name in names:
+            if name in outcomes:
+                continue
+            started = time.perf_counter()
+            issues = getattr(self, name)(document_data)
+            outcomes[name] = (issues, time.perf_counter() - started)
+            if on_outcome is not None:
+                on_outcome({name: outcomes[name]})
+        return outcomes
+    
+    def _slowest_rules(self, results, durations, limit=SLOWEST_RULES_LIMIT):
+        """
+        Самые медленные проверки; нормы с общей проверкой объединяются в одну запись
+        """
+        by_checker = {}
+        for result in results:
+            checker, duration = durations[result['rule_id']]
+            entry = by_checker.setdefault(checker, {
+                'checker': checker,
+                'rule_ids': [],
+                'rule_names': [],
+                'duration_ms': round(duration * 1000, 3),
+                'issues_count': 0
+            })
+            entry['rule_ids'].append(result['rule_id'])
+            entry['rule_names'].append(result['rule_name'])
+            entry['issues_count'] += result['issues_count']
+        slowest = sorted(by_checker.values(), key=lambda entry: entry['duration_ms'], reverse=True)
+        return slowest[:limit]
+    
+    def _paragraph_visitor_engine(self, names):
+        """
+        Создает движок однопроходного обхода с обработчиками указанных проверок
+        """
+        engine = ParagraphVisitorEngine(code_listing_detector=self._is_code_listing)
+        for name in names:
+            visit_name, prepare_name = self.PARAGRAPH_VISITORS[name]
+            prepare = getattr(self, prepare_name) if prepare_name else None
+            engine.register(name, getattr(self, visit_name), prepare)
+        return engine
+    
+    def _run_paragraph_visitors(self, document_data, names, timings=None, positions=None):
+        """
+        Выполняет текстовые проверки за один проход по параграфам
+        
+        Args:
+            document_data: Данные документа с ключом 'paragraphs'
+            names: Имена проверок из PARAGRAPH_VISITORS
+            timings: Словарь для времени каждой проверки в секундах (необязательно)
+            positions: Позиции параграфов для проверки (None — все параграфы)
+            
+        Returns:
+            dict: {имя проверки: список замечаний}
+        """
+        return self._paragraph_visitor_engine(names).run(document_data, names, timings=timings, positions=positions)
+    
     def _check_font(self, document_data):
         """
         Проверяет соответствие шрифта требованиям
@@ -177,58 +767,59 @@ class NormControlChecker:
             })
             return issues
 
-        # Проверяем основной текст документа
-        for para in document_data['paragraphs']:
-            # Пропускаем заголовки и параграфы без текста
-            if not para or 'style' not in para or para.get('style', '').startswith('Heading'):
-                continue
-                
-            font = para.get('font', {})
-            if not font:
-                continue
+        return self._run_paragraph_visitors(document_data, ['_check_font'])['_check_font']
+    
+    def _visit_font(self, facts, issues, context):
+        """
+        Проверяет шрифт одного параграфа (обработчик для _check_font)
+        """
+        para = facts.para
+        # Пропускаем заголовки и параграфы без текста
+        if not para or 'style' not in para or facts.is_heading_style:
+            return
+            
+        font = para.get('font', {})
+        if not font:
+            return
 
-            # Проверяем, является ли это листингом кода
-            is_code_listing = self._is_code_listing(para)
+        # Проверяем название шрифта
+        font_name = font.get('name')
+        if font_name and font_name != self.standard_rules['font']['name']:
+            # Если это листинг кода и используется Courier New, это допустимо
+            if facts.is_code_listing and font_name in ['Courier New', 'Consolas', 'Monaco', 'Menlo']:
+                return  # Пропускаем - это допустимо для кода
             
-            # Проверяем название шрифта
-            font_name = font.get('name')
-            if font_name and font_name != self.standard_rules['font']['name']:
-                # Если это листинг кода и используется Courier New, это допустимо
-                if is_code_listing and font_name in ['Courier New', 'Consolas', 'Monaco', 'Menlo']:
-                    continue  # Пропускаем - это допустимо для кода
-                
-                issues.append({
-                    'type': 'font_name',
-                    'severity': 'high',
-                    'location': f"Параграф {para['index'] + 1}",
-                    'description': f"Неверный шрифт: {font_name}. Должен быть {self.standard_rules['font']['name']} (для листингов кода допустимы моноширинные шрифты).",
-                    'auto_fixable': True
-                })                
-            # Проверяем размер шрифта
-            font_size = font.get('size')
-            if font_size and font_size != self.standard_rules['font']['size']:
-                # Для листингов кода допустим размер 12pt
-                if is_code_listing and font_size == 12.0:
-                    continue  # Пропускаем - это допустимо для кода
-                
-                issues.append({
-                    'type': 'font_size',
-                    'severity': 'high',
-                    'location': f"Параграф {para['index'] + 1}",
-                    'description': f"Неверный размер шрифта: {font_size}. Должен быть {self.standard_rules['font']['size']} (для листингов кода допустим 12pt).",
-                    'auto_fixable': True
-                })
-                
-            # Проверяем согласованность форматирования
-            if font.get('consistent_formatting') is False:
-                issues.append({
-                    'type': 'font_consistency',
-                    'severity': 'medium',
-                    'location': f"Параграф {para['index'] + 1}",
-                    'description': "Непоследовательное форматирование текста внутри параграфа. Текст должен иметь единое форматирование.",
-                    'auto_fixable': True
-                })                
-        return issues
+            issues.append({
+                'type': 'font_name',
+                'severity': 'high',
+                'location': f"Параграф {para['index'] + 1}",
+                'description': f"Неверный шрифт: {font_name}. Должен быть {self.standard_rules['font']['name']} (для листингов кода допустимы моноширинные шрифты).",
+                'auto_fixable': True
+            })                
+        # Проверяем размер шрифта
+        font_size = font.get('size')
+        if font_size and font_size != self.standard_rules['font']['size']:
+            # Для листингов кода допустим размер 12pt
+            if facts.is_code_listing and font_size == 12.0:
+                return  # Пропускаем - это допустимо для кода
+            
+            issues.append({
+                'type': 'font_size',
+                'severity': 'high',
+                'location': f"Параграф {para['index'] + 1}",
+                'description': f"Неверный размер шрифта: {font_size}. Должен быть {self.standard_rules['font']['size']} (для листингов кода допустим 12pt).",
+                'auto_fixable': True
+            })
+            
+        # Проверяем согласованность форматирования
+        if font.get('consistent_formatting') is False:
+            issues.append({
+                'type': 'font_consistency',
+                'severity': 'medium',
+                'location': f"Параграф {para['index'] + 1}",
+                'description': "Непоследовательное форматирование текста внутри параграфа. Текст должен иметь единое форматирование.",
+                'auto_fixable': True
+            })
     
     def _is_code_listing(self, para):
         """
@@ -239,24 +830,6 @@ class NormControlChecker:
         if not text:
             return False
         
-        # Признаки программного кода
-        code_indicators = [
-            # Ключевые слова программирования
-            r'\b(def|function|class|if|else|elif|for|while|return|import|include|#include|using|namespace)\b',
-            # Операторы и синтаксис
-            r'[{}();]',
-            r'=>|->|\+\+|--|==|!=|<=|>=',
-            # Типичные конструкции
-            r'\b(int|string|char|float|double|boolean|void|public|private|protected)\b',
-            r'\b(printf|cout|cin|scanf|print|console\.log)\b',
-            # HTML/CSS/JS
-            r'<[^>]+>|{\s*[a-zA-Z-]+\s*:',
-            # SQL
-            r'\b(SELECT|FROM|WHERE|INSERT|UPDATE|DELETE|CREATE|TABLE)\b',
-            # Отступы как в коде (4+ пробелов в начале)
-            r'^\s{4,}'
-        ]
-        
         # Также проверяем стиль параграфа
         style = para.get('style', '').lower()
         if 'code' in style or 'listing' in style or 'программ' in style:
@@ -269,8 +842,8 @@ class NormControlChecker:
             return True
         
         # Проверяем текст на наличие признаков кода
-        for pattern in code_indicators:
-            if re.search(pattern, text, re.IGNORECASE):
+        for pattern in rx.CODE_INDICATORS:
+            if pattern.search(text):
                 return True
                 
         return False
@@ -342,65 +915,69 @@ class NormControlChecker:
         """
         Проверяет соответствие межстрочного интервала требованиям
         """
-        issues = []
-        
-        for para in document_data['paragraphs']:
-            # Пропускаем заголовки
-            if para.get('style', '').startswith('Heading'):
-                continue
-                
-            line_spacing = para.get('line_spacing')
+        return self._run_paragraph_visitors(document_data, ['_check_line_spacing'])['_check_line_spacing']
+    
+    def _visit_line_spacing(self, facts, issues, context):
+        """
+        Проверяет межстрочный интервал одного параграфа (обработчик для _check_line_spacing)
+        """
+        # Пропускаем заголовки
+        if facts.is_heading_style:
+            return
             
-            # Если информация о межстрочном интервале доступна
-            if line_spacing and line_spacing != self.standard_rules['line_spacing']:
-                issues.append({
-                    'type': 'line_spacing',
-                    'severity': 'medium',
-                    'location': f"Параграф {para['index'] + 1}",
-                    'description': f"Неверный межстрочный интервал: {line_spacing}. Должен быть {self.standard_rules['line_spacing']}.",
-                    'auto_fixable': True
-                })
-                
-        return issues
+        para = facts.para
+        line_spacing = para.get('line_spacing')
+        
+        # Если информация о межстрочном интервале доступна
+        if line_spacing and line_spacing != self.standard_rules['line_spacing']:
+            issues.append({
+                'type': 'line_spacing',
+                'severity': 'medium',
+                'location': f"Параграф {para['index'] + 1}",
+                'description': f"Неверный межстрочный интервал: {line_spacing}. Должен быть {self.standard_rules['line_spacing']}.",
+                'auto_fixable': True
+            })
     
     def _check_paragraphs(self, document_data):
         """
         Проверяет форматирование параграфов (отступы первой строки и т.д.)
         """
-        issues = []
+        return self._run_paragraph_visitors(document_data, ['_check_paragraphs'])['_check_paragraphs']
+    
+    def _visit_paragraphs(self, facts, issues, context):
+        """
+        Проверяет отступ и выравнивание одного параграфа (обработчик для _check_paragraphs)
+        """
+        para = facts.para
+        # Пропускаем заголовки и параграфы, для которых нет данных о стилях
+        if facts.is_heading_style or not para.get('paragraph_format'):
+            return
+            
+        # Проверяем отступ первой строки
+        paragraph_format = para.get('paragraph_format', {})
+        first_line_indent = paragraph_format.get('first_line_indent')
         
-        for para in document_data['paragraphs']:
-            # Пропускаем заголовки и параграфы, для которых нет данных о стилях
-            if para.get('style', '').startswith('Heading') or not para.get('paragraph_format'):
-                continue
-                
-            # Проверяем отступ первой строки
-            paragraph_format = para.get('paragraph_format', {})
-            first_line_indent = paragraph_format.get('first_line_indent')
+        # Если отступ первой строки отличается от стандартного
+        expected_indent = self.standard_rules['first_line_indent'].cm
+        if first_line_indent is not None and abs(first_line_indent - expected_indent) > 0.05:
+            issues.append({
+                'type': 'first_line_indent',
+                'severity': 'medium',
+                'location': f"Параграф {para['index'] + 1}",
+                'description': f"Неверный отступ первой строки: {first_line_indent} см. Должен быть {expected_indent} см.",
+                'auto_fixable': True
+            })
             
-            # Если отступ первой строки отличается от стандартного
-            expected_indent = self.standard_rules['first_line_indent'].cm
-            if first_line_indent is not None and abs(first_line_indent - expected_indent) > 0.05:
-                issues.append({
-                    'type': 'first_line_indent',
-                    'severity': 'medium',
-                    'location': f"Параграф {para['index'] + 1}",
-                    'description': f"Неверный отступ первой строки: {first_line_indent} см. Должен быть {expected_indent} см.",
-                    'auto_fixable': True
-                })
-                
-            # Проверяем выравнивание текста (должно быть по ширине)
-            alignment = paragraph_format.get('alignment')
-            if alignment and alignment != WD_PARAGRAPH_ALIGNMENT.JUSTIFY:
-                issues.append({
-                    'type': 'paragraph_alignment',
-                    'severity': 'low',
-                    'location': f"Параграф {para['index'] + 1}",
-                    'description': "Неверное выравнивание текста. Основной текст должен быть выровнен по ширине.",
-                    'auto_fixable': True
-                })
-                
-        return issues
+        # Проверяем выравнивание текста (должно быть по ширине)
+        alignment = paragraph_format.get('alignment')
+        if alignment and alignment != WD_PARAGRAPH_ALIGNMENT.JUSTIFY:
+            issues.append({
+                'type': 'paragraph_alignment',
+                'severity': 'low',
+                'location': f"Параграф {para['index'] + 1}",
+                'description': "Неверное выравнивание текста. Основной текст должен быть выровнен по ширине.",
+                'auto_fixable': True
+            })
     
     def _check_headings(self, document_data):
         """
@@ -520,8 +1097,8 @@ class NormControlChecker:
                 continue
                 
             # Проверяем соответствие библиографической записи шаблону
-            pattern = self.bibliography_patterns.get(record_type)
-            if pattern and not re.match(pattern, item_text.strip()):
+            pattern = rx.BIBLIOGRAPHY_RECORD_PATTERNS.get(record_type)
+            if pattern and not pattern.match(item_text.strip()):
                 issues.append({
                     'type': f'bibliography_{record_type}_format',
                     'severity': 'medium',
@@ -554,7 +1131,7 @@ class NormControlChecker:
                     })
                 
             # Проверка наличия года издания для всех типов источников
-            if not re.search(r'\d{4}', item_text):
+            if not rx.YEAR.search(item_text):
                 issues.append({
                     'type': 'bibliography_missing_year',
                     'severity': 'medium',
@@ -567,7 +1144,7 @@ class NormControlChecker:
             # Проверка корректности нумерации
             if 'index' in item and item['index'] > 0:
                 expected_number = item['index']
-                actual_number_match = re.match(r'^\s*(\d+)\.\s', item_text)
+                actual_number_match = rx.BIBLIOGRAPHY_ITEM_NUMBER.match(item_text)
                 if actual_number_match:
                     actual_number = int(actual_number_match.group(1))
                     if actual_number != expected_number:
@@ -619,7 +1196,7 @@ class NormControlChecker:
         text = text.strip()
         
         # Удаляем нумерацию в начале строки, если она есть
-        text = re.sub(r'^\d+\.?\s*', '', text)
+        text = rx.BIBLIOGRAPHY_LEADING_NUMBER.sub('', text)
         
         # Проверяем на электронный ресурс
         if ('[электронный ресурс]' in text.lower() or 'url:' in text.lower() or 
@@ -640,11 +1217,11 @@ class NormControlChecker:
             return '5_plus_authors'
             
         # Подсчитываем количество авторов по количеству инициалов И.О.
-        initials_count = len(re.findall(r'[А-Я]\.\s?[А-Я]\.', text))
+        initials_count = len(rx.INITIALS.findall(text))
         
         if initials_count == 1:
             # Проверяем паттерн для одного автора
-            if re.match(r'^[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\.', text):
+            if rx.ONE_AUTHOR_START.match(text):
                 return 'one_author'
         elif initials_count == 2 or initials_count == 3:
             # Проверяем паттерн для 2-3 авторов
@@ -694,7 +1271,7 @@ class NormControlChecker:
                 })
                 
             # Проверяем формат подписи (Рисунок X - Название)
-            if caption and not re.match(r'^Рисунок\s+\d+\s*[–—-]\s*.+$', caption, re.IGNORECASE):
+            if caption and not rx.IMAGE_CAPTION.match(caption):
                 issues.append({
                     'type': 'image_caption_format',
                     'severity': 'medium',
@@ -742,7 +1319,7 @@ class NormControlChecker:
             title = table.get('title', '')
             
             # Проверяем формат заголовка (Таблица X - Название)
-            if title and not re.match(r'^Таблица\s+\d+\s*[–—-]\s*.+$', title, re.IGNORECASE):
+            if title and not rx.TABLE_TITLE.match(title):
                 issues.append({
                     'type': 'table_title_format',
                     'severity': 'medium',
@@ -903,7 +1480,7 @@ class NormControlChecker:
             if not caption:
                 continue
                 
-            match = re.search(r'Рисунок\s+(\d+)', caption, re.IGNORECASE)
+            match = rx.IMAGE_NUMBER.search(caption)
             if match:
                 image_numbers.append(match.group(1))
                 
@@ -917,7 +1494,7 @@ class NormControlChecker:
             if not title:
                 continue
                 
-            match = re.search(r'Таблица\s+(\d+)', title, re.IGNORECASE)
+            match = rx.TABLE_NUMBER.search(title)
             if match:
                 table_numbers.append(match.group(1))
                 
@@ -938,11 +1515,11 @@ class NormControlChecker:
                 continue
             
             # Ищем ссылки на рисунки
-            for match in re.finditer(r'(?:рис\.|рисунок|рисунку)\s+(\d+)', text, re.IGNORECASE):
+            for match in rx.IMAGE_REFERENCE.finditer(text):
                 images_referenced.add(match.group(1))
                 
             # Ищем ссылки на таблицы
-            for match in re.finditer(r'(?:табл\.|таблица|таблицу|таблице)\s+(\d+)', text, re.IGNORECASE):
+            for match in rx.TABLE_REFERENCE.finditer(text):
                 tables_referenced.add(match.group(1))
                 
         # Проверяем, есть ли ссылки на все рисунки
@@ -1184,10 +1761,10 @@ class NormControlChecker:
                     'auto_fixable': False
                 })
         # Остальная проверка (шрифт, выравнивание, отступы, номер страницы) — как было
-        paragraphs = document_data.get('paragraphs', [])
+        paragraphs_by_index = index_paragraphs_by_position(document_data.get('paragraphs', []))
         for p in title_page:
             idx_p = p['index']
-            para = next((x for x in paragraphs if x['index'] == idx_p), None)
+            para = paragraphs_by_index.get(idx_p)
             if not para:
                 continue
             font = para.get('font', {})
@@ -1230,8 +1807,7 @@ class NormControlChecker:
             text = title_page[i]['text'].strip()
             if text:
                 # Проверяем, содержит ли последняя непустая строка город и год через пробел
-                city_year_pattern = r'^[А-Я][а-я]+ \d{4}$'
-                if not re.match(city_year_pattern, text):
+                if not rx.CITY_YEAR.match(text):
                     issues.append({
                         'type': 'title_page_city_year',
                         'severity': 'medium',
@@ -1412,101 +1988,103 @@ class NormControlChecker:
             })
             return issues
         
-        # Допустимые акценты в тексте
-        allowed_accents = ['italic', 'bold', 'size']
+        return self._run_paragraph_visitors(document_data, ['_check_accents'])['_check_accents']
+    
+    def _visit_accents(self, facts, issues, context):
+        """
+        Проверяет акценты в runs одного параграфа (обработчик для _check_accents)
+        """
+        # Пропускаем заголовки (в них разрешены акценты)
+        if facts.is_heading:
+            return
         
-        # Проверяем форматирование каждого параграфа
-        for para in document_data['paragraphs']:
-            # Пропускаем заголовки (в них разрешены акценты)
-            if para.get('style', '').startswith('Heading') or para.get('is_heading', False):
+        para = facts.para
+        # Получаем список запусков (runs) в параграфе
+        runs = para.get('runs', [])
+        
+        for run_idx, run in enumerate(runs):
+            # Пропускаем пустые запуски
+            if not run.get('text'):
                 continue
             
-            # Получаем список запусков (runs) в параграфе
-            runs = para.get('runs', [])
+            # Проверяем наличие недопустимых акцентов
+            run_style = run.get('style', {})
             
-            for run_idx, run in enumerate(runs):
-                # Пропускаем пустые запуски
-                if not run.get('text'):
-                    continue
-                
-                # Проверяем наличие недопустимых акцентов
-                run_style = run.get('style', {})
-                
-                # Проверяем подчеркивание
-                if run_style.get('underline'):
-                    issues.append({
-                        'type': 'accent_underline',
-                        'severity': 'medium',
-                        'location': f"Параграф {para.get('index', 0) + 1}, фрагмент {run_idx + 1}",
-                        'description': f"Недопустимое подчеркивание в тексте: '{run.get('text')[:30]}...'",
-                        'auto_fixable': True,
-                        'context': run.get('text')
-                    })
-                
-                # Проверяем разрядку (расширенный межзнаковый интервал)
-                if run_style.get('char_spacing') and run_style.get('char_spacing') != 0:
-                    issues.append({
-                        'type': 'accent_char_spacing',
-                        'severity': 'medium',
-                        'location': f"Параграф {para.get('index', 0) + 1}, фрагмент {run_idx + 1}",
-                        'description': f"Недопустимая разрядка (расширенный межзнаковый интервал) в тексте: '{run.get('text')[:30]}...'",
-                        'auto_fixable': True,
-                        'context': run.get('text')
-                    })
-                
-                # Проверяем цвет текста (должен быть черным)
-                if run_style.get('color') and run_style.get('color').lower() != 'black' and run_style.get('color').lower() != '000000':
-                    issues.append({
-                        'type': 'accent_color',
-                        'severity': 'medium',
-                        'location': f"Параграф {para.get('index', 0) + 1}, фрагмент {run_idx + 1}",
-                        'description': f"Недопустимое использование цветного текста: '{run.get('text')[:30]}...'",
-                        'auto_fixable': True,
-                        'context': run.get('text')
-                    })
-                
-                # Проверяем верхний/нижний индекс
-                if run_style.get('superscript') or run_style.get('subscript'):
-                    # Разрешаем только для математических формул и сносок
-                    if not any(char in run.get('text', '') for char in '0123456789+-*/()[]{}=<>'):
-                        issues.append({
-                            'type': 'accent_script',
-                            'severity': 'low',
-                            'location': f"Параграф {para.get('index', 0) + 1}, фрагмент {run_idx + 1}",
-                            'description': f"Верхний/нижний индекс разрешен только для формул и сносок: '{run.get('text')[:30]}...'",
-                            'auto_fixable': False,
-                            'context': run.get('text')
-                        })
-                
-                # Проверяем шрифт
-                font_name = run_style.get('font', {}).get('name')
-                if font_name and font_name != self.standard_rules['font']['name']:
+            # Проверяем подчеркивание
+            if run_style.get('underline'):
+                issues.append({
+                    'type': 'accent_underline',
+                    'severity': 'medium',
+                    'location': f"Параграф {para.get('index', 0) + 1}, фрагмент {run_idx + 1}",
+                    'description': f"Недопустимое подчеркивание в тексте: '{run.get('text')[:30]}...'",
+                    'auto_fixable': True,
+                    'context': run.get('text')
+                })
+            
+            # Проверяем разрядку (расширенный межзнаковый интервал)
+            if run_style.get('char_spacing') and run_style.get('char_spacing') != 0:
+                issues.append({
+                    'type': 'accent_char_spacing',
+                    'severity': 'medium',
+                    'location': f"Параграф {para.get('index', 0) + 1}, фрагмент {run_idx + 1}",
+                    'description': f"Недопустимая разрядка (расширенный межзнаковый интервал) в тексте: '{run.get('text')[:30]}...'",
+                    'auto_fixable': True,
+                    'context': run.get('text')
+                })
+            
+            # Проверяем цвет текста (должен быть черным)
+            if run_style.get('color') and run_style.get('color').lower() != 'black' and run_style.get('color').lower() != '000000':
+                issues.append({
+                    'type': 'accent_color',
+                    'severity': 'medium',
+                    'location': f"Параграф {para.get('index', 0) + 1}, фрагмент {run_idx + 1}",
+                    'description': f"Недопустимое использование цветного текста: '{run.get('text')[:30]}...'",
+                    'auto_fixable': True,
+                    'context': run.get('text')
+                })
+            
+            # Проверяем верхний/нижний индекс
+            if run_style.get('superscript') or run_style.get('subscript'):
+                # Разрешаем только для математических формул и сносок
+                if not any(char in run.get('text', '') for char in '0123456789+-*/()[]{}=<>'):
                     issues.append({
-                        'type': 'accent_font',
-                        'severity': 'high',
+                        'type': 'accent_script',
+                        'severity': 'low',
                         'location': f"Параграф {para.get('index', 0) + 1}, фрагмент {run_idx + 1}",
-                        'description': f"Недопустимый шрифт '{font_name}' в тексте: '{run.get('text')[:30]}...'",
-                        'auto_fixable': True,
+                        'description': f"Верхний/нижний индекс разрешен только для формул и сносок: '{run.get('text')[:30]}...'",
+                        'auto_fixable': False,
                         'context': run.get('text')
                     })
+            
+            # Проверяем шрифт
+            font_name = run_style.get('font', {}).get('name')
+            if font_name and font_name != self.standard_rules['font']['name']:
+                issues.append({
+                    'type': 'accent_font',
+                    'severity': 'high',
+                    'location': f"Параграф {para.get('index', 0) + 1}, фрагмент {run_idx + 1}",
+                    'description': f"Недопустимый шрифт '{font_name}' в тексте: '{run.get('text')[:30]}...'",
+                    'auto_fixable': True,
+                    'context': run.get('text')
+                })
+            
+            # Проверяем размер шрифта
+            font_size = run_style.get('font', {}).get('size')
+            if font_size and font_size != self.standard_rules['font']['size'] and not run_style.get('bold') and not run_style.get('italic'):
+                # Допускаем размер 12 pt для подписей к таблицам и рисункам
+                if para.get('is_caption') and font_size == 12.0:
+                    continue
                 
-                # Проверяем размер шрифта
-                font_size = run_style.get('font', {}).get('size')
-                if font_size and font_size != self.standard_rules['font']['size'] and not run_style.get('bold') and not run_style.get('italic'):
-                    # Допускаем размер 12 pt для подписей к таблицам и рисункам
-                    if para.get('is_caption') and font_size == 12.0:
-                        continue
-                    
-                    issues.append({
-                        'type': 'accent_font_size',
-                        'severity': 'medium',
-                        'location': f"Параграф {para.get('index', 0) + 1}, фрагмент {run_idx + 1}",
-                        'description': f"Необычный размер шрифта {font_size} pt в тексте: '{run.get('text')[:30]}...'",
-                        'auto_fixable': True,
-                        'context': run.get('text')
-                    })
-        
-        return issues
+                issues.append({
+                    'type': 'accent_font_size',
+                    'severity': 'medium',
+                    'location': f"Параграф {para.get('index', 0) + 1}, фрагмент {run_idx + 1}",
+                    'description': f"Необычный размер шрифта {font_size} pt в тексте: '{run.get('text')[:30]}...'",
+                    'auto_fixable': True,
+                    'context': run.get('text')
+                })
+    
+    
     def _check_page_count(self, document_data):
         """
         Проверяет объем работы (количество страниц)
@@ -1636,6 +2214,19 @@ class NormControlChecker:
             })
             return issues
         
+        return self._run_paragraph_visitors(document_data, ['_check_heading_spacing'])['_check_heading_spacing']
+    
+    def _visit_heading_spacing(self, facts, issues, context):
+        """
+        Проверяет интервалы до и после заголовка (обработчик для _check_heading_spacing)
+        """
+        # Проверяем, является ли параграф заголовком
+        if not facts.is_heading:
+            return
+        
+        para = facts.para
+        i = facts.position
+        
         # Норма для интервала после заголовка
         required_spacing_after = {
             'line_spacing': 2.0,  # Для одинарного интервала
@@ -1648,98 +2239,82 @@ class NormControlChecker:
             'pt': 36.0  # В пунктах
         }
         
-        # Пройдемся по всем параграфам и найдем заголовки
-        for i, para in enumerate(document_data['paragraphs']):
-            # Проверяем, является ли параграф заголовком
-            if para.get('style', '').startswith('Heading') or para.get('is_heading', False):
-                heading_level = None
-                
-                # Определяем уровень заголовка
-                if para.get('style', '').startswith('Heading'):
-                    # Получаем уровень из стиля, например "Heading 1" -> 1
-                    try:
-                        heading_level = int(para.get('style', '').split()[-1])
-                    except (ValueError, IndexError):
-                        heading_level = 1
-                elif para.get('heading_level'):
-                    heading_level = para.get('heading_level')
-                else:
-                    heading_level = 1
-                
-                # Проверяем интервал после заголовка, если это не последний параграф
-                if i < len(document_data['paragraphs']) - 1:
-                    next_para = document_data['paragraphs'][i + 1]
-                    
-                    # Проверяем, является ли следующий параграф также заголовком
-                    next_is_heading = next_para.get('style', '').startswith('Heading') or next_para.get('is_heading', False)
-                      # Если следующий параграф не заголовок, проверяем интервал между ними
-                    if not next_is_heading:
-                        # Получаем информацию об интервале после заголовка
-                        spacing_after = para.get('paragraph_format', {}).get('space_after', 0)
-                        line_spacing = para.get('paragraph_format', {}).get('line_spacing', 1.0)
-                        
-                        # Вычисляем фактический интервал в пунктах
-                        # Проверяем на None и устанавливаем значение по умолчанию
-                        actual_spacing = spacing_after if spacing_after is not None else 0
-                        
-                        # Проверяем, соответствует ли интервал требованиям
-                        # Используем допуск в 2 пт для компенсации погрешности измерения
-                        if abs(actual_spacing - required_spacing_after['pt']) > 2.0:
-                            issues.append({
-                                'type': 'heading_spacing_after',
-                                'severity': 'medium',
-                                'location': f"Заголовок '{para.get('text', '').strip()}'",
-                                'description': f"Неверный интервал после заголовка: {actual_spacing} пт. " +
-                                              f"Должно быть {required_spacing_after['pt']} пт (2 одинарных интервала).",
-                                'auto_fixable': True,
-                                'heading_index': i,
-                                'context': para.get('text', '')
-                            })
-                
-                # Проверяем интервал перед заголовком, если это не первый параграф
-                if i > 0:
-                    prev_para = document_data['paragraphs'][i - 1]
-                    
-                    # Проверяем, является ли предыдущий параграф также заголовком
-                    prev_is_heading = prev_para.get('style', '').startswith('Heading') or prev_para.get('is_heading', False)
-                      # Если предыдущий параграф не заголовок, проверяем интервал между ними
-                    if not prev_is_heading:
-                        # Получаем информацию об интервале перед заголовком
-                        spacing_before = para.get('paragraph_format', {}).get('space_before', 0)
-                        
-                        # Вычисляем фактический интервал в пунктах
-                        # Проверяем на None и устанавливаем значение по умолчанию
-                        actual_spacing = spacing_before if spacing_before is not None else 0
-                        
-                        # Разные требования к интервалам для разных уровней заголовков
-                        if heading_level == 1:
-                            # Для заголовков первого уровня (разделы) - больший интервал
-                            if abs(actual_spacing - required_spacing_before['pt']) > 2.0:
-                                issues.append({
-                                    'type': 'heading_spacing_before',
-                                    'severity': 'medium',
-                                    'location': f"Заголовок '{para.get('text', '').strip()}'",
-                                    'description': f"Неверный интервал перед заголовком: {actual_spacing} пт. " +
-                                                  f"Должно быть {required_spacing_before['pt']} пт (3 одинарных интервала).",
-                                    'auto_fixable': True,
-                                    'heading_index': i,
-                                    'context': para.get('text', '')
-                                })
-                        else:
-                            # Для заголовков второго и более уровней - меньший интервал
-                            if abs(actual_spacing - required_spacing_after['pt']) > 2.0:
-                                issues.append({
-                                    'type': 'heading_spacing_before',
-                                    'severity': 'medium',
-                                    'location': f"Заголовок '{para.get('text', '').strip()}'",
-                                    'description': f"Неверный интервал перед заголовком: {actual_spacing} пт. " +
-                                                  f"Должно быть {required_spacing_after['pt']} пт (2 одинарных интервала).",
-                                    'auto_fixable': True,
-                                    'heading_index': i,
-                                    'context': para.get('text', '')
-                                })
+        heading_level = None
+        
+        # Определяем уровень заголовка
+        if facts.is_heading_style:
+            # Получаем уровень из стиля, например "Heading 1" -> 1
+            try:
+                heading_level = int(facts.style.split()[-1])
+            except (ValueError, IndexError):
+                heading_level = 1
+        elif para.get('heading_level'):
+            heading_level = para.get('heading_level')
+        else:
+            heading_level = 1
         
-        return issues
+        # Проверяем интервал после заголовка, если это не последний параграф
+        # и следующий параграф не является заголовком
+        if facts.next is not None and not facts.next.is_heading:
+            # Получаем информацию об интервале после заголовка
+            spacing_after = para.get('paragraph_format', {}).get('space_after', 0)
+            
+            # Вычисляем фактический интервал в пунктах
+            # Проверяем на None и устанавливаем значение по умолчанию
+            actual_spacing = spacing_after if spacing_after is not None else 0
+            
+            # Проверяем, соответствует ли интервал требованиям
+            # Используем допуск в 2 пт для компенсации погрешности измерения
+            if abs(actual_spacing - required_spacing_after['pt']) > 2.0:
+                issues.append({
+                    'type': 'heading_spacing_after',
+                    'severity': 'medium',
+                    'location': f"Заголовок '{facts.stripped}'",
+                    'description': f"Неверный интервал после заголовка: {actual_spacing} пт. " +
+                                  f"Должно быть {required_spacing_after['pt']} пт (2 одинарных интервала).",
+                    'auto_fixable': True,
+                    'heading_index': i,
+                    'context': para.get('text', '')
+                })
+        
+        # Проверяем интервал перед заголовком, если это не первый параграф
+        # и предыдущий параграф не является заголовком
+        if facts.prev is not None and not facts.prev.is_heading:
+            # Получаем информацию об интервале перед заголовком
+            spacing_before = para.get('paragraph_format', {}).get('space_before', 0)
+            
+            # Вычисляем фактический интервал в пунктах
+            # Проверяем на None и устанавливаем значение по умолчанию
+            actual_spacing = spacing_before if spacing_before is not None else 0
+            
+            # Разные требования к интервалам для разных уровней заголовков
+            if heading_level == 1:
+                # Для заголовков первого уровня (разделы) - больший интервал
+                if abs(actual_spacing - required_spacing_before['pt']) > 2.0:
+                    issues.append({
+                        'type': 'heading_spacing_before',
+                        'severity': 'medium',
+                        'location': f"Заголовок '{facts.stripped}'",
+                        'description': f"Неверный интервал перед заголовком: {actual_spacing} пт. " +
+                                      f"Должно быть {required_spacing_before['pt']} пт (3 одинарных интервала).",
+                        'auto_fixable': True,
+                        'heading_index': i,
+                        'context': para.get('text', '')
+                    })
+            else:
+                # Для заголовков второго и более уровней - меньший интервал
+                if abs(actual_spacing - required_spacing_after['pt']) > 2.0:
+                    issues.append({
+                        'type': 'heading_spacing_before',
+                        'severity': 'medium',
+                        'location': f"Заголовок '{facts.stripped}'",
+                        'description': f"Неверный интервал перед заголовком: {actual_spacing} пт. " +
+                                      f"Должно быть {required_spacing_after['pt']} пт (2 одинарных интервала).",
+                        'auto_fixable': True,
+                        'heading_index': i,
+                        'context': para.get('text', '')
+                    })
+    
     def _check_section_start(self, document_data):
         """
         Проверяет, начинается ли каждая структурная часть (глава, раздел) с новой страницы
@@ -2134,125 +2709,108 @@ class NormControlChecker:
             })
             return issues
         
-        # Словарь числительных от 0 до 9
-        digit_words = {
-            '0': ['ноль', 'нулевой', 'нулевая', 'нулевое', 'нулевые'],
-            '1': ['один', 'одна', 'одно', 'первый', 'первая', 'первое', 'первые'],
-            '2': ['два', 'две', 'второй', 'вторая', 'второе', 'вторые'],
-            '3': ['три', 'третий', 'третья', 'третье', 'третьи'],
-            '4': ['четыре', 'четвертый', 'четвертая', 'четвертое', 'четвертые'],
-            '5': ['пять', 'пятый', 'пятая', 'пятое', 'пятые'],
-            '6': ['шесть', 'шестой', 'шестая', 'шестое', 'шестые'],
-            '7': ['семь', 'седьмой', 'седьмая', 'седьмое', 'седьмые'],
-            '8': ['восемь', 'восьмой', 'восьмая', 'восьмое', 'восьмые'],
-            '9': ['девять', 'девятый', 'девятая', 'девятое', 'девятые']
-        }
+        return self._run_paragraph_visitors(document_data, ['_check_numerals'])['_check_numerals']
+    
+    def _visit_numerals(self, facts, issues, context):
+        """
+        Проверяет числительные одного параграфа (обработчик для _check_numerals)
+        """
+        # Пропускаем пустые параграфы и заголовки
+        if not facts.stripped or facts.is_heading_style:
+            return
         
-        # Инвертируем словарь для поиска цифры по слову
-        word_to_digit = {}
-        for digit, words in digit_words.items():
-            for word in words:
-                word_to_digit[word] = digit
+        para = facts.para
+        # Пропускаем особые типы параграфов (подписи к таблицам, формулам и т.д.)
+        if facts.is_caption or para.get('is_table_content') or para.get('is_formula'):
+            return
         
-        # Регулярное выражение для поиска однозначных чисел в тексте
-        # Исключаем числа в составе слов, десятичные дроби и т.д.
-        single_digit_pattern = r'(?<!\d)(?<!\w)[0-9](?!\d)(?!\w)'
+        digit_words = self.DIGIT_WORDS
+        word_to_digit = self.WORD_TO_DIGIT
         
-        # Проверяем каждый параграф
-        for para in document_data['paragraphs']:
-            # Пропускаем пустые параграфы и заголовки
-            if not para.get('text', '').strip() or para.get('style', '').startswith('Heading'):
-                continue
+        text = facts.text
+        
+        # Проверяем наличие однозначных чисел, записанных цифрами
+        # (исключаем числа в составе слов, десятичные дроби и т.д.)
+        single_digits = rx.SINGLE_DIGIT.finditer(text)
+        
+        for match in single_digits:
+            # Получаем цифру и ее позицию в тексте
+            digit = match.group()
+            pos = match.start()
             
-            # Пропускаем особые типы параграфов (подписи к таблицам, формулам и т.д.)
-            if para.get('is_caption') or para.get('is_table_content') or para.get('is_formula'):
+            # Проверяем, не является ли цифра частью специального контекста
+            # (например, перечисления, номера и т.д.)
+            context_before = text[max(0, pos-5):pos]
+            
+            # Пропускаем цифры в контексте перечислений, номеров и т.д.
+            if rx.NUMBER_SIGN_CONTEXT.search(context_before) or rx.ENUMERATION_CONTEXT.search(context_before):
                 continue
             
-            text = para.get('text', '')
+            # Проверяем, является ли цифра началом предложения
+            is_sentence_start = False
+            if pos > 0:
+                text_before = text[:pos].rstrip()
+                if text_before.endswith('.') or text_before.endswith('!') or text_before.endswith('?'):
+                    is_sentence_start = True
+            elif pos == 0:
+                is_sentence_start = True
+            
+            if is_sentence_start:
+                issues.append({
+                    'type': 'numeral_at_sentence_start',
+                    'severity': 'medium',
+                    'location': f"Параграф {para.get('index', 0) + 1}",
+                    'description': f"Число в начале предложения должно быть записано словами: '{digit}'.",
+                    'auto_fixable': True,
+                    'context': text[max(0, pos-10):min(len(text), pos+20)],
+                    'position': pos,
+                    'replacement': digit_words.get(digit, [''])[0]
+                })
+            else:
+                # Для однозначных чисел внутри предложения (не относящихся к перечислениям)
+                issues.append({
+                    'type': 'single_digit_as_numeral',
+                    'severity': 'low',
+                    'location': f"Параграф {para.get('index', 0) + 1}",
+                    'description': f"Однозначное число '{digit}' рекомендуется писать словами.",
+                    'auto_fixable': True,
+                    'context': text[max(0, pos-10):min(len(text), pos+20)],
+                    'position': pos,
+                    'replacement': digit_words.get(digit, [''])[0]
+                })
+        
+        # Разбиваем текст на предложения
+        sentences = rx.SENTENCE_BOUNDARY.split(text)
+        
+        for sentence in sentences:
+            # Пропускаем пустые предложения
+            if not sentence.strip():
+                continue
             
-            # Проверяем наличие однозначных чисел, записанных цифрами
-            single_digits = re.finditer(single_digit_pattern, text)
+            # Проверяем, начинается ли предложение с числительного, записанного словами
+            words = sentence.strip().split()
+            if not words:
+                continue
             
-            for match in single_digits:
-                # Получаем цифру и ее позицию в тексте
-                digit = match.group()
-                pos = match.start()
-                
-                # Проверяем, не является ли цифра частью специального контекста
-                # (например, перечисления, номера и т.д.)
-                context_before = text[max(0, pos-5):pos]
-                
-                # Пропускаем цифры в контексте перечислений, номеров и т.д.
-                if re.search(r'[№пn]\s*$', context_before) or re.search(r'^\s*\d+\)', context_before):
-                    continue
-                
-                # Проверяем, является ли цифра началом предложения
-                is_sentence_start = False
-                if pos > 0:
-                    text_before = text[:pos].rstrip()
-                    if text_before.endswith('.') or text_before.endswith('!') or text_before.endswith('?'):
-                        is_sentence_start = True
-                elif pos == 0:
-                    is_sentence_start = True
-                
-                if is_sentence_start:
-                    issues.append({
-                        'type': 'numeral_at_sentence_start',
-                        'severity': 'medium',
-                        'location': f"Параграф {para.get('index', 0) + 1}",
-                        'description': f"Число в начале предложения должно быть записано словами: '{digit}'.",
-                        'auto_fixable': True,
-                        'context': text[max(0, pos-10):min(len(text), pos+20)],
-                        'position': pos,
-                        'replacement': digit_words.get(digit, [''])[0]
-                    })
-                else:
-                    # Для однозначных чисел внутри предложения (не относящихся к перечислениям)
-                    issues.append({
-                        'type': 'single_digit_as_numeral',
-                        'severity': 'low',
-                        'location': f"Параграф {para.get('index', 0) + 1}",
-                        'description': f"Однозначное число '{digit}' рекомендуется писать словами.",
-                        'auto_fixable': True,
-                        'context': text[max(0, pos-10):min(len(text), pos+20)],
-                        'position': pos,
-                        'replacement': digit_words.get(digit, [''])[0]
-                    })
+            first_word = words[0].lower()
+            # Удаляем знаки препинания для проверки
+            first_word = rx.PUNCTUATION.sub('', first_word)
             
-            # Разбиваем текст на предложения
-            sentences = re.split(r'(?<=[.!?])\s+', text)
+            # Если первое слово - числительное в виде слова, оно записано правильно
+            if first_word in word_to_digit:
+                continue
             
-            for sentence in sentences:
-                # Пропускаем пустые предложения
-                if not sentence.strip():
-                    continue
-                
-                # Проверяем, начинается ли предложение с числительного, записанного словами
-                words = sentence.strip().split()
-                if not words:
-                    continue
-                
-                first_word = words[0].lower()
-                # Удаляем знаки препинания для проверки
-                first_word = re.sub(r'[^\w\s]', '', first_word)
-                
-                # Если первое слово - числительное в виде слова, оно записано правильно
-                if first_word in word_to_digit:
-                    continue
-                
-                # Проверяем, начинается ли предложение с многозначного числа
-                if re.match(r'^\d{2,}', words[0]):
-                    issues.append({
-                        'type': 'multi_digit_at_sentence_start',
-                        'severity': 'medium',
-                        'location': f"Параграф {para.get('index', 0) + 1}",
-                        'description': f"Число в начале предложения должно быть записано словами: '{words[0]}'.",
-                        'auto_fixable': False,
-                        'context': sentence[:50],
-                        'position': 0
-                    })
-        
-        return issues
+            # Проверяем, начинается ли предложение с многозначного числа
+            if rx.MULTI_DIGIT_START.match(words[0]):
+                issues.append({
+                    'type': 'multi_digit_at_sentence_start',
+                    'severity': 'medium',
+                    'location': f"Параграф {para.get('index', 0) + 1}",
+                    'description': f"Число в начале предложения должно быть записано словами: '{words[0]}'.",
+                    'auto_fixable': False,
+                    'context': sentence[:50],
+                    'position': 0
+                })
     
     def _check_ordinals(self, document_data):
         """
@@ -2277,69 +2835,67 @@ class NormControlChecker:
                 'description': "Невозможно проверить порядковые числительные: данные о параграфах отсутствуют.",
                 'auto_fixable': False
             })
-            return issues        # Регулярные выражения для поиска неправильно оформленных порядковых числительных
-        # Находим числительные без дефиса и окончания
-        no_suffix_pattern = r'\b\d+\s+(век[а-яёе]?|столети[а-яёеию]?|дн[а-яёеий]?|день|год[а-яёеы]?)\b'
+            return issues
+        
+        return self._run_paragraph_visitors(document_data, ['_check_ordinals'])['_check_ordinals']
+    
+    def _visit_ordinals(self, facts, issues, context):
+        """
+        Проверяет порядковые числительные одного параграфа (обработчик для _check_ordinals)
+        """
+        para = facts.para
+        if not para or 'text' not in para or not para['text']:
+            return
         
-        # Находим числительные с неправильными окончаниями 
-        wrong_suffix_pattern = r'\b\d+(-[а-яё]{1,3})?\s+(год[а-я]{0,2}|век[а-я]{0,2}|столети[а-яё]{0,2}|дн[а-яё]{0,2}|месяц[а-я]{0,2})\b'
-          # Находим числительные в виде сокращений с неправильным оформлением (включая "на 10 стр.")
-        abbr_pattern = r'\b\d+\s+(стр?\.)'
+        text = para['text']
+        para_idx = para.get('index', 0)
         
-        for para in document_data['paragraphs']:
-            if not para or 'text' not in para or not para['text']:
-                continue
+        # Поиск числительных без окончаний
+        matches_no_suffix = rx.ORDINAL_NO_SUFFIX.finditer(text)
+        for match in matches_no_suffix:
+            matched_text = match.group(0)
+            num = rx.DIGITS.search(matched_text).group(0)
+            unit = rx.TRAILING_WORD.search(matched_text).group(0)
             
-            text = para['text']
-            para_idx = para.get('index', 0)
+            # Определяем правильное окончание в зависимости от контекста
+            suffix = self._determine_ordinal_suffix(num, unit)
             
-            # Поиск числительных без окончаний
-            matches_no_suffix = re.finditer(no_suffix_pattern, text, re.IGNORECASE)
-            for match in matches_no_suffix:
-                matched_text = match.group(0)
-                num = re.search(r'\d+', matched_text).group(0)
-                unit = re.search(r'[а-яё]+$', matched_text, re.IGNORECASE).group(0)
-                
-                # Определяем правильное окончание в зависимости от контекста
-                suffix = self._determine_ordinal_suffix(num, unit)
-                
-                issues.append({
-                    'type': 'ordinal_no_suffix',
-                    'severity': 'medium',
-                    'location': f"Параграф {para_idx + 1}",
-                    'description': f"Порядковое числительное без окончания: '{matched_text}'. Правильно: '{num}-{suffix} {unit}'.",
-                    'auto_fixable': True,
-                    'text': matched_text,
-                    'replacement': f"{num}-{suffix} {unit}"
-                })
-            
-            # Поиск сокращений без дефиса
-            matches_abbr = re.finditer(abbr_pattern, text)
-            for match in matches_abbr:
-                matched_text = match.group(0)
-                num = re.search(r'\d+', matched_text).group(0)
-                abbr = re.search(r'[а-яё]+\.', matched_text, re.IGNORECASE).group(0)
-                
-                # Определяем правильное окончание для сокращений
-                if abbr == 'г.':  # год
-                    suffix = 'м' if 'на' in matched_text.lower() else 'й'
-                elif abbr == 'в.':  # век
-                    suffix = 'м' if 'на' in matched_text.lower() else 'й'
-                elif abbr in ['стр.', 'с.']:  # страница
-                    suffix = 'й'
-                else:
-                    suffix = 'й'  # по умолчанию
-                
-                issues.append({
-                    'type': 'ordinal_abbr_no_suffix',
-                    'severity': 'medium',
-                    'location': f"Параграф {para_idx + 1}",
-                    'description': f"Сокращение без правильного окончания: '{matched_text}'. Правильно: '{num}-{suffix} {abbr}'.",                    'auto_fixable': True,
-                    'text': matched_text,
-                    'replacement': matched_text.replace(f"{num} {abbr}", f"{num}-{suffix} {abbr}")
-                })
+            issues.append({
+                'type': 'ordinal_no_suffix',
+                'severity': 'medium',
+                'location': f"Параграф {para_idx + 1}",
+                'description': f"Порядковое числительное без окончания: '{matched_text}'. Правильно: '{num}-{suffix} {unit}'.",
+                'auto_fixable': True,
+                'text': matched_text,
+                'replacement': f"{num}-{suffix} {unit}"
+            })
         
-        return issues
+        # Поиск сокращений без дефиса
+        # Находим числительные в виде сокращений с неправильным оформлением (включая "на 10 стр.")
+        matches_abbr = rx.ORDINAL_ABBREVIATION.finditer(text)
+        for match in matches_abbr:
+            matched_text = match.group(0)
+            num = rx.DIGITS.search(matched_text).group(0)
+            abbr = rx.ABBREVIATION.search(matched_text).group(0)
+            
+            # Определяем правильное окончание для сокращений
+            if abbr == 'г.':  # год
+                suffix = 'м' if 'на' in matched_text.lower() else 'й'
+            elif abbr == 'в.':  # век
+                suffix = 'м' if 'на' in matched_text.lower() else 'й'
+            elif abbr in ['стр.', 'с.']:  # страница
+                suffix = 'й'
+            else:
+                suffix = 'й'  # по умолчанию
+            
+            issues.append({
+                'type': 'ordinal_abbr_no_suffix',
+                'severity': 'medium',
+                'location': f"Параграф {para_idx + 1}",
+                'description': f"Сокращение без правильного окончания: '{matched_text}'. Правильно: '{num}-{suffix} {abbr}'.",                    'auto_fixable': True,
+                'text': matched_text,
+                'replacement': matched_text.replace(f"{num} {abbr}", f"{num}-{suffix} {abbr}")
+            })
     
     def _determine_ordinal_suffix(self, num, unit):
         """
@@ -2393,78 +2949,81 @@ class NormControlChecker:
             })
             return issues
         
-        # Регулярные выражения для поиска фамилий и инициалов
-        # Неправильное оформление в тексте (фамилия перед инициалами)
-        wrong_text_pattern = r'(?<!\sи\s)(?<![«"\'\(])([А-Я][а-я]+)\s+([А-Я])\.\s*([А-Я])\.'
-        
-        # Неправильное оформление инициалов (пробелы между ними)
-        wrong_initials_pattern = r'([А-Я])\.\s+([А-Я])\.'
-          # Неправильное оформление в списках (инициалы перед фамилией)
-        wrong_list_pattern = r'(?:^\s*\d+\.\s*)?([А-Я])\.\s*([А-Я])\.\s+([А-Я][а-я]+)'
+        return self._run_paragraph_visitors(document_data, ['_check_surnames'])['_check_surnames']
+    
+    def _prepare_surnames(self, document_data):
+        """
+        Индексы параграфов списка литературы (контекст для _visit_surnames)
+        """
+        return {p.get('index') for p in (document_data.get('bibliography') or [])}
+    
+    def _visit_surnames(self, facts, issues, bibliography_indexes):
+        """
+        Проверяет оформление фамилий в одном параграфе (обработчик для _check_surnames)
+        """
+        para = facts.para
+        if not para or 'text' not in para or not para['text']:
+            return
         
-        for para in document_data['paragraphs']:
-            if not para or 'text' not in para or not para['text']:
-                continue
-            
-            text = para['text']
-            para_idx = para.get('index', 0)
-            is_bibliography = False
-            
-            # Определяем, является ли параграф частью списка литературы
-            if 'bibliography' in document_data and para_idx in [p.get('index') for p in document_data.get('bibliography', [])]:
-                is_bibliography = True
-            
-            # Проверка на наличие названия списка литературы
-            if re.search(r'список\s+(?:использованн[ыо]й|использованной|испол[ьз]зуемой)\s+литературы', text, re.IGNORECASE):
-                is_bibliography = True
-            
-            # Проверяем оформление фамилий в тексте (если не список литературы)
-            if not is_bibliography:
-                # Поиск фамилий перед инициалами в основном тексте
-                matches = re.finditer(wrong_text_pattern, text)
-                for match in matches:
-                    surname, init1, init2 = match.groups()
-                    issues.append({
-                        'type': 'surname_wrong_order_in_text',
-                        'severity': 'medium',
-                        'location': f"Параграф {para_idx + 1}",
-                        'description': f"Неправильное оформление фамилии в тексте: '{surname} {init1}.{init2}.'. Должно быть: '{init1}.{init2}. {surname}'.",
-                        'auto_fixable': True,
-                        'text': f"{surname} {init1}.{init2}.",
-                        'replacement': f"{init1}.{init2}. {surname}"
-                    })
-                
-                # Поиск неправильно оформленных инициалов (с пробелами)
-                matches = re.finditer(wrong_initials_pattern, text)
-                for match in matches:
-                    init1, init2 = match.groups()
-                    issues.append({
-                        'type': 'surname_wrong_initials_spacing',
-                        'severity': 'medium',
-                        'location': f"Параграф {para_idx + 1}",
-                        'description': f"Неправильное оформление инициалов: '{init1}. {init2}.'. Должно быть: '{init1}.{init2}.'.",
-                        'auto_fixable': True,
-                        'text': f"{init1}. {init2}.",
-                        'replacement': f"{init1}.{init2}."
-                    })
+        text = para['text']
+        para_idx = para.get('index', 0)
+        is_bibliography = False
+        
+        # Определяем, является ли параграф частью списка литературы
+        if para_idx in bibliography_indexes:
+            is_bibliography = True
+        
+        # Проверка на наличие названия списка литературы
+        if rx.BIBLIOGRAPHY_TITLE.search(text):
+            is_bibliography = True
+        
+        # Проверяем оформление фамилий в тексте (если не список литературы)
+        if not is_bibliography:
+            # Поиск фамилий перед инициалами в основном тексте
+            # Фамилия перед инициалами
+            matches = rx.SURNAME_BEFORE_INITIALS.finditer(text)
+            for match in matches:
+                surname, init1, init2 = match.groups()
+                issues.append({
+                    'type': 'surname_wrong_order_in_text',
+                    'severity': 'medium',
+                    'location': f"Параграф {para_idx + 1}",
+                    'description': f"Неправильное оформление фамилии в тексте: '{surname} {init1}.{init2}.'. Должно быть: '{init1}.{init2}. {surname}'.",
+                    'auto_fixable': True,
+                    'text': f"{surname} {init1}.{init2}.",
+                    'replacement': f"{init1}.{init2}. {surname}"
+                })
             
-            # Проверяем оформление фамилий в списке литературы
-            else:
-                # Поиск инициалов перед фамилией в списке литературы
-                matches = re.finditer(wrong_list_pattern, text)
-                for match in matches:
-                    init1, init2, surname = match.groups()
-                    issues.append({
-                        'type': 'surname_wrong_order_in_list',
-                        'severity': 'medium',
-                        'location': f"Параграф {para_idx + 1} (список литературы)",
-                        'description': f"Неправильное оформление фамилии в списке: '{init1}.{init2}. {surname}'. Должно быть: '{surname} {init1}.{init2}.'.",
-                        'auto_fixable': True,
-                        'text': f"{init1}.{init2}. {surname}",
-                        'replacement': f"{surname} {init1}.{init2}."
-                    })
+            # Поиск неправильно оформленных инициалов (с пробелами)
+            matches = rx.SPACED_INITIALS.finditer(text)
+            for match in matches:
+                init1, init2 = match.groups()
+                issues.append({
+                    'type': 'surname_wrong_initials_spacing',
+                    'severity': 'medium',
+                    'location': f"Параграф {para_idx + 1}",
+                    'description': f"Неправильное оформление инициалов: '{init1}. {init2}.'. Должно быть: '{init1}.{init2}.'.",
+                    'auto_fixable': True,
+                    'text': f"{init1}. {init2}.",
+                    'replacement': f"{init1}.{init2}."
+                })
         
-        return issues
+        # Проверяем оформление фамилий в списке литературы
+        else:
+            # Поиск инициалов перед фамилией в списке литературы
+            matches = rx.INITIALS_BEFORE_SURNAME.finditer(text)
+            for match in matches:
+                init1, init2, surname = match.groups()
+                issues.append({
+                    'type': 'surname_wrong_order_in_list',
+                    'severity': 'medium',
+                    'location': f"Параграф {para_idx + 1} (список литературы)",
+                    'description': f"Неправильное оформление фамилии в списке: '{init1}.{init2}. {surname}'. Должно быть: '{surname} {init1}.{init2}.'.",
+                    'auto_fixable': True,
+                    'text': f"{init1}.{init2}. {surname}",
+                    'replacement': f"{surname} {init1}.{init2}."
+                })
+    
         
     def _check_toc(self, document_data):
         """
@@ -2646,7 +3205,7 @@ class NormControlChecker:
             # Проверяем формат номера
             number = element['number']
             # Шаблон для проверки: только цифры или цифры с точкой (X или X.Y)
-            if not re.match(r'^\d+(\.\d+)?$', str(number)):
+            if not rx.ELEMENT_NUMBER.match(str(number)):
                 issues.append({
                     'type': f'{element_type}_wrong_number_format',
                     'severity': 'medium',
@@ -0,0 +1,226 @@
+"""
+Сохранение DOCX с переносом неизмененных частей пакета без пересжатия.
+
+document.save() заново сериализует и сжимает каждую часть пакета, в том числе
+изображения word/media/*, которые исправление не меняет. save_document()
+записывает те же части в том же порядке, что и python-docx, но если содержимое
+части побайтно совпадает с записью исходного ZIP, ее сжатые байты копируются
+из исходного файла как есть. Заново сжимаются только измененные части — обычно
+document.xml, styles.xml и колонтитулы. Размер и CRC-32 служат лишь быстрым
+предварительным отбором: совпадение CRC не гарантирует совпадения содержимого.
+
+Копирование без пересжатия использует внутренние поля zipfile (заголовки
+записей, start_dir, _writecheck). Если в текущей версии Python их нет,
+все части записываются обычным образом (raw_copy_supported()).
+"""
+
+import io
+import os
+import struct
+import zipfile
+import zlib
+
+from docx.opc.pkgwriter import PackageWriter
+
+DEFAULT_COMPRESSION_LEVEL = 6
+
+# Поля локального заголовка записи ZIP (zipfile.structFileHeader)
+_FH_SIGNATURE = 0
+_FH_FILENAME_LENGTH = 10
+_FH_EXTRA_FIELD_LENGTH = 11
+_FLAG_ENCRYPTED = 0x1
+_FLAG_DATA_DESCRIPTOR = 0x8
+_COPYABLE_COMPRESSION = (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+# Внутренние поля zipfile, без которых копирование сжатых байтов невозможно
+_ZIPFILE_MODULE_API = ('structFileHeader', 'sizeFileHeader', 'stringFileHeader')
+_ZIPFILE_WRITER_API = ('fp', 'start_dir', 'filelist', 'NameToInfo', '_writecheck', '_didModify')
+_ZIPFILE_READER_API = ('fp',)
+
+
+def raw_copy_supported(writer_zip=None, source_zip=None):
+    """
+    Есть ли в zipfile внутренние поля, нужные для копирования сжатых байтов
+    (для переданных объектов ZipFile проверяются и поля экземпляров)
+    """
+    if not all(hasattr(zipfile, name) for name in _ZIPFILE_MODULE_API):
+        return False
+    if not callable(getattr(zipfile.ZipInfo, 'FileHeader', None)):
+        return False
+    if writer_zip is not None and not all(hasattr(writer_zip, name) for name in _ZIPFILE_WRITER_API):
+        return False
+    if source_zip is not None and not all(hasattr(source_zip, name) for name in _ZIPFILE_READER_API):
+        return False
+    return True
+
+
+def get_docx_compression_level():
+    """
+    Уровень сжатия измененных частей из переменной окружения
+    DOCX_COMPRESSION_LEVEL (0-9, 0 — без сжатия; по умолчанию 6, как у python-docx)
+    """
+    value = os.environ.get('DOCX_COMPRESSION_LEVEL', str(DEFAULT_COMPRESSION_LEVEL)).strip()
+    try:
+        level = int(value)
+        if not 0 <= level <= 9:
+            raise ValueError(value)
+    except ValueError:
+        print(f"Некорректное значение DOCX_COMPRESSION_LEVEL={value}, используется {DEFAULT_COMPRESSION_LEVEL}")
+        level = DEFAULT_COMPRESSION_LEVEL
+    return level
+
+
+class PreservingPackageWriter:
+    """
+    Запись частей пакета в ZIP (интерфейс PhysPkgWriter python-docx):
+    совпадающие с исходным ZIP части копируются в сжатом виде
+    """
+
+    def __init__(self, target, source_zip=None, compression_level=DEFAULT_COMPRESSION_LEVEL):
+        """
+        target: путь или поток для записи DOCX
+        source_zip: zipfile.ZipFile исходного документа (None — все части сжимаются заново)
+        compression_level: уровень сжатия измененных частей (0 — без сжатия)
+        """
+        self.compression_level = compression_level
+        self._zipf = zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_DEFLATED)
+        if source_zip is not None and not raw_copy_supported(self._zipf, source_zip):
+            print("Копирование частей без пересжатия недоступно в этой версии zipfile, части сжимаются заново")
+            source_zip = None
+        self.source_zip = source_zip
+        self.copied = []
+        self.compressed = []
+
+    def write(self, pack_uri, blob):
+        """
+        Записывает часть pack_uri: копирует исходную запись, если содержимое не изменилось
+        """
+        name = pack_uri.membername
+        info = self._source_info(name, blob)
+        raw = self._read_raw(info) if info is not None else None
+        if raw is not None:
+            self._write_raw(info, raw)
+            self.copied.append(name)
+            return
+
+        if self.compression_level == 0:
+            self._zipf.writestr(name, blob, compress_type=zipfile.ZIP_STORED)
+        else:
+            self._zipf.writestr(name, blob, compress_type=zipfile.ZIP_DEFLATED,
+                                compresslevel=self.compression_level)
+        self.compressed.append(name)
+
+    def close(self):
+        self._zipf.close()
+
+    def _source_info(self, name, blob):
+        """
+        Запись исходного ZIP с тем же содержимым, что и blob, или None
+        """
+        if self.source_zip is None:
+            return None
+        try:
+            info = self.source_zip.getinfo(name)
+        except KeyError:
+            return None
+        if info.flag_bits & _FLAG_ENCRYPTED or info.compress_type not in _COPYABLE_COMPRESSION:
+            return None
+        if info.file_size != len(blob) or info.CRC != zlib.crc32(blob):
+            return None
+        # CRC-32 может совпасть у разного содержимого: сравниваем полностью
+        try:
+            if self.source_zip.read(info) != blob:
+                return None
+        except (OSError, zipfile.BadZipFile, zlib.error, NotImplementedError):
+            return None
+        return info
+
+    def _read_raw(self, info):
+        """
+        Сжатые байты записи исходного ZIP (без локального заголовка)
+        """
+        try:
+            fp = self.source_zip.fp
+            fp.seek(info.header_offset)
+            header = struct.unpack(zipfile.structFileHeader, fp.read(zipfile.sizeFileHeader))
+            if header[_FH_SIGNATURE] != zipfile.stringFileHeader:
+                return None
+            fp.seek(header[_FH_FILENAME_LENGTH] + header[_FH_EXTRA_FIELD_LENGTH], io.SEEK_CUR)
+            raw = fp.read(info.compress_size)
+        except (OSError, struct.error):
+            return None
+        return raw if len(raw) == info.compress_size else None
+
+    def _write_raw(self, source_info, raw):
+        """
+        Добавляет запись с уже сжатыми данными так же, как это делает ZipFile.writestr
+        """
+        zinfo = zipfile.ZipInfo(source_info.filename, date_time=source_info.date_time)
+        zinfo.compress_type = source_info.compress_type
+        zinfo.external_attr = source_info.external_attr or 0o600 << 16
+        zinfo.create_system = source_info.create_system
+        # Размеры и CRC известны заранее — дескриптор данных после записи не нужен
+        zinfo.flag_bits = source_info.flag_bits & ~_FLAG_DATA_DESCRIPTOR
+        zinfo.file_size = source_info.file_size
+        zinfo.compress_size = source_info.compress_size
+        zinfo.CRC = source_info.CRC
+
+        zipf = self._zipf
+        zipf.fp.seek(zipf.start_dir)
+        zinfo.header_offset = zipf.fp.tell()
+        zipf._writecheck(zinfo)
+        zipf._didModify = True
+        zipf.fp.write(zinfo.FileHeader())
+        zipf.fp.write(raw)
+        zipf.start_dir = zipf.fp.tell()
+        zipf.filelist.append(zinfo)
+        zipf.NameToInfo[zinfo.filename] = zinfo
+
+
+def _open_source(source, target):
+    """
+    Открывает исходный DOCX (путь, bytes или поток) для чтения; None, если это невозможно
+    """
+    if source is None:
+        return None
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)) and isinstance(target, (str, os.PathLike)):
+        # Сохранение поверх исходного файла: исходный ZIP читается в память до записи
+        if os.path.exists(target) and os.path.samefile(source, target):
+            with open(source, 'rb') as f:
+                source = io.BytesIO(f.read())
+    try:
+        return zipfile.ZipFile(source)
+    except (OSError, zipfile.BadZipFile) as e:
+        print(f"Исходный пакет недоступен, все части сжимаются заново: {str(e)}")
+        return None
+
+
+def save_document(document, target, source=None, compression_level=None):
+    """
+    Сохраняет документ в target (путь или поток). Части, не изменившиеся
+    относительно source (исходный DOCX: путь, bytes или поток), копируются
+    без пересжатия. compression_level по умолчанию — get_docx_compression_level().
+    Возвращает словарь {'copied': [...], 'compressed': [...]} с именами частей.
+    """
+    if compression_level is None:
+        compression_level = get_docx_compression_level()
+
+    package = document.part.package
+    parts = package.parts
+    for part in parts:
+        part.before_marshal()
+
+    source_zip = _open_source(source, target)
+    try:
+        writer = PreservingPackageWriter(target, source_zip, compression_level)
+        try:
+            PackageWriter._write_content_types_stream(writer, parts)
+            PackageWriter._write_pkg_rels(writer, package.rels)
+            PackageWriter._write_parts(writer, parts)
+        finally:
+            writer.close()
+    finally:
+        if source_zip is not None:
+            source_zip.close()
+    return {'copied': writer.copied, 'compressed': writer.compressed}
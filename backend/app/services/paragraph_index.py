@@ -0,0 +1,90 @@
+"""
+Позиционный индекс параграфов документа DOCX.
+
+Строится один раз на документ и позволяет за O(1) получать параграф
+по его позиции в теле документа, позицию по XML-элементу и рисунки,
+к которым относится подпись.
+"""
+
+PIC_NAMESPACE = {'pic': 'http://schemas.openxmlformats.org/drawingml/2006/picture'}
+
+# Сколько параграфов назад от подписи ищется рисунок
+PICTURE_LOOKBACK = 3
+
+
+class ParagraphIndex:
+    """
+    Индекс параграфов тела документа.
+    Позиции совпадают с индексами в document.paragraphs.
+    """
+
+    def __init__(self, document):
+        """
+        Инициализация индекса
+        document: объект docx.Document
+        """
+        # Список прокси-объектов python-docx строится один раз
+        self.paragraphs = document.paragraphs
+        self.elements = [para._p for para in self.paragraphs]
+        self._positions = {element: i for i, element in enumerate(self.elements)}
+
+        # Отмечаем параграфы, содержащие рисунки (pic:pic внутри runs)
+        self.picture_flags = [self._element_has_picture(element) for element in self.elements]
+        self.picture_positions = [i for i, flag in enumerate(self.picture_flags) if flag]
+
+    def __len__(self):
+        return len(self.elements)
+
+    @staticmethod
+    def _element_has_picture(element):
+        """
+        Проверяет, есть ли в runs параграфа рисунок
+        """
+        return any(r.findall('.//pic:pic', PIC_NAMESPACE) for r in element.r_lst)
+
+    def position_of(self, element):
+        """
+        Возвращает позицию параграфа по XML-элементу или None, если элемента нет в теле документа
+        """
+        return self._positions.get(element)
+
+    def paragraph_at(self, position):
+        """
+        Возвращает параграф по позиции
+        """
+        return self.paragraphs[position]
+
+    def has_picture(self, position):
+        """
+        Проверяет, содержит ли параграф на указанной позиции рисунок
+        """
+        return 0 <= position < len(self.picture_flags) and self.picture_flags[position]
+
+    def images_for_caption(self, caption_position, lookback=PICTURE_LOOKBACK):
+        """
+        Возвращает позиции параграфов с рисунками, к которым может относиться подпись,
+        в порядке удаления от подписи (не далее lookback параграфов назад)
+        """
+        start = caption_position - 1
+        stop = max(caption_position - lookback - 1, -1)
+        return [j for j in range(start, stop, -1) if self.picture_flags[j]]
+
+    def preceding_paragraph(self, element):
+        """
+        Возвращает параграф тела документа, непосредственно предшествующий элементу
+        (например, таблице), или None
+        """
+        prev_elem = element.getprevious()
+        if prev_elem is None:
+            return None
+        position = self._positions.get(prev_elem)
+        if position is None:
+            return None
+        return self.paragraphs[position]
+
+
+def index_paragraphs_by_position(paragraphs):
+    """
+    Строит словарь {index: параграф} для списка параграфов из document_data
+    """
+    return {para['index']: para for para in paragraphs if para and 'index' in para}
@@ -0,0 +1,178 @@
+"""
+Однопроходный обход параграфов для текстовых проверок нормоконтроля.
+
+Проверки регистрируют обработчики параграфа, а движок за один цикл по
+document_data['paragraphs'] передает каждый параграф всем заинтересованным
+проверкам. Общие признаки параграфа (заголовок, листинг кода, подпись,
+очищенный текст) вычисляются один раз и разделяются между проверками.
+Каждое замечание помечается индексом параграфа (ключ 'paragraph_index'),
+что позволяет при повторной проверке пересчитывать только измененные параграфы.
+"""
+
+import time
+
+
+class ParagraphFacts:
+    """
+    Признаки одного параграфа, общие для всех проверок
+    """
+
+    __slots__ = (
+        'para', 'position', 'text', 'stripped', 'style', 'is_heading_style',
+        'is_heading', 'is_caption', 'prev', 'next', '_code_listing_detector', '_is_code_listing'
+    )
+
+    def __init__(self, para, position, code_listing_detector=None):
+        self.para = para
+        self.position = position
+        self.text = (para.get('text') or '') if para else ''
+        self.stripped = self.text.strip()
+        self.style = (para.get('style') or '') if para else ''
+        self.is_heading_style = self.style.startswith('Heading')
+        self.is_heading = self.is_heading_style or bool(para and para.get('is_heading', False))
+        self.is_caption = bool(para and para.get('is_caption'))
+        self.prev = None
+        self.next = None
+        self._code_listing_detector = code_listing_detector
+        self._is_code_listing = None
+
+    @property
+    def is_code_listing(self):
+        """
+        Является ли параграф листингом кода (вычисляется при первом обращении)
+        """
+        if self._is_code_listing is None:
+            detector = self._code_listing_detector
+            self._is_code_listing = bool(detector(self.para)) if detector else False
+        return self._is_code_listing
+
+
+class ParagraphVisitorEngine:
+    """
+    Движок однопроходного обхода параграфов.
+
+    Обработчик вызывается как callback(facts, issues, context), где context —
+    результат prepare(document_data), вычисленный один раз перед обходом.
+    """
+
+    def __init__(self, code_listing_detector=None):
+        """
+        Инициализация движка
+        code_listing_detector: функция para -> bool для признака is_code_listing
+        """
+        self.code_listing_detector = code_listing_detector
+        self._visitors = {}
+
+    def register(self, name, callback, prepare=None):
+        """
+        Регистрирует обработчик параграфа под именем проверки
+        """
+        self._visitors[name] = (callback, prepare)
+
+    def __contains__(self, name):
+        return name in self._visitors
+
+    def names(self):
+        """
+        Имена зарегистрированных проверок
+        """
+        return list(self._visitors)
+
+    def run(self, document_data, names=None, timings=None, positions=None):
+        """
+        Выполняет выбранные проверки за один проход по параграфам
+        document_data: данные документа с ключом 'paragraphs'
+        names: имена проверок (None — все зарегистрированные)
+        timings: словарь, в который записывается время каждой проверки в секундах
+                 (подготовка и обработчики; общие признаки параграфа не учитываются)
+        positions: позиции параграфов, которые нужно проверить (None — все);
+                   соседние параграфы при этом доступны обработчикам как обычно
+        Returns:
+            dict: {имя проверки: список замечаний}
+        """
+        if names is None:
+            names = list(self._visitors)
+        active = []
+        results = {}
+        for name in names:
+            callback, prepare = self._visitors[name]
+            issues = results[name] = []
+            started = time.perf_counter()
+            context = prepare(document_data) if prepare else None
+            if timings is not None:
+                timings[name] = time.perf_counter() - started
+                callback = self._timed(callback, name, timings)
+            active.append((callback, issues, context))
+
+        paragraphs = document_data['paragraphs']
+        count = len(paragraphs)
+        if not active or not count:
+            return results
+
+        detector = self.code_listing_detector
+        if positions is not None:
+            for position in sorted(positions):
+                if 0 <= position < count:
+                    self._visit(self._facts_with_neighbors(paragraphs, position), active)
+            return results
+
+        # Признаки следующего параграфа строятся заранее, чтобы обработчики
+        # могли смотреть на соседей без повторного разбора
+        current = ParagraphFacts(paragraphs[0], 0, detector)
+        for position in range(count):
+            if position + 1 < count:
+                following = ParagraphFacts(paragraphs[position + 1], position + 1, detector)
+                following.prev = current
+                current.next = following
+            else:
+                following = None
+
+            self._visit(current, active)
+
+            # Разрываем ссылку назад, чтобы не удерживать всю цепочку признаков
+            current.prev = None
+            current = following
+
+        return results
+
+    @staticmethod
+    def _visit(facts, active):
+        """
+        Передает параграф всем обработчикам и помечает новые замечания индексом параграфа
+        """
+        paragraph_index = facts.para.get('index') if facts.para else None
+        for callback, issues, context in active:
+            before = len(issues)
+            callback(facts, issues, context)
+            for issue in issues[before:]:
+                issue.setdefault('paragraph_index', paragraph_index)
+
+    def _facts_with_neighbors(self, paragraphs, position):
+        """
+        Признаки параграфа вместе с признаками соседних параграфов
+        """
+        detector = self.code_listing_detector
+        facts = ParagraphFacts(paragraphs[position], position, detector)
+        if position > 0:
+            facts.prev = ParagraphFacts(paragraphs[position - 1], position - 1, detector)
+            facts.prev.next = facts
+        if position + 1 < len(paragraphs):
+            facts.next = ParagraphFacts(paragraphs[position + 1], position + 1, detector)
+            facts.next.prev = facts
+        return facts
+
+    @staticmethod
+    def _timed(callback, name, timings):
+        """
+        Оборачивает обработчик для накопления времени его работы в timings[name]
+        """
+        clock = time.perf_counter
+
+        def timed_callback(facts, issues, context):
+            started = clock()
+            try:
+                callback(facts, issues, context)
+            finally:
+                timings[name] += clock() - started
+
+        return timed_callback
@@ -0,0 +1,192 @@
+"""
+Общий реестр предкомпилированных регулярных выражений.
+
+Шаблоны компилируются один раз при импорте модуля и используются
+NormControlChecker, DocumentCorrector и DocumentProcessor во внутренних
+циклах по параграфам вместо передачи строк в re.search/re.match.
+"""
+
+import re
+
+# === Листинги программного кода ===
+CODE_INDICATORS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    # Ключевые слова программирования
+    r'\b(def|function|class|if|else|elif|for|while|return|import|include|#include|using|namespace)\b',
+    # Операторы и синтаксис
+    r'[{}();]',
+    r'=>|->|\+\+|--|==|!=|<=|>=',
+    # Типичные конструкции
+    r'\b(int|string|char|float|double|boolean|void|public|private|protected)\b',
+    r'\b(printf|cout|cin|scanf|print|console\.log)\b',
+    # HTML/CSS/JS
+    r'<[^>]+>|{\s*[a-zA-Z-]+\s*:',
+    # SQL
+    r'\b(SELECT|FROM|WHERE|INSERT|UPDATE|DELETE|CREATE|TABLE)\b',
+    # Отступы как в коде (4+ пробелов в начале)
+    r'^\s{4,}',
+))
+
+# === Список литературы ===
+# Шаблоны записей по типам (ГОСТ)
+BIBLIOGRAPHY_RECORD_PATTERNS = {
+    'one_author': re.compile(r'^[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\.\s.*\s[–—-]\s.*,\s\d{4}\.\s[–—-]\s\d+\sс\.?$'),
+    '2_3_authors': re.compile(r'^[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\.,\s[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\..*\s[–—-]\s.*,\s\d{4}\.\s[–—-]\s\d+\sс\.?$'),
+    '4_authors': re.compile(r'^[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\.,\s[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\.,\s[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\.,\s[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\..*$'),
+    '5_plus_authors': re.compile(r'^.*\[и\sдр\.\].*$'),
+    'web_resource': re.compile(r'^.*\s?\[Электронный\sресурс\]\s?.*URL:\s.+\s\(дата\sобращения:?\s\d{2}\.\d{2}\.\d{4}\)\.?$'),
+    'law': re.compile(r'^.*(закон|постановление|указ|кодекс).*от\s\d{2}\.\d{2}\.\d{4}.*№.*$'),
+    'gost': re.compile(r'^ГОСТ\s.*[–—-]\s\d{4}.*$'),
+}
+
+# Признаки библиографической записи (DocumentProcessor._looks_like_bibliography_item)
+BIBLIOGRAPHY_ITEM_HINTS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'^[А-Я][а-я]+,\s[А-Я]\.',  # Фамилия, И.О.
+    r'\d{4}\.',  # Год издания с точкой
+    r'[–—-]\s\d+\sс\.',  # Указание на количество страниц
+    r'\[Электронный\sресурс\]',  # Электронный ресурс
+    r'URL:',  # URL
+    r'дата\sобращения',  # Дата обращения
+    r'ГОСТ\s',  # ГОСТ
+    r'№\s?\d+',  # Номер (для законов и постановлений)
+    r'от\s\d{2}\.\d{2}\.\d{4}',  # Дата (для законов и постановлений)
+))
+
+BIBLIOGRAPHY_NUMBERED = re.compile(r'^\d+[\.\)\]]')  # 1. 1) 1]
+BIBLIOGRAPHY_BRACKET_NUMBERED = re.compile(r'^\[\d+\]')  # [1]
+BIBLIOGRAPHY_NUMBER_PREFIX = re.compile(r'^\d+[\.\)\]]?\s*')
+BIBLIOGRAPHY_BRACKET_PREFIX = re.compile(r'^\[\d+\]\s*')
+BIBLIOGRAPHY_LEADING_NUMBER = re.compile(r'^\d+\.?\s*')
+BIBLIOGRAPHY_ITEM_NUMBER = re.compile(r'^\s*(\d+)\.\s')
+BIBLIOGRAPHY_TITLE = re.compile(r'список\s+(?:использованн[ыо]й|использованной|испол[ьз]зуемой)\s+литературы', re.IGNORECASE)
+YEAR = re.compile(r'\d{4}')
+INITIALS = re.compile(r'[А-Я]\.\s?[А-Я]\.')
+ONE_AUTHOR_START = re.compile(r'^[А-Я][а-я]+,\s[А-Я]\.\s?[А-Я]\.')
+
+# === Подписи и ссылки на рисунки и таблицы ===
+IMAGE_CAPTION = re.compile(r'^Рисунок\s+\d+\s*[–—-]\s*.+$', re.IGNORECASE)
+TABLE_TITLE = re.compile(r'^Таблица\s+\d+\s*[–—-]\s*.+$', re.IGNORECASE)
+IMAGE_NUMBER = re.compile(r'Рисунок\s+(\d+)', re.IGNORECASE)
+TABLE_NUMBER = re.compile(r'Таблица\s+(\d+)', re.IGNORECASE)
+IMAGE_REFERENCE = re.compile(r'(?:рис\.|рисунок|рисунку)\s+(\d+)', re.IGNORECASE)
+TABLE_REFERENCE = re.compile(r'(?:табл\.|таблица|таблицу|таблице)\s+(\d+)', re.IGNORECASE)
+ELEMENT_NUMBER = re.compile(r'^\d+(\.\d+)?$')
+
+# Ссылки в тексте для перекрестных ссылок (DocumentCorrector._correct_cross_references)
+CROSS_REFERENCE_IMAGE = re.compile(r'(?<!\w)(рис\.|рисунк[а-я]*)\s*\.?\s*(\d+)(?!\d)', re.IGNORECASE)
+CROSS_REFERENCE_TABLE = re.compile(r'(?<!\w)(табл\.|таблиц[а-я]*)\s*\.?\s*(\d+)(?!\d)', re.IGNORECASE)
+CROSS_REFERENCE_FORMULA = re.compile(r'(?<!\w)(формул[а-я]*|выражени[а-я]*)\s*\.?\s*(\d+(?:\.\d+)?)(?!\d)', re.IGNORECASE)
+CROSS_REFERENCE_SECTION = re.compile(r'(?<!\w)(раздел[а-я]*|глав[а-я]*)\s*\.?\s*(\d+(?:\.\d+)?)(?!\d)', re.IGNORECASE)
+CROSS_REFERENCE_APPENDIX = re.compile(r'(?<!\w)(приложени[а-я]*)\s*\.?\s*([А-Я])(?![А-Я])', re.IGNORECASE)
+
+# Номер заголовка ("1.2 Название") и номер в подписи рисунка ("рис. 3", "рисунок 3")
+HEADING_NUMBER = re.compile(r'^\d+(\.\d+)*\.?\s')
+IMAGE_CAPTION_NUMBER = re.compile(r'рис\w*\s+\d+')
+
+# Псевдозаголовки и нумерация глав (DocumentCorrector)
+CHAPTER_OR_SECTION_HEADING = re.compile(r'^(глава|раздел)\s+\d+\.?\s*')
+MULTILEVEL_NUMBERING = re.compile(r'^(\d+(?:\.\d+)*)(?:[\s\.:\-]+)(.*)')
+TOP_LEVEL_NUMBERING = re.compile(r'^\d+\.(\s+|$)')
+CHAPTER_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'^глава\s+\d+\.?\s+',
+    r'^раздел\s+\d+\.?\s+',
+    r'^\d+\.\s+[А-Я]',
+    r'^\d+\.\d+\.\s+[А-Я]',
+))
+
+# Заголовки структурных разделов, по которым DocumentIndex находит их границы
+# (текст параграфа приводится к нижнему регистру)
+TOC_TITLE = re.compile(r'^(оглавление|содержание)$')
+BIBLIOGRAPHY_SECTION_TITLE = re.compile(r'список\s+(использованн(ой|ых)\s+)?литератур')
+ABBREVIATIONS_TITLES = tuple(re.compile(pattern) for pattern in (
+    r'список\s+сокращений',
+    r'перечень\s+сокращений',
+    r'список\s+условных\s+обозначений',
+    r'условные\s+обозначения',
+    r'принятые\s+сокращения',
+))
+
+# === Титульный лист ===
+CITY_YEAR = re.compile(r'^[А-Я][а-я]+ \d{4}$')
+
+# === Количественные числительные ===
+SINGLE_DIGIT = re.compile(r'(?<!\d)(?<!\w)[0-9](?!\d)(?!\w)')
+NUMBER_SIGN_CONTEXT = re.compile(r'[№пn]\s*$')
+ENUMERATION_CONTEXT = re.compile(r'^\s*\d+\)')
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+PUNCTUATION = re.compile(r'[^\w\s]')
+MULTI_DIGIT_START = re.compile(r'^\d{2,}')
+
+# === Порядковые числительные ===
+ORDINAL_NO_SUFFIX = re.compile(r'\b\d+\s+(век[а-яёе]?|столети[а-яёеию]?|дн[а-яёеий]?|день|год[а-яёеы]?)\b', re.IGNORECASE)
+ORDINAL_ABBREVIATION = re.compile(r'\b\d+\s+(стр?\.)')
+DIGITS = re.compile(r'\d+')
+TRAILING_WORD = re.compile(r'[а-яё]+$', re.IGNORECASE)
+ABBREVIATION = re.compile(r'[а-яё]+\.', re.IGNORECASE)
+
+# === Фамилии и инициалы ===
+SURNAME_BEFORE_INITIALS = re.compile(r'(?<!\sи\s)(?<![«"\'\(])([А-Я][а-я]+)\s+([А-Я])\.\s*([А-Я])\.')
+SPACED_INITIALS = re.compile(r'([А-Я])\.\s+([А-Я])\.')
+INITIALS_BEFORE_SURNAME = re.compile(r'(?:^\s*\d+\.\s*)?([А-Я])\.\s*([А-Я])\.\s+([А-Я][а-я]+)')
+
+# === Списки ===
+BULLET_ITEM = re.compile(r'^[•\-–—]\s')
+NUMBERED_ITEM = re.compile(r'^\d+[.)]\s')
+LATIN_LETTER_ITEM = re.compile(r'^[a-z][.)]\s')
+LETTER_ITEM = re.compile(r'^([а-яa-z])[)\.]\s', re.IGNORECASE)
+LETTER_ITEM_RANGE = re.compile(r'^[a-яa-z][.)]\s', re.IGNORECASE)
+NUMBERED_LEVEL1_ITEM = re.compile(r'^(\d+)[)\.]\s')
+
+# === Переносы и висячие предлоги ===
+# Слова, которые не должны отрываться от следующего слова при переносе
+FORBIDDEN_HYPHEN_WORDS = (
+    r'\bи\b', r'\bа\b', r'\bв\b', r'\bс\b', r'\bк\b', r'\bу\b', r'\bо\b',
+    r'\bна\b', r'\bот\b', r'\bдо\b', r'\bза\b', r'\bиз\b', r'\bпо\b',
+    r'\bт\.д\b', r'\bт\.п\b', r'\bт\.е\b',
+    r'\bг\.\b', r'\bгг\.\b', r'\bвв\.\b', r'\bстр\.\b'
+)
+# Любое из запрещенных слов (для быстрой проверки необходимости изменений)
+FORBIDDEN_HYPHEN_ANY = re.compile('|'.join(FORBIDDEN_HYPHEN_WORDS))
+# Запрещенное слово, перед которым стоит пробел (для замены на неразрывный)
+FORBIDDEN_HYPHEN_SPACED = tuple(
+    re.compile(r'\s+(' + pattern[2:-2] + r')\b') for pattern in FORBIDDEN_HYPHEN_WORDS
+)
+
+# Правила исправления неправильных переносов: (шаблон, замена)
+HYPHEN_RULES = (
+    (re.compile(r'(\w)-\s+(\w)'), r'\1\2'),  # Убираем переносы внутри слов
+    (re.compile(r'(\d+)\s*-\s*(\d+)'), r'\1-\2'),  # Исправляем дефисы в числовых диапазонах
+    (re.compile(r'(\w+)\s*-\s*(\w+)'), r'\1-\2'),  # Исправляем дефисы между словами
+)
+
+# Предлоги и союзы, которые не должны находиться в конце строки
+HANGING_WORDS = (
+    'а', 'и', 'в', 'с', 'к', 'у', 'о', 'на', 'от', 'до', 'за', 'из', 'по', 'под', 'над',
+    'при', 'для', 'без', 'про', 'через', 'перед', 'после', 'кроме', 'вдоль', 'вместо',
+    'около', 'возле', 'между', 'сквозь', 'среди', 'из-за', 'из-под', 'но', 'да', 'или',
+    'либо', 'то', 'не', 'ни', 'бы', 'же', 'ведь', 'вот', 'что', 'как', 'так', 'уж'
+)
+HANGING_WORD = re.compile(r'\b(' + '|'.join(HANGING_WORDS) + r')\s+')
+
+# === Замечания проверки ===
+# Место замечания, указывающее на параграф тела документа: "Параграф 12", "Заголовок 3",
+# и, возможно, на фрагмент (run) в нем: "Параграф 12, фрагмент 2"
+ISSUE_PARAGRAPH_LOCATION = re.compile(r'^(?:Параграф|Заголовок)\s+(\d+)(?:,\s*фрагмент\s+(\d+))?$')
+
+
+def all_patterns():
+    """
+    Возвращает все скомпилированные шаблоны реестра (для бенчмарка и тестов)
+    """
+    patterns = []
+    for value in globals().values():
+        if isinstance(value, re.Pattern):
+            patterns.append(value)
+        elif isinstance(value, dict):
+            patterns.extend(item for item in value.values() if isinstance(item, re.Pattern))
+        elif isinstance(value, tuple):
+            for item in value:
+                if isinstance(item, re.Pattern):
+                    patterns.append(item)
+                elif isinstance(item, tuple) and item and isinstance(item[0], re.Pattern):
+                    patterns.append(item[0])
+    return patterns
@@ -0,0 +1,279 @@
+"""
+Кеш результатов обработки документов по содержимому файла.
+
+Ключ — SHA-256 загруженных байтов плюс отпечаток набора правил и версии
+конвейера обработки. Хранятся document_data, результаты проверки и
+исправленный документ: в памяти (LRU по числу записей) и на диске
+(LRU по суммарному размеру). Повторная загрузка того же файла не требует
+ни разбора DOCX, ни проверки, ни автоисправления.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from .norm_control_checker import NORM_RULES
+
+# Увеличивается при изменении формата записей кеша
+CACHE_VERSION = 1
+
+SERVICES_DIR = os.path.abspath(os.path.dirname(__file__))
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(SERVICES_DIR), 'cache')
+
+# Модули, от которых зависит результат; их изменение сбрасывает кеш
+_PIPELINE_MODULES = (
+    'document_processor.py', 'norm_control_checker.py', 'document_corrector.py',
+    'paragraph_index.py', 'formatting_resolver.py', 'compact_paragraphs.py',
+    'lazy_document_data.py', 'paragraph_visitor.py', 'regex_patterns.py',
+    'correction_journal.py', 'document_index.py', 'formatting_engine.py',
+    'document_pipeline.py', 'package_writer.py', 'change_set.py',
+)
+
+_pipeline_fingerprint = None
+
+
+def pipeline_fingerprint():
+    """
+    Отпечаток версии конвейера: правила NORM_RULES и исходный код сервисов (вычисляется один раз)
+    """
+    global _pipeline_fingerprint
+    if _pipeline_fingerprint is None:
+        digest = hashlib.sha256()
+        digest.update(str(CACHE_VERSION).encode())
+        digest.update(json.dumps(NORM_RULES, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        for name in _PIPELINE_MODULES:
+            path = os.path.join(SERVICES_DIR, name)
+            try:
+                with open(path, 'rb') as fh:
+                    digest.update(fh.read())
+            except OSError:
+                digest.update(name.encode())
+        _pipeline_fingerprint = digest.hexdigest()
+    return _pipeline_fingerprint
+
+
+def make_cache_key(content, rule_ids=None, variant=''):
+    """
+    Ключ кеша: SHA-256 содержимого файла + отпечаток набора правил и конвейера
+    """
+    digest = hashlib.sha256()
+    digest.update(hashlib.sha256(content).digest())
+    digest.update(pipeline_fingerprint().encode())
+    digest.update(json.dumps(sorted(rule_ids) if rule_ids else None).encode())
+    digest.update(variant.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Двухуровневый LRU-кеш результатов обработки документов
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_memory_entries=32, max_disk_bytes=512 * 1024 * 1024):
+        """
+        Инициализация кеша
+        cache_dir: директория дискового кеша (None — только память)
+        max_memory_entries: число записей в памяти
+        max_disk_bytes: максимальный суммарный размер файлов на диске
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def artifact_path(self, key):
+        """
+        Путь к сохраненному исправленному документу для ключа
+        """
+        return os.path.join(self.cache_dir, f"{key}.docx") if self.cache_dir else None
+
+    def get(self, key):
+        """
+        Возвращает запись кеша или None
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._touch(key)
+                return entry
+
+        if not self.cache_dir:
+            return None
+        path = self._entry_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as fh:
+                entry = pickle.load(fh)
+        except Exception as e:
+            print(f"Ошибка при чтении записи кеша {key}: {str(e)}")
+            self._remove_files(key)
+            return None
+
+        # Запись без исправленного документа считаем неполной
+        if entry.get('artifact') and not os.path.exists(self.artifact_path(key)):
+            self._remove_files(key)
+            return None
+
+        with self._lock:
+            self._remember(key, entry)
+            self._touch(key)
+        return entry
+
+    def put(self, key, entry, artifact_path=None):
+        """
+        Сохраняет запись. artifact_path — исправленный документ, который копируется в кеш.
+        """
+        entry = dict(entry)
+        entry['artifact'] = False
+        entry['stored_at'] = time.time()
+
+        if self.cache_dir:
+            try:
+                if artifact_path and os.path.exists(artifact_path):
+                    def copy_artifact(fh):
+                        with open(artifact_path, 'rb') as src:
+                            shutil.copyfileobj(src, fh)
+                    self._write_file(key, self.artifact_path(key), copy_artifact)
+                    entry['artifact'] = True
+                self._write_file(key, self._entry_path(key),
+                                 lambda fh: pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL))
+            except Exception as e:
+                # Записи, уже сохраненные другим процессом или потоком, не трогаем
+                print(f"Ошибка при записи в кеш {key}: {str(e)}")
+                entry['artifact'] = False
+
+        with self._lock:
+            self._remember(key, entry)
+        if self.cache_dir:
+            self._evict_disk()
+        return entry
+
+    def _write_file(self, key, path, write):
+        """
+        Записывает файл кеша через временный файл с уникальным именем и заменяет
+        им path: одновременные записи того же ключа не портят файлы друг друга
+        """
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{key}.", suffix='.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                write(fh)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def restore_artifact(self, key, destination):
+        """
+        Копирует исправленный документ из кеша в destination. Возвращает True при успехе.
+        """
+        source = self.artifact_path(key)
+        if not source or not os.path.exists(source):
+            return False
+        shutil.copyfile(source, destination)
+        return True
+
+    def clear(self):
+        """
+        Очищает кеш в памяти и на диске
+        """
+        with self._lock:
+            self._memory.clear()
+        if self.cache_dir and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(('.pkl', '.docx', '.tmp')):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _touch(self, key):
+        # Время доступа к файлам определяет порядок вытеснения на диске
+        if not self.cache_dir:
+            return
+        for path in (self._entry_path(key), self.artifact_path(key)):
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+
+    def _remove_files(self, key):
+        for path in (self._entry_path(key), self.artifact_path(key)):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _evict_disk(self):
+        """
+        Удаляет давно не использованные записи, пока размер кеша превышает лимит
+        """
+        entries = {}
+        try:
+            for name in os.listdir(self.cache_dir):
+                key, ext = os.path.splitext(name)
+                if ext not in ('.pkl', '.docx'):
+                    continue
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                size, mtime = entries.get(key, (0, 0))
+                entries[key] = (size + stat.st_size, max(mtime, stat.st_mtime))
+        except OSError as e:
+            print(f"Ошибка при обходе директории кеша: {str(e)}")
+            return
+
+        total = sum(size for size, _ in entries.values())
+        for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_disk_bytes:
+                break
+            self._remove_files(key)
+            with self._lock:
+                self._memory.pop(key, None)
+            total -= size
+
+
+_document_cache = None
+_document_cache_lock = threading.Lock()
+
+
+def get_document_cache():
+    """
+    Общий кеш процесса, настраиваемый переменными окружения:
+    DOCUMENT_CACHE_ENABLED (по умолчанию 1), DOCUMENT_CACHE_DIR,
+    DOCUMENT_CACHE_MEMORY_ENTRIES (32), DOCUMENT_CACHE_DISK_MB (512).
+    Возвращает None, если кеш отключен.
+    """
+    global _document_cache
+    if os.environ.get('DOCUMENT_CACHE_ENABLED', '1').lower() in ('0', 'false', 'no'):
+        return None
+    if _document_cache is None:
+        with _document_cache_lock:
+            if _document_cache is None:
+                _document_cache = ResultCache(
+                    cache_dir=os.environ.get('DOCUMENT_CACHE_DIR') or DEFAULT_CACHE_DIR,
+                    max_memory_entries=int(os.environ.get('DOCUMENT_CACHE_MEMORY_ENTRIES', '32')),
+                    max_disk_bytes=int(float(os.environ.get('DOCUMENT_CACHE_DISK_MB', '512')) * 1024 * 1024),
+                )
+    return _document_cache
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+Бенчмарк однопроходного форматирования DocumentCorrector.
+
+Для каждого документа группы правил форматирования (шрифт и интервалы,
+списки, переносы с отступами и выравниванием) применяются двумя способами:
+отдельным обходом на каждое правило (как раньше) и одним обходом на группу
+(FormattingEngine). Выводится время обоих вариантов и проверяется, что
+полученные документы совпадают побайтно. Затем так же сравнивается полное
+исправление документа (correct_document). В конце для режимов исправления
+шрифта 'direct' и 'styles' выводятся размер document.xml и время открытия
+и сохранения исправленного документа.
+
+Использование:
+    python benchmark_corrector.py [--repeat N] [путь.docx ...]
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from docx import Document
+from lxml import etree
+
+from app.services.document_corrector import (
+    BASE_FORMATTING_RULES, FINAL_FORMATTING_RULES, LIST_FORMATTING_RULES, DocumentCorrector
+)
+
+DEFAULT_DOCUMENTS = [
+    os.path.join(BASE_DIR, 'tests', 'test_data', 'large_document.docx'),
+    os.path.join(BASE_DIR, 'tests', 'test_data', 'documents', 'large_document.docx'),
+    os.path.join(BASE_DIR, 'test_document.docx'),
+]
+
+RULE_GROUPS = (BASE_FORMATTING_RULES, LIST_FORMATTING_RULES, FINAL_FORMATTING_RULES)
+
+
+def format_groups(path, fused):
+    """
+    Применяет группы правил форматирования; возвращает (время, XML тела документа)
+    """
+    document = Document(path)
+    corrector = DocumentCorrector()
+    corrector.fuse_formatting = fused
+    started = time.perf_counter()
+    for group in RULE_GROUPS:
+        corrector._apply_formatting(document, group)
+    elapsed = time.perf_counter() - started
+    return elapsed, etree.tostring(document.element)
+
+
+def correct_document(path, fused, out_path):
+    """
+    Полное исправление документа; возвращает (время, отпечатки частей пакета)
+    """
+    corrector = DocumentCorrector()
+    corrector.fuse_formatting = fused
+    started = time.perf_counter()
+    corrector.correct_document(path, out_path=out_path)
+    elapsed = time.perf_counter() - started
+    with zipfile.ZipFile(out_path) as archive:
+        parts = {name: hashlib.sha256(archive.read(name)).hexdigest() for name in archive.namelist()}
+    return elapsed, parts
+
+
+def formatting_mode_result(path, mode, out_path):
+    """
+    Исправляет документ в режиме mode; возвращает (размер document.xml, время открытия и сохранения)
+    """
+    corrector = DocumentCorrector()
+    corrector.formatting_mode = mode
+    corrector.correct_document(path, out_path=out_path)
+    with zipfile.ZipFile(out_path) as archive:
+        xml_size = len(archive.read('word/document.xml'))
+    started = time.perf_counter()
+    Document(out_path).save(out_path)
+    return xml_size, time.perf_counter() - started
+
+
+def measure(function, path, repeat, *args):
+    """
+    Минимальное время из repeat прогонов и результат последнего прогона
+    """
+    best = None
+    result = None
+    for _ in range(repeat):
+        elapsed, result = function(path, *args)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    """Главная функция"""
+    parser = argparse.ArgumentParser(description='Бенчмарк однопроходного форматирования')
+    parser.add_argument('documents', nargs='*', help='Пути к DOCX-файлам')
+    parser.add_argument('--repeat', type=int, default=3, help='Число прогонов на документ')
+    args = parser.parse_args()
+
+    documents = args.documents or [path for path in DEFAULT_DOCUMENTS if os.path.exists(path)]
+    out_dir = tempfile.mkdtemp()
+
+    # Вывод сервисов (print) не должен смешиваться с таблицей
+    real_stdout = sys.stdout
+    print(f"{'Документ':32} {'Этап':14} {'Проходы, с':>11} {'Один обход, с':>14} {'Ускорение':>10} {'Совпадает':>10}")
+    for path in documents:
+        name = os.path.basename(path)[:32]
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            separate, separate_xml = measure(format_groups, path, args.repeat, False)
+            fused, fused_xml = measure(format_groups, path, args.repeat, True)
+            out_path = os.path.join(out_dir, 'corrected.docx')
+            full_separate, separate_parts = measure(correct_document, path, args.repeat, False, out_path)
+            full_fused, fused_parts = measure(correct_document, path, args.repeat, True, out_path)
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        for stage, before, after, same in (
+            ('форматирование', separate, fused, separate_xml == fused_xml),
+            ('исправление', full_separate, full_fused, separate_parts == fused_parts),
+        ):
+            speedup = before / after if after else 0.0
+            print(f"{name:32} {stage:14} {before:11.3f} {after:14.3f} {speedup:9.2f}x {'да' if same else 'НЕТ':>10}")
+
+    print()
+    print(f"{'Документ':32} {'Режим':8} {'document.xml, КБ':>17} {'Открытие и сохранение, с':>25}")
+    for path in documents:
+        name = os.path.basename(path)[:32]
+        for mode in ('direct', 'styles'):
+            sys.stdout = open(os.devnull, 'w')
+            try:
+                out_path = os.path.join(out_dir, f'corrected_{mode}.docx')
+                xml_size, best = None, None
+                for _ in range(args.repeat):
+                    xml_size, elapsed = formatting_mode_result(path, mode, out_path)
+                    best = elapsed if best is None else min(best, elapsed)
+            finally:
+                sys.stdout.close()
+                sys.stdout = real_stdout
+            print(f"{name:32} {mode:8} {xml_size / 1024:17.1f} {best:25.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Бенчмарк стоимости регулярных выражений при обработке документа.
+
+Для каждого документа профилируются извлечение данных, проверка нормоконтроля
+и исправление переносов/висячих предлогов; выводится общее время, время внутри
+модуля re (включая компиляцию и поиск в кеше шаблонов) и число вызовов.
+С флагом --compare дополнительно сравнивается применение шаблонов реестра
+app.services.regex_patterns к тексту документа: строкой через re.* (как было
+раньше) и предкомпилированным объектом.
+
+Использование:
+    python benchmark_regex.py [--compare] [--repeat N] [путь.docx ...]
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from docx import Document
+
+from app.services.document_corrector import DocumentCorrector
+from app.services.document_processor import DocumentProcessor
+from app.services.norm_control_checker import NormControlChecker
+
+DEFAULT_DOCUMENTS = [
+    os.path.join(BASE_DIR, 'tests', 'test_data', 'large_document.docx'),
+    os.path.join(BASE_DIR, 'tests', 'test_data', 'multiple_errors_document.docx'),
+    os.path.join(BASE_DIR, 'test_document.docx'),
+]
+
+
+def _is_regex_entry(key):
+    """
+    Относится ли запись профиля к модулю re (функции модуля или методы re.Pattern)
+    """
+    filename, _, name = key
+    if filename == '~':
+        return "'re.Pattern'" in name or 're.Match' in name or '_sre' in name
+    return os.sep + 're' + os.sep in filename
+
+
+def process_document(path):
+    """
+    Этапы обработки документа, использующие регулярные выражения
+    """
+    data = DocumentProcessor(path).extract_data()
+    NormControlChecker().check_document(data)
+    document = Document(path)
+    corrector = DocumentCorrector()
+    corrector._fix_incorrect_hyphenation(document)
+    corrector._fix_hanging_prepositions(document)
+
+
+def profile_document(path, repeat):
+    """
+    Возвращает (общее время, время в re, число вызовов re) в среднем на один прогон
+    """
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        profiler.runcall(process_document, path)
+    total = time.perf_counter() - started
+
+    stats = pstats.Stats(profiler).stats
+    regex_time = 0.0
+    regex_calls = 0
+    for key, (_, ncalls, tottime, _, _) in stats.items():
+        if _is_regex_entry(key):
+            regex_time += tottime
+            regex_calls += ncalls
+    return total / repeat, regex_time / repeat, regex_calls // repeat
+
+
+def compare_registry(path, repeat):
+    """
+    Сравнивает применение шаблонов реестра строкой и предкомпилированным объектом
+    """
+    import re
+    from app.services import regex_patterns
+
+    texts = [para.text for para in Document(path).paragraphs if para.text.strip()]
+    patterns = regex_patterns.all_patterns()
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            for pattern in patterns:
+                re.search(pattern.pattern, text, pattern.flags)
+    by_string = (time.perf_counter() - started) / repeat
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            for pattern in patterns:
+                pattern.search(text)
+    compiled = (time.perf_counter() - started) / repeat
+    return len(texts), len(patterns), by_string, compiled
+
+
+def main():
+    """Главная функция"""
+    parser = argparse.ArgumentParser(description='Бенчмарк регулярных выражений')
+    parser.add_argument('documents', nargs='*', help='Пути к DOCX-файлам')
+    parser.add_argument('--repeat', type=int, default=3, help='Число прогонов на документ')
+    parser.add_argument('--compare', action='store_true', help='Сравнить строковые и предкомпилированные шаблоны')
+    args = parser.parse_args()
+
+    documents = args.documents or [path for path in DEFAULT_DOCUMENTS if os.path.exists(path)]
+
+    # Вывод сервисов (print) не должен смешиваться с таблицей
+    real_stdout = sys.stdout
+    print(f"{'Документ':40} {'Всего, с':>10} {'re, с':>10} {'Доля re':>8} {'Вызовов re':>11}")
+    for path in documents:
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            total, regex_time, regex_calls = profile_document(path, args.repeat)
+        finally:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+        share = regex_time / total if total else 0.0
+        print(f"{os.path.basename(path)[:40]:40} {total:10.3f} {regex_time:10.3f} {share:8.1%} {regex_calls:11d}")
+
+    if args.compare:
+        print()
+        print(f"{'Документ':40} {'Параграфов':>10} {'Шаблонов':>9} {'Строкой, с':>11} {'Компил., с':>11}")
+        for path in documents:
+            count, pattern_count, by_string, compiled = compare_registry(path, args.repeat)
+            print(f"{os.path.basename(path)[:40]:40} {count:10d} {pattern_count:9d} {by_string:11.4f} {compiled:11.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -121,6 +121,10 @@ def pytest_runtest_makereport(item, call):
 # Добавляем корневую директорию проекта в PYTHONPATH
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# Кеш результатов обработки документов — отдельный для каждого запуска тестов
+import tempfile
+os.environ.setdefault('DOCUMENT_CACHE_DIR', tempfile.mkdtemp(prefix='cursa_test_cache_'))
+
 from app import create_app
 
 @pytest.fixture
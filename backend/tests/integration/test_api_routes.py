@@ -1,6 +1,7 @@
 """Интеграционные тесты для API маршрутов."""
 import os
 import io
+import uuid
 import pytest
 
 def test_api_document_analysis_route_exists(client):
@@ -42,4 +43,216 @@ def test_document_analysis_with_valid_file(client):
     )
     
     assert response.status_code == 200
-    assert 'analysis' in response.json 
\ No newline at end of file
+    assert 'analysis' in response.json 
+
+def _make_docx_bytes(text="Текст для выборочной проверки."):
+    """Создает небольшой DOCX в памяти."""
+    from docx import Document
+    doc = Document()
+    doc.add_paragraph(text)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_upload_with_unknown_rule(client):
+    """Тест загрузки с неизвестной нормой в параметре rules."""
+    response = client.post(
+        '/api/document/upload',
+        data={'file': (_make_docx_bytes(), 'doc.docx'), 'rules': '2,999'},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 400
+    assert '999' in response.json['error']
+
+
+def test_upload_with_rules_subset(client):
+    """Тест выборочной проверки: только шрифт и поля."""
+    response = client.post(
+        '/api/document/upload?rules=2,3,6',
+        data={'file': (_make_docx_bytes(), 'doc.docx')},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 200
+    assert response.json['rules'] == [2, 3, 6]
+    rule_ids = [r['rule_id'] for r in response.json['check_results']['rules_results']]
+    assert rule_ids == [2, 3, 6]
+    slowest = response.json['slowest_rules']
+    assert slowest and {rule_id for entry in slowest for rule_id in entry['rule_ids']} <= {2, 3, 6}
+
+
+def test_repeated_upload_served_from_cache(client):
+    """Тест повторной загрузки того же файла: результат берется из кеша."""
+    content = _make_docx_bytes().getvalue()
+    first = client.post(
+        '/api/document/upload',
+        data={'file': (io.BytesIO(content), 'cached.docx')},
+        content_type='multipart/form-data'
+    )
+    second = client.post(
+        '/api/document/upload',
+        data={'file': (io.BytesIO(content), 'cached.docx')},
+        content_type='multipart/form-data'
+    )
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.json['cache_hit'] is False
+    assert second.json['cache_hit'] is True
+    assert second.json['check_results'] == first.json['check_results']
+    if first.json['correction_success']:
+        assert second.json['corrected_file_path']
+        assert second.json['corrected_check_results'] == first.json['corrected_check_results']
+
+
+def test_correct_dry_run_and_apply_changes(client):
+    """Тест пробного исправления: набор изменений без DOCX и применение выбранных изменений."""
+    from app.api.document_routes import CORRECTIONS_DIR
+    upload = client.post(
+        '/api/document/upload',
+        data={'file': (_make_docx_bytes(), 'dry_run.docx')},
+        content_type='multipart/form-data'
+    )
+    assert upload.status_code == 200
+
+    dry_run = client.post('/api/document/correct', json={
+        'file_path': upload.json['temp_path'], 'original_filename': 'dry_run.docx', 'dry_run': True
+    })
+    assert dry_run.status_code == 200
+    assert dry_run.json['dry_run'] is True
+    changes = dry_run.json['changes']
+    assert changes and dry_run.json['summary']['total'] == len(changes)
+    assert 'corrected_file_path' not in dry_run.json
+
+    paragraph_changes = [change['id'] for change in changes if change['kind'] in ('paragraph', 'run')]
+    applied = client.post('/api/document/apply-changes', json={
+        'change_set_id': dry_run.json['change_set_id'], 'change_ids': paragraph_changes
+    })
+    assert applied.status_code == 200
+    assert sorted(applied.json['applied_changes']) == sorted(paragraph_changes)
+    assert os.path.exists(os.path.join(CORRECTIONS_DIR, applied.json['corrected_file_path']))
+
+    missing = client.post('/api/document/apply-changes', json={'change_set_id': '0' * 32})
+    assert missing.status_code == 404
+
+
+def test_upload_async_job(client):
+    """Тест асинхронной загрузки: задание в очереди и его результат по /jobs/<id>."""
+    import time
+    response = client.post(
+        '/api/document/upload',
+        data={'file': (_make_docx_bytes(), 'async.docx'), 'async': '1'},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 202
+    job_id = response.json['job_id']
+    assert response.json['status_url'] == f'/api/document/jobs/{job_id}'
+
+    deadline = time.time() + 60
+    job = client.get(f'/api/document/jobs/{job_id}').json
+    while job['status'] not in ('done', 'failed') and time.time() < deadline:
+        time.sleep(0.1)
+        job = client.get(f'/api/document/jobs/{job_id}').json
+    assert job['status'] == 'done', job
+    assert job['filename'] == 'async.docx'
+    assert 'check_results' in job['result'] and job['result']['success'] is True
+
+    assert client.get('/api/document/jobs/' + '0' * 32).status_code == 404
+    assert client.get('/api/document/jobs/not-a-job').status_code == 400
+
+
+def test_upload_async_job_events(client):
+    """Тест потока событий задания: результаты проверки приходят до автоисправления."""
+    import json
+    response = client.post(
+        '/api/document/upload',
+        # Уникальный текст: документ обрабатывается полностью, а не берется из кеша
+        data={'file': (_make_docx_bytes(f"Текст для потока событий {uuid.uuid4().hex}."), 'events.docx'),
+              'async': '1'},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 202
+    events_url = response.json['events_url']
+
+    stream = client.get(events_url)
+    assert stream.status_code == 200
+    assert stream.mimetype == 'text/event-stream'
+    messages = []
+    for block in stream.get_data(as_text=True).split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if 'event' in fields:
+            messages.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+
+    names = [name for _, name, _ in messages]
+    assert names[:2] == ['queued', 'started'] and names[-1] == 'done'
+    assert names.index('checked') < names.index('correction_pass') < names.index('corrected')
+    assert names.index('rule') < names.index('checked')
+    assert names.count('rule') == len(messages[names.index('checked')][2]['rules_results'])
+    assert messages[-1][2]['result']['success'] is True
+
+    # Переподключение продолжает поток после Last-Event-ID
+    resumed = client.get(events_url, headers={'Last-Event-ID': str(messages[-2][0])})
+    assert resumed.get_data(as_text=True).count('event: ') == 1
+    assert client.get('/api/document/jobs/' + '0' * 32 + '/events').status_code == 404
+
+
+def test_batch_upload(client):
+    """Тест пакетной обработки: ZIP с документами, строки NDJSON по файлам и архив исправленных."""
+    import json
+    import zipfile
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        for name in ('group/first.docx', 'other/first.docx', 'second.docx'):
+            zf.writestr(name, _make_docx_bytes(f"Текст пакетной проверки {name} {uuid.uuid4().hex}.").getvalue())
+        zf.writestr('readme.txt', 'не документ')
+    archive.seek(0)
+
+    response = client.post(
+        '/api/document/batch',
+        data={'file': (archive, 'works.zip')},
+        content_type='multipart/form-data'
+    )
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    files = [line for line in lines if line['type'] == 'file']
+    summary = lines[-1]
+    assert summary['type'] == 'summary'
+    assert sorted(line['filename'] for line in files if line['status'] == 'done') == [
+        'first.docx', 'first_2.docx', 'second.docx'
+    ]
+    assert [line['filename'] for line in files if line['status'] == 'skipped'] == ['readme.txt']
+    assert summary['succeeded'] == 3 and summary['failed'] == 0 and summary['skipped'] == 1
+    assert summary['total_issues'] == sum(line['total_issues'] for line in files if line['status'] == 'done')
+
+    download = client.get(summary['archive_url'])
+    assert download.status_code == 200
+    result = zipfile.ZipFile(io.BytesIO(download.get_data()))
+    assert sorted(result.namelist()) == ['first.docx', 'first_2.docx', 'second.docx', 'summary.json']
+    assert json.loads(result.read('summary.json'))['batch_id'] == summary['batch_id']
+
+    assert client.post('/api/document/batch', data={}, content_type='multipart/form-data').status_code == 400
+    assert client.get('/api/document/batch/' + '0' * 32 + '/archive').status_code == 404
+
+
+def test_expired_uploads_purged(client):
+    """Тест удаления загруженных оригиналов старше UPLOAD_TTL_HOURS."""
+    import time
+    from unittest.mock import patch
+    from app.api.document_routes import UPLOADS_DIR, _purge_expired_uploads
+    expired = os.path.join(UPLOADS_DIR, f"{uuid.uuid4().hex}_expired.docx")
+    fresh = os.path.join(UPLOADS_DIR, f"{uuid.uuid4().hex}_fresh.docx")
+    for path in (expired, fresh):
+        with open(path, 'wb') as f:
+            f.write(b'docx')
+    old = time.time() - 3 * 3600
+    os.utime(expired, (old, old))
+    try:
+        with patch.dict(os.environ, {'UPLOAD_TTL_HOURS': '2'}):
+            assert _purge_expired_uploads(force=True) >= 1
+        assert not os.path.exists(expired)
+        assert os.path.exists(fresh)
+    finally:
+        for path in (expired, fresh):
+            if os.path.exists(path):
+                os.remove(path)
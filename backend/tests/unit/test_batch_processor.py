@@ -0,0 +1,110 @@
+"""
+Модульные тесты для пакетной обработки документов
+"""
+import io
+import os
+import sys
+import zipfile
+from unittest.mock import patch
+
+import pytest
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.batch_processor import BatchError, get_batch_config, open_batch, run_batch, stream_zip
+from app.services.job_queue import JobQueue
+
+
+def _describe(content, filename):
+    return f"{filename}:{len(content)}"
+
+
+def _make_zip(files):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+class TestBatchProcessor:
+    """
+    Тесты open_batch, run_batch и stream_zip
+    """
+
+    def setup_method(self):
+        """
+        Архив с документами в разных каталогах, служебными и неподходящими файлами
+        """
+        self.archive = _make_zip({
+            'group/report.docx': b'a' * 10,
+            'other/report.docx': b'b' * 20,
+            'group/notes.txt': b'text',
+            '__MACOSX/group/._report.docx': b'',
+            'group/~$report.docx': b'',
+            'big.docx': b'c' * 100,
+        })
+
+    def test_open_batch(self):
+        """
+        Документы из архива и отдельные файлы получают уникальные имена,
+        неподходящие и слишком большие файлы пропускаются
+        """
+        source = open_batch([('works.zip', self.archive), ('single.docx', io.BytesIO(b'd' * 5))],
+                            max_file_size=50)
+        try:
+            assert [entry.name for entry in source.entries] == ['report.docx', 'report_2.docx', 'single.docx']
+            assert [entry.read() for entry in source.entries] == [b'a' * 10, b'b' * 20, b'd' * 5]
+            assert [item['filename'] for item in source.skipped] == ['group/notes.txt', 'big.docx']
+        finally:
+            source.close()
+
+        with pytest.raises(BatchError):
+            open_batch([('works.zip', io.BytesIO(b'not a zip'))])
+        with pytest.raises(BatchError):
+            open_batch([('notes.txt', io.BytesIO(b'text'))])
+        with pytest.raises(BatchError):
+            open_batch([('works.zip', _make_zip({'a.docx': b'a', 'b.docx': b'b'}))], max_files=1)
+
+    def test_run_batch(self):
+        """
+        Все документы пакета обрабатываются в очереди, результаты выдаются по мере готовности
+        """
+        source = open_batch([('works.zip', self.archive)])
+        queue = JobQueue(workers=1, queue_size=0)
+        try:
+            results = {entry.name: job for entry, job in run_batch(
+                queue, source.entries, _describe, window=1, filename_fn=lambda entry: f"{entry.index}.docx")}
+        finally:
+            queue.shutdown()
+            source.close()
+
+        assert {name: job['status'] for name, job in results.items()} == {
+            'report.docx': 'done', 'report_2.docx': 'done', 'big.docx': 'done'
+        }
+        assert results['report_2.docx']['result'] == '1.docx:20'
+        assert results['report_2.docx']['filename'] == 'report_2.docx'
+
+    def test_stream_zip(self, tmp_path):
+        """
+        Архив, сформированный по частям, содержит файлы и данные в памяти
+        """
+        path = tmp_path / 'corrected.docx'
+        path.write_bytes(os.urandom(3 * 1024 * 1024))
+        chunks = list(stream_zip([('работа.docx', str(path)), ('summary.json', b'{}')]))
+
+        assert len(chunks) > 1
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+        assert archive.testzip() is None
+        assert archive.read('работа.docx') == path.read_bytes()
+        assert archive.read('summary.json') == b'{}'
+
+    def test_config_from_environment(self):
+        """
+        Ограничения пакета читаются из переменных окружения, неверные значения игнорируются
+        """
+        with patch.dict(os.environ, {'BATCH_MAX_FILES': '20', 'BATCH_MAX_FILE_MB': '0'}):
+            config = get_batch_config()
+        assert config == {'max_files': 20, 'max_file_size': 50 * 1024 * 1024}
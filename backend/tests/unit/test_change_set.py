@@ -0,0 +1,121 @@
+"""
+Модульные тесты для набора изменений пробного исправления (dry_run)
+"""
+import os
+import sys
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.shared import Pt
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.change_set import ChangeBaseline, ChangeSet
+from app.services.correction_journal import package_digest
+from app.services.document_corrector import DocumentCorrector
+
+
+class TestChangeSet:
+    """
+    Тесты ChangeSet и DocumentCorrector.correct_document(dry_run=True)
+    """
+
+    def setup_method(self):
+        """
+        Создает документ с ошибками шрифта, интервалов и заголовков
+        """
+        self.doc = Document()
+        self.doc.add_heading('Введение.', level=1)
+        for i in range(3):
+            para = self.doc.add_paragraph(f'Абзац {i} основного текста.')
+            para.runs[0].font.name = 'Arial'
+            para.runs[0].font.size = Pt(12)
+        self.doc.add_paragraph('')
+        self.doc.add_paragraph('')
+        self.doc.add_paragraph('Заключение')
+
+    def _source(self, tmp_path):
+        source = tmp_path / "source.docx"
+        self.doc.save(source)
+        return str(source)
+
+    def test_dry_run_does_not_save(self, tmp_path):
+        """
+        Пробный запуск возвращает изменения со старыми и новыми значениями и не создает файлов
+        """
+        source = self._source(tmp_path)
+        change_set = DocumentCorrector().correct_document(source, dry_run=True)
+
+        assert isinstance(change_set, ChangeSet) and len(change_set)
+        assert sorted(os.listdir(tmp_path)) == ['source.docx']
+        font_changes = [change for change in change_set.to_list()
+                        if change['kind'] == 'run' and change['paragraph_index'] == 1 and change['property'] == 'font_name']
+        assert font_changes and font_changes[0]['old']['ascii'] == 'Arial'
+        assert font_changes[0]['new']['ascii'] == 'Times New Roman'
+        text_changes = [change for change in change_set.to_list() if change['property'] == 'text']
+        assert {'old': 'Введение.', 'new': 'ВВЕДЕНИЕ'} in [
+            {'old': change['old'], 'new': change['new']} for change in text_changes
+        ]
+
+    def test_apply_all_matches_correction(self, tmp_path):
+        """
+        Применение всех изменений дает тот же документ, что и обычное исправление
+        """
+        source = self._source(tmp_path)
+        change_set = DocumentCorrector().correct_document(source, dry_run=True)
+        change_set.save(str(tmp_path / "changes.json"), file_path=source)
+        loaded, meta = ChangeSet.load(str(tmp_path / "changes.json"))
+
+        applied = DocumentCorrector().apply_changes(source, loaded, out_path=str(tmp_path / "applied.docx"))
+        corrected = DocumentCorrector().correct_document(source, out_path=str(tmp_path / "corrected.docx"))
+
+        assert meta['file_path'] == source
+        assert package_digest(applied) == package_digest(corrected)
+
+    def test_apply_subset(self, tmp_path):
+        """
+        Применяются только выбранные изменения
+        """
+        source = self._source(tmp_path)
+        change_set = DocumentCorrector().correct_document(source, dry_run=True)
+        selected = [change['id'] for change in change_set.changes
+                    if change['kind'] == 'run' and change['paragraph_index'] == 1]
+
+        out = DocumentCorrector().apply_changes(source, change_set, selected, out_path=str(tmp_path / "subset.docx"))
+        document = Document(out)
+
+        assert document.paragraphs[1].runs[0].font.name == 'Times New Roman'
+        assert document.paragraphs[2].runs[0].font.name == 'Arial'
+        assert document.paragraphs[0].text == 'Введение.'
+
+    def test_subset_requires_style_and_numbering(self, tmp_path):
+        """
+        Изменение параграфа, ссылающееся на новый стиль и новую нумерацию,
+        применяется вместе с их определениями
+        """
+        source = self._source(tmp_path)
+        document = Document(source)
+        baseline = ChangeBaseline(document)
+        style = document.styles.add_style('Подпись рисунка', WD_STYLE_TYPE.PARAGRAPH)
+        style.font.size = Pt(12)
+        num = document.part.numbering_part.element.add_num(0)
+        paragraph = document.paragraphs[2]
+        paragraph.style = style
+        paragraph._p.get_or_add_pPr().get_or_add_numPr().get_or_add_numId().val = num.numId
+
+        change_set = ChangeSet.build(baseline, document)
+        by_key = {(change['kind'], change['property']): change for change in change_set.changes}
+        style_change = by_key[('style', style.style_id)]
+        numbering_change = by_key[('part', '/word/numbering.xml')]
+        assert by_key[('paragraph', 'style')]['requires'] == [style_change['id']]
+        assert by_key[('paragraph', 'numbering')]['requires'] == [numbering_change['id']]
+
+        selected = [by_key[('paragraph', 'style')]['id'], by_key[('paragraph', 'numbering')]['id']]
+        out = DocumentCorrector().apply_changes(source, change_set, selected, out_path=str(tmp_path / "subset.docx"))
+        applied = Document(out)
+
+        assert applied.paragraphs[2].style.name == 'Подпись рисунка'
+        assert applied.styles['Подпись рисунка'].font.size == Pt(12)
+        assert num.numId in [n.numId for n in applied.part.numbering_part.element.num_lst]
+        assert applied.paragraphs[1].style.name == 'Normal'
@@ -0,0 +1,88 @@
+"""
+Модульные тесты для пакетной обработки директорий из командной строки
+"""
+import csv
+import json
+import os
+import sys
+
+import pytest
+from docx import Document
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.cli import find_documents, main
+
+
+def _make_docx(path, text):
+    document = Document()
+    document.add_paragraph(text)
+    document.save(path)
+
+
+class TestCli:
+    """
+    Тесты python -m app.cli
+    """
+
+    @pytest.fixture(autouse=True)
+    def archive(self, tmp_path):
+        """
+        Директория с двумя документами (один во вложенной директории),
+        временным файлом Word и поврежденным документом
+        """
+        self.root = tmp_path / 'archive'
+        (self.root / 'group').mkdir(parents=True)
+        _make_docx(self.root / 'first.docx', 'Первый документ.')
+        _make_docx(self.root / 'group' / 'second.docx', 'Второй документ.')
+        (self.root / '~$first.docx').write_bytes(b'')
+        (self.root / 'broken.docx').write_bytes(b'not a docx')
+        self.tmp_path = tmp_path
+
+    def _read_jsonl(self, path):
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_find_documents(self):
+        """
+        Документы ищутся рекурсивно, временные файлы Word пропускаются
+        """
+        documents = [os.path.relpath(path, self.root) for path in find_documents(str(self.root))]
+        assert documents == ['broken.docx', 'first.docx', os.path.join('group', 'second.docx')]
+
+    def test_correct_and_resume(self):
+        """
+        Режим correct сохраняет исправленные документы, повторный запуск с --resume
+        пропускает успешно обработанные
+        """
+        output = str(self.tmp_path / 'results.jsonl')
+        corrected_dir = self.tmp_path / 'corrected'
+        args = ['correct', str(self.root), '-o', output, '--workers', '1', '--corrected-dir', str(corrected_dir)]
+
+        assert main(args) == 1
+        records = {record['path']: record for record in self._read_jsonl(output)}
+        assert records['broken.docx']['status'] == 'failed' and records['broken.docx']['error']
+        second = records[os.path.join('group', 'second.docx')]
+        assert second['status'] == 'ok' and second['corrected_total_issues'] is not None
+        assert set(second['timing']) == {'check_ms', 'correct_ms', 'recheck_ms', 'total_ms'}
+        assert (corrected_dir / 'group' / 'second.docx').exists()
+
+        # Повторно обрабатывается только документ с ошибкой
+        assert main(args + ['--resume']) == 1
+        resumed = self._read_jsonl(output)[len(records):]
+        assert [record['path'] for record in resumed] == ['broken.docx']
+
+    def test_check_csv(self):
+        """
+        Результаты проверки в CSV: строка на документ со временем обработки
+        """
+        output = str(self.tmp_path / 'results.csv')
+        main(['check', str(self.root), '-o', output, '--format', 'csv', '--workers', '2', '--rules', '2,3'])
+
+        with open(output, encoding='utf-8', newline='') as f:
+            rows = {row['path']: row for row in csv.DictReader(f)}
+        assert rows['first.docx']['status'] == 'ok' and rows['first.docx']['rules'] == '2,3'
+        assert float(rows['first.docx']['check_ms']) > 0
+        assert rows['first.docx']['corrected_path'] == ''
+        assert not (self.tmp_path / 'archive_corrected').exists()
@@ -0,0 +1,149 @@
+"""
+Модульные тесты для компактного представления параграфов
+"""
+import os
+import sys
+import pickle
+from pathlib import Path
+
+import pytest
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.compact_paragraphs import CompactParagraphList, ParagraphRecord, compact_paragraphs
+from app.services.document_pipeline import DocumentPipeline
+from app.services.document_processor import DocumentProcessor
+from app.services.norm_control_checker import NormControlChecker
+
+# Путь к тестовым данным
+TEST_DATA_DIR = Path(__file__).parent.parent / "test_data"
+
+
+class TestCompactParagraphs:
+    """
+    Модульные тесты для ParagraphRecord и CompactParagraphList
+    """
+    
+    def setup_method(self):
+        """
+        Настройка перед каждым тестом
+        """
+        font = {'name': 'Times New Roman', 'size': 14.0, 'bold': None}
+        self.paragraphs = [
+            {
+                'index': i,
+                'text': f"Параграф {i}",
+                'style': 'Normal',
+                'alignment': None,
+                'font': dict(font),
+                'line_spacing': 1.5,
+                'paragraph_format': {'first_line_indent': 1.25},
+                'is_heading': False,
+                'list_info': {'is_list_item': False, 'list_type': None, 'list_level': 0}
+            }
+            for i in range(5)
+        ]
+    
+    def test_dict_compatible_view(self):
+        """
+        Запись ведет себя как словарь только для чтения
+        """
+        records = compact_paragraphs(self.paragraphs)
+        record = records[2]
+        
+        assert isinstance(record, ParagraphRecord)
+        assert record['text'] == "Параграф 2"
+        assert record.get('font', {}).get('size') == 14.0
+        assert record.get('runs', []) == []
+        assert 'runs' not in record
+        assert 'text' in record
+        assert record == self.paragraphs[2]
+        assert records.to_dicts() == self.paragraphs
+        with pytest.raises(KeyError):
+            record['runs']
+    
+    def test_formatting_is_interned(self):
+        """
+        Одинаковые словари форматирования хранятся один раз
+        """
+        records = compact_paragraphs(self.paragraphs)
+        
+        assert records[0]['font'] is records[4]['font']
+        assert records[0]['list_info'] is records[1]['list_info']
+        assert len(records.intern_table) == 3
+        assert records.column('index') == [0, 1, 2, 3, 4]
+    
+    def test_pickle_roundtrip(self):
+        """
+        Компактные записи сериализуются через pickle
+        """
+        records = compact_paragraphs(self.paragraphs)
+        restored = pickle.loads(pickle.dumps(records))
+        assert list(restored) == self.paragraphs
+    
+    def test_checker_results_unchanged(self):
+        """
+        Результаты проверки для компактного представления совпадают с обычным
+        """
+        file_path = TEST_DATA_DIR / "multiple_errors_document.docx"
+        if not os.path.exists(file_path):
+            pytest.skip(f"Тестовый файл {file_path} не найден")
+        
+        processor = DocumentProcessor(file_path)
+        document_data = processor.extract_data()
+        compact_data = processor.extract_data(compact=True)
+        
+        assert isinstance(compact_data['paragraphs'], CompactParagraphList)
+        checker = NormControlChecker()
+        compact_results = checker.check_document(compact_data)
+        results = checker.check_document(document_data)
+        # Время выполнения проверок от запуска к запуску различается
+        for check_results in (compact_results, results):
+            check_results.pop('timing')
+            for rule_result in check_results['rules_results']:
+                rule_result.pop('duration_ms')
+        assert compact_results == results
+    
+    def test_single_pass_builds_records(self):
+        """
+        Однопроходное извлечение сразу создает записи с общими словарями форматирования
+        """
+        file_path = TEST_DATA_DIR / "multiple_errors_document.docx"
+        if not os.path.exists(file_path):
+            pytest.skip(f"Тестовый файл {file_path} не найден")
+        
+        processor = DocumentProcessor(file_path)
+        sections = processor._extract_body_single_pass(compact=True)
+        paragraphs = sections['paragraphs']
+        
+        assert isinstance(paragraphs, CompactParagraphList)
+        assert all(isinstance(para, ParagraphRecord) for para in paragraphs)
+        # Одинаковые словари форматирования — один объект
+        for first in paragraphs:
+            for second in paragraphs:
+                if first.paragraph_format == second.paragraph_format:
+                    assert first.paragraph_format is second.paragraph_format
+        assert paragraphs.to_dicts() == processor._extract_body_single_pass()['paragraphs']
+    
+    def test_pipeline_config(self, monkeypatch):
+        """
+        COMPACT_PARAGRAPHS включает компактные записи в DocumentPipeline
+        """
+        file_path = TEST_DATA_DIR / "multiple_errors_document.docx"
+        if not os.path.exists(file_path):
+            pytest.skip(f"Тестовый файл {file_path} не найден")
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        
+        monkeypatch.setenv('COMPACT_PARAGRAPHS', '1')
+        pipeline = DocumentPipeline(content)
+        pipeline.check()
+        assert isinstance(pipeline.document_data['paragraphs'], CompactParagraphList)
+        # Записи исходного документа переиспользуются при повторной проверке
+        pipeline.correct()
+        pipeline.recheck()
+        assert isinstance(pipeline.corrected_data['paragraphs'], CompactParagraphList)
+        
+        monkeypatch.setenv('COMPACT_PARAGRAPHS', 'maybe')
+        assert DocumentPipeline(content).compact is False
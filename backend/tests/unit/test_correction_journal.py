@@ -0,0 +1,242 @@
+"""
+Модульные тесты для журнала исправлений и повторной проверки исправленного документа
+"""
+import os
+import sys
+import zipfile
+
+from docx import Document
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+from docx.oxml.ns import qn
+from docx.shared import Cm, Pt
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.correction_journal import CorrectionJournal, package_digest
+from app.services.document_corrector import DocumentCorrector
+from app.services.document_processor import DocumentProcessor
+from app.services.norm_control_checker import NormControlChecker
+
+
+def _without_timing(check_results):
+    results = {key: value for key, value in check_results.items() if key not in ('timing', 'recheck')}
+    results['rules_results'] = [
+        {key: value for key, value in result.items() if key != 'duration_ms'}
+        for result in check_results['rules_results']
+    ]
+    return results
+
+
+class TestCorrectionJournal:
+    """
+    Тесты журнала изменений и повторной проверки
+    """
+
+    def _build_document(self, tmp_path):
+        """
+        Создает документ из заголовка и нескольких абзацев
+        """
+        doc = Document()
+        doc.add_heading('ВВЕДЕНИЕ', level=1)
+        for i in range(6):
+            para = doc.add_paragraph(f"Абзац {i + 1}. В 2020 году было 5 книг, автор Иванов А. Б.")
+            para.runs[0].font.name = 'Arial'
+            para.runs[0].font.size = Pt(12)
+        file_path = tmp_path / "source.docx"
+        doc.save(file_path)
+        return file_path
+
+    def test_touched_paragraphs_and_parts(self, tmp_path):
+        """
+        Журнал отмечает измененные и вставленные параграфы и измененные части
+        """
+        doc = Document(self._build_document(tmp_path))
+        journal = CorrectionJournal(doc)
+        doc.paragraphs[2].runs[0].text = "Измененный абзац"
+        doc.paragraphs[4].insert_paragraph_before("Новый абзац")
+        doc.sections[0].left_margin = Cm(3)
+        journal.finish(doc)
+
+        assert journal.paragraph_count == 8
+        assert journal.touched_paragraphs == {2, 4}
+        assert journal.removed_paragraphs == {2}
+        assert journal.paragraph_map[5] == 4
+        assert journal.touched_parts == {'sections'}
+        assert not journal.formatting_touched
+
+    def test_combine(self, tmp_path):
+        """
+        Журналы последовательных исправлений объединяются относительно исходного документа
+        """
+        doc = Document(self._build_document(tmp_path))
+        first = CorrectionJournal(doc)
+        doc.paragraphs[1].insert_paragraph_before("Вставка")
+        first.finish(doc)
+        second = CorrectionJournal(doc)
+        doc.paragraphs[5].runs[0].text = "Изменено"
+        doc.styles['Normal'].font.size = Pt(14)
+        second.finish(doc)
+
+        combined = first.combine(second)
+        assert combined.touched_paragraphs == {1, 5}
+        assert combined.paragraph_map[6] == 5
+        assert combined.removed_paragraphs == {4}
+        assert combined.formatting_touched
+        # Размер шрифта Normal изменился у всех абзацев, заголовок задает свой размер
+        assert combined.restyled_paragraphs == {2, 3, 4, 6, 7}
+        assert combined.reusable_paragraphs() == {0: 0}
+
+    def test_corrector_records_journal(self, tmp_path):
+        """
+        DocumentCorrector сохраняет журнал последнего исправления
+        """
+        source = self._build_document(tmp_path)
+        corrector = DocumentCorrector()
+        corrector.correct_document(str(source), out_path=str(tmp_path / "corrected.docx"))
+        summary = corrector.journal.summary()
+        assert summary['paragraph_count'] == len(Document(tmp_path / "corrected.docx").paragraphs)
+        assert summary['touched_paragraphs'] > 0
+
+    def test_recheck_matches_full_check(self, tmp_path):
+        """
+        Повторная проверка по журналу совпадает с полной и пересчитывает только измененное
+        """
+        source = self._build_document(tmp_path)
+        checker = NormControlChecker()
+        document_data = DocumentProcessor(source).extract_data()
+        check_results = checker.check_document(document_data)
+
+        doc = Document(source)
+        journal = CorrectionJournal(doc)
+        doc.paragraphs[3].runs[0].font.name = 'Times New Roman'
+        doc.paragraphs[3].runs[0].font.size = Pt(14)
+        journal.finish(doc)
+        corrected_path = tmp_path / "edited.docx"
+        doc.save(corrected_path)
+
+        corrected_data = DocumentProcessor(corrected_path).extract_data(
+            previous_data=document_data, journal=journal
+        )
+        assert corrected_data == DocumentProcessor(corrected_path).extract_data()
+
+        rechecked = checker.recheck_document(corrected_data, document_data, check_results)
+        full = checker.check_document(DocumentProcessor(corrected_path).extract_data())
+        assert _without_timing(rechecked) == _without_timing(full)
+
+        recheck = rechecked['recheck']
+        assert '_check_margins' in recheck['reused_checks']
+        assert '_check_font' in recheck['paragraph_checks']
+        assert recheck['rechecked_paragraphs'] == 3
+        assert recheck['paragraph_count'] == 7
+
+    def test_mostly_changed_document_checked_fully(self, tmp_path):
+        """
+        Если изменено больше RECHECK_MAX_CHANGED_SHARE параграфов, повторная
+        проверка выполняется как обычная
+        """
+        source = self._build_document(tmp_path)
+        checker = NormControlChecker()
+        document_data = DocumentProcessor(source).extract_data()
+        check_results = checker.check_document(document_data)
+
+        doc = Document(source)
+        for para in doc.paragraphs:
+            para.runs[0].text = para.runs[0].text + " Изменено."
+        corrected_path = tmp_path / "edited.docx"
+        doc.save(corrected_path)
+
+        corrected_data = DocumentProcessor(corrected_path).extract_data()
+        rechecked = checker.recheck_document(corrected_data, document_data, check_results)
+        assert 'recheck' not in rechecked
+        assert _without_timing(rechecked) == _without_timing(checker.check_document(corrected_data))
+
+    def test_style_formatted_paragraphs_keep_xml(self, tmp_path):
+        """
+        Выравнивание, отступы и переносы, которые уже действуют через стиль,
+        не записываются в параграфы прямым форматированием
+        """
+        doc = Document()
+        normal = doc.styles['Normal']
+        normal.font.name = 'Times New Roman'
+        normal.font.size = Pt(14)
+        normal.paragraph_format.line_spacing = 1.5
+        normal.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
+        normal.paragraph_format.first_line_indent = Cm(1.25)
+        for i in range(3):
+            doc.add_paragraph(f"Абзац {i + 1} оформлен стилем документа.")
+
+        DocumentCorrector().correct(doc)
+
+        for para in doc.paragraphs:
+            ppr = para._p.pPr
+            for tag in ('w:jc', 'w:ind', 'w:autoSpaceDE', 'w:suppressAutoHyphens', 'w:contextualSpacing'):
+                assert ppr is None or ppr.find(qn(tag)) is None
+
+    def test_style_change_reparses_only_restyled(self, tmp_path):
+        """
+        После изменения стиля заново разбираются только параграфы, действующее
+        форматирование которых от него зависит
+        """
+        source = self._build_document(tmp_path)
+        document_data = DocumentProcessor(source).extract_data()
+
+        doc = Document(source)
+        journal = CorrectionJournal(doc)
+        doc.styles['Heading 1'].font.size = Pt(16)
+        doc.styles['Heading 2'].font.size = Pt(15)
+        doc.paragraphs[2].runs[0].font.name = 'Times New Roman'
+        journal.finish(doc)
+        corrected_path = tmp_path / "restyled.docx"
+        doc.save(corrected_path)
+
+        assert journal.formatting_touched
+        assert journal.touched_paragraphs == {2}
+        assert journal.restyled_paragraphs == {0}
+        assert sorted(journal.reusable_paragraphs()) == [1, 3, 4, 5, 6]
+        corrected_data = DocumentProcessor(corrected_path).extract_data(
+            previous_data=document_data, journal=journal
+        )
+        assert corrected_data == DocumentProcessor(corrected_path).extract_data()
+        assert corrected_data['headings'][0]['font']['size'] == 16
+
+    def test_package_digest_ignores_zip_metadata(self, tmp_path):
+        """
+        Канонический отпечаток не зависит от времени записи и сжатия частей ZIP
+        """
+        source = self._build_document(tmp_path)
+        copy_path = tmp_path / "copy.docx"
+        with zipfile.ZipFile(source) as src, zipfile.ZipFile(copy_path, 'w', zipfile.ZIP_STORED) as dst:
+            for info in src.infolist():
+                info.date_time = (2001, 2, 3, 4, 5, 6)
+                dst.writestr(info, src.read(info.filename))
+        assert package_digest(copy_path) == package_digest(source)
+
+        doc = Document(source)
+        doc.paragraphs[1].runs[0].text = "Измененный абзац"
+        doc.save(copy_path)
+        assert package_digest(copy_path) != package_digest(source)
+
+    def test_second_correction_is_noop(self, tmp_path):
+        """
+        Повторное исправление уже исправленного документа ничего не меняет
+        """
+        doc = Document()
+        doc.add_paragraph('Оглавление')
+        doc.add_paragraph('Введение 3')
+        doc.add_paragraph('Введение')
+        doc.add_paragraph('Текст с пере- носом и предлогом в конце и на краю строки.')
+        doc.add_paragraph('1. Первый пункт')
+        table = doc.add_table(rows=1, cols=1)
+        table.cell(0, 0).text = 'Ячейка таблицы'
+        source = tmp_path / "source.docx"
+        doc.save(source)
+
+        corrector = DocumentCorrector()
+        first = corrector.correct_document(str(source), out_path=str(tmp_path / "first.docx"))
+        second = corrector.correct_document(first, out_path=str(tmp_path / "second.docx"))
+
+        assert package_digest(second) == package_digest(first)
+        summary = corrector.journal.summary()
+        assert summary['touched_paragraphs'] == 0
+        assert summary['touched_parts'] == []
@@ -0,0 +1,94 @@
+"""
+Модульные тесты для общего индекса документа, используемого проходами DocumentCorrector
+"""
+import os
+import sys
+
+from docx import Document
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.document_index import DocumentIndex
+from app.services.document_corrector import DocumentCorrector
+
+
+class TestDocumentIndex:
+    """
+    Тесты индекса параграфов, заголовков и структурных разделов
+    """
+
+    def setup_method(self):
+        """
+        Создает документ с оглавлением, таблицей, списком литературы и сокращений
+        """
+        self.doc = Document()
+        self.doc.add_paragraph('СОДЕРЖАНИЕ')
+        self.doc.add_paragraph('Введение 3')
+        self.doc.add_paragraph('Глава 1 5')
+        self.doc.add_paragraph('ВВЕДЕНИЕ')
+        self.doc.add_paragraph('Текст введения.')
+        table = self.doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = 'Ячейка'
+        self.doc.add_heading('Основная часть', level=1)
+        self.doc.add_paragraph('Список использованной литературы')
+        self.doc.add_paragraph('1. Иванов И. И. Книга. — М., 2020.')
+        self.doc.add_paragraph('2. Петров П. П. Статья. — СПб., 2021.')
+        self.doc.add_paragraph('Список сокращений')
+        self.doc.add_paragraph('ГОСТ – государственный стандарт')
+
+    def test_paragraphs_and_tables(self):
+        """
+        Параграфы тела совпадают с document.paragraphs, параграфы таблиц отмечаются по элементу
+        """
+        index = DocumentIndex(self.doc)
+        assert len(index) == len(self.doc.paragraphs)
+        assert not any(index.is_table_paragraph(para) for para in index.paragraphs)
+
+        cell_paragraph = self.doc.tables[0].cell(0, 0).paragraphs[0]
+        assert index.is_table_paragraph(cell_paragraph)
+        assert index.position_of(cell_paragraph) is None
+        assert index.position_of(self.doc.paragraphs[4]) == 4
+
+    def test_section_spans(self):
+        """
+        Границы оглавления, списка литературы и списка сокращений
+        """
+        index = DocumentIndex(self.doc)
+        assert index.heading_positions() == [5]
+        assert index.section_span('toc') == (0, [1, 2])
+        # Список литературы заканчивается на заголовке, назначенном через индекс
+        assert index.section_span('bibliography') == (6, [7, 8, 9, 10])
+        index.set_style(index.paragraphs[9], self.doc.styles['Heading 1'])
+        assert index.heading_positions() == [5, 9]
+        assert index.section_span('bibliography') == (6, [7, 8])
+        assert index.section_span('abbreviations') == (9, [10])
+
+    def test_remove_paragraph(self):
+        """
+        Удаление параграфа через индекс сдвигает позиции и границы разделов
+        """
+        index = DocumentIndex(self.doc)
+        removed = index.paragraphs[1]
+        index.remove_paragraph(removed)
+        assert len(index) == len(self.doc.paragraphs)
+        assert index.position_of(removed) is None
+        assert index.position_of(self.doc.paragraphs[1]) == 1
+        assert index.section_span('toc') == (0, [1])
+
+    def test_corrector_shares_index(self, tmp_path):
+        """
+        Проходы корректора используют индекс, построенный в correct_document
+        """
+        source = tmp_path / "source.docx"
+        self.doc.save(source)
+        corrector = DocumentCorrector()
+        corrector.correct_document(str(source), out_path=str(tmp_path / "corrected.docx"))
+
+        index = corrector._document_index
+        assert index is not None
+        assert corrector._get_document_index(index.document) is index
+        # Заголовки разделов назначены через индекс, имена стилей в нем актуальны
+        for para in index.paragraphs:
+            assert index.style_name(para) == para.style.name
+        assert index.style_name(index.paragraphs[0]) == 'Heading 1'
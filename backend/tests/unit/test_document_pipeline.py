@@ -0,0 +1,124 @@
+"""
+Модульные тесты для обработки загруженного документа в памяти
+"""
+import io
+import os
+import sys
+
+import pytest
+from docx import Document
+from docx.shared import Pt
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.document_pipeline import DocumentPipeline
+from app.services.document_processor import DocumentProcessor
+from app.services.norm_control_checker import NormControlChecker
+
+
+class TestDocumentPipeline:
+    """
+    Тесты конвейера DocumentPipeline
+    """
+
+    def setup_method(self):
+        """
+        Создает документ с ошибками шрифта и заголовков в памяти
+        """
+        doc = Document()
+        doc.add_heading('Введение', level=1)
+        for i in range(3):
+            para = doc.add_paragraph(f'Абзац {i} основного текста.')
+            para.runs[0].font.name = 'Arial'
+            para.runs[0].font.size = Pt(12)
+        doc.add_heading('Заключение', level=1)
+        stream = io.BytesIO()
+        doc.save(stream)
+        self.content = stream.getvalue()
+
+    @staticmethod
+    def _issues(results):
+        """
+        Найденные нарушения без времени выполнения проверок
+        """
+        return sorted((issue.get('type'), issue.get('description')) for issue in results.get('issues', []))
+
+    def test_invalid_content(self):
+        """
+        Пустое содержимое и не-DOCX отклоняются с ValueError
+        """
+        with pytest.raises(ValueError):
+            DocumentPipeline(b'')
+        with pytest.raises(ValueError):
+            DocumentPipeline(b'not a docx')
+
+    def test_correct_works_on_copy(self):
+        """
+        Исправление не изменяет исходный объект документа, а результат сохраняется в памяти
+        """
+        pipeline = DocumentPipeline(self.content)
+        pipeline.check()
+        content = pipeline.correct()
+
+        assert pipeline.document.paragraphs[1].runs[0].font.name == 'Arial'
+        assert pipeline.corrected_document is not pipeline.document
+        assert Document(io.BytesIO(content)).paragraphs[1].runs[0].font.name == 'Times New Roman'
+        # Исправления идемпотентны: второй проход только подтверждает результат
+        assert pipeline.correction_passes == 2
+
+    def test_recheck_matches_full_check(self):
+        """
+        Повторная проверка исправленного объекта совпадает с проверкой сохраненного DOCX
+        """
+        pipeline = DocumentPipeline(self.content)
+        pipeline.check()
+        content = pipeline.correct()
+        rechecked = pipeline.recheck()
+
+        data = DocumentProcessor.from_document(Document(io.BytesIO(content))).extract_data()
+        full = NormControlChecker().check_document(data)
+        assert self._issues(rechecked) == self._issues(full)
+        assert rechecked['total_issues_count'] == full['total_issues_count']
+
+    def test_selected_rules_correct_only_their_issues(self):
+        """
+        При выборочной проверке исправляются только замечания выбранных норм:
+        поля страницы и заголовки не меняются
+        """
+        pipeline = DocumentPipeline(self.content, rule_ids=[2])
+        pipeline.check()
+        content = pipeline.correct()
+        rechecked = pipeline.recheck()
+
+        corrected = Document(io.BytesIO(content))
+        assert corrected.sections[0].left_margin == pipeline.document.sections[0].left_margin
+        assert pipeline.journal.touched_paragraphs == {1, 2, 3}
+        assert 'sections' not in pipeline.journal.touched_parts
+        assert rechecked['total_issues_count'] == 0
+
+    def test_corrected_sample_reuses_paragraphs(self):
+        """
+        Повторная обработка исправленного образца берет данные и замечания
+        неизмененных параграфов из первой проверки
+        """
+        file_path = os.path.join(os.path.dirname(__file__), '..', 'test_data', 'documents', 'perfect.docx')
+        if not os.path.exists(file_path):
+            pytest.skip(f"Тестовый файл {file_path} не найден")
+        with open(file_path, 'rb') as f:
+            first = DocumentPipeline(f.read())
+        first.check()
+        corrected_content = first.correct()
+
+        pipeline = DocumentPipeline(corrected_content)
+        pipeline.check()
+        content = pipeline.correct()
+        rechecked = pipeline.recheck()
+
+        assert pipeline.journal.changed_share() == 0
+        assert len(pipeline.journal.reusable_paragraphs()) == pipeline.journal.paragraph_count > 0
+        assert rechecked['recheck']['rechecked_paragraphs'] == 0
+        assert rechecked['recheck']['reused_checks']
+
+        data = DocumentProcessor.from_document(Document(io.BytesIO(content))).extract_data()
+        assert self._issues(rechecked) == self._issues(NormControlChecker().check_document(data))
@@ -113,4 +113,133 @@ class TestDocumentProcessor:
         
         # Удаляем временный файл
         if os.path.exists(invalid_file_path):
-            os.remove(invalid_file_path) 
\ No newline at end of file
+            os.remove(invalid_file_path) 
+
+class TestSinglePassExtraction:
+    """
+    Проверка однопроходного извлечения данных: результат должен совпадать
+    с последовательным вызовом отдельных методов извлечения
+    """
+    
+    @pytest.mark.parametrize("file_name", [
+        "multiple_errors_document.docx",
+        "wrong_font_document.docx",
+        "api_test_document.docx",
+    ])
+    def test_single_pass_matches_separate_extractors(self, file_name):
+        """
+        Параграфы, заголовки, библиография, изображения и статистика совпадают
+        """
+        file_path = TEST_DATA_DIR / file_name
+        if not os.path.exists(file_path):
+            pytest.skip(f"Тестовый файл {file_path} не найден")
+        
+        processor = DocumentProcessor(file_path)
+        sections = processor._extract_body_single_pass()
+        
+        assert sections['paragraphs'] == processor._extract_paragraphs()
+        assert sections['headings'] == processor._extract_headings()
+        assert sections['bibliography'] == processor._extract_bibliography()
+        assert sections['images'] == processor._extract_images()
+        assert sections['statistics'] == processor._extract_document_properties()['statistics']
+    
+    def test_single_pass_bibliography_and_images(self, tmp_path):
+        """
+        Однопроходное извлечение находит записи списка литературы и подписи к рисункам
+        """
+        from docx import Document
+        from docx.shared import Inches
+        import base64
+        
+        # PNG 1x1 пиксель
+        png = base64.b64decode(
+            'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=='
+        )
+        image_path = tmp_path / "pixel.png"
+        image_path.write_bytes(png)
+        
+        doc = Document()
+        doc.add_heading("Введение", level=1)
+        doc.add_paragraph("Текст работы.")
+        doc.add_paragraph().add_run().add_picture(str(image_path), width=Inches(1))
+        doc.add_paragraph("Рисунок 1 – Схема")
+        doc.add_paragraph("Список литературы")
+        doc.add_paragraph("1. Иванов, И. И. Книга. – М., 2020. – 100 с.")
+        doc.add_paragraph("продолжение записи")
+        doc.add_heading("Приложение А", level=1)
+        file_path = tmp_path / "single_pass.docx"
+        doc.save(str(file_path))
+        
+        processor = DocumentProcessor(str(file_path))
+        data = processor.extract_data()
+        
+        assert len(data['images']) == 1
+        assert data['images'][0]['image_para_index'] == 2
+        assert data['images'][0]['caption_index'] == 3
+        assert len(data['bibliography']) == 1
+        assert data['bibliography'][0]['text'].endswith("продолжение записи")
+        assert data['document_properties']['statistics']['heading_count'] == 2
+        assert data['bibliography'] == processor._extract_bibliography()
+        assert data['images'] == processor._extract_images()
+
+
+class TestLazyExtraction:
+    """
+    Проверка ленивого извлечения разделов document_data
+    """
+    
+    def setup_method(self):
+        """
+        Настройка перед каждым тестом
+        """
+        self.test_file_path = TEST_DATA_DIR / "multiple_errors_document.docx"
+        if not os.path.exists(self.test_file_path):
+            pytest.skip(f"Тестовый файл {self.test_file_path} не найден")
+        self.processor = DocumentProcessor(self.test_file_path)
+    
+    def test_lazy_data_matches_eager(self):
+        """
+        Ленивое представление после полного извлечения совпадает с обычным
+        """
+        lazy_data = self.processor.extract_data(lazy=True)
+        assert lazy_data.loaded_sections() == []
+        assert lazy_data.materialize() == self.processor.extract_data()
+    
+    def test_partial_check_loads_only_needed_sections(self):
+        """
+        Проверка шрифта и полей не извлекает библиографию, изображения и колонтитулы
+        """
+        from app.services.norm_control_checker import NormControlChecker
+        
+        lazy_data = self.processor.extract_data(lazy=True)
+        results = NormControlChecker().check_document(lazy_data, rules=[2, 3, 6])
+        
+        assert [r['rule_id'] for r in results['rules_results']] == [2, 3, 6]
+        assert set(lazy_data.loaded_sections()) == {'paragraphs', 'page_setup'}
+        
+        full_results = NormControlChecker().check_document(self.processor.extract_data())
+        expected_issues = [r['issues'] for r in full_results['rules_results'] if r['rule_id'] in (2, 3, 6)]
+        assert [r['issues'] for r in results['rules_results']] == expected_issues
+    
+    def test_concurrent_sections_extracted_once(self):
+        """
+        Разделы, одновременно запрошенные несколькими потоками, извлекаются один раз
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        original = DocumentProcessor._extract_body_single_pass
+        calls = []
+        
+        def counted(processor, *args, **kwargs):
+            calls.append(1)
+            return original(processor, *args, **kwargs)
+        
+        lazy_data = self.processor.extract_data(lazy=True)
+        keys = ['paragraphs', 'headings', 'bibliography', 'images', 'paragraphs', 'title_page'] * 4
+        with patch.object(DocumentProcessor, '_extract_body_single_pass', counted):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                values = list(pool.map(lazy_data.__getitem__, keys))
+        
+        assert len(calls) == 1
+        assert all(value is lazy_data[key] for key, value in zip(keys, values))
+        assert lazy_data.materialize(['page_setup', 'missing']) == {'page_setup': lazy_data['page_setup']}
@@ -0,0 +1,134 @@
+"""
+Модульные тесты для однопроходного применения правил форматирования
+"""
+import os
+import sys
+
+from docx import Document
+from docx.shared import Pt
+from lxml import etree
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.document_corrector import DocumentCorrector
+from app.services.document_index import DocumentIndex
+from app.services.formatting_engine import FormattingEngine
+
+
+class TestFormattingEngine:
+    """
+    Тесты движка FormattingEngine и его использования в DocumentCorrector
+    """
+
+    def setup_method(self):
+        """
+        Создает документ с заголовками, списками, переносами и таблицей
+        """
+        self.doc = Document()
+        self.doc.add_heading('ВВЕДЕНИЕ', level=1)
+        para = self.doc.add_paragraph('Текст с пере- носом и предлогом в конце, см. стр. 5 - 7.')
+        para.runs[0].font.name = 'Arial'
+        para.runs[0].font.size = Pt(12)
+        self.doc.add_paragraph('1. Первый пункт')
+        self.doc.add_paragraph('а. подпункт и пояснение')
+        self.doc.add_paragraph('- маркер списка')
+        self.doc.add_paragraph('Рисунок 1 – Схема')
+        self.doc.add_paragraph('Таблица 1 – Данные')
+        table = self.doc.add_table(rows=2, cols=1)
+        table.cell(0, 0).text = 'Заголовок'
+        table.cell(1, 0).text = 'Значение'
+        self.doc.add_heading('Подраздел', level=2)
+        self.doc.add_paragraph('Обычный абзац текста для выравнивания по ширине.')
+
+    def _corrected_xml(self, tmp_path, fused):
+        """
+        Исправляет копию документа и возвращает XML тела
+        """
+        source = tmp_path / "source.docx"
+        self.doc.save(source)
+        corrector = DocumentCorrector()
+        corrector.fuse_formatting = fused
+        out = corrector.correct_document(str(source), out_path=str(tmp_path / f"out_{fused}.docx"))
+        return etree.tostring(Document(out).element)
+
+    def test_fused_matches_separate_passes(self, tmp_path):
+        """
+        Один обход на группу правил дает тот же документ, что и отдельные проходы
+        """
+        assert self._corrected_xml(tmp_path, True) == self._corrected_xml(tmp_path, False)
+
+    def test_rules_applied_in_order(self):
+        """
+        Правила применяются к каждому параграфу в заданном порядке,
+        а после правила, изменившего текст, следующие видят новый текст
+        """
+        calls = []
+        engine = FormattingEngine()
+
+        def upper(facts, context):
+            calls.append(('upper', facts.position))
+            facts.paragraph.runs[0].text = facts.text.upper()
+
+        def record(facts, context):
+            calls.append(('record', facts.text))
+
+        def count(facts, context):
+            context['paragraphs'] += 1
+
+        engine.register('upper', upper, changes_text=True)
+        engine.register('record', record)
+        engine.register('count', count, prepare=lambda document: {'paragraphs': 0},
+                        finish=lambda document, context: calls.append(('count', context['paragraphs'])))
+
+        doc = Document()
+        doc.add_paragraph('один')
+        doc.add_paragraph('два')
+        engine.run(doc, DocumentIndex(doc), ('upper', 'record', 'count'))
+
+        assert calls == [('upper', 0), ('record', 'ОДИН'), ('upper', 1), ('record', 'ДВА'), ('count', 2)]
+
+    def test_run_hooks_and_timings(self):
+        """
+        Run-обработчик вызывается для runs параграфов, отобранных правилом; время учитывается
+        """
+        seen = []
+        engine = FormattingEngine()
+        engine.register(
+            'non_empty',
+            lambda facts, context: bool(facts.stripped),
+            run=lambda run, facts, value, context: seen.append(run.text),
+        )
+
+        doc = Document()
+        para = doc.add_paragraph('первый ')
+        para.add_run('второй')
+        doc.add_paragraph('')
+        timings = {}
+        engine.run(doc, DocumentIndex(doc), ('non_empty',), timings=timings)
+
+        assert seen == ['первый ', 'второй']
+        assert timings['non_empty'] >= 0
+
+    def test_targets_limit_paragraphs_and_runs(self):
+        """
+        С targets обходятся только заданные параграфы и runs, а finish не вызывается
+        """
+        seen = []
+        finished = []
+        engine = FormattingEngine()
+        engine.register(
+            'all',
+            lambda facts, context: True,
+            run=lambda run, facts, value, context: seen.append((facts.position, run.text)),
+            finish=lambda document, context: finished.append(True),
+        )
+
+        doc = Document()
+        for i in range(3):
+            para = doc.add_paragraph(f'{i}a')
+            para.add_run(f'{i}b')
+        engine.run(doc, DocumentIndex(doc), ('all',), targets={2: {1}, 0: None, 7: None})
+
+        assert seen == [(0, '0a'), (0, '0b'), (2, '2b')]
+        assert finished == []
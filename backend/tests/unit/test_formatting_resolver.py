@@ -0,0 +1,110 @@
+"""
+Модульные тесты для резолвера действующего форматирования
+"""
+import os
+import sys
+
+from docx import Document
+from docx.shared import Pt
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.formatting_resolver import FormattingResolver
+from app.services.document_processor import DocumentProcessor
+from app.services.document_corrector import DocumentCorrector
+
+
+class TestFormattingResolver:
+    """
+    Модульные тесты для класса FormattingResolver
+    """
+    
+    def test_theme_and_doc_defaults(self):
+        """
+        Шрифт без прямого форматирования берется из темы и docDefaults
+        """
+        doc = Document()
+        para = doc.add_paragraph("Обычный текст")
+        resolver = FormattingResolver(doc)
+        
+        font = resolver.resolve_paragraph_font(para)
+        assert font['name'] == resolver.theme_fonts['minor']
+        assert font['size'] == 11.0
+        assert font['bold'] is False
+    
+    def test_style_chain_and_direct_formatting(self):
+        """
+        Прямое форматирование перекрывает стиль, стиль наследуется через basedOn
+        """
+        doc = Document()
+        normal = doc.styles['Normal']
+        normal.font.name = 'Times New Roman'
+        normal.font.size = Pt(14)
+        normal.paragraph_format.alignment = WD_PARAGRAPH_ALIGNMENT.JUSTIFY
+        
+        para = doc.add_paragraph()
+        plain_run = para.add_run("Текст ")
+        bold_run = para.add_run("жирный")
+        bold_run.bold = True
+        bold_run.font.size = Pt(12)
+        quote = doc.add_paragraph("Цитата", style='Quote')
+        
+        resolver = FormattingResolver(doc)
+        style_id = resolver.paragraph_style_id(para._p)
+        
+        plain = resolver.resolve_run(plain_run._r, style_id)
+        assert plain['name'] == 'Times New Roman'
+        assert plain['size'] == 14.0
+        bold = resolver.resolve_run(bold_run._r, style_id)
+        assert bold['bold'] is True
+        assert bold['size'] == 12.0
+        
+        # Quote основан на Normal
+        assert resolver.resolve_paragraph_font(quote)['size'] == 14.0
+        assert resolver.resolve_paragraph(para._p)['alignment'] == WD_PARAGRAPH_ALIGNMENT.JUSTIFY
+    
+    def test_results_are_cached(self):
+        """
+        Одинаково оформленные runs разбираются один раз
+        """
+        doc = Document()
+        runs = [doc.add_paragraph().add_run(f"Текст {i}") for i in range(10)]
+        resolver = FormattingResolver(doc)
+        style_id = resolver._default_paragraph_style
+        
+        first = resolver.resolve_run(runs[0]._r, style_id)
+        assert all(resolver.resolve_run(run._r, style_id) is first for run in runs)
+        assert len(resolver._run_cache) == 1
+    
+    def test_processor_reports_effective_font(self, tmp_path):
+        """
+        DocumentProcessor сообщает шрифт, заданный стилем, а не None
+        """
+        doc = Document()
+        doc.styles['Normal'].font.name = 'Arial'
+        doc.styles['Normal'].font.size = Pt(12)
+        doc.add_paragraph("Текст со шрифтом из стиля")
+        file_path = tmp_path / "styled.docx"
+        doc.save(str(file_path))
+        
+        data = DocumentProcessor(str(file_path)).extract_data()
+        assert data['paragraphs'][0]['font']['name'] == 'Arial'
+        assert data['paragraphs'][0]['font']['size'] == 12.0
+    
+    def test_corrector_fixes_theme_font(self, tmp_path):
+        """
+        Исправление шрифта учитывает шрифт темы и не оставляет его действующим
+        """
+        doc = Document()
+        doc.add_paragraph("Текст со шрифтом темы")
+        src = tmp_path / "theme.docx"
+        doc.save(str(src))
+        
+        out = DocumentCorrector().correct_document(str(src), [{'type': 'font_name'}], out_path=str(tmp_path / "out.docx"))
+        
+        fixed = Document(out)
+        font = FormattingResolver(fixed).resolve_paragraph_font(fixed.paragraphs[0])
+        assert font['name'] == 'Times New Roman'
+        assert font['size'] == 14.0
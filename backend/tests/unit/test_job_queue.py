@@ -0,0 +1,221 @@
+"""
+Модульные тесты для очереди заданий с пулом рабочих процессов
+"""
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.job_queue import JobQueue, QueueFullError, get_job_queue_config
+from app.services.job_worker import current_rss, report_progress
+
+
+def _square(value):
+    return value * value
+
+
+def _crash_once(marker):
+    """
+    Аварийно завершает рабочий процесс при первом вызове
+    """
+    if not os.path.exists(marker):
+        open(marker, 'w').close()
+        os._exit(1)
+    return 'ok'
+
+
+def _crash_after(seconds, marker=None):
+    """
+    Аварийно завершает рабочий процесс через seconds секунд
+    (при заданном marker — только при первом вызове)
+    """
+    time.sleep(seconds)
+    if marker is None or not os.path.exists(marker):
+        if marker is not None:
+            open(marker, 'w').close()
+        os._exit(1)
+    return 'ok'
+
+
+def _fail():
+    raise ValueError('ошибка обработки')
+
+
+def _report_steps(count):
+    """
+    Сообщает о count этапах и возвращает их число
+    """
+    for step in range(count):
+        report_progress('step', {'step': step})
+    return count
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+class TestJobQueue:
+    """
+    Тесты JobQueue
+    """
+
+    def setup_method(self):
+        """
+        Создает очередь с двумя рабочими процессами
+        """
+        self.queue = JobQueue(workers=2, queue_size=1, max_attempts=2)
+
+    def teardown_method(self):
+        self.queue.shutdown()
+
+    def _wait(self, job_id, timeout=30):
+        return self._wait_in(self.queue, job_id, timeout)
+
+    @staticmethod
+    def _wait_in(queue, job_id, timeout=30):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = queue.get(job_id)
+            if job['status'] in ('done', 'failed'):
+                return job
+            time.sleep(0.05)
+        raise AssertionError(f"Задание {job_id} не завершилось за {timeout} с")
+
+    def test_job_result(self):
+        """
+        Результат задания и дополнительные сведения доступны по идентификатору
+        """
+        job_id = self.queue.submit(_square, 7, filename='doc.docx')
+        job = self._wait(job_id)
+
+        assert job['status'] == 'done' and job['result'] == 49
+        assert job['filename'] == 'doc.docx' and job['attempts'] == 1
+        assert self.queue.get('missing') is None
+
+    def test_retry_after_worker_crash(self, tmp_path):
+        """
+        Задание, прерванное аварийным завершением процесса, выполняется повторно
+        """
+        job = self._wait(self.queue.submit(_crash_once, str(tmp_path / 'crashed')))
+
+        assert job['status'] == 'done' and job['result'] == 'ok'
+        assert job['attempts'] == 2
+        # После пересоздания пула очередь продолжает работать
+        assert self._wait(self.queue.submit(_square, 3))['result'] == 9
+
+    def test_crash_not_charged_to_other_jobs(self, tmp_path):
+        """
+        Аварийное завершение процесса не расходует попытки заданий, которые
+        выполнялись рядом или еще не начинались; начатые задания проверяются по одному
+        """
+        crashing = self.queue.submit(_crash_after, 0.5, str(tmp_path / 'crashed'))
+        sleeping = self.queue.submit(_sleep, 2)
+        waiting = self.queue.submit(_square, 4)
+        jobs = {job_id: self._wait(job_id) for job_id in (crashing, sleeping, waiting)}
+
+        assert [jobs[job_id]['status'] for job_id in (crashing, sleeping, waiting)] == ['done'] * 3
+        assert [jobs[job_id]['attempts'] for job_id in (crashing, sleeping, waiting)] == [1, 1, 1]
+        requeued = {job_id: [event['data'] for event in self.queue.events(job_id)[0] if event['event'] == 'requeued']
+                    for job_id in jobs}
+        assert requeued[crashing] == requeued[sleeping] == [{'attempt': 1, 'isolated': True}]
+        assert requeued[waiting] == [{'attempt': 1, 'isolated': False}]
+
+    def test_crashing_job_isolated(self):
+        """
+        Задание, которое каждый раз завершает процесс, выявляется в пуле изоляции
+        и завершается с ошибкой; задание, выполнявшееся рядом, не страдает
+        """
+        crashing = self.queue.submit(_crash_after, 0.5)
+        sleeping = self.queue.submit(_sleep, 2)
+
+        crashed = self._wait(crashing)
+        assert crashed['status'] == 'failed' and crashed['attempts'] == 2
+        assert 'аварийно' in crashed['error']
+        assert self._wait(sleeping)['status'] == 'done'
+        assert self._wait(sleeping)['attempts'] == 1
+
+    def test_job_error_not_retried(self):
+        """
+        Исключение в задании завершает его без повторной попытки
+        """
+        job = self._wait(self.queue.submit(_fail))
+
+        assert job['status'] == 'failed' and job['attempts'] == 1
+        assert 'ошибка обработки' in job['error']
+
+    def test_job_events(self):
+        """
+        События рабочего процесса приходят по порядку, завершающее событие — последним
+        """
+        job_id = self.queue.submit(_report_steps, 3)
+        events = []
+        closed = False
+        deadline = time.time() + 30
+        while not closed and time.time() < deadline:
+            new_events, closed = self.queue.events(job_id, len(events), timeout=5)
+            events.extend(new_events)
+
+        assert [event['event'] for event in events] == ['queued', 'started', 'step', 'step', 'step', 'done']
+        assert [event['data']['step'] for event in events[2:5]] == [0, 1, 2]
+        assert [event['id'] for event in events] == list(range(6))
+        assert self.queue.events(job_id, len(events), timeout=0) == ([], True)
+        assert self.queue.events('missing') is None
+
+    def test_queue_full(self):
+        """
+        Сверх workers + queue_size заданий очередь не принимает
+        """
+        job_ids = [self.queue.submit(_sleep, 0.5) for _ in range(3)]
+        with pytest.raises(QueueFullError):
+            self.queue.submit(_sleep, 0.5)
+
+        for job_id in job_ids:
+            self._wait(job_id)
+        assert self.queue.stats()['done'] == 3
+
+    def test_worker_recycled_after_max_tasks(self):
+        """
+        После max_tasks_per_worker заданий рабочий процесс заменяется новым
+        """
+        queue = JobQueue(workers=1, max_tasks_per_worker=1)
+        try:
+            pids = [self._wait_in(queue, queue.submit(os.getpid))['result'] for _ in range(2)]
+        finally:
+            queue.shutdown()
+
+        assert pids[0] != pids[1]
+
+    def test_pool_replaced_over_rss(self):
+        """
+        Превышение порога памяти заменяет пул, задания продолжают выполняться
+        """
+        queue = JobQueue(workers=1, max_worker_rss=1)
+        try:
+            first = self._wait_in(queue, queue.submit(os.getpid))
+            second = self._wait_in(queue, queue.submit(os.getpid))
+        finally:
+            queue.shutdown()
+
+        assert first['status'] == second['status'] == 'done'
+        assert first['result'] != second['result']
+        assert queue.recycled_pools == 2
+        assert current_rss() > 0
+
+    def test_config_from_environment(self):
+        """
+        Настройки очереди читаются из переменных окружения, неверные значения игнорируются
+        """
+        with patch.dict(os.environ, {'JOB_WORKERS': '3', 'JOB_QUEUE_SIZE': '5', 'JOB_MAX_ATTEMPTS': 'x',
+                                     'JOB_WORKER_MAX_TASKS': '0', 'JOB_WORKER_MAX_RSS_MB': '256',
+                                     'JOB_START_METHOD': 'threads'}):
+            config = get_job_queue_config()
+        assert config['workers'] == 3 and config['queue_size'] == 5 and config['max_attempts'] == 3
+        assert config['max_tasks_per_worker'] is None
+        assert config['max_worker_rss'] == 256 * 1024 * 1024
+        assert config['start_method'] in ('forkserver', 'spawn')
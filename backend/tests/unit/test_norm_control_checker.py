@@ -10,7 +10,7 @@ import sys
 # Добавляем путь к корневой директории проекта
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from app.services.norm_control_checker import NormControlChecker
+from app.services.norm_control_checker import NormControlChecker, NORM_RULES, get_rule_plan
 
 # Путь к тестовым данным
 TEST_DATA_DIR = Path(__file__).parent.parent / "test_data"
@@ -402,4 +402,148 @@ class TestNormControlChecker:
         assert any('table_non_sequential_numbering' in issue['type'] for issue in issues)
         assert any('image_wrong_number_format' in issue['type'] for issue in issues)
         assert any('formula_missing_number' in issue['type'] for issue in issues)
-        assert any('appendix_table_wrong_number_format' in issue['type'] for issue in issues) 
\ No newline at end of file
+        assert any('appendix_table_wrong_number_format' in issue['type'] for issue in issues) 
+
+class TestRulePlan:
+    """
+    Тесты плана выполнения норм без повторных вызовов общих проверок
+    """
+
+    def setup_method(self):
+        """
+        Настройка перед каждым тестом
+        """
+        self.checker = NormControlChecker()
+        self.document_data = {
+            'paragraphs': [
+                {
+                    'index': 0, 'text': 'Текст', 'style': 'Normal',
+                    'font': {'name': 'Arial', 'size': 12.0},
+                    'paragraph_format': {'first_line_indent': 2.0, 'alignment': None}
+                }
+            ],
+            'headings': [
+                {'index': 1, 'text': 'ВВЕДЕНИЕ.', 'level': 1, 'has_ending_dot': True,
+                 'alignment': None, 'font': {'size': 16.0, 'bold': False}}
+            ]
+        }
+
+    def test_plan_is_built_once(self):
+        """
+        План строится один раз и содержит по одному шагу на функцию проверки
+        """
+        plan = get_rule_plan()
+        assert plan is get_rule_plan()
+        checkers = [step[0] for step in plan.steps]
+        assert len(checkers) == len(set(checkers))
+        assert set(checkers) == {rule['checker'] for rule in NORM_RULES}
+
+    def test_every_checker_declares_dependencies(self):
+        """
+        Для каждой проверки известны разделы данных, от которых она зависит
+        """
+        checkers = {rule['checker'] for rule in NORM_RULES if hasattr(NormControlChecker, rule['checker'])}
+        assert checkers <= set(NormControlChecker.CHECK_DEPENDENCIES)
+
+    def test_shared_checker_runs_once(self):
+        """
+        Общая проверка вызывается один раз, а замечания не дублируются между нормами
+        """
+        with patch.object(self.checker, '_check_images_and_tables',
+                          wraps=self.checker._check_images_and_tables) as check_images:
+            self.checker.check_document(self.document_data, rules=[24, 25])
+        assert check_images.call_count == 1
+
+        with patch.object(self.checker, '_visit_font', wraps=self.checker._visit_font) as visit_font:
+            results = self.checker.check_document(self.document_data, rules=[2, 3])
+        assert visit_font.call_count == len(self.document_data['paragraphs'])
+
+        by_rule = {result['rule_id']: result['issues'] for result in results['rules_results']}
+        assert [issue['type'] for issue in by_rule[2]] == ['font_size']
+        assert [issue['type'] for issue in by_rule[3]] == ['font_name']
+        assert results['total_issues_count'] == 2
+
+    def test_issues_routed_by_type(self):
+        """
+        Замечания общих проверок распределяются по нормам по типу
+        """
+        results = self.checker.check_document(self.document_data, rules=[5, 9, 13, 15, 16])
+        by_rule = {result['rule_id']: result['issues'] for result in results['rules_results']}
+        assert [result['rule_id'] for result in results['rules_results']] == [5, 9, 13, 15, 16]
+        assert {issue['type'] for issue in by_rule[5]} == {'first_line_indent'}
+        assert by_rule[9] == []
+        assert {issue['type'] for issue in by_rule[13]} == {'heading_dot', 'heading_alignment'}
+        assert {issue['type'] for issue in by_rule[15]} == {'heading_bold'}
+        assert by_rule[16] == []
+
+    def test_unselected_rule_issues_are_dropped(self):
+        """
+        Замечания, относящиеся к невыбранной норме группы, не попадают в результат
+        """
+        results = self.checker.check_document(self.document_data, rules=[3])
+        assert [result['rule_id'] for result in results['rules_results']] == [3]
+        assert {issue['type'] for issue in results['issues']} == {'font_name'}
+
+
+class TestCheckExecution:
+    """
+    Тесты режимов выполнения проверок и замеров времени
+    """
+
+    def setup_method(self):
+        """
+        Настройка перед каждым тестом
+        """
+        self.document_path = TEST_DATA_DIR / "multiple_errors_document.docx"
+
+    def _document_data(self):
+        from app.services.document_processor import DocumentProcessor
+        return DocumentProcessor(str(self.document_path)).extract_data()
+
+    @staticmethod
+    def _without_timing(results):
+        return [{key: value for key, value in result.items() if key != 'duration_ms'}
+                for result in results['rules_results']]
+
+    def test_timing_fields(self):
+        """
+        Каждая норма получает время и число замечаний, а сводка — самые медленные проверки
+        """
+        if not self.document_path.exists():
+            pytest.skip("Тестовый документ не найден")
+        results = NormControlChecker(executor='serial').check_document(self._document_data())
+        for result in results['rules_results']:
+            assert result['duration_ms'] >= 0
+            assert result['issues_count'] == len(result['issues'])
+
+        timing = results['timing']
+        assert timing['mode'] == 'serial'
+        assert timing['workers'] == 1
+        assert 0 < len(timing['slowest']) <= 5
+        durations = [entry['duration_ms'] for entry in timing['slowest']]
+        assert durations == sorted(durations, reverse=True)
+        checkers = [entry['checker'] for entry in timing['slowest']]
+        assert len(checkers) == len(set(checkers))
+
+    @pytest.mark.parametrize('mode', ['thread', 'process'])
+    def test_parallel_matches_serial(self, mode):
+        """
+        Параллельное выполнение дает те же замечания, что и последовательное
+        """
+        if not self.document_path.exists():
+            pytest.skip("Тестовый документ не найден")
+        serial = NormControlChecker(executor='serial').check_document(self._document_data())
+        parallel = NormControlChecker(executor=mode, max_workers=2).check_document(self._document_data())
+        assert parallel['timing']['mode'] == mode
+        assert self._without_timing(parallel) == self._without_timing(serial)
+        assert parallel['total_issues_count'] == serial['total_issues_count']
+
+    def test_executor_from_environment(self):
+        """
+        Режим и размер пула берутся из переменных окружения, неизвестный режим — serial
+        """
+        with patch.dict(os.environ, {'CHECK_EXECUTOR': 'thread', 'CHECK_WORKERS': '3'}):
+            checker = NormControlChecker()
+        assert (checker.executor, checker.max_workers) == ('thread', 3)
+        with patch.dict(os.environ, {'CHECK_EXECUTOR': 'gpu'}):
+            assert NormControlChecker().executor == 'serial'
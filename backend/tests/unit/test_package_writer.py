@@ -0,0 +1,160 @@
+"""
+Модульные тесты для сохранения DOCX без пересжатия неизмененных частей
+"""
+import io
+import os
+import struct
+import sys
+import zipfile
+import zlib
+from unittest.mock import patch
+
+from docx import Document
+from docx.shared import Cm
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.correction_journal import package_digest
+from app.services.package_writer import get_docx_compression_level, save_document
+
+
+def _png(width, height):
+    """
+    Минимальное PNG-изображение в градациях серого
+    """
+    rows = b''.join(b'\x00' + bytes((x * y) % 256 for x in range(width)) for y in range(height))
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(rows)) + chunk(b'IEND', b''))
+
+
+def _crc_collision(data, offset):
+    """
+    Другие данные той же длины и с тем же CRC-32: изменяются биты data[offset:offset + 8].
+    CRC-32 линейна по изменению битов, поэтому нужная комбинация находится
+    исключением Гаусса над GF(2).
+    """
+    base = zlib.crc32(data)
+    rows = []
+    for bit in range(64):
+        flipped = bytearray(data)
+        flipped[offset + bit // 8] ^= 1 << (bit % 8)
+        rows.append((zlib.crc32(bytes(flipped)) ^ base, 1 << bit))
+    basis = {}
+    for value, combination in rows:
+        for pivot in sorted(basis, reverse=True):
+            if value >> pivot & 1:
+                value ^= basis[pivot][0]
+                combination ^= basis[pivot][1]
+        if value == 0:
+            forged = bytearray(data)
+            for bit in range(64):
+                if combination >> bit & 1:
+                    forged[offset + bit // 8] ^= 1 << (bit % 8)
+            return bytes(forged)
+        basis[value.bit_length() - 1] = (value, combination)
+    raise AssertionError('Коллизия не найдена')
+
+
+class TestPackageWriter:
+    """
+    Тесты save_document
+    """
+
+    def setup_method(self):
+        """
+        Создает документ с изображением
+        """
+        doc = Document()
+        doc.add_paragraph('Текст до рисунка.')
+        doc.add_picture(io.BytesIO(_png(64, 64)), width=Cm(5))
+        stream = io.BytesIO()
+        doc.save(stream)
+        self.content = stream.getvalue()
+
+    def _corrected(self):
+        document = Document(io.BytesIO(self.content))
+        document.paragraphs[0].runs[0].font.name = 'Times New Roman'
+        return document
+
+    @staticmethod
+    def _raw_entries(content):
+        """
+        Сжатые байты каждой записи ZIP
+        """
+        result = {}
+        with zipfile.ZipFile(io.BytesIO(content)) as zipf:
+            for info in zipf.infolist():
+                offset = info.header_offset + zipfile.sizeFileHeader
+                header = struct.unpack(zipfile.structFileHeader,
+                                       content[info.header_offset:offset])
+                offset += header[10] + header[11]
+                result[info.filename] = content[offset:offset + info.compress_size]
+        return result
+
+    def test_unchanged_parts_copied(self):
+        """
+        Изображение и неизмененные XML-части копируются как есть, document.xml записывается заново
+        """
+        document = self._corrected()
+        stream = io.BytesIO()
+        saved = save_document(document, stream, source=self.content)
+
+        assert 'word/media/image1.png' in saved['copied']
+        assert 'word/document.xml' in saved['compressed']
+        source_raw = self._raw_entries(self.content)
+        result_raw = self._raw_entries(stream.getvalue())
+        for name in saved['copied']:
+            assert result_raw[name] == source_raw[name]
+        assert zipfile.ZipFile(io.BytesIO(stream.getvalue())).testzip() is None
+
+        reference = io.BytesIO()
+        document.save(reference)
+        assert package_digest(io.BytesIO(stream.getvalue())) == package_digest(reference)
+        assert Document(io.BytesIO(stream.getvalue())).paragraphs[0].runs[0].font.name == 'Times New Roman'
+
+    def test_compression_level(self):
+        """
+        Уровень 0 записывает измененные части без сжатия; неверное значение переменной окружения игнорируется
+        """
+        stream = io.BytesIO()
+        save_document(self._corrected(), stream, source=self.content, compression_level=0)
+
+        with zipfile.ZipFile(io.BytesIO(stream.getvalue())) as zipf:
+            assert zipf.getinfo('word/document.xml').compress_type == zipfile.ZIP_STORED
+        with patch.dict(os.environ, {'DOCX_COMPRESSION_LEVEL': '1'}):
+            assert get_docx_compression_level() == 1
+        with patch.dict(os.environ, {'DOCX_COMPRESSION_LEVEL': 'max'}):
+            assert get_docx_compression_level() == 6
+
+    def test_crc_collision_not_copied(self):
+        """
+        Часть с тем же размером и CRC-32, но другим содержимым записывается заново
+        """
+        document = self._corrected()
+        image = next(part for part in document.part.package.parts if part.partname == '/word/media/image1.png')
+        forged = _crc_collision(image.blob, len(image.blob) - 8)
+        assert forged != image.blob and zlib.crc32(forged) == zlib.crc32(image.blob)
+        image._blob = forged
+
+        stream = io.BytesIO()
+        saved = save_document(document, stream, source=self.content)
+
+        assert 'word/media/image1.png' in saved['compressed']
+        with zipfile.ZipFile(io.BytesIO(stream.getvalue())) as zipf:
+            assert zipf.read('word/media/image1.png') == forged
+
+    def test_fallback_without_zipfile_internals(self):
+        """
+        Без нужных внутренних полей zipfile все части сжимаются заново
+        """
+        stream = io.BytesIO()
+        with patch('app.services.package_writer.raw_copy_supported', return_value=False):
+            saved = save_document(self._corrected(), stream, source=self.content)
+
+        assert saved['copied'] == []
+        assert zipfile.ZipFile(io.BytesIO(stream.getvalue())).testzip() is None
@@ -0,0 +1,94 @@
+"""
+Модульные тесты для позиционного индекса параграфов
+"""
+import os
+import sys
+import base64
+
+from docx import Document
+from docx.shared import Inches
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.paragraph_index import ParagraphIndex, index_paragraphs_by_position
+from app.services.document_processor import DocumentProcessor
+
+# PNG 1x1 пиксель
+PIXEL_PNG = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=='
+)
+
+
+class TestParagraphIndex:
+    """
+    Модульные тесты для класса ParagraphIndex
+    """
+    
+    def _build_document(self, tmp_path):
+        """
+        Создает документ с рисунками, подписями и таблицей
+        """
+        image_path = tmp_path / "pixel.png"
+        image_path.write_bytes(PIXEL_PNG)
+        
+        doc = Document()
+        doc.add_paragraph("Текст перед рисунком.")                           # 0
+        doc.add_paragraph().add_run().add_picture(str(image_path), width=Inches(1))  # 1
+        doc.add_paragraph("Рисунок 1 – Первая схема.")                        # 2
+        for _ in range(4):
+            doc.add_paragraph("Промежуточный текст.")                        # 3..6
+        doc.add_paragraph("Рисунок 2 – Подпись без рисунка.")                 # 7
+        doc.add_paragraph("Таблица 1 – Данные")                               # 8
+        doc.add_table(rows=2, cols=2)
+        file_path = tmp_path / "index.docx"
+        doc.save(str(file_path))
+        return Document(str(file_path)), str(file_path)
+    
+    def test_positions_and_pictures(self, tmp_path):
+        """
+        Позиции совпадают с document.paragraphs, рисунки отмечены
+        """
+        document, _ = self._build_document(tmp_path)
+        index = ParagraphIndex(document)
+        
+        assert len(index) == len(document.paragraphs)
+        assert index.picture_positions == [1]
+        assert index.has_picture(1)
+        assert not index.has_picture(100)
+        for i, element in enumerate(index.elements):
+            assert index.position_of(element) == i
+    
+    def test_images_for_caption(self, tmp_path):
+        """
+        Подпись находит рисунок только в пределах трех предыдущих параграфов
+        """
+        document, _ = self._build_document(tmp_path)
+        index = ParagraphIndex(document)
+        
+        assert index.images_for_caption(2) == [1]
+        assert index.images_for_caption(7) == []
+        assert index.images_for_caption(0) == []
+    
+    def test_preceding_paragraph_for_table(self, tmp_path):
+        """
+        Для таблицы возвращается предшествующий параграф с заголовком
+        """
+        document, file_path = self._build_document(tmp_path)
+        index = ParagraphIndex(document)
+        
+        prev_para = index.preceding_paragraph(document.tables[0]._element)
+        assert prev_para is not None
+        assert prev_para.text == "Таблица 1 – Данные"
+        
+        tables = DocumentProcessor(file_path)._extract_tables()
+        assert tables[0]['title'] == "Таблица 1 – Данные"
+    
+    def test_index_paragraphs_by_position(self):
+        """
+        Словарь параграфов строится по полю index
+        """
+        paragraphs = [{'index': 3, 'text': 'a'}, {'index': 7, 'text': 'b'}, None]
+        by_index = index_paragraphs_by_position(paragraphs)
+        assert by_index[7]['text'] == 'b'
+        assert 5 not in by_index
@@ -0,0 +1,125 @@
+"""
+Модульные тесты однопроходного обхода параграфов
+"""
+import os
+import sys
+from unittest.mock import patch
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.norm_control_checker import NormControlChecker
+from app.services.paragraph_visitor import ParagraphVisitorEngine, ParagraphFacts
+
+
+class TestParagraphVisitorEngine:
+    """
+    Тесты движка ParagraphVisitorEngine
+    """
+
+    def setup_method(self):
+        """
+        Настройка перед каждым тестом
+        """
+        self.document_data = {
+            'paragraphs': [
+                {'index': 0, 'text': 'ВВЕДЕНИЕ', 'style': 'Heading 1'},
+                {'index': 1, 'text': '  Текст  ', 'style': 'Normal'},
+                {'index': 2, 'text': 'Рисунок 1 – Схема', 'style': 'Normal', 'is_caption': True},
+            ]
+        }
+
+    def test_facts(self):
+        """
+        Общие признаки параграфа вычисляются один раз и доступны всем обработчикам
+        """
+        facts = ParagraphFacts(self.document_data['paragraphs'][1], 1)
+        assert facts.stripped == 'Текст'
+        assert facts.is_heading is False
+        assert facts.is_code_listing is False
+
+        heading = ParagraphFacts(self.document_data['paragraphs'][0], 0)
+        assert heading.is_heading_style and heading.is_heading
+
+        caption = ParagraphFacts(self.document_data['paragraphs'][2], 2)
+        assert caption.is_caption
+
+    def test_single_pass_dispatch(self):
+        """
+        Каждый параграф передается всем зарегистрированным обработчикам за один проход
+        """
+        visited = []
+
+        def first(facts, issues, context):
+            visited.append(('first', facts.position))
+            if facts.is_heading:
+                issues.append({'type': 'heading', 'next': facts.next.stripped})
+
+        def second(facts, issues, context):
+            visited.append(('second', facts.position))
+            issues.append({'type': context, 'prev': facts.prev.position if facts.prev else None})
+
+        engine = ParagraphVisitorEngine()
+        engine.register('first', first)
+        engine.register('second', second, prepare=lambda data: 'prepared')
+        results = engine.run(self.document_data)
+
+        assert visited == [('first', 0), ('second', 0), ('first', 1), ('second', 1), ('first', 2), ('second', 2)]
+        assert results['first'] == [{'type': 'heading', 'next': 'Текст', 'paragraph_index': 0}]
+        assert [issue['prev'] for issue in results['second']] == [None, 0, 1]
+        assert [issue['paragraph_index'] for issue in results['second']] == [0, 1, 2]
+        assert all(issue['type'] == 'prepared' for issue in results['second'])
+
+    def test_selected_positions(self):
+        """
+        При заданных позициях обработчики вызываются только для них, соседи доступны
+        """
+        neighbors = []
+
+        def visit(facts, issues, context):
+            neighbors.append((facts.position, facts.prev.position if facts.prev else None,
+                              facts.next.position if facts.next else None))
+
+        engine = ParagraphVisitorEngine()
+        engine.register('visit', visit)
+        engine.run(self.document_data, positions={2, 1, 7})
+        assert neighbors == [(1, 0, 2), (2, 1, None)]
+
+    def test_code_listing_detected_lazily(self):
+        """
+        Признак листинга кода вычисляется только при обращении
+        """
+        calls = []
+        engine = ParagraphVisitorEngine(code_listing_detector=lambda para: calls.append(para) or True)
+        engine.register('noop', lambda facts, issues, context: None)
+        engine.run(self.document_data)
+        assert calls == []
+
+    def test_checker_runs_text_checks_in_one_pass(self):
+        """
+        check_document выполняет текстовые проверки одним проходом с тем же результатом
+        """
+        checker = NormControlChecker()
+        document_data = {
+            'paragraphs': [
+                {'index': 0, 'text': 'Пушкин А.С. писал в 5 главе', 'style': 'Normal',
+                 'font': {'name': 'Arial', 'size': 14.0}, 'line_spacing': 1.0,
+                 'paragraph_format': {'first_line_indent': 1.25}},
+                {'index': 1, 'text': 'ГЛАВА', 'style': 'Heading 1',
+                 'paragraph_format': {'space_before': 0, 'space_after': 0}},
+                {'index': 2, 'text': 'Текст', 'style': 'Normal', 'font': {}},
+            ],
+            'headings': [],
+            'bibliography': []
+        }
+        names = list(NormControlChecker.PARAGRAPH_VISITORS)
+        separate = {name: getattr(checker, name)(document_data) for name in names}
+
+        with patch('app.services.norm_control_checker.ParagraphVisitorEngine.run',
+                   autospec=True, side_effect=ParagraphVisitorEngine.run) as run:
+            fused = checker._run_paragraph_visitors(document_data, names)
+        assert run.call_count == 1
+        assert fused == separate
+        assert fused['_check_font'][0]['type'] == 'font_name'
+        assert fused['_check_surnames'][0]['type'] == 'surname_wrong_order_in_text'
+        assert fused['_check_heading_spacing']
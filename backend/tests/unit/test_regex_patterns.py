@@ -0,0 +1,62 @@
+"""
+Модульные тесты реестра предкомпилированных регулярных выражений
+"""
+import os
+import re
+import sys
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services import regex_patterns as rx
+from app.services.document_processor import DocumentProcessor
+from app.services.norm_control_checker import NormControlChecker
+
+
+class TestRegexPatterns:
+    """
+    Тесты реестра regex_patterns
+    """
+
+    def setup_method(self):
+        """
+        Настройка перед каждым тестом
+        """
+        self.samples = [
+            'Иванов, И.И. Основы программирования – М., 2020. – 300 с.',
+            'Как показано на рис. 3 и в табл. 2, в 5 главе',
+            'т.д. и т.п. в 2019 г. на стр. 5',
+            'Пушкин А.С. и А. С. Пушкин',
+            '',
+        ]
+
+    def test_all_patterns_compiled(self):
+        """
+        Реестр содержит только скомпилированные шаблоны
+        """
+        patterns = rx.all_patterns()
+        assert patterns
+        assert all(isinstance(pattern, re.Pattern) for pattern in patterns)
+        assert rx.HANGING_WORD in patterns
+        assert all(pattern in patterns for pattern in rx.BIBLIOGRAPHY_RECORD_PATTERNS.values())
+
+    def test_forbidden_hyphen_any_matches_individual_words(self):
+        """
+        Объединенный шаблон запрещенных переносов эквивалентен проверке по отдельным словам
+        """
+        for text in self.samples:
+            expected = any(re.search(pattern, text) for pattern in rx.FORBIDDEN_HYPHEN_WORDS)
+            assert bool(rx.FORBIDDEN_HYPHEN_ANY.search(text)) == expected
+
+    def test_services_share_registry(self):
+        """
+        Проверки используют общие шаблоны, а не создают их для каждого экземпляра
+        """
+        checker = NormControlChecker()
+        assert not hasattr(checker, 'bibliography_patterns')
+        assert checker._determine_bibliography_record_type(self.samples[0]) == 'one_author'
+        assert checker._is_code_listing({'text': 'def main(): return 0', 'style': 'Normal', 'font': {}})
+
+        processor = DocumentProcessor.__new__(DocumentProcessor)
+        assert processor._looks_like_bibliography_item(self.samples[0])
+        assert not processor._looks_like_bibliography_item('Обычный текст')
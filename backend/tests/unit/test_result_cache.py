@@ -0,0 +1,96 @@
+"""
+Модульные тесты для кеша результатов обработки документов
+"""
+import os
+import sys
+import threading
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.result_cache import ResultCache, make_cache_key
+
+
+class TestResultCache:
+    """
+    Модульные тесты для класса ResultCache
+    """
+    
+    def test_cache_key_depends_on_content_and_rules(self):
+        """
+        Ключ зависит от содержимого файла и набора правил
+        """
+        key = make_cache_key(b'document')
+        assert key == make_cache_key(b'document')
+        assert key != make_cache_key(b'other document')
+        assert key != make_cache_key(b'document', [2, 3])
+        assert make_cache_key(b'document', [3, 2]) == make_cache_key(b'document', [2, 3])
+    
+    def test_memory_and_disk_roundtrip(self, tmp_path):
+        """
+        Запись доступна из памяти и после перезапуска (с диска) вместе с документом
+        """
+        artifact = tmp_path / "corrected.docx"
+        artifact.write_bytes(b'docx bytes')
+        
+        cache = ResultCache(cache_dir=str(tmp_path / "cache"))
+        cache.put('key1', {'check_results': {'total_issues_count': 3}}, artifact_path=str(artifact))
+        assert cache.get('key1')['check_results']['total_issues_count'] == 3
+        
+        reopened = ResultCache(cache_dir=str(tmp_path / "cache"))
+        entry = reopened.get('key1')
+        assert entry['artifact'] is True
+        restored = tmp_path / "restored.docx"
+        assert reopened.restore_artifact('key1', str(restored))
+        assert restored.read_bytes() == b'docx bytes'
+        assert reopened.get('missing') is None
+    
+    def test_memory_lru_eviction(self):
+        """
+        В памяти хранится не больше max_memory_entries записей
+        """
+        cache = ResultCache(cache_dir=None, max_memory_entries=2)
+        cache.put('a', {'n': 1})
+        cache.put('b', {'n': 2})
+        cache.get('a')
+        cache.put('c', {'n': 3})
+        assert cache.get('b') is None
+        assert cache.get('a')['n'] == 1
+        assert cache.get('c')['n'] == 3
+    
+    def test_disk_size_eviction(self, tmp_path):
+        """
+        На диске вытесняются давно не использованные записи при превышении лимита
+        """
+        cache = ResultCache(cache_dir=str(tmp_path), max_memory_entries=1, max_disk_bytes=3000)
+        for i in range(5):
+            cache.put(f'k{i}', {'payload': 'x' * 1000})
+            os.utime(os.path.join(str(tmp_path), f'k{i}.pkl'), (i, i))
+        cache._evict_disk()
+        
+        remaining = sorted(name for name in os.listdir(str(tmp_path)) if name.endswith('.pkl'))
+        assert remaining == ['k3.pkl', 'k4.pkl']
+    
+    def test_concurrent_put_same_key(self, tmp_path):
+        """
+        Одновременные записи одного ключа не портят запись и не оставляют временных файлов
+        """
+        artifacts = []
+        for i in range(8):
+            artifact = tmp_path / f"corrected_{i}.docx"
+            artifact.write_bytes(bytes([i]) * 256 * 1024)
+            artifacts.append(artifact)
+        cache = ResultCache(cache_dir=str(tmp_path / "cache"))
+        threads = [
+            threading.Thread(target=cache.put, args=('key1', {'n': i}), kwargs={'artifact_path': str(artifact)})
+            for i, artifact in enumerate(artifacts)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        entry = ResultCache(cache_dir=str(tmp_path / "cache")).get('key1')
+        assert entry['artifact'] is True and 0 <= entry['n'] < 8
+        assert len(set((tmp_path / "cache" / "key1.docx").read_bytes())) == 1
+        assert not [name for name in os.listdir(tmp_path / "cache") if name.endswith('.tmp')]
@@ -0,0 +1,113 @@
+"""
+Модульные тесты для исправления шрифта через стили (режим 'styles')
+"""
+import os
+import sys
+import zipfile
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import qn
+from docx.shared import Pt
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.document_corrector import DocumentCorrector
+from app.services.formatting_resolver import FormattingResolver
+
+
+class TestStyleFormatting:
+    """
+    Тесты режима formatting_mode = 'styles' в DocumentCorrector
+    """
+
+    def setup_method(self):
+        """
+        Создает документ с прямым форматированием runs и собственным стилем параграфа
+        """
+        self.doc = Document()
+        self.doc.add_heading('ВВЕДЕНИЕ', level=1)
+        for i in range(5):
+            para = self.doc.add_paragraph(f'Абзац {i} основного текста. ')
+            para.runs[0].font.name = 'Arial'
+            para.runs[0].font.size = Pt(12)
+            run = para.add_run('Выделенная часть.')
+            run.font.bold = True
+        custom = self.doc.styles.add_style('Основной текст работы', WD_STYLE_TYPE.PARAGRAPH)
+        custom.font.name = 'Calibri'
+        custom.font.size = Pt(11)
+        self.doc.add_paragraph('Текст в собственном стиле', style=custom)
+        self.doc.add_paragraph('1. Первый пункт списка')
+        self.doc.add_heading('Подраздел', level=2)
+
+    def _correct(self, tmp_path, mode):
+        """
+        Исправляет копию документа в заданном режиме и возвращает путь к результату
+        """
+        source = tmp_path / "source.docx"
+        self.doc.save(source)
+        corrector = DocumentCorrector()
+        corrector.formatting_mode = mode
+        return corrector.correct_document(str(source), out_path=str(tmp_path / f"out_{mode}.docx"))
+
+    @staticmethod
+    def _effective_formatting(path):
+        """
+        Действующее форматирование параграфов и runs тела документа
+        """
+        document = Document(path)
+        resolver = FormattingResolver(document)
+        result = []
+        for paragraph in document.paragraphs:
+            style_id = resolver.paragraph_style_id(paragraph._p)
+            result.append(resolver.resolve_paragraph(paragraph._p))
+            result.extend((run.text, resolver.resolve_run(run._r, style_id)) for run in paragraph.runs)
+        return result
+
+    def test_same_effective_formatting_and_smaller_document(self, tmp_path):
+        """
+        Режим 'styles' дает то же действующее форматирование, что и 'direct',
+        при меньшем document.xml
+        """
+        direct = self._correct(tmp_path, 'direct')
+        styles = self._correct(tmp_path, 'styles')
+
+        assert self._effective_formatting(styles) == self._effective_formatting(direct)
+        with zipfile.ZipFile(direct) as direct_zip, zipfile.ZipFile(styles) as styles_zip:
+            assert len(styles_zip.read('word/document.xml')) < len(direct_zip.read('word/document.xml'))
+
+    def test_run_font_moved_to_styles(self, tmp_path):
+        """
+        Шрифт и размер заданы стилями, а в runs остается только отличное от стиля форматирование
+        """
+        document = Document(self._correct(tmp_path, 'styles'))
+
+        for paragraph in document.paragraphs:
+            for run in paragraph.runs:
+                assert run.font.name is None
+                assert run.font.size is None
+        bold_runs = [run for run in document.paragraphs[1].runs if run.font.bold]
+        assert [run.text for run in bold_runs] == ['Выделенная часть.']
+
+        custom = document.styles['Основной текст работы']
+        assert custom.font.name == 'Times New Roman'
+        assert custom.font.size == Pt(14)
+
+    def test_character_style_keeps_direct_font(self):
+        """
+        Если шрифт run задан символьным стилем, нужный шрифт остается прямым форматированием
+        """
+        code_style = self.doc.styles.add_style('Код', WD_STYLE_TYPE.CHARACTER)
+        code_style.font.name = 'Courier New'
+        para = self.doc.add_paragraph()
+        para.add_run('print()', style=code_style)
+
+        corrector = DocumentCorrector()
+        corrector.formatting_mode = 'styles'
+        corrector._apply_core_styles(self.doc)
+        corrector._correct_font(self.doc)
+
+        run = para.runs[0]
+        assert run.font.name == 'Times New Roman'
+        assert run._r.rPr.find(qn('w:sz')) is None
@@ -0,0 +1,114 @@
+"""
+Модульные тесты для точечного исправления замечаний по их месту
+"""
+import os
+import sys
+
+from docx import Document
+from docx.shared import Pt
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.document_corrector import DocumentCorrector
+from app.services.document_index import DocumentIndex
+from app.services.norm_control_checker import NormControlChecker
+
+
+class TestTargetedCorrections:
+    """
+    Тесты _correct_specific_errors с замечаниями, указывающими параграф
+    """
+
+    def setup_method(self):
+        """
+        Создает документ, в котором у всех параграфов неверный шрифт
+        """
+        self.doc = Document()
+        self.doc.add_heading('Введение.', level=1)
+        for i in range(4):
+            para = self.doc.add_paragraph(f'Абзац {i} ')
+            para.runs[0].font.name = 'Arial'
+            para.runs[0].font.size = Pt(12)
+            run = para.add_run('продолжение')
+            run.font.name = 'Arial'
+        self.corrector = DocumentCorrector()
+        self.corrector.formatting_mode = 'direct'
+        self.corrector._document_index = DocumentIndex(self.doc)
+
+    def test_error_position(self):
+        """
+        Позиция берется из paragraph_index или из места "Параграф N" / "Заголовок N"
+        """
+        assert DocumentCorrector._error_position({'paragraph_index': 3, 'location': 'Параграф 9'}) == 3
+        assert DocumentCorrector._error_position({'location': 'Параграф 12'}) == 11
+        assert DocumentCorrector._error_position({'location': 'Заголовок 1'}) == 0
+        assert DocumentCorrector._error_position({'location': 'Документ'}) is None
+        assert DocumentCorrector._error_position({'location': 'Параграф 5, фрагмент 2'}) == 4
+        assert DocumentCorrector._error_runs({'location': 'Параграф 5, фрагмент 2'}) == (1,)
+        assert DocumentCorrector._error_runs({'location': 'Параграф 5'}) is None
+        assert DocumentCorrector._error_runs({'run_index': 0, 'location': 'Параграф 5, фрагмент 2'}) == (0,)
+
+    def test_only_located_paragraphs_and_runs_corrected(self):
+        """
+        Исправляются только указанные параграфы и runs, остальные не затрагиваются
+        """
+        errors = [
+            {'type': 'font_name', 'location': 'Параграф 3'},
+            {'type': 'font_size', 'paragraph_index': 4, 'run_index': 1},
+        ]
+        touched = self.corrector._correct_specific_errors(self.doc, errors)
+        paragraphs = self.doc.paragraphs
+
+        assert touched == {2: None, 4: {1}}
+        assert [run.font.name for run in paragraphs[2].runs] == ['Times New Roman', 'Times New Roman']
+        assert [run.font.name for run in paragraphs[4].runs] == ['Arial', 'Times New Roman']
+        assert [run.font.name for run in paragraphs[1].runs] == ['Arial', 'Arial']
+        assert [run.font.name for run in paragraphs[3].runs] == ['Arial', 'Arial']
+
+    def test_heading_and_fallback(self):
+        """
+        Заголовок исправляется по месту; замечание без места исправляет весь документ
+        """
+        touched = self.corrector._correct_specific_errors(self.doc, [{'type': 'heading_dot', 'location': 'Заголовок 1'}])
+        assert touched == {0: None}
+        assert self.doc.paragraphs[0].text == 'ВВЕДЕНИЕ'
+
+        touched = self.corrector._correct_specific_errors(self.doc, [
+            {'type': 'font_name', 'location': 'Параграф 2'},
+            {'type': 'font_name', 'location': 'Документ'},
+        ])
+        assert touched is None
+        for paragraph in self.doc.paragraphs[1:]:
+            assert {run.font.name for run in paragraph.runs} == {'Times New Roman'}
+
+    def test_checker_fragment_locations(self):
+        """
+        Замечания проверки о фрагментах ("Параграф N, фрагмент M") исправляют только эти runs
+        """
+        self.doc.paragraphs[2].runs[0].font.name = 'Times New Roman'
+        document_data = {'paragraphs': [
+            {
+                'index': i,
+                'text': paragraph.text,
+                'style': paragraph.style.name,
+                'is_heading': paragraph.style.name.startswith('Heading'),
+                'runs': [
+                    {'text': run.text, 'style': {'font': {'name': run.font.name, 'size': 14.0}}}
+                    for run in paragraph.runs
+                ],
+            }
+            for i, paragraph in enumerate(self.doc.paragraphs)
+        ]}
+        issues = [
+            issue for issue in NormControlChecker()._check_accents(document_data)
+            if issue['location'].startswith('Параграф 3,')
+        ]
+        assert [issue['location'] for issue in issues] == ['Параграф 3, фрагмент 2']
+
+        touched = self.corrector._correct_specific_errors(self.doc, issues)
+        paragraphs = self.doc.paragraphs
+
+        assert touched == {2: {1}}
+        assert [run.font.name for run in paragraphs[2].runs] == ['Times New Roman', 'Times New Roman']
+        assert [run.font.name for run in paragraphs[1].runs] == ['Arial', 'Arial']
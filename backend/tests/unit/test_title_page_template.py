@@ -0,0 +1,56 @@
+"""
+Модульные тесты для вставки титульного листа из шаблона
+"""
+import io
+import os
+import sys
+
+from docx import Document
+
+# Добавляем путь к корневой директории проекта
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from app.services.document_corrector import DocumentCorrector, get_title_page_template
+
+
+class TestTitlePageTemplate:
+    """
+    Тесты кеша шаблона титульного листа и вставки в памяти
+    """
+
+    def setup_method(self):
+        """
+        Создает документ без титульного листа
+        """
+        self.doc = Document()
+        self.doc.add_heading('ВВЕДЕНИЕ', level=1)
+        self.doc.add_paragraph('Текст введения.')
+        self.texts = [p.text for p in self.doc.paragraphs]
+
+    def test_template_parsed_once(self):
+        """
+        Шаблон разбирается один раз на процесс; отсутствующий шаблон — None
+        """
+        template = get_title_page_template()
+
+        assert template is not None
+        assert get_title_page_template() is template
+        assert get_title_page_template('/nonexistent/Титульный лист.docx') is None
+
+    def test_insert_in_memory(self):
+        """
+        Титульный лист вставляется в начало без временных файлов, общий шаблон не меняется
+        """
+        template = get_title_page_template()
+        template_texts = [p.text for p in template.paragraphs]
+        corrector = DocumentCorrector()
+
+        corrector._insert_title_page_from_template(self.doc)
+
+        assert corrector.temp_files == []
+        assert [p.text for p in template.paragraphs] == template_texts
+        stream = io.BytesIO()
+        self.doc.save(stream)
+        texts = [p.text for p in Document(io.BytesIO(stream.getvalue())).paragraphs]
+        assert texts[:len(template_texts)] == template_texts
+        assert texts[len(template_texts):] == self.texts